@@ -0,0 +1,244 @@
+"""
+Resumen de actividad de cada ticket, desnormalizado en sus columnas
+total_comentarios, fecha_ultimo_comentario, autor_ultimo_comentario y
+extracto_ultimo_comentario.
+
+Se mantiene en la misma transacción que la escritura de los comentarios:
+    - Altas (save() y crear_lote): un único UPDATE por lote suma al total y
+      reemplaza el último comentario si el nuevo es más reciente. Es el
+      mismo UPDATE que mueve fecha_actualizacion para la sincronización
+      incremental, así que no agrega consultas.
+    - Bajas y comentarios movidos (fusionar_tickets): el ticket se
+      recalcula desde sus comentarios.
+Las importaciones y los datos sintéticos lo completan antes de insertar
+(asignar) y ArchivedTicket lo conserva al archivar.
+
+El listado, el detalle, el admin y la sincronización leen las columnas
+sin contar comentarios. ?ordering=-fecha_ultimo_comentario,
+?actividad_desde= y ?actividad_hasta= usan el índice
+ticket_actividad_id_idx. El comando rebuild_ticket_activity recalcula
+todo por lotes.
+"""
+from datetime import date, datetime, time
+
+from django.db import router, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Substr
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import ArchivedComment, ArchivedTicket, Comment, Ticket
+
+
+PARAMETRO_DESDE = 'actividad_desde'
+PARAMETRO_HASTA = 'actividad_hasta'
+
+# Tickets por UPDATE al registrar comentarios en lote
+LOTE_UPDATE = 100
+
+
+def extracto(contenido):
+    return contenido[:Ticket.LARGO_EXTRACTO]
+
+
+def _ultimo(comentarios):
+    """El más reciente; a igual fecha, el último insertado."""
+    ultimo = None
+    for comentario in comentarios:
+        if ultimo is None or comentario.fecha_creacion >= ultimo.fecha_creacion:
+            ultimo = comentario
+    return ultimo
+
+
+def _copiar_ultimo(ticket, comentario):
+    ticket.fecha_ultimo_comentario = comentario.fecha_creacion
+    ticket.autor_ultimo_comentario = comentario.autor
+    ticket.extracto_ultimo_comentario = extracto(comentario.contenido)
+
+
+def asignar(ticket, comentarios):
+    """
+    Completa el resumen de un ticket aún sin guardar con los comentarios
+    que se insertarán con él (importación, datos sintéticos).
+    """
+    ticket.total_comentarios = len(comentarios)
+    ultimo = _ultimo(comentarios)
+    if ultimo is not None:
+        _copiar_ultimo(ticket, ultimo)
+
+
+def registrar_comentarios(comentarios, using=None):
+    """
+    Suma comentarios recién insertados al resumen de sus tickets y mueve su
+    fecha_actualizacion, con un UPDATE cada LOTE_UPDATE tickets. Los
+    tickets enlazados en memoria a los comentarios se actualizan también,
+    para que la respuesta de la escritura los muestre sin releerlos.
+
+    Args:
+        comentarios (list): Comentarios ya insertados, con fecha_creacion
+    """
+    por_ticket = {}
+    for comentario in comentarios:
+        por_ticket.setdefault(comentario.ticket_id, []).append(comentario)
+    if not por_ticket:
+        return
+    using = using or router.db_for_write(Ticket)
+    ahora = timezone.now()
+
+    grupos = list(por_ticket.items())
+    for inicio in range(0, len(grupos), LOTE_UPDATE):
+        lote = grupos[inicio:inicio + LOTE_UPDATE]
+        sumas, fechas, autores, extractos = [], [], [], []
+        for ticket_id, suyos in lote:
+            ultimo = _ultimo(suyos)
+            # El último guardado puede ser más nuevo (importaciones con fechas originales)
+            mas_reciente = Q(pk=ticket_id) & (
+                Q(fecha_ultimo_comentario__isnull=True) |
+                Q(fecha_ultimo_comentario__lte=ultimo.fecha_creacion)
+            )
+            sumas.append(When(pk=ticket_id, then=Value(len(suyos))))
+            fechas.append(When(mas_reciente, then=Value(ultimo.fecha_creacion)))
+            autores.append(When(mas_reciente, then=Value(ultimo.autor)))
+            extractos.append(When(mas_reciente, then=Value(extracto(ultimo.contenido))))
+        Ticket.objects.using(using).filter(pk__in=[ticket_id for ticket_id, _ in lote]).update(
+            total_comentarios=F('total_comentarios') + Case(*sumas, default=Value(0)),
+            fecha_ultimo_comentario=Case(*fechas, default=F('fecha_ultimo_comentario')),
+            autor_ultimo_comentario=Case(*autores, default=F('autor_ultimo_comentario')),
+            extracto_ultimo_comentario=Case(*extractos, default=F('extracto_ultimo_comentario')),
+            fecha_actualizacion=ahora,
+        )
+
+    for suyos in por_ticket.values():
+        _actualizar_en_memoria(suyos)
+
+
+def _actualizar_en_memoria(comentarios):
+    """Aplica el alta a las instancias de Ticket ya enlazadas a los comentarios."""
+    ultimo = _ultimo(comentarios)
+    tickets = {
+        id(comentario.ticket): comentario.ticket for comentario in comentarios
+        if Comment.ticket.is_cached(comentario)
+    }
+    for ticket in tickets.values():
+        # Las columnas diferidas se leerán ya actualizadas
+        if 'total_comentarios' in ticket.__dict__:
+            ticket.total_comentarios += len(comentarios)
+        anterior = ticket.__dict__.get('fecha_ultimo_comentario')
+        if anterior is None or anterior <= ultimo.fecha_creacion:
+            _copiar_ultimo(ticket, ultimo)
+
+
+def recalcular(tickets, comentarios=Comment, actualizar_fecha=False):
+    """
+    Recalcula el resumen de `tickets` desde sus comentarios con un único
+    UPDATE de subconsultas correlacionadas, que leen el índice
+    (ticket, fecha_creacion, id) de cada ticket.
+
+    Args:
+        tickets (QuerySet): Tickets, o ArchivedTicket, a recalcular
+        comentarios (Model): Modelo de sus comentarios (Comment o ArchivedComment)
+        actualizar_fecha (bool): Mover también fecha_actualizacion
+
+    Returns:
+        int: Tickets actualizados
+    """
+    suyos = comentarios.objects.filter(ticket=OuterRef('pk')).order_by()
+    recientes = suyos.order_by('-fecha_creacion', '-id')
+    valores = {
+        'total_comentarios': Coalesce(
+            Subquery(suyos.values('ticket').annotate(total=Count('id')).values('total')), 0
+        ),
+        'fecha_ultimo_comentario': Subquery(recientes.values('fecha_creacion')[:1]),
+        'autor_ultimo_comentario': Coalesce(
+            Subquery(recientes.values('autor')[:1]), Value('')
+        ),
+        'extracto_ultimo_comentario': Coalesce(
+            Subquery(
+                recientes.annotate(extracto=Substr('contenido', 1, Ticket.LARGO_EXTRACTO))
+                .values('extracto')[:1]
+            ),
+            Value('')
+        ),
+    }
+    if actualizar_fecha:
+        valores['fecha_actualizacion'] = timezone.now()
+    return tickets.update(**valores)
+
+
+def recalcular_tickets(ids, using=None):
+    """Recalcula los tickets activos indicados y mueve su fecha_actualizacion."""
+    using = using or router.db_for_write(Ticket)
+    return recalcular(
+        Ticket.objects.using(using).filter(pk__in=ids), actualizar_fecha=True
+    )
+
+
+def reconstruir(lote=2000, using=None):
+    """
+    Recalcula el resumen de todos los tickets, activos y archivados, en
+    transacciones de `lote` tickets. No mueve fecha_actualizacion.
+
+    Yields:
+        int: Tickets recalculados en cada lote
+    """
+    using = using or router.db_for_write(Ticket)
+    for modelo_ticket, modelo_comentario in ((Ticket, Comment), (ArchivedTicket, ArchivedComment)):
+        ids = modelo_ticket.objects.using(using).order_by('id').values_list('id', flat=True)
+        ultimo = None
+        while True:
+            pendientes = ids if ultimo is None else ids.filter(id__gt=ultimo)
+            bloque = list(pendientes[:lote])
+            if not bloque:
+                break
+            with transaction.atomic(using=using):
+                recalcular(
+                    modelo_ticket.objects.using(using).filter(id__gte=bloque[0], id__lte=bloque[-1]),
+                    modelo_comentario
+                )
+            ultimo = bloque[-1]
+            yield len(bloque)
+
+
+def elimina_ticket(origen):
+    """True si la eliminación empezó por un Ticket: sus comentarios caen con él."""
+    return isinstance(origen, Ticket) or getattr(origen, 'model', None) is Ticket
+
+
+def _fecha(valor, parametro, fin_del_dia=False):
+    """YYYY-MM-DD o fecha y hora ISO 8601."""
+    try:
+        if len(valor) == 10:
+            resultado = datetime.combine(
+                date.fromisoformat(valor), time.max if fin_del_dia else time.min
+            )
+        else:
+            resultado = datetime.fromisoformat(valor)
+    except ValueError:
+        raise ValidationError({parametro: [f'Fecha inválida: {valor}. Use ISO 8601.']})
+    if timezone.is_naive(resultado):
+        resultado = timezone.make_aware(resultado)
+    return resultado
+
+
+def filtra(query_params):
+    """True si la petición usa ?actividad_desde= o ?actividad_hasta=."""
+    return any(query_params.get(parametro) for parametro in (PARAMETRO_DESDE, PARAMETRO_HASTA))
+
+
+def filtrar(queryset, query_params):
+    """
+    Aplica ?actividad_desde= y ?actividad_hasta= (fecha del último
+    comentario, ambas incluidas).
+
+    Raises:
+        ValidationError: Si alguna fecha no es válida
+    """
+    desde = query_params.get(PARAMETRO_DESDE)
+    hasta = query_params.get(PARAMETRO_HASTA)
+    if desde:
+        queryset = queryset.filter(fecha_ultimo_comentario__gte=_fecha(desde, PARAMETRO_DESDE))
+    if hasta:
+        queryset = queryset.filter(
+            fecha_ultimo_comentario__lte=_fecha(hasta, PARAMETRO_HASTA, fin_del_dia=True)
+        )
+    return queryset
@@ -12,11 +12,14 @@ class TicketAdmin(admin.ModelAdmin):
     
     list_display = [
         'id', 'titulo_truncado', 'estado_badge', 'prioridad_badge', 
-        'solicitante', 'fecha_creacion', 'total_comentarios'
+        'solicitante', 'fecha_creacion', 'total_comentarios', 'fecha_ultimo_comentario'
     ]
     list_filter = ['estado', 'prioridad', 'fecha_creacion']
     search_fields = ['titulo', 'descripcion', 'solicitante', 'email']
-    readonly_fields = ['fecha_creacion', 'fecha_actualizacion']
+    readonly_fields = [
+        'fecha_creacion', 'fecha_actualizacion', 'total_comentarios',
+        'fecha_ultimo_comentario', 'autor_ultimo_comentario', 'extracto_ultimo_comentario',
+    ]
     ordering = ['-fecha_creacion']
     
     fieldsets = (
@@ -29,6 +32,13 @@ class TicketAdmin(admin.ModelAdmin):
         ('Solicitante', {
             'fields': ('solicitante', 'email')
         }),
+        ('Actividad', {
+            'fields': (
+                'total_comentarios', 'fecha_ultimo_comentario',
+                'autor_ultimo_comentario', 'extracto_ultimo_comentario',
+            ),
+            'classes': ('collapse',)
+        }),
         ('Metadatos', {
             'fields': ('fecha_creacion', 'fecha_actualizacion'),
             'classes': ('collapse',)
@@ -74,15 +84,11 @@ class TicketAdmin(admin.ModelAdmin):
     prioridad_badge.short_description = 'Prioridad'
     
     def total_comentarios(self, obj):
-        """Muestra el total de comentarios."""
-        count = obj.comentarios.count()
+        """Muestra el total de comentarios (columna de actividad, sin N+1)."""
+        count = obj.total_comentarios
         return f"{count} comentario{'s' if count != 1 else ''}"
     total_comentarios.short_description = 'Comentarios'
-    
-    def get_queryset(self, request):
-        """Optimiza las consultas para evitar N+1."""
-        queryset = super().get_queryset(request)
-        return queryset.prefetch_related('comentarios')
+    total_comentarios.admin_order_field = 'total_comentarios'
 
 
 class CommentInline(admin.TabularInline):
@@ -104,12 +110,14 @@ class CommentAdmin(admin.ModelAdmin):
     search_fields = ['contenido', 'autor', 'ticket__titulo']
     readonly_fields = ['fecha_creacion']
     ordering = ['-fecha_creacion']
+    # ticket_link lee el título del ticket: se trae en la misma consulta
+    list_select_related = ['ticket']
     
     def ticket_link(self, obj):
         """Muestra un enlace al ticket asociado."""
         return format_html(
             '<a href="/admin/tickets/ticket/{}/change/">Ticket #{} - {}</a>',
-            obj.ticket.id, obj.ticket.id, obj.ticket.titulo[:30]
+            obj.ticket_id, obj.ticket_id, obj.ticket.titulo[:30]
         )
     ticket_link.short_description = 'Ticket'
     
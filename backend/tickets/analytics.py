@@ -0,0 +1,378 @@
+"""
+Métricas operativas a partir del historial de TicketEvent.
+
+El comando rollup_metrics incorpora los eventos nuevos a TicketMetricRollup
+(por hora y por día, estado y prioridad) en lotes, registrando el último
+evento procesado en la misma transacción; puede ejecutarse en cualquier
+momento y retoma donde quedó. Los reportes (mttr, backlog, throughput) leen
+solo esos acumulados, de modo que su costo depende de la cantidad de
+períodos pedidos y no de los años de historia.
+
+Los períodos se calculan en la zona horaria del proyecto (TIME_ZONE).
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import cache
+from .models import RollupCheckpoint, Ticket, TicketEvent, TicketMetricRollup
+
+
+HORA = TicketMetricRollup.HORA
+DIA = TicketMetricRollup.DIA
+GRANULARIDADES = (HORA, DIA)
+NOMBRE_CHECKPOINT = 'metricas'
+
+# Estados que cuentan como trabajo pendiente
+ESTADOS_BACKLOG = ('nuevo', 'en_proceso')
+
+CAMPOS_ACUMULADOS = (
+    'creados', 'entradas', 'salidas', 'segundos_en_estado',
+    'salidas_medidas', 'segundos_desde_creacion',
+)
+
+
+class RangoInvalido(ValueError):
+    """Parámetros de granularidad, fechas o prioridad inválidos."""
+
+
+def inicio_periodo(fecha, granularidad):
+    """Inicio de la hora o del día local que contiene `fecha`."""
+    local = timezone.localtime(fecha)
+    if granularidad == HORA:
+        return local.replace(minute=0, second=0, microsecond=0)
+    return timezone.make_aware(datetime.combine(local.date(), time()))
+
+
+def siguiente_periodo(inicio, granularidad):
+    if granularidad == HORA:
+        return inicio + timedelta(hours=1)
+    return timezone.make_aware(datetime.combine(inicio.date() + timedelta(days=1), time()))
+
+
+# --- Acumulado incremental ---------------------------------------------------
+
+def _deltas(eventos):
+    """
+    Agrupa eventos en incrementos por (granularidad, período, estado, prioridad).
+    Cada evento es una entrada a su estado y una salida del anterior.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(CAMPOS_ACUMULADOS, 0))
+    for evento in eventos:
+        for granularidad in GRANULARIDADES:
+            periodo = inicio_periodo(evento.fecha, granularidad)
+            if evento.estado:
+                delta = deltas[(granularidad, periodo, evento.estado, evento.prioridad)]
+                delta['entradas'] += 1
+                if evento.tipo == TicketEvent.CREADO:
+                    delta['creados'] += 1
+                if evento.segundos_desde_creacion is not None:
+                    delta['segundos_desde_creacion'] += evento.segundos_desde_creacion
+            if evento.estado_anterior:
+                delta = deltas[(granularidad, periodo, evento.estado_anterior, evento.prioridad)]
+                delta['salidas'] += 1
+                if evento.segundos_en_estado is not None:
+                    delta['segundos_en_estado'] += evento.segundos_en_estado
+                    delta['salidas_medidas'] += 1
+    return deltas
+
+
+def _aplicar(deltas, using):
+    """Suma los incrementos a las filas existentes y crea las que faltan."""
+    existentes = {}
+    for granularidad in GRANULARIDADES:
+        periodos = sorted({clave[1] for clave in deltas if clave[0] == granularidad})
+        for inicio in range(0, len(periodos), 500):
+            filas = TicketMetricRollup.objects.using(using).filter(
+                granularidad=granularidad, periodo__in=periodos[inicio:inicio + 500]
+            )
+            existentes.update(
+                ((fila.granularidad, fila.periodo, fila.estado, fila.prioridad), fila)
+                for fila in filas
+            )
+
+    # Totales nuevos calculados aquí y escritos con un único upsert por bloque
+    filas = []
+    for clave, delta in deltas.items():
+        granularidad, periodo, estado, prioridad = clave
+        fila = TicketMetricRollup(
+            granularidad=granularidad, periodo=periodo, estado=estado, prioridad=prioridad
+        )
+        existente = existentes.get(clave)
+        for campo, valor in delta.items():
+            setattr(fila, campo, valor + (getattr(existente, campo) if existente else 0))
+        filas.append(fila)
+
+    TicketMetricRollup.objects.using(using).bulk_create(
+        filas, batch_size=500, update_conflicts=True,
+        unique_fields=['granularidad', 'periodo', 'estado', 'prioridad'],
+        update_fields=CAMPOS_ACUMULADOS,
+    )
+
+
+def acumular(lote=None, margen=None, using=DEFAULT_DB_ALIAS):
+    """
+    Incorpora a los acumulados los eventos posteriores al último procesado.
+
+    Solo toma eventos registrados hace más de `margen` segundos, para no
+    saltear los de transacciones que todavía no confirmaron.
+
+    Args:
+        lote (int): Eventos por transacción (TICKETS_ROLLUP_BATCH)
+        margen (float): Segundos de margen (TICKETS_ROLLUP_SAFETY_WINDOW)
+        using (str): Alias de la base de datos
+
+    Returns:
+        int: Eventos procesados
+    """
+    if lote is None:
+        lote = getattr(settings, 'TICKETS_ROLLUP_BATCH', 5000)
+    if margen is None:
+        margen = getattr(settings, 'TICKETS_ROLLUP_SAFETY_WINDOW', 5)
+    limite = timezone.now() - timedelta(seconds=margen)
+
+    procesados = 0
+    while True:
+        with transaction.atomic(using=using):
+            avance, _ = (
+                RollupCheckpoint.objects.using(using).select_for_update()
+                .get_or_create(nombre=NOMBRE_CHECKPOINT)
+            )
+            eventos = list(
+                TicketEvent.objects.using(using)
+                .filter(id__gt=avance.ultimo_evento, fecha_registro__lt=limite)
+                .order_by('id')[:lote]
+            )
+            if not eventos:
+                break
+            _aplicar(_deltas(eventos), using)
+            avance.ultimo_evento = eventos[-1].id
+            avance.save(update_fields=['ultimo_evento', 'fecha_actualizacion'])
+        procesados += len(eventos)
+
+    if procesados:
+        cache.invalidar(using=using)
+    return procesados
+
+
+def reiniciar(using=DEFAULT_DB_ALIAS):
+    """Borra los acumulados para recalcularlos desde el primer evento."""
+    with transaction.atomic(using=using):
+        TicketMetricRollup.objects.using(using).all().delete()
+        RollupCheckpoint.objects.using(using).filter(nombre=NOMBRE_CHECKPOINT).delete()
+
+
+def completar_historial(lote=2000, using=DEFAULT_DB_ALIAS):
+    """
+    Crea el historial aproximado (TicketEvent.historial_inicial) de los
+    tickets que no tienen eventos: anteriores a la tabla o generados sin
+    señales. Se puede repetir; los tickets con historial se saltean.
+
+    Returns:
+        int: Eventos creados
+    """
+    ultimo, creados = 0, 0
+    while True:
+        tickets = list(
+            Ticket.objects.using(using).filter(id__gt=ultimo).order_by('id')
+            .only('id', 'estado', 'prioridad', 'fecha_creacion', 'fecha_actualizacion')[:lote]
+        )
+        if not tickets:
+            return creados
+        ultimo = tickets[-1].id
+
+        con_historial = set(
+            TicketEvent.objects.using(using)
+            .filter(ticket_id__gte=tickets[0].id, ticket_id__lte=ultimo)
+            .values_list('ticket_id', flat=True).distinct()
+        )
+        eventos = [
+            evento
+            for ticket in tickets if ticket.id not in con_historial
+            for evento in TicketEvent.historial_inicial(ticket)
+        ]
+        with transaction.atomic(using=using):
+            TicketEvent.objects.using(using).bulk_create(eventos, batch_size=1000)
+        creados += len(eventos)
+
+
+# --- Reportes ----------------------------------------------------------------
+
+def _fecha(valor, nombre):
+    fecha = parse_datetime(valor)
+    if fecha is None:
+        dia = parse_date(valor)
+        if dia is None:
+            raise RangoInvalido(f'{nombre} debe ser una fecha ISO 8601.')
+        fecha = datetime.combine(dia, time())
+    if timezone.is_naive(fecha):
+        fecha = timezone.make_aware(fecha)
+    return fecha
+
+
+def rango(query_params):
+    """
+    Interpreta ?granularidad=hora|dia, ?desde=, ?hasta= y ?prioridad=.
+    Por defecto: últimos 30 días por día, o últimas 48 horas por hora.
+
+    Returns:
+        tuple: (granularidad, [inicio de cada período], prioridad o None)
+
+    Raises:
+        RangoInvalido: Si algún parámetro no es válido
+    """
+    granularidad = query_params.get('granularidad', DIA)
+    if granularidad not in GRANULARIDADES:
+        raise RangoInvalido(f'granularidad debe ser {" o ".join(GRANULARIDADES)}.')
+
+    prioridad = query_params.get('prioridad') or None
+    if prioridad is not None and prioridad not in Ticket.PRIORIDAD_DISPLAY:
+        raise RangoInvalido(f'Prioridad desconocida: {prioridad}.')
+
+    hasta = _fecha(query_params['hasta'], 'hasta') if query_params.get('hasta') else timezone.now()
+    if query_params.get('desde'):
+        desde = _fecha(query_params['desde'], 'desde')
+    else:
+        desde = hasta - (timedelta(hours=48) if granularidad == HORA else timedelta(days=30))
+    if desde >= hasta:
+        raise RangoInvalido('desde debe ser anterior a hasta.')
+
+    maximo = getattr(settings, 'TICKETS_ANALYTICS_MAX_PERIODS', 1000)
+    periodos = []
+    periodo = inicio_periodo(desde, granularidad)
+    while periodo < hasta:
+        if len(periodos) == maximo:
+            raise RangoInvalido(
+                f'El rango abarca más de {maximo} períodos; use granularidad=dia o acórtelo.'
+            )
+        periodos.append(periodo)
+        periodo = siguiente_periodo(periodo, granularidad)
+    return granularidad, periodos, prioridad
+
+
+def _acumulados(granularidad, periodos, prioridad):
+    """Sumas por (período, estado) del rango, en una consulta."""
+    filas = TicketMetricRollup.objects.filter(
+        granularidad=granularidad,
+        periodo__gte=periodos[0],
+        periodo__lt=siguiente_periodo(periodos[-1], granularidad),
+    )
+    if prioridad:
+        filas = filas.filter(prioridad=prioridad)
+    filas = filas.values('periodo', 'estado').annotate(
+        **{campo: Sum(campo) for campo in CAMPOS_ACUMULADOS}
+    ).order_by()
+
+    resultado = defaultdict(dict)
+    for fila in filas:
+        resultado[fila['periodo']][fila['estado']] = fila
+    return resultado
+
+
+def _valor(acumulados, periodo, estado, campo):
+    return acumulados.get(periodo, {}).get(estado, {}).get(campo) or 0
+
+
+def _horas(segundos, cantidad):
+    return round(segundos / cantidad / 3600, 2) if cantidad else None
+
+
+def _encabezado(granularidad, periodos, prioridad):
+    return {
+        'granularidad': granularidad,
+        'desde': periodos[0].isoformat(),
+        'hasta': siguiente_periodo(periodos[-1], granularidad).isoformat(),
+        'prioridad': prioridad,
+    }
+
+
+def throughput(granularidad, periodos, prioridad=None):
+    """Tickets creados, resueltos y cerrados por período."""
+    acumulados = _acumulados(granularidad, periodos, prioridad)
+    series = []
+    for periodo in periodos:
+        series.append({
+            'periodo': periodo.isoformat(),
+            'creados': sum(
+                _valor(acumulados, periodo, estado, 'creados') for estado in Ticket.ESTADO_DISPLAY
+            ),
+            'resueltos': _valor(acumulados, periodo, 'resuelto', 'entradas'),
+            'cerrados': _valor(acumulados, periodo, 'cerrado', 'entradas'),
+        })
+    return {**_encabezado(granularidad, periodos, prioridad), 'series': series}
+
+
+def mttr(granularidad, periodos, prioridad=None):
+    """
+    Tiempo medio hasta la resolución (desde la creación) por período y
+    en el rango, y tiempo medio en cada estado en el rango.
+    """
+    acumulados = _acumulados(granularidad, periodos, prioridad)
+    series = []
+    resueltos_total = segundos_total = 0
+    for periodo in periodos:
+        resueltos = _valor(acumulados, periodo, 'resuelto', 'entradas')
+        segundos = _valor(acumulados, periodo, 'resuelto', 'segundos_desde_creacion')
+        resueltos_total += resueltos
+        segundos_total += segundos
+        series.append({
+            'periodo': periodo.isoformat(),
+            'resueltos': resueltos,
+            'mttr_horas': _horas(segundos, resueltos),
+        })
+
+    tiempo_en_estado = {}
+    for estado, nombre in Ticket.STATUS_CHOICES:
+        salidas = sum(_valor(acumulados, p, estado, 'salidas_medidas') for p in periodos)
+        segundos = sum(_valor(acumulados, p, estado, 'segundos_en_estado') for p in periodos)
+        tiempo_en_estado[estado] = {
+            'nombre': nombre,
+            'salidas': salidas,
+            'promedio_horas': _horas(segundos, salidas),
+        }
+
+    return {
+        **_encabezado(granularidad, periodos, prioridad),
+        'resueltos': resueltos_total,
+        'mttr_horas': _horas(segundos_total, resueltos_total),
+        'tiempo_en_estado': tiempo_en_estado,
+        'series': series,
+    }
+
+
+def backlog(granularidad, periodos, prioridad=None):
+    """
+    Tickets en cada estado al cierre de cada período: el saldo anterior al
+    rango (acumulados diarios hasta el día de inicio y horarios dentro de
+    ese día) más las entradas y salidas de cada período.
+    """
+    dia_inicio = inicio_periodo(periodos[0], DIA)
+    anteriores = TicketMetricRollup.objects.filter(
+        Q(granularidad=DIA, periodo__lt=dia_inicio) |
+        Q(granularidad=HORA, periodo__gte=dia_inicio, periodo__lt=periodos[0])
+    )
+    if prioridad:
+        anteriores = anteriores.filter(prioridad=prioridad)
+    saldo = defaultdict(int)
+    for fila in anteriores.values('estado').annotate(e=Sum('entradas'), s=Sum('salidas')).order_by():
+        saldo[fila['estado']] = fila['e'] - fila['s']
+
+    acumulados = _acumulados(granularidad, periodos, prioridad)
+    series = []
+    for periodo in periodos:
+        for estado in Ticket.ESTADO_DISPLAY:
+            saldo[estado] += (
+                _valor(acumulados, periodo, estado, 'entradas') -
+                _valor(acumulados, periodo, estado, 'salidas')
+            )
+        series.append({
+            'periodo': periodo.isoformat(),
+            'abiertos': sum(saldo[estado] for estado in ESTADOS_BACKLOG),
+            'por_estado': {estado: saldo[estado] for estado in Ticket.ESTADO_DISPLAY},
+        })
+    return {**_encabezado(granularidad, periodos, prioridad), 'series': series}
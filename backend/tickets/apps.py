@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class TicketsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tickets'
-    verbose_name = 'Sistema de Tickets'
\ No newline at end of file
+    verbose_name = 'Sistema de Tickets'
+    
+    def ready(self):
+        """Registra los receptores de señales de la aplicación."""
+        from . import signals  # noqa: F401
\ No newline at end of file
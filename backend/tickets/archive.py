@@ -0,0 +1,263 @@
+"""
+Archivo de tickets cerrados.
+
+'cerrado' es un estado final: pasado un tiempo, el comando archive_closed
+mueve esos tickets y sus comentarios a ArchivedTicket y ArchivedComment
+para que las tablas activas (y sus índices) contengan solo el conjunto de
+trabajo. Cada lote se mueve en una transacción, por lo que el comando es
+reanudable: si se interrumpe, los tickets aún no movidos siguen cerrados en
+la tabla activa y la siguiente ejecución continúa con ellos.
+
+Mover un ticket al archivo no es eliminarlo: no deja tombstone ni evento de
+eliminación. Se descuenta de los contadores y de los índices de texto
+completo y de duplicados, que describen solo la tabla activa.
+
+La API lee del archivo de forma transparente:
+    GET /api/tickets/{id}/                  Detalle (y sus comentarios)
+    GET /api/tickets/?include_archived=1    Listado con activos y archivados
+"""
+import heapq
+import re
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache, duplicates, search, stats
+from .filters import ordenar
+from .models import ArchivedComment, ArchivedTicket, Comment, Ticket
+
+
+PARAMETRO_ARCHIVADOS = 'include_archived'
+ESTADO_ARCHIVABLE = 'cerrado'
+
+# Columnas copiadas tal cual a la tabla de archivo
+CAMPOS_TICKET = tuple(campo.attname for campo in Ticket._meta.concrete_fields)
+CAMPOS_COMENTARIO = tuple(campo.attname for campo in Comment._meta.concrete_fields)
+
+_ANTIGUEDAD = re.compile(r'^\s*(\d+)\s*([dhw]?)\s*$')
+_UNIDADES = {'': 'days', 'd': 'days', 'h': 'hours', 'w': 'weeks'}
+_EPOCA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICROSEGUNDO = timedelta(microseconds=1)
+
+
+def incluye_archivados(request):
+    """True con ?include_archived=1 (o true)."""
+    valor = request.query_params.get(PARAMETRO_ARCHIVADOS, '')
+    return valor.lower() in ('1', 'true')
+
+
+def parsear_antiguedad(texto):
+    """
+    Convierte '90d', '12h', '2w' o '90' (días) en un timedelta.
+
+    Raises:
+        ValueError: Si el formato no es válido
+    """
+    coincidencia = _ANTIGUEDAD.match(texto or '')
+    if not coincidencia:
+        raise ValueError(f"Antigüedad inválida: '{texto}'. Use por ejemplo 90d, 12h o 2w.")
+    cantidad, unidad = coincidencia.groups()
+    return timedelta(**{_UNIDADES[unidad]: int(cantidad)})
+
+
+def archivables(antes_de, using='default'):
+    """Tickets cerrados sin actividad desde `antes_de`."""
+    return Ticket.objects.using(using).filter(
+        estado=ESTADO_ARCHIVABLE, fecha_actualizacion__lt=antes_de
+    )
+
+
+def candidatos(antes_de, limite, using='default'):
+    """
+    Ids del siguiente lote de archivables, los más antiguos primero (índice
+    por fecha de actualización).
+    """
+    return list(
+        archivables(antes_de, using)
+        .order_by('fecha_actualizacion', 'id')
+        .values_list('id', flat=True)[:limite]
+    )
+
+
+def archivar_tickets(ids, using='default'):
+    """
+    Mueve los tickets cerrados indicados y sus comentarios al archivo, en
+    una sola transacción. Los ids que ya no estén cerrados en la tabla
+    activa se ignoran.
+
+    Returns:
+        tuple: (tickets movidos, comentarios movidos)
+    """
+    with transaction.atomic(using=using):
+        tickets = list(
+            Ticket.objects.using(using)
+            .filter(id__in=ids, estado=ESTADO_ARCHIVABLE)
+            .values(*CAMPOS_TICKET)
+        )
+        if not tickets:
+            return 0, 0
+        ids = [fila['id'] for fila in tickets]
+        comentarios = list(
+            Comment.objects.using(using).filter(ticket_id__in=ids).values(*CAMPOS_COMENTARIO)
+        )
+
+        ahora = timezone.now()
+        ArchivedTicket.objects.using(using).bulk_create(
+            [ArchivedTicket(**fila, fecha_archivado=ahora) for fila in tickets]
+        )
+        ArchivedComment.objects.using(using).bulk_create(
+            [ArchivedComment(**fila) for fila in comentarios], batch_size=1000
+        )
+
+        search.eliminar_comentarios([fila['id'] for fila in comentarios])
+        search.eliminar_tickets(ids)
+        duplicates.eliminar(ids, using)
+        # Sin señales de eliminación: el ticket se mueve, no se borra
+        Comment.objects.using(using).filter(ticket_id__in=ids)._raw_delete(using)
+        Ticket.objects.using(using).filter(id__in=ids)._raw_delete(using)
+
+        stats.aplicar_deltas(_descuentos(tickets))
+        cache.invalidar(ids, using)
+    return len(tickets), len(comentarios)
+
+
+def _descuentos(tickets):
+    """Variación de los contadores por los tickets que salen de la tabla activa."""
+    deltas = Counter()
+    for fila in tickets:
+        deltas[(fila['estado'], fila['prioridad'])] -= 1
+    return deltas
+
+
+def archivar_cerrados(antiguedad, lote=None, maximo=None, using='default'):
+    """
+    Archiva por lotes todos los tickets cerrados sin actividad en `antiguedad`.
+
+    Args:
+        antiguedad (timedelta): Tiempo mínimo desde la última actualización
+        lote (int): Tickets por transacción (TICKETS_ARCHIVE_BATCH)
+        maximo (int): Tope de tickets a mover en esta ejecución (None = todos)
+
+    Yields:
+        tuple: (tickets movidos, comentarios movidos) de cada lote
+    """
+    if lote is None:
+        lote = getattr(settings, 'TICKETS_ARCHIVE_BATCH', 500)
+    antes_de = timezone.now() - antiguedad
+    movidos = 0
+
+    while maximo is None or movidos < maximo:
+        limite = lote if maximo is None else min(lote, maximo - movidos)
+        ids = candidatos(antes_de, limite, using)
+        if not ids:
+            return
+        resultado = archivar_tickets(ids, using)
+        movidos += resultado[0]
+        yield resultado
+
+
+def filtrar_estado(archivados, estado):
+    """
+    Filtro por estado sobre el archivo. Solo se archivan tickets cerrados,
+    así que no hace falta un índice por estado: o coinciden todos o ninguno.
+    """
+    if estado and estado != ESTADO_ARCHIVABLE:
+        return archivados.none()
+    return archivados
+
+
+def contar(estado=None):
+    """Tickets archivados, opcionalmente de un estado."""
+    return filtrar_estado(ArchivedTicket.objects.all(), estado).count()
+
+
+def _valor_orden(valor, descendente):
+    """
+    Valor comparable de una fecha o un id para la mezcla: NULL es el más
+    bajo, como en tickets.filters, y en orden descendente se invierte.
+    """
+    if valor is None:
+        clave = (0, 0)
+    elif isinstance(valor, datetime):
+        clave = (1, (valor - _EPOCA) // _MICROSEGUNDO)
+    else:
+        clave = (1, valor)
+    return (-clave[0], -clave[1]) if descendente else clave
+
+
+def _clave_orden(orden):
+    """Clave de heapq.merge para filas de .values() ordenadas por `orden`."""
+    campos = [(campo.lstrip('-'), campo.startswith('-')) for campo in orden]
+
+    def clave(fila):
+        return tuple(_valor_orden(fila[nombre], descendente) for nombre, descendente in campos)
+    return clave
+
+
+class ConsultaCombinada:
+    """
+    Tickets activos y archivados como una sola consulta paginable.
+
+    Recibe dos consultas de .values() con las mismas columnas. Los filtros
+    se aplican a ambas; al cortar una página cada tabla lee sus primeras
+    filas por su propio índice y se mezclan ordenadas en memoria, de modo
+    que la paginación por cursor o por número funciona sin UNION ni un
+    orden sobre el total.
+
+    El orden es el del keyset (TicketPagination.orden_keyset): una fecha,
+    que puede ser NULL, y el desempate por id.
+    """
+
+    ordered = True
+
+    def __init__(self, activos, archivados, orden=None):
+        self.activos = activos
+        self.archivados = archivados
+        self.orden = tuple(orden or ('-fecha_creacion', '-id'))
+
+    @property
+    def db(self):
+        return self.activos.db
+
+    @property
+    def model(self):
+        return self.activos.model
+
+    def filter(self, *args, **kwargs):
+        return ConsultaCombinada(
+            self.activos.filter(*args, **kwargs),
+            self.archivados.filter(*args, **kwargs),
+            self.orden,
+        )
+
+    def order_by(self, *campos):
+        return ConsultaCombinada(self.activos, self.archivados, campos or self.orden)
+
+    def aplicar(self, funcion):
+        """Aplica `funcion` a la consulta de cada tabla."""
+        return ConsultaCombinada(funcion(self.activos), funcion(self.archivados), self.orden)
+
+    def count(self):
+        return self.activos.count() + self.archivados.count()
+
+    def __getitem__(self, corte):
+        if not isinstance(corte, slice):
+            return self[corte:corte + 1][0]
+        inicio, fin = corte.start or 0, corte.stop
+        partes = [
+            ordenar(consulta, self.orden)[:fin] if fin is not None
+            else ordenar(consulta, self.orden)
+            for consulta in (self.activos, self.archivados)
+        ]
+        mezcla = heapq.merge(*partes, key=_clave_orden(self.orden))
+        return list(islice(mezcla, inicio, fin))
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __len__(self):
+        return self.count()
@@ -0,0 +1,238 @@
+"""
+Lecturas de la API como vistas async nativas, para despliegues ASGI.
+
+Con TICKETS_ASYNC_READS activo, tickets.urls atiende con estas vistas los
+GET de:
+    /api/tickets/                 Listado (estado, search, page, page_size, cursor)
+    /api/tickets/{id}/            Detalle con sus últimos comentarios
+    /api/tickets/{id}/comments/   Comentarios (paginación por cursor opcional)
+    /api/tickets/stats/           Estadísticas (estado, search)
+
+Las consultas usan el ORM async (acount, afirst, async for) y la
+búsqueda de texto completo corre con sync_to_async. Armar los datos y
+renderizarlos con orjson se hace en el pool de hilos de asgiref, así el
+event loop solo coordina. Con Django 4.2 el ORM async ejecuta cada
+consulta en el hilo de la petición. Ese hilo solo se ocupa mientras la
+base responde: una búsqueda lenta no retiene el worker entre consulta y
+consulta.
+
+Las respuestas son las de TicketViewSet: mismos bytes, cabeceras Allow y
+Vary, claves de caché y ETag. La única diferencia es Vary: Cookie, que
+DRF agrega al leer la sesión para autenticar. Por eso las vistas async
+solo responden si el ViewSet es público (AllowAny, sin throttling). Se
+delega en la acción síncrona del router en estos casos:
+    - otros métodos (POST, PATCH, DELETE)
+    - la API navegable
+    - parámetros sin versión async (fields, expand, include_archived,
+      ordering, total)
+    - tickets archivados o inexistentes
+    - páginas o cursores inválidos
+    - ViewSets con autenticación, permisos o throttling
+benchmark_asgi verifica la equivalencia y compara WSGI contra ASGI.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import path
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import AllowAny
+from rest_framework.request import Request
+
+from . import cache, fastpath, instrumentation, search, stats
+from .models import Comment, Ticket
+from .pagination import CommentPagination, TicketPagination
+from .renderers import ORJSONRenderer
+from .serializers import CommentSerializer, TicketDetailSerializer
+
+
+_renderizador = ORJSONRenderer()
+
+
+def rutas(router):
+    """
+    Rutas de las lecturas async. Van antes de las del router, cuyas vistas
+    atienden lo que aquí se delega.
+
+    Args:
+        router (DefaultRouter): Router de tickets.urls
+    """
+    sincronas = {patron.name: patron.callback for patron in router.urls if patron.name}
+    return [
+        path('api/tickets/', vista_async(
+            listar, sincronas['ticket-list'],
+            ('estado', 'search', 'page', 'page_size', 'paginacion', 'cursor'),
+        ), name='ticket-list'),
+        path('api/tickets/stats/', vista_async(
+            estadisticas, sincronas['ticket-stats'], ('estado', 'search'),
+        ), name='ticket-stats'),
+        path('api/tickets/<int:pk>/', vista_async(
+            detalle, sincronas['ticket-detail'],
+        ), name='ticket-detail'),
+        path('api/tickets/<int:pk>/comments/', vista_async(
+            comentarios, sincronas['ticket-comments'], ('paginacion', 'cursor', 'page_size'),
+        ), name='ticket-comments'),
+    ]
+
+
+def vista_async(nativa, sincrona, parametros=()):
+    """
+    Vista que atiende con `nativa` los GET en JSON con solo `parametros`
+    y delega el resto en `sincrona`, la vista del router para la misma ruta.
+
+    `nativa` devuelve la respuesta, o None para delegar.
+    """
+    permitidos = _metodos_permitidos(sincrona)
+    publica = _es_publica(sincrona.cls)
+    delegar = sync_to_async(sincrona)
+
+    async def vista(request, **kwargs):
+        if publica and request.method == 'GET' and _admite(request, parametros):
+            respuesta = await nativa(request, **kwargs)
+            if respuesta is not None:
+                # Las mismas cabeceras que agrega APIView.finalize_response
+                respuesta['Allow'] = permitidos
+                if 'Vary' not in respuesta:
+                    respuesta['Vary'] = 'Accept'
+                return respuesta
+        return await delegar(request, **{clave: str(valor) for clave, valor in kwargs.items()})
+
+    # Como las vistas de DRF: la autenticación de DRF aplica CSRF por su cuenta
+    vista.csrf_exempt = True
+    # ReplicaMiddleware decide por la clase y la acción de la vista
+    vista.cls = sincrona.cls
+    vista.actions = sincrona.actions
+    vista.__name__ = nativa.__name__
+    return vista
+
+
+def _metodos_permitidos(sincrona):
+    """Cabecera Allow de la vista del router (APIView.allowed_methods)."""
+    metodos = set(sincrona.actions) | {'options'}
+    if 'get' in metodos:
+        metodos.add('head')
+    return ', '.join(
+        metodo.upper() for metodo in sincrona.cls.http_method_names if metodo in metodos
+    )
+
+
+def _es_publica(viewset):
+    """Sin permisos ni throttling que verificar: no hace falta autenticar."""
+    return not viewset.throttle_classes and all(
+        issubclass(permiso, AllowAny) for permiso in viewset.permission_classes
+    )
+
+
+def _admite(request, parametros):
+    """True si la petición pide JSON y solo usa parámetros con versión async."""
+    formato = request.GET.get('format')
+    if formato is None:
+        # La negociación de DRF elige la API navegable para los navegadores
+        if 'text/html' in request.headers.get('Accept', ''):
+            return False
+    elif formato != 'json':
+        return False
+    return all(nombre in parametros or nombre == 'format' for nombre in request.GET)
+
+
+async def _json(construir):
+    """
+    Arma los datos con construir() y los renderiza en el pool de hilos: la
+    serialización no ocupa el event loop.
+    """
+    def renderizar():
+        datos = construir()
+        with instrumentation.medir_serializacion():
+            return _renderizador.render(datos)
+
+    contenido = await sync_to_async(renderizar, thread_sensitive=False)()
+    return HttpResponse(contenido, content_type=_renderizador.media_type)
+
+
+def _tickets_filtrados(request):
+    """Tickets filtrados por ?estado=, como TicketViewSet.get_queryset()."""
+    tickets = Ticket.objects.all()
+    estado = request.GET.get('estado')
+    if estado:
+        tickets = tickets.filter(estado=estado)
+    return tickets
+
+
+@cache.respuesta_cacheada_async('list')
+async def listar(request):
+    """Listado con .values() (fastpath) y paginación por número o por cursor."""
+    if not getattr(settings, 'TICKETS_FAST_LIST', True):
+        return None
+
+    filas = _tickets_filtrados(request)
+    texto = request.GET.get('search')
+    if texto:
+        filas = await sync_to_async(search.filtrar)(filas, texto)
+    filas = filas.values(*fastpath.CAMPOS_LISTA)
+
+    paginador = TicketPagination()
+    try:
+        pagina = await paginador.apaginate_queryset(filas, Request(request))
+    except NotFound:
+        return None
+    if pagina is None:
+        return None
+    return await _json(
+        lambda: paginador.get_paginated_response(fastpath.filas_lista(pagina)).data
+    )
+
+
+@cache.respuesta_cacheada_async('retrieve', por_ticket=True)
+async def detalle(request, pk):
+    """Detalle con los últimos TICKETS_DETAIL_COMMENTS comentarios embebidos."""
+    try:
+        ticket = await Ticket.objects.aget(pk=pk)
+    except Ticket.DoesNotExist:
+        return None
+
+    limite = getattr(settings, 'TICKETS_DETAIL_COMMENTS', 20)
+    recientes = [
+        comentario async for comentario in
+        Comment.objects.filter(ticket_id=pk).order_by('-fecha_creacion', '-id')[:limite + 1]
+    ]
+    hay_anteriores = len(recientes) > limite
+    recientes = recientes[:limite]
+    recientes.reverse()
+    # Lo que calcularía TicketDetailSerializer: serializar no consulta la base
+    ticket._ultimos_comentarios = (recientes, hay_anteriores)
+    return await _json(lambda: TicketDetailSerializer(ticket).data)
+
+
+async def comentarios(request, pk):
+    """Comentarios del ticket en orden cronológico, todos o por cursor."""
+    if not await Ticket.objects.filter(pk=pk).aexists():
+        return None
+
+    queryset = Comment.objects.filter(ticket_id=pk)
+    paginador = CommentPagination()
+    peticion = Request(request)
+    if not paginador.usa_cursor(peticion):
+        todos = [comentario async for comentario in queryset]
+        return await _json(lambda: CommentSerializer(todos, many=True).data)
+
+    try:
+        pagina = await paginador.apaginate_queryset(queryset, peticion)
+    except NotFound:
+        return None
+    return await _json(
+        lambda: paginador.get_paginated_response(CommentSerializer(pagina, many=True).data).data
+    )
+
+
+@cache.respuesta_cacheada_async('stats')
+async def estadisticas(request):
+    """Desde la tabla de contadores, o con una consulta agrupada si hay filtros."""
+    estado = request.GET.get('estado')
+    texto = request.GET.get('search')
+    if not (estado or texto):
+        resumen = await stats.aresumen_contadores()
+    else:
+        tickets = _tickets_filtrados(request)
+        if texto:
+            tickets = await sync_to_async(search.coincidencias)(tickets, texto)
+        resumen = await stats.aresumen_queryset(tickets)
+    return await _json(lambda: resumen)
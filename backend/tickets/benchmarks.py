@@ -0,0 +1,89 @@
+"""
+Utilidades compartidas por los comandos de benchmark: percentiles,
+metadatos de la ejecución y guardado/comparación de resultados en JSON.
+"""
+import json
+import platform
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.db import connection
+
+
+def percentil(valores_ordenados, p):
+    """Percentil p (0-100) por interpolación lineal sobre valores ordenados."""
+    if not valores_ordenados:
+        return 0.0
+    posicion = (len(valores_ordenados) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(valores_ordenados) - 1)
+    fraccion = posicion - inferior
+    return valores_ordenados[inferior] + (
+        valores_ordenados[superior] - valores_ordenados[inferior]
+    ) * fraccion
+
+
+def resumir_tiempos(tiempos_ms):
+    """
+    Returns:
+        dict: {n, media_ms, p50_ms, p95_ms, p99_ms, max_ms}
+    """
+    ordenados = sorted(tiempos_ms)
+    return {
+        'n': len(ordenados),
+        'media_ms': round(sum(ordenados) / len(ordenados), 3) if ordenados else 0.0,
+        'p50_ms': round(percentil(ordenados, 50), 3),
+        'p95_ms': round(percentil(ordenados, 95), 3),
+        'p99_ms': round(percentil(ordenados, 99), 3),
+        'max_ms': round(ordenados[-1], 3) if ordenados else 0.0,
+    }
+
+
+def metadatos():
+    """Contexto de la ejecución para comparar resultados entre versiones."""
+    from .models import Ticket, Comment
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, cwd=settings.BASE_DIR, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'motor': connection.vendor,
+        'tickets': Ticket.objects.count(),
+        'comentarios': Comment.objects.count(),
+    }
+
+
+def guardar(resultado, ruta):
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding='utf-8')
+
+
+def comparar(actual, ruta_previa, metrica='p50_ms'):
+    """
+    Compara los escenarios de dos ejecuciones.
+
+    Returns:
+        list: Tuplas (escenario, valor previo, valor actual, variación %)
+    """
+    previo = json.loads(Path(ruta_previa).read_text(encoding='utf-8'))
+    filas = []
+    for nombre, datos in actual['escenarios'].items():
+        anterior = previo.get('escenarios', {}).get(nombre)
+        if not anterior or metrica not in anterior or not anterior[metrica]:
+            continue
+        variacion = (datos[metrica] - anterior[metrica]) * 100 / anterior[metrica]
+        filas.append((nombre, anterior[metrica], datos[metrica], variacion))
+    return filas
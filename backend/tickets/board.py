@@ -0,0 +1,97 @@
+"""
+Tablero Kanban: los primeros N tickets de cada estado en una sola consulta.
+
+Cada columna aporta sus candidatos con una subconsulta acotada sobre el
+índice (estado, fecha_creacion, id) y ROW_NUMBER() OVER (PARTITION BY
+estado) numera el conjunto resultante, de modo que la consulta lee como
+mucho N + 1 filas por columna sin importar el tamaño del backlog. La fila
+N + 1 solo indica que la columna tiene más tickets.
+
+Cada columna pagina por su cuenta con ?cursor_<estado>=, el mismo cursor
+opaco de la paginación por cursor del listado.
+"""
+import operator
+from functools import reduce
+
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+from rest_framework.exceptions import ValidationError
+
+from . import stats
+from .models import Ticket
+from .pagination import TicketPagination
+
+
+PARAMETRO_COLUMNAS = 'columnas'
+PREFIJO_CURSOR = 'cursor_'
+
+
+def estados_pedidos(request):
+    """
+    Columnas de ?columnas=a,b (todas por defecto), en el orden del flujo.
+
+    Raises:
+        ValidationError: Si se pide un estado inexistente
+    """
+    todos = [estado for estado, _ in Ticket.STATUS_CHOICES]
+    valor = request.query_params.get(PARAMETRO_COLUMNAS)
+    if not valor:
+        return todos
+
+    pedidos = {parte.strip() for parte in valor.split(',') if parte.strip()}
+    desconocidos = pedidos - set(todos)
+    if desconocidos:
+        raise ValidationError({PARAMETRO_COLUMNAS: [
+            f'Estados desconocidos: {", ".join(sorted(desconocidos))}. '
+            f'Opciones: {", ".join(todos)}'
+        ]})
+    return [estado for estado in todos if estado in pedidos]
+
+
+def primeros_por_estado(queryset, estados, limite, posiciones, base=None):
+    """
+    Args:
+        queryset (QuerySet): Tickets ya filtrados
+        estados (list): Columnas a incluir
+        limite (int): Tickets por columna
+        posiciones (dict): {estado: (fecha, id)} de los cursores recibidos
+        base (QuerySet): Consulta externa sin filtros (columnas y anotaciones);
+                         evita repetir los filtros ya aplicados a los candidatos
+
+    Returns:
+        QuerySet: Hasta limite + 1 tickets por estado, anotados con
+                  `posicion` y ordenados por estado y posición
+    """
+    paginador = TicketPagination()
+    orden = paginador.keyset_ordering
+
+    candidatos = []
+    for estado in estados:
+        columna = queryset.filter(estado=estado)
+        if posiciones.get(estado) is not None:
+            columna = columna.filter(paginador.filtro_posicion(orden, posiciones[estado]))
+        candidatos.append(Q(id__in=columna.order_by(*orden).values('id')[:limite + 1]))
+
+    return (
+        (queryset if base is None else base)
+        .filter(reduce(operator.or_, candidatos))
+        .annotate(posicion=Window(
+            RowNumber(),
+            partition_by=F('estado'),
+            order_by=[F('fecha_creacion').desc(), F('id').desc()],
+        ))
+        .order_by('estado', 'posicion')
+    )
+
+
+def totales(queryset, filtrado):
+    """
+    Total de tickets por estado. Sin filtros se leen los contadores de
+    estadísticas; con filtros, una consulta agrupada.
+    """
+    if not filtrado:
+        por_estado = stats.resumen_contadores()['por_estado']
+        return {estado: datos['count'] for estado, datos in por_estado.items()}
+    return dict(
+        queryset.order_by().values_list('estado').annotate(total=Count('id'))
+    )
@@ -0,0 +1,273 @@
+"""
+Caché de respuestas y ETags para las lecturas de tickets.
+
+Cada respuesta se guarda bajo una clave que combina la ruta, los parámetros
+de la consulta y una versión:
+    - versión global: listados y estadísticas; cambia con cualquier escritura
+    - versión por ticket: detalle; cambia al modificar el ticket o comentarlo
+
+Las señales incrementan las versiones al confirmar cada transacción, por lo
+que las entradas anteriores simplemente dejan de usarse y expiran solas. El
+ETag se deriva de la misma clave: un If-None-Match vigente responde 304 sin
+consultar la base ni serializar.
+
+Con réplicas de lectura (tickets.routers), una respuesta leída de una
+réplica poco después de una escritura puede no incluirla todavía: esa
+respuesta no se guarda ni lleva ETag.
+
+El backend es el alias TICKETS_CACHE_ALIAS de CACHES (locmem por defecto).
+Con varios procesos se debe usar un backend compartido (Redis, Memcached),
+ya que las versiones viven en la propia caché.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+from . import instrumentation, routers
+
+
+PREFIJO = 'tickets'
+VERSION_GLOBAL = f'{PREFIJO}:v:global'
+ULTIMA_ESCRITURA = f'{PREFIJO}:ultima_escritura'
+
+# Aciertos y fallos por acción, en este proceso
+_contadores = Counter()
+_lock_contadores = threading.Lock()
+
+
+def _cache():
+    return caches[getattr(settings, 'TICKETS_CACHE_ALIAS', 'default')]
+
+
+def habilitada():
+    return getattr(settings, 'TICKETS_CACHE_ENABLED', True)
+
+
+def _clave_version(ticket_id):
+    return VERSION_GLOBAL if ticket_id is None else f'{PREFIJO}:v:t:{ticket_id}'
+
+
+def obtener_version(ticket_id=None):
+    """
+    Versión vigente global o de un ticket.
+    Si la caché la perdió se inicializa con la hora actual, que nunca
+    coincide con una versión anterior.
+    """
+    cache = _cache()
+    clave = _clave_version(ticket_id)
+    version = cache.get(clave)
+    if version is None:
+        cache.add(clave, time.time_ns(), timeout=None)
+        version = cache.get(clave)
+    return version
+
+
+async def aobtener_version(ticket_id=None):
+    """obtener_version() para vistas async."""
+    cache = _cache()
+    clave = _clave_version(ticket_id)
+    version = await cache.aget(clave)
+    if version is None:
+        await cache.aadd(clave, time.time_ns(), timeout=None)
+        version = await cache.aget(clave)
+    return version
+
+
+def _incrementar(claves):
+    cache = _cache()
+    cache.set(ULTIMA_ESCRITURA, time.time(), timeout=None)
+    for clave in claves:
+        try:
+            cache.incr(clave)
+        except ValueError:
+            # No existía: cualquier valor nuevo invalida lo anterior
+            cache.set(clave, time.time_ns(), timeout=None)
+
+
+def escritura_reciente():
+    """True si hubo una escritura dentro de la ventana de retraso de las réplicas."""
+    ultima = _cache().get(ULTIMA_ESCRITURA)
+    ventana = getattr(settings, 'TICKETS_DB_STICKY_SECONDS', 5)
+    return ultima is not None and time.time() - ultima < ventana
+
+
+async def aescritura_reciente():
+    ultima = await _cache().aget(ULTIMA_ESCRITURA)
+    ventana = getattr(settings, 'TICKETS_DB_STICKY_SECONDS', 5)
+    return ultima is not None and time.time() - ultima < ventana
+
+
+def invalidar(ticket_ids=(), using=None):
+    """
+    Invalida los listados y el detalle de los tickets dados al confirmar
+    la transacción actual.
+
+    Args:
+        ticket_ids (iterable): Tickets cuyo detalle cambió
+        using (str): Alias de la base de datos de la transacción
+    """
+    claves = [VERSION_GLOBAL] + [_clave_version(pk) for pk in set(ticket_ids)]
+    transaction.on_commit(lambda: _incrementar(claves), using=using)
+
+
+def contar(accion, resultado):
+    with _lock_contadores:
+        _contadores[(accion, resultado)] += 1
+
+
+def estadisticas():
+    """
+    Returns:
+        dict: {accion: {aciertos, fallos, no_modificados, tasa_aciertos}}
+    """
+    with _lock_contadores:
+        copia = dict(_contadores)
+
+    resumen = {}
+    for (accion, resultado), total in copia.items():
+        resumen.setdefault(accion, {'aciertos': 0, 'fallos': 0, 'no_modificados': 0})
+        resumen[accion][resultado] += total
+    for valores in resumen.values():
+        lecturas = sum(valores.values())
+        valores['tasa_aciertos'] = round(
+            (valores['aciertos'] + valores['no_modificados']) / lecturas, 4
+        ) if lecturas else 0.0
+    return resumen
+
+
+def reiniciar_estadisticas():
+    with _lock_contadores:
+        _contadores.clear()
+
+
+def _firma(request, version):
+    # El host forma parte de la clave: los enlaces de paginación son absolutos
+    return hashlib.md5(
+        f'{request.get_host()}{request.get_full_path()}:{version}'.encode()
+    ).hexdigest()
+
+
+def _no_modificado(etag):
+    respuesta = HttpResponseNotModified()
+    respuesta['ETag'] = etag
+    return respuesta
+
+
+def respuesta_cacheada(por_ticket=False):
+    """
+    Decorador para acciones de lectura de un ViewSet.
+
+    Args:
+        por_ticket (bool): Usar la versión del ticket del URL (detalle)
+                           en vez de la global
+    """
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltura(self, request, *args, **kwargs):
+            # Solo JSON: la API navegable depende del usuario y del formulario
+            if not habilitada() or request.accepted_renderer.format != 'json':
+                return metodo(self, request, *args, **kwargs)
+
+            ticket_id = None
+            if por_ticket:
+                try:
+                    ticket_id = int(kwargs[self.lookup_url_kwarg or self.lookup_field])
+                except (KeyError, ValueError):
+                    return metodo(self, request, *args, **kwargs)
+
+            firma = _firma(request, obtener_version(ticket_id))
+            etag = f'"{firma}"'
+
+            if etag in request.headers.get('If-None-Match', ''):
+                contar(self.action, 'no_modificados')
+                return _no_modificado(etag)
+
+            cache = _cache()
+            clave = f'{PREFIJO}:r:{self.action}:{firma}'
+            guardada = cache.get(clave)
+            if guardada is not None:
+                contar(self.action, 'aciertos')
+                contenido, tipo = guardada
+                respuesta = HttpResponse(contenido, content_type=tipo)
+            else:
+                contar(self.action, 'fallos')
+                respuesta = metodo(self, request, *args, **kwargs)
+                if respuesta.status_code != 200:
+                    return respuesta
+                if routers.en_replica() and escritura_reciente():
+                    return respuesta
+                # Renderizar aquí para guardar los bytes finales
+                respuesta.accepted_renderer = request.accepted_renderer
+                respuesta.accepted_media_type = request.accepted_media_type
+                respuesta.renderer_context = self.get_renderer_context()
+                with instrumentation.medir_serializacion():
+                    respuesta.render()
+                cache.set(
+                    clave, (respuesta.content, respuesta['Content-Type']),
+                    getattr(settings, 'TICKETS_CACHE_TIMEOUT', 300)
+                )
+
+            respuesta['ETag'] = etag
+            patch_vary_headers(respuesta, ('Accept',))
+            return respuesta
+        return envoltura
+    return decorador
+
+
+def respuesta_cacheada_async(accion, por_ticket=False):
+    """
+    respuesta_cacheada() para las vistas async de tickets.async_views:
+    misma clave, mismo ETag y mismos contadores que la acción `accion` del
+    ViewSet, de modo que ambas comparten las entradas de la caché.
+
+    La vista decorada devuelve una respuesta JSON ya renderizada, o None
+    para delegar en la acción síncrona (que aplica su propia caché).
+    """
+    def decorador(vista):
+        @wraps(vista)
+        async def envoltura(request, **kwargs):
+            if not habilitada():
+                return await vista(request, **kwargs)
+
+            ticket_id = int(kwargs['pk']) if por_ticket else None
+            firma = _firma(request, await aobtener_version(ticket_id))
+            etag = f'"{firma}"'
+
+            if etag in request.headers.get('If-None-Match', ''):
+                contar(accion, 'no_modificados')
+                return _no_modificado(etag)
+
+            cache = _cache()
+            clave = f'{PREFIJO}:r:{accion}:{firma}'
+            guardada = await cache.aget(clave)
+            if guardada is not None:
+                contar(accion, 'aciertos')
+                contenido, tipo = guardada
+                respuesta = HttpResponse(contenido, content_type=tipo)
+            else:
+                respuesta = await vista(request, **kwargs)
+                if respuesta is None:
+                    return None
+                contar(accion, 'fallos')
+                if respuesta.status_code != 200:
+                    return respuesta
+                if routers.en_replica() and await aescritura_reciente():
+                    return respuesta
+                await cache.aset(
+                    clave, (respuesta.content, respuesta['Content-Type']),
+                    getattr(settings, 'TICKETS_CACHE_TIMEOUT', 300)
+                )
+
+            respuesta['ETag'] = etag
+            patch_vary_headers(respuesta, ('Accept',))
+            return respuesta
+        return envoltura
+    return decorador
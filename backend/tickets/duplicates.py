@@ -0,0 +1,273 @@
+"""
+Detección de tickets duplicados entre los abiertos ('nuevo', 'en_proceso').
+
+Cada ticket abierto tiene una firma MinHash del conjunto de palabras de su
+título y descripción (las del título cuentan dos veces, como "t:palabra").
+La firma se divide en BANDAS de FILAS valores. Cada banda se guarda con su
+hash en TicketSignatureBand (LSH): dos tickets comparten alguna banda con
+alta probabilidad si su similitud de Jaccard supera ~0.4. Así los
+candidatos salen de una consulta por el índice (banda, valor), sin
+recorrer el backlog abierto. Después se estima la similitud con las firmas
+completas de los candidatos.
+
+Las señales mantienen el índice al crear y editar tickets, y lo vacían al
+resolverlos. Los tickets resueltos no vuelven a abrirse. El comando
+rebuild_duplicate_index lo reconstruye.
+"""
+import hashlib
+import random
+import re
+import struct
+import unicodedata
+from array import array
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Count, Q
+
+from .models import Ticket, TicketSignature, TicketSignatureBand
+
+
+ESTADOS_ABIERTOS = ('nuevo', 'en_proceso')
+
+# Campos de Ticket de los que depende la firma
+CAMPOS_FIRMA = ('titulo', 'descripcion')
+
+# 20 bandas de 3 filas: umbral aproximado (1/20)^(1/3) ~ 0.37.
+# Cambiarlos requiere rebuild_duplicate_index.
+BANDAS = 20
+FILAS = 3
+PERMUTACIONES = BANDAS * FILAS
+
+# Cada permutación es un XOR con una máscara fija sobre hashes de 64 bits:
+# los hashes son uniformes, así que el orden resultante también lo es y
+# min() recorre los valores en C.
+_rng = random.Random(20240611)
+_MASCARAS = [_rng.getrandbits(64) for _ in range(PERMUTACIONES)]
+
+_PALABRA = re.compile(r'\w+', re.UNICODE)
+
+# Palabras que no distinguen un problema de otro
+PALABRAS_VACIAS = frozenset("""
+    a al algo con de del el en es esta este hay la las le lo los me mi no
+    para pero por que se sin su sus un una uno y ya
+""".split())
+
+
+def habilitado():
+    return getattr(settings, 'TICKETS_DUPLICATES_ENABLED', True)
+
+
+def palabras(texto):
+    """Palabras en minúsculas y sin tildes, sin palabras vacías ni sueltas."""
+    plano = unicodedata.normalize('NFKD', (texto or '').lower())
+    plano = ''.join(c for c in plano if not unicodedata.combining(c))
+    return {
+        palabra for palabra in _PALABRA.findall(plano)
+        if len(palabra) > 1 and palabra not in PALABRAS_VACIAS
+    }
+
+
+def shingles(titulo, descripcion):
+    """Elementos del conjunto comparado: el título pesa el doble."""
+    del_titulo = palabras(titulo)
+    return del_titulo | palabras(descripcion) | {f't:{palabra}' for palabra in del_titulo}
+
+
+def calcular_firma(titulo, descripcion):
+    """
+    Firma MinHash de un texto.
+
+    Returns:
+        tuple: PERMUTACIONES enteros, o None si el texto no tiene palabras
+    """
+    elementos = shingles(titulo, descripcion)
+    if not elementos:
+        return None
+    valores = [
+        int.from_bytes(hashlib.blake2b(e.encode(), digest_size=8).digest(), 'little')
+        for e in elementos
+    ]
+    return tuple(min(map(mascara.__xor__, valores)) for mascara in _MASCARAS)
+
+
+def firma_de(ticket):
+    """Firma del ticket, calculada una sola vez por instancia."""
+    if not hasattr(ticket, '_firma_duplicados'):
+        ticket._firma_duplicados = calcular_firma(ticket.titulo, ticket.descripcion)
+    return ticket._firma_duplicados
+
+
+def bandas(firma):
+    """Pares (banda, valor) de la firma; el valor es un entero de 64 bits con signo."""
+    return [
+        (banda, struct.unpack('<q', hashlib.blake2b(
+            struct.pack(f'<{FILAS}Q', *firma[banda * FILAS:(banda + 1) * FILAS]),
+            digest_size=8
+        ).digest())[0])
+        for banda in range(BANDAS)
+    ]
+
+
+def similitud(firma, otra):
+    """Similitud de Jaccard estimada: fracción de permutaciones con el mismo mínimo."""
+    return sum(1 for x, y in zip(firma, otra) if x == y) / PERMUTACIONES
+
+
+def codificar(firma):
+    return array('Q', firma).tobytes()
+
+
+def decodificar(datos):
+    firma = array('Q')
+    firma.frombytes(bytes(datos))
+    return tuple(firma)
+
+
+def _filas(tickets):
+    """Firmas y bandas a insertar para los tickets abiertos con texto."""
+    firmas, filas_bandas = [], []
+    for ticket in tickets:
+        firma = firma_de(ticket)
+        if ticket.estado not in ESTADOS_ABIERTOS or firma is None:
+            continue
+        firmas.append(TicketSignature(ticket_id=ticket.pk, minhash=codificar(firma)))
+        filas_bandas.extend(
+            TicketSignatureBand(ticket_id=ticket.pk, banda=banda, valor=valor)
+            for banda, valor in bandas(firma)
+        )
+    return firmas, filas_bandas
+
+
+def indexar_tickets(tickets, using=None, nuevos=False):
+    """
+    Reemplaza la firma de los tickets: los abiertos se indexan y el resto
+    sale del índice.
+
+    Args:
+        tickets (list): Tickets con titulo, descripcion y estado cargados
+        nuevos (bool): Recién insertados, no hace falta borrar firmas previas
+    """
+    if not habilitado() or not tickets:
+        return
+    using = using or router.db_for_write(Ticket)
+    firmas, filas_bandas = _filas(tickets)
+    # Sin savepoint: normalmente corre dentro de la transacción de la escritura
+    with transaction.atomic(using=using, savepoint=False):
+        if not nuevos:
+            eliminar([ticket.pk for ticket in tickets], using)
+        TicketSignature.objects.using(using).bulk_create(firmas)
+        TicketSignatureBand.objects.using(using).bulk_create(filas_bandas)
+
+
+def actualizar_ticket(ticket, update_fields=None, using=None, creado=False):
+    """
+    Mantiene la firma tras un save(). Los cambios de estado entre abiertos
+    (nuevo <-> en_proceso) no la tocan; al resolverse el ticket sale del índice.
+    """
+    if update_fields is not None and not set(update_fields) & set(CAMPOS_FIRMA):
+        if 'estado' not in update_fields or ticket.estado in ESTADOS_ABIERTOS:
+            return
+        if habilitado():
+            eliminar([ticket.pk], using or router.db_for_write(Ticket))
+        return
+    if not creado:
+        # El texto pudo cambiar desde la última firma calculada
+        ticket.__dict__.pop('_firma_duplicados', None)
+    indexar_tickets([ticket], using, nuevos=creado)
+
+
+def eliminar(ids, using=None):
+    """Quita los tickets del índice."""
+    using = using or router.db_for_write(Ticket)
+    TicketSignatureBand.objects.using(using).filter(ticket_id__in=ids)._raw_delete(using)
+    TicketSignature.objects.using(using).filter(ticket_id__in=ids)._raw_delete(using)
+
+
+def reconstruir(lote=2000, using=None):
+    """
+    Vacía el índice y firma todos los tickets abiertos, en transacciones de
+    `lote` tickets.
+
+    Yields:
+        int: Tickets leídos en cada lote
+    """
+    using = using or router.db_for_write(Ticket)
+    with transaction.atomic(using=using):
+        TicketSignatureBand.objects.using(using).all()._raw_delete(using)
+        TicketSignature.objects.using(using).all()._raw_delete(using)
+
+    abiertos = (
+        Ticket.objects.using(using).filter(estado__in=ESTADOS_ABIERTOS)
+        .only('id', 'estado', *CAMPOS_FIRMA).order_by('id')
+    )
+    ultimo = 0
+    while True:
+        tickets = list(abiertos.filter(id__gt=ultimo)[:lote])
+        if not tickets:
+            return
+        indexar_tickets(tickets, using, nuevos=True)
+        ultimo = tickets[-1].pk
+        yield len(tickets)
+
+
+def buscar(firma, excluir=None, limite=None, umbral=None, using=None):
+    """
+    Tickets abiertos parecidos a la firma, de más a menos similares.
+
+    Las bandas compartidas dan los candidatos; se comparan como máximo
+    TICKETS_DUPLICATES_MAX_CANDIDATES, los que más bandas comparten.
+
+    Args:
+        firma (tuple): Firma MinHash (calcular_firma)
+        excluir (int): Id de ticket a omitir (el propio)
+        limite (int): Resultados (TICKETS_DUPLICATES_MAX_RESULTS)
+        umbral (float): Similitud mínima (TICKETS_DUPLICATES_THRESHOLD)
+
+    Returns:
+        list: Diccionarios {id, titulo, estado, prioridad, similitud}
+    """
+    if firma is None or not habilitado():
+        return []
+    if limite is None:
+        limite = getattr(settings, 'TICKETS_DUPLICATES_MAX_RESULTS', 5)
+    if umbral is None:
+        umbral = getattr(settings, 'TICKETS_DUPLICATES_THRESHOLD', 0.4)
+    maximo = getattr(settings, 'TICKETS_DUPLICATES_MAX_CANDIDATES', 200)
+    using = using or router.db_for_read(Ticket)
+
+    coincidencias = Q()
+    for banda, valor in bandas(firma):
+        coincidencias |= Q(banda=banda, valor=valor)
+    candidatos = TicketSignatureBand.objects.using(using).filter(coincidencias)
+    if excluir is not None:
+        candidatos = candidatos.exclude(ticket_id=excluir)
+    candidatos = (
+        candidatos.values('ticket_id').annotate(compartidas=Count('ticket_id'))
+        .order_by('-compartidas', '-ticket_id')
+        .values_list('ticket_id', flat=True)[:maximo]
+    )
+    # El estado se revisa aquí: filtrarlo en SQL lleva a SQLite a recorrer
+    # todos los abiertos por el índice de estado en vez de buscar por id
+    filas = (
+        TicketSignature.objects.using(using).filter(ticket_id__in=list(candidatos))
+        .values_list('ticket_id', 'minhash', 'ticket__titulo', 'ticket__estado', 'ticket__prioridad')
+    )
+
+    parecidos = []
+    for pk, minhash, titulo, estado, prioridad in filas:
+        if estado not in ESTADOS_ABIERTOS:
+            continue
+        valor = similitud(firma, decodificar(minhash))
+        if valor >= umbral:
+            parecidos.append({
+                'id': pk, 'titulo': titulo, 'estado': estado,
+                'prioridad': prioridad, 'similitud': round(valor, 2),
+            })
+    parecidos.sort(key=lambda fila: (-fila['similitud'], -fila['id']))
+    return parecidos[:limite]
+
+
+def candidatos(ticket, **kwargs):
+    """Posibles duplicados abiertos de un ticket (ver buscar)."""
+    return buscar(firma_de(ticket), excluir=ticket.pk, **kwargs)
@@ -0,0 +1,302 @@
+"""
+Feed de cambios de tickets en tiempo real.
+
+Las señales publican un evento por ticket creado, transicionado, eliminado
+o comentado, siempre después de confirmar la transacción. Los clientes los
+reciben por Server-Sent Events (ver views.feed_eventos) y pueden reanudar
+desde el último id recibido con la cabecera Last-Event-ID.
+
+El broker se elige con TICKETS_EVENTS_BROKER:
+    - BrokerLocal: en memoria del proceso. Suficiente con un solo worker.
+    - BrokerBaseDatos: tabla ChangeEvent consultada periódicamente; comparte
+      el feed entre varios workers o servidores sin dependencias extra.
+      Admite varios escritores: los ids que faltan se vuelven a consultar
+      durante TICKETS_EVENTS_SAFETY_WINDOW segundos.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.utils.module_loading import import_string
+
+from .models import ChangeEvent
+
+
+TICKET_CREADO = 'ticket_creado'
+TICKET_TRANSICIONADO = 'ticket_transicionado'
+TICKET_ELIMINADO = 'ticket_eliminado'
+COMENTARIO_CREADO = 'comentario_creado'
+# Se envía cuando el id pedido ya no está retenido: el cliente debe recargar
+REINICIO = 'reinicio'
+
+
+def datos_ticket(ticket):
+    """Campos del ticket incluidos en los eventos; los que muestra el tablero."""
+    return {
+        'id': ticket.id,
+        'titulo': ticket.titulo,
+        'descripcion': ticket.descripcion,
+        'solicitante': ticket.solicitante,
+        'estado': ticket.estado,
+        'prioridad': ticket.prioridad,
+        'version': ticket.version,
+        'fecha_creacion': ticket.fecha_creacion.isoformat(),
+        'fecha_actualizacion': ticket.fecha_actualizacion.isoformat(),
+    }
+
+
+def datos_comentario(comentario):
+    return {
+        'id': comentario.id,
+        'ticket_id': comentario.ticket_id,
+        'autor': comentario.autor,
+        'fecha_creacion': comentario.fecha_creacion.isoformat(),
+    }
+
+
+def formatear_sse(evento):
+    """Serializa un evento en el formato de text/event-stream."""
+    datos = json.dumps(
+        {'ticket_id': evento['ticket_id'], **evento['datos']},
+        ensure_ascii=False, separators=(',', ':')
+    )
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {datos}\n\n"
+
+
+class BrokerLocal:
+    """
+    Broker en memoria: buffer circular de eventos y colas asyncio por cliente.
+
+    Las escrituras ocurren en hilos de vistas síncronas, por lo que la
+    entrega a cada cliente se agenda en su propio event loop.
+    """
+
+    def __init__(self, retencion=1000):
+        self.retencion = retencion
+        self._eventos = deque(maxlen=retencion)
+        self._ultimo_id = 0
+        self._suscriptores = set()
+        self._lock = threading.Lock()
+
+    def publicar(self, eventos):
+        """
+        Args:
+            eventos (list): Diccionarios {tipo, ticket_id, datos}
+        """
+        if not eventos:
+            return
+
+        with self._lock:
+            for evento in eventos:
+                self._ultimo_id += 1
+                self._eventos.append({'id': self._ultimo_id, **evento})
+            nuevos = list(self._eventos)[-len(eventos):]
+            suscriptores = list(self._suscriptores)
+
+        for loop, cola in suscriptores:
+            for evento in nuevos:
+                try:
+                    loop.call_soon_threadsafe(self._entregar, cola, evento)
+                except RuntimeError:
+                    # El loop del cliente ya se cerró
+                    pass
+
+    def _entregar(self, cola, evento):
+        try:
+            cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente demasiado lento: se le pide recargar en vez de crecer sin límite
+            while not cola.empty():
+                cola.get_nowait()
+            cola.put_nowait(self._reinicio(evento['id']))
+
+    def _reinicio(self, ultimo_id):
+        return {'id': ultimo_id, 'tipo': REINICIO, 'ticket_id': None, 'datos': {}}
+
+    def pendientes(self, ultimo_id):
+        """
+        Eventos posteriores a ultimo_id que siguen retenidos.
+        Debe llamarse con el lock tomado.
+        """
+        if ultimo_id is None or ultimo_id == self._ultimo_id:
+            return []
+        # Id desconocido (p. ej. el proceso se reinició) o fuera del buffer
+        primero = self._eventos[0]['id'] if self._eventos else self._ultimo_id + 1
+        if ultimo_id > self._ultimo_id or ultimo_id < primero - 1:
+            return [self._reinicio(self._ultimo_id)]
+        return [evento for evento in self._eventos if evento['id'] > ultimo_id]
+
+    async def escuchar(self, ultimo_id, espera):
+        """
+        Genera los eventos posteriores a ultimo_id y luego los nuevos.
+        Produce None cada `espera` segundos sin eventos (latido).
+        """
+        loop = asyncio.get_running_loop()
+        cola = asyncio.Queue(maxsize=self.retencion)
+        suscriptor = (loop, cola)
+
+        with self._lock:
+            self._suscriptores.add(suscriptor)
+            pendientes = self.pendientes(ultimo_id)
+            ultimo_id = self._ultimo_id
+
+        try:
+            for evento in pendientes:
+                yield evento
+
+            while True:
+                try:
+                    evento = await asyncio.wait_for(cola.get(), espera)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if evento['id'] > ultimo_id or evento['tipo'] == REINICIO:
+                    ultimo_id = evento['id']
+                    yield evento
+        finally:
+            with self._lock:
+                self._suscriptores.discard(suscriptor)
+
+
+class BrokerBaseDatos:
+    """
+    Broker respaldado por la tabla ChangeEvent.
+
+    Cada worker consulta los eventos con id mayor al último entregado cada
+    `intervalo` segundos. Los eventos más antiguos que la retención se
+    eliminan de forma periódica al publicar.
+
+    Con varios escritores un id menor puede confirmarse después de uno
+    mayor ya entregado. Los ids salteados (huecos) se vuelven a consultar
+    durante `ventana` segundos, como el margen de tickets.sync, y luego se
+    dan por revertidos. Un evento que llega tarde se entrega con su id
+    original, por lo que un cliente que reanuda desde él puede recibir
+    otra vez eventos posteriores: el feed no pierde eventos, pero puede
+    repetirlos.
+    """
+
+    def __init__(self, retencion=1000, intervalo=1.0, ventana=None):
+        self.retencion = retencion
+        self.intervalo = intervalo
+        if ventana is None:
+            ventana = getattr(settings, 'TICKETS_EVENTS_SAFETY_WINDOW', 5)
+        self.ventana = ventana
+
+    def publicar(self, eventos):
+        creados = ChangeEvent.objects.bulk_create([
+            ChangeEvent(tipo=e['tipo'], ticket_id=e['ticket_id'], datos=e['datos'])
+            for e in eventos
+        ])
+        ultimo = creados[-1].id if creados and creados[-1].id else None
+        # Depurar cada ~100 eventos para no borrar en cada escritura
+        if ultimo and ultimo // 100 != (ultimo - len(creados)) // 100:
+            ChangeEvent.objects.filter(id__lte=ultimo - self.retencion).delete()
+
+    def pendientes(self, ultimo_id, primera=False, huecos=None):
+        """
+        Args:
+            huecos (dict): {id salteado: instante límite (time.monotonic())}
+                del suscriptor; se actualiza en el lugar
+
+        Returns:
+            tuple: (último id entregado, eventos posteriores a ultimo_id y
+                    de los huecos que se confirmaron)
+        """
+        consulta = ChangeEvent.objects.values('id', 'tipo', 'ticket_id', 'datos')
+        if ultimo_id is None:
+            fila = consulta.order_by('-id').first()
+            return fila['id'] if fila else 0, []
+
+        if huecos is None:
+            huecos = {}
+        filtro = Q(id__gt=ultimo_id)
+        if huecos:
+            filtro |= Q(id__in=list(huecos))
+        eventos = list(consulta.filter(filtro)[:self.retencion])
+        nuevo_ultimo = self._registrar_huecos(ultimo_id, eventos, huecos)
+        if not primera:
+            return nuevo_ultimo, eventos
+
+        # Al conectar: el id del cliente debe estar dentro de lo retenido.
+        # Puede haber huecos por transacciones revertidas, así que solo se
+        # compara contra los extremos de la tabla.
+        extremos = ChangeEvent.objects.aggregate(primero=Min('id'), ultimo=Max('id'))
+        primero = extremos['primero'] or 1
+        ultimo = extremos['ultimo'] or 0
+        if ultimo_id > ultimo or ultimo_id < primero - 1:
+            huecos.clear()
+            return ultimo, [{'id': ultimo, 'tipo': REINICIO, 'ticket_id': None, 'datos': {}}]
+        return nuevo_ultimo, eventos
+
+    def _registrar_huecos(self, ultimo_id, eventos, huecos):
+        """
+        Quita de `huecos` los ids entregados o vencidos y agrega los que se
+        saltearon hasta el nuevo último id, acotados a la retención.
+
+        Returns:
+            int: Nuevo último id entregado
+        """
+        ahora = time.monotonic()
+        entregados = {evento['id'] for evento in eventos}
+        nuevo_ultimo = max(entregados | {ultimo_id})
+        for pk, limite in list(huecos.items()):
+            if pk in entregados or limite <= ahora or pk <= nuevo_ultimo - self.retencion:
+                del huecos[pk]
+        limite = ahora + self.ventana
+        for pk in range(max(ultimo_id, nuevo_ultimo - self.retencion) + 1, nuevo_ultimo):
+            if pk not in entregados:
+                huecos[pk] = limite
+        return nuevo_ultimo
+
+    async def escuchar(self, ultimo_id, espera):
+        pendientes = sync_to_async(self.pendientes, thread_sensitive=False)
+        huecos = {}
+        ultimo_id, eventos = await pendientes(ultimo_id, primera=True, huecos=huecos)
+        ultimo_latido = time.monotonic()
+
+        while True:
+            for evento in eventos:
+                yield evento
+            if eventos:
+                ultimo_latido = time.monotonic()
+            elif time.monotonic() - ultimo_latido >= espera:
+                ultimo_latido = time.monotonic()
+                yield None
+
+            await asyncio.sleep(self.intervalo)
+            ultimo_id, eventos = await pendientes(ultimo_id, huecos=huecos)
+
+
+_broker = None
+
+
+def get_broker():
+    """Broker configurado en TICKETS_EVENTS_BROKER, creado una vez por proceso."""
+    global _broker
+    if _broker is None:
+        clase = import_string(getattr(settings, 'TICKETS_EVENTS_BROKER', 'tickets.events.BrokerLocal'))
+        _broker = clase(retencion=getattr(settings, 'TICKETS_EVENTS_RETENTION', 1000))
+    return _broker
+
+
+def publicar(eventos, using=None):
+    """
+    Publica eventos al confirmar la transacción actual.
+    Si la transacción se revierte, los eventos se descartan.
+
+    Args:
+        eventos (list): Diccionarios {tipo, ticket_id, datos}
+        using (str): Alias de la base de datos de la transacción
+    """
+    if eventos:
+        transaction.on_commit(lambda: get_broker().publicar(eventos), using=using)
+
+
+def evento(tipo, ticket_id, datos):
+    return {'tipo': tipo, 'ticket_id': ticket_id, 'datos': datos}
@@ -0,0 +1,196 @@
+"""
+Exportación masiva de tickets con sus comentarios en CSV o NDJSON.
+
+Tickets y comentarios se leen con dos iteradores por bloques ordenados por
+ticket y se combinan como un merge join: la memoria usada no depende del
+tamaño de la tabla y solo se ejecutan dos consultas.
+"""
+import csv
+import json
+from datetime import date, datetime, time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Ticket, Comment
+
+
+FORMATOS = ('csv', 'ndjson')
+
+CAMPOS_TICKET = [
+    'id', 'titulo', 'descripcion', 'prioridad', 'estado', 'solicitante',
+    'email', 'fecha_creacion', 'fecha_actualizacion',
+]
+CAMPOS_COMENTARIO = ['id', 'autor', 'contenido', 'fecha_creacion']
+
+ENCABEZADO_CSV = (
+    [f'ticket_{campo}' if campo == 'id' else campo for campo in CAMPOS_TICKET] +
+    [f'comentario_{campo}' for campo in CAMPOS_COMENTARIO]
+)
+
+
+class FiltroInvalido(ValueError):
+    """Un filtro de la exportación no tiene un valor válido."""
+
+
+def _fecha(valor, fin_del_dia=False):
+    """Acepta YYYY-MM-DD o una fecha y hora ISO 8601."""
+    try:
+        if len(valor) == 10:
+            dia = date.fromisoformat(valor)
+            resultado = datetime.combine(dia, time.max if fin_del_dia else time.min)
+        else:
+            resultado = datetime.fromisoformat(valor)
+    except ValueError:
+        raise FiltroInvalido(f'Fecha inválida: {valor}')
+    if timezone.is_naive(resultado):
+        resultado = timezone.make_aware(resultado)
+    return resultado
+
+
+def filtrar(queryset, estado=None, prioridad=None, desde=None, hasta=None):
+    """
+    Aplica los filtros del listado y el rango de fecha de creación.
+
+    Args:
+        queryset (QuerySet): Tickets
+        estado (str): Estado exacto
+        prioridad (str): Prioridad exacta
+        desde (str): Fecha de creación mínima (incluida)
+        hasta (str): Fecha de creación máxima (incluida)
+
+    Returns:
+        QuerySet: Tickets filtrados
+
+    Raises:
+        FiltroInvalido: Si algún valor no es válido
+    """
+    if estado:
+        if estado not in dict(Ticket.STATUS_CHOICES):
+            raise FiltroInvalido(f'Estado inválido: {estado}')
+        queryset = queryset.filter(estado=estado)
+    if prioridad:
+        if prioridad not in dict(Ticket.PRIORITY_CHOICES):
+            raise FiltroInvalido(f'Prioridad inválida: {prioridad}')
+        queryset = queryset.filter(prioridad=prioridad)
+    if desde:
+        queryset = queryset.filter(fecha_creacion__gte=_fecha(desde))
+    if hasta:
+        queryset = queryset.filter(fecha_creacion__lte=_fecha(hasta, fin_del_dia=True))
+    return queryset
+
+
+def tickets_con_comentarios(tickets, chunk_size=None):
+    """
+    Genera (ticket, [comentarios]) en orden de id leyendo por bloques.
+
+    Args:
+        tickets (QuerySet): Tickets filtrados
+        chunk_size (int): Filas por bloque (TICKETS_EXPORT_CHUNK_SIZE)
+
+    Yields:
+        tuple: (dict del ticket, lista de dicts de comentarios)
+    """
+    chunk_size = chunk_size or getattr(settings, 'TICKETS_EXPORT_CHUNK_SIZE', 2000)
+    tickets = tickets.order_by('id')
+
+    filas_tickets = tickets.values_list(*CAMPOS_TICKET).iterator(chunk_size=chunk_size)
+    filas_comentarios = (
+        Comment.objects
+        .filter(ticket__in=tickets.values('id'))
+        .order_by('ticket_id', 'fecha_creacion', 'id')
+        .values_list('ticket_id', *CAMPOS_COMENTARIO)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    pendiente = next(filas_comentarios, None)
+    for fila in filas_tickets:
+        ticket = dict(zip(CAMPOS_TICKET, fila))
+        comentarios = []
+        # Ambos flujos están ordenados por ticket: avanzar hasta alcanzarlo
+        while pendiente is not None and pendiente[0] <= ticket['id']:
+            if pendiente[0] == ticket['id']:
+                comentarios.append(dict(zip(CAMPOS_COMENTARIO, pendiente[1:])))
+            pendiente = next(filas_comentarios, None)
+        yield ticket, comentarios
+
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
+
+class _Eco:
+    """Objeto tipo archivo que devuelve lo escrito, para csv.writer en streaming."""
+
+    def write(self, valor):
+        return valor
+
+
+def lineas_csv(tickets, chunk_size=None):
+    """
+    Una fila por comentario con los datos del ticket repetidos; los tickets
+    sin comentarios generan una fila con las columnas de comentario vacías.
+    """
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(ENCABEZADO_CSV)
+    for ticket, comentarios in tickets_con_comentarios(tickets, chunk_size):
+        datos_ticket = [_texto(ticket[campo]) for campo in CAMPOS_TICKET]
+        if not comentarios:
+            yield escritor.writerow(datos_ticket + [''] * len(CAMPOS_COMENTARIO))
+        for comentario in comentarios:
+            yield escritor.writerow(
+                datos_ticket + [_texto(comentario[campo]) for campo in CAMPOS_COMENTARIO]
+            )
+
+
+def lineas_ndjson(tickets, chunk_size=None):
+    """Un objeto JSON por línea: el ticket con sus comentarios anidados."""
+    for ticket, comentarios in tickets_con_comentarios(tickets, chunk_size):
+        ticket['comentarios'] = comentarios
+        yield json.dumps(ticket, ensure_ascii=False, default=_texto) + '\n'
+
+
+def lineas(formato, tickets, chunk_size=None):
+    """
+    Raises:
+        FiltroInvalido: Si el formato no es csv ni ndjson
+    """
+    if formato == 'csv':
+        return lineas_csv(tickets, chunk_size)
+    if formato == 'ndjson':
+        return lineas_ndjson(tickets, chunk_size)
+    raise FiltroInvalido(f'Formato inválido: {formato}. Opciones: {", ".join(FORMATOS)}')
+
+
+def bloques(lineas, tamano=64 * 1024):
+    """Agrupa las líneas en bloques de ~64 KB para reducir escrituras al socket."""
+    acumulado = []
+    total = 0
+    for linea in lineas:
+        acumulado.append(linea)
+        total += len(linea)
+        if total >= tamano:
+            yield ''.join(acumulado)
+            acumulado = []
+            total = 0
+    if acumulado:
+        yield ''.join(acumulado)
+
+
+async def bloques_async(bloques_sync):
+    """
+    Versión asíncrona para servidores ASGI, que de otro modo consumen los
+    iteradores síncronos completos en memoria. Cada bloque se produce en el
+    hilo de las vistas síncronas, donde vive la conexión a la base.
+    """
+    siguiente = sync_to_async(next, thread_sensitive=True)
+    while True:
+        bloque = await siguiente(bloques_sync, None)
+        if bloque is None:
+            break
+        yield bloque
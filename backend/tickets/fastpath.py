@@ -0,0 +1,192 @@
+"""
+Lectura rápida del listado de tickets sin ModelSerializer.
+
+Las filas se leen con .values() y se convierten a la misma estructura que
+TicketListSerializer (mismas claves, mismo orden, mismos formatos) usando
+las tablas precalculadas de Ticket para nombres y colores. Con el
+renderizador de tickets.renderers la respuesta es idéntica byte a byte a
+la del serializer; el comando benchmark_fast_path lo verifica y mide la
+diferencia.
+
+Con ?fields= solo se leen y se construyen los campos pedidos, y con
+?expand=comentarios los últimos comentarios de cada ticket se leen en una
+sola consulta adicional (fieldsets.comentarios_recientes).
+
+Se desactiva con TICKETS_FAST_LIST = False.
+"""
+from operator import itemgetter
+
+from django.conf import settings
+from rest_framework import ISO_8601
+from rest_framework.fields import DateTimeField
+from rest_framework.settings import api_settings
+
+from . import fieldsets, instrumentation
+from .models import ArchivedComment, Ticket
+from .serializers import TicketListSerializer
+
+
+# Columnas leídas, incluido el resumen de actividad (tickets.activity)
+CAMPOS_LISTA = (
+    'id', 'titulo', 'descripcion', 'prioridad', 'solicitante', 'email',
+    'estado', 'fecha_creacion', 'fecha_actualizacion', 'total_comentarios',
+    'fecha_ultimo_comentario', 'autor_ultimo_comentario', 'extracto_ultimo_comentario',
+)
+
+
+def columnas(campos=None):
+    """
+    Columnas de .values() para los campos pedidos (None = todos). Incluye
+    siempre fecha_creacion, fecha_ultimo_comentario e id, que usa la
+    paginación por cursor.
+    """
+    if campos is None:
+        return CAMPOS_LISTA
+    resultado = TicketListSerializer.columnas(campos)
+    for campo in ('fecha_creacion', 'fecha_ultimo_comentario'):
+        if campo not in resultado:
+            resultado.append(campo)
+    return tuple(resultado)
+
+
+def habilitado(request):
+    """Solo para JSON: la API navegable usa el serializer para sus formularios."""
+    return (
+        getattr(settings, 'TICKETS_FAST_LIST', True) and
+        request.accepted_renderer.format == 'json'
+    )
+
+
+def formateador_fecha():
+    """
+    Función equivalente a DateTimeField.to_representation para el formato
+    configurado, sin la maquinaria de campos por cada valor.
+    """
+    campo = DateTimeField()
+    formato = api_settings.DATETIME_FORMAT
+    if formato is None or formato.lower() != ISO_8601:
+        return campo.to_representation
+
+    zona = campo.default_timezone()
+
+    def formatear(valor):
+        if not valor:
+            return None
+        if zona is not None:
+            valor = campo.enforce_timezone(valor) if valor.tzinfo is None else valor.astimezone(zona)
+        texto = valor.isoformat()
+        if texto.endswith('+00:00'):
+            texto = texto[:-6] + 'Z'
+        return texto
+
+    return formatear
+
+
+def _constructores(fecha):
+    """Función por campo de TicketListSerializer, para ?fields=."""
+    prioridades = Ticket.PRIORIDAD_DISPLAY
+    estados = Ticket.ESTADO_DISPLAY
+    colores_prioridad = Ticket.PRIORITY_COLORS
+    colores_estado = Ticket.STATUS_COLORS
+    return {
+        'prioridad_display': lambda fila: prioridades.get(fila['prioridad'], fila['prioridad']),
+        'estado_display': lambda fila: estados.get(fila['estado'], fila['estado']),
+        'fecha_creacion': lambda fila: fecha(fila['fecha_creacion']),
+        'fecha_actualizacion': lambda fila: fecha(fila['fecha_actualizacion']),
+        'fecha_ultimo_comentario': lambda fila: fecha(fila['fecha_ultimo_comentario']),
+        'priority_color': lambda fila: colores_prioridad.get(fila['prioridad'], 'gray'),
+        'status_color': lambda fila: colores_estado.get(fila['estado'], 'gray'),
+    }
+
+
+def _comentarios(filas, fecha, archivados=False):
+    """Últimos comentarios por ticket con el formato de CommentSerializer."""
+    recientes = fieldsets.comentarios_recientes([fila['id'] for fila in filas])
+    if archivados:
+        # Un ticket está en una sola de las dos tablas
+        sin_comentarios = [pk for pk, comentarios in recientes.items() if not comentarios]
+        recientes.update(
+            (pk, comentarios) for pk, comentarios in
+            fieldsets.comentarios_recientes(sin_comentarios, modelo=ArchivedComment).items()
+            if comentarios
+        )
+    return {
+        ticket_id: [
+            {
+                'id': comentario['id'],
+                'ticket': comentario['ticket'],
+                'autor': comentario['autor'],
+                'contenido': comentario['contenido'],
+                'fecha_creacion': fecha(comentario['fecha_creacion']),
+            }
+            for comentario in comentarios
+        ]
+        for ticket_id, comentarios in recientes.items()
+    }
+
+
+def filas_lista(filas, campos=None, comentarios=False, archivados=False):
+    """
+    Convierte filas de .values(*columnas(campos)) al formato de TicketListSerializer.
+
+    Args:
+        filas (iterable): Diccionarios de .values()
+        campos (tuple): Campos pedidos con ?fields= (None = todos)
+        comentarios (bool): Agregar los últimos comentarios (?expand=comentarios)
+        archivados (bool): Hay filas de ArchivedTicket (?include_archived=1)
+
+    Returns:
+        list: Un diccionario por ticket, con las claves en el orden del serializer
+    """
+    fecha = formateador_fecha()
+    filas = list(filas)
+
+    with instrumentation.medir_serializacion():
+        if campos is None:
+            datos = _filas_completas(filas, fecha)
+        else:
+            especiales = _constructores(fecha)
+            constructores = [
+                (campo, especiales.get(campo) or itemgetter(campo)) for campo in campos
+            ]
+            datos = [
+                {campo: construir(fila) for campo, construir in constructores}
+                for fila in filas
+            ]
+
+        if comentarios:
+            por_ticket = _comentarios(filas, fecha, archivados)
+            for fila, dato in zip(filas, datos):
+                dato['comentarios'] = por_ticket[fila['id']]
+        return datos
+
+
+def _filas_completas(filas, fecha):
+    """Todos los campos, con un diccionario literal (el caso más frecuente)."""
+    prioridades = Ticket.PRIORIDAD_DISPLAY
+    estados = Ticket.ESTADO_DISPLAY
+    colores_prioridad = Ticket.PRIORITY_COLORS
+    colores_estado = Ticket.STATUS_COLORS
+
+    return [
+        {
+            'id': fila['id'],
+            'titulo': fila['titulo'],
+            'descripcion': fila['descripcion'],
+            'prioridad': fila['prioridad'],
+            'prioridad_display': prioridades.get(fila['prioridad'], fila['prioridad']),
+            'solicitante': fila['solicitante'],
+            'email': fila['email'],
+            'estado': fila['estado'],
+            'estado_display': estados.get(fila['estado'], fila['estado']),
+            'fecha_creacion': fecha(fila['fecha_creacion']),
+            'fecha_actualizacion': fecha(fila['fecha_actualizacion']),
+            'total_comentarios': fila['total_comentarios'],
+            'fecha_ultimo_comentario': fecha(fila['fecha_ultimo_comentario']),
+            'autor_ultimo_comentario': fila['autor_ultimo_comentario'],
+            'extracto_ultimo_comentario': fila['extracto_ultimo_comentario'],
+            'priority_color': colores_prioridad.get(fila['prioridad'], 'gray'),
+            'status_color': colores_estado.get(fila['estado'], 'gray'),
+        }
+        for fila in filas
+    ]
@@ -0,0 +1,208 @@
+"""
+Selección de campos (?fields=) y expansión de relaciones (?expand=).
+
+    ?fields=id,titulo,estado    Solo esos campos, en el orden del serializer
+    ?expand=comentarios         Embebe la relación (tickets)
+    ?expand=ticket              Reemplaza el id del ticket por su resumen (comentarios)
+
+Los campos pedidos se traducen a columnas (CamposSelectivosMixin.columnas)
+para leerlas con .only() o .values(), y las relaciones solo se consultan
+cuando se expanden. Sin ninguno de los dos parámetros cada endpoint
+responde como siempre (el detalle de un ticket embebe sus comentarios).
+"""
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from rest_framework.exceptions import ValidationError
+
+from .models import Comment
+
+
+PARAMETRO_CAMPOS = 'fields'
+PARAMETRO_EXPANDIR = 'expand'
+
+
+def _lista(valor):
+    return [parte.strip() for parte in valor.split(',') if parte.strip()]
+
+
+def campos_pedidos(request, disponibles):
+    """
+    Args:
+        request (Request): Petición de DRF
+        disponibles (list): Campos del serializer, en su orden
+
+    Returns:
+        tuple | None: Campos pedidos en el orden del serializer, o None si
+                      no se usó ?fields=
+
+    Raises:
+        ValidationError: Si se piden campos que no existen
+    """
+    valor = request.query_params.get(PARAMETRO_CAMPOS)
+    if valor is None:
+        return None
+    pedidos = set(_lista(valor))
+    desconocidos = pedidos - set(disponibles)
+    if desconocidos or not pedidos:
+        raise ValidationError({PARAMETRO_CAMPOS: [
+            f'Campos desconocidos: {", ".join(sorted(desconocidos)) or "(ninguno)"}. '
+            f'Opciones: {", ".join(disponibles)}'
+        ]})
+    return tuple(campo for campo in disponibles if campo in pedidos)
+
+
+def expansiones_pedidas(request, disponibles, por_defecto=()):
+    """
+    Args:
+        request (Request): Petición de DRF
+        disponibles (iterable): Relaciones expandibles
+        por_defecto (iterable): Expansiones cuando no se usa ?fields= ni ?expand=
+
+    Returns:
+        frozenset: Relaciones a expandir
+
+    Raises:
+        ValidationError: Si se pide una relación no expandible
+    """
+    valor = request.query_params.get(PARAMETRO_EXPANDIR)
+    if valor is None:
+        if request.query_params.get(PARAMETRO_CAMPOS) is None:
+            return frozenset(por_defecto)
+        return frozenset()
+
+    pedidas = set(_lista(valor))
+    desconocidas = pedidas - set(disponibles)
+    if desconocidas:
+        raise ValidationError({PARAMETRO_EXPANDIR: [
+            f'No se puede expandir: {", ".join(sorted(desconocidas))}. '
+            f'Opciones: {", ".join(disponibles) or "(ninguna)"}'
+        ]})
+    return frozenset(pedidas)
+
+
+class CamposSelectivosMixin:
+    """
+    Mixin de serializers que recibe `campos` y `expandir`.
+
+    Atributos de la clase:
+        RELACIONES (dict): Campo -> relación que debe expandirse para incluirlo
+        EXPANDIBLES (tuple): Otras relaciones que cambian de forma al expandirse
+        EXPANSIONES_POR_DEFECTO (tuple): Relaciones incluidas si no se indica `expandir`
+        FUENTES (dict): Campo calculado -> campos del modelo que necesita
+    """
+
+    RELACIONES = {}
+    EXPANDIBLES = ()
+    EXPANSIONES_POR_DEFECTO = ()
+    FUENTES = {}
+
+    def __init__(self, *args, campos=None, expandir=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if expandir is None:
+            expandir = self.EXPANSIONES_POR_DEFECTO
+        for nombre in list(self.fields):
+            relacion = self.RELACIONES.get(nombre)
+            if relacion is not None:
+                if relacion not in expandir:
+                    self.fields.pop(nombre)
+            elif campos is not None and nombre not in campos:
+                self.fields.pop(nombre)
+
+    @classmethod
+    def expandibles(cls):
+        """Relaciones aceptadas en ?expand=, en orden."""
+        return tuple(dict.fromkeys([*cls.RELACIONES.values(), *cls.EXPANDIBLES]))
+
+    @classmethod
+    def columnas(cls, campos=None):
+        """
+        Campos del modelo necesarios para serializar `campos` (todos si es
+        None), para usar con .only() o .values(). Siempre incluye la pk.
+        """
+        modelo = cls.Meta.model
+        concretos = {campo.name for campo in modelo._meta.concrete_fields}
+        resultado = [modelo._meta.pk.name]
+        for campo in campos if campos is not None else cls.Meta.fields:
+            for fuente in cls.FUENTES.get(campo, (campo,)):
+                if fuente in concretos and fuente not in resultado:
+                    resultado.append(fuente)
+        return resultado
+
+
+class CamposSelectivosViewMixin:
+    """
+    Mixin de vistas que interpreta ?fields= y ?expand= una sola vez por
+    petición y los pasa a los serializers con CamposSelectivosMixin.
+    """
+
+    def _seleccion(self, serializer_class):
+        if serializer_class is None:
+            serializer_class = self.get_serializer_class()
+        cache = self.__dict__.setdefault('_selecciones', {})
+        if serializer_class not in cache:
+            disponibles = [
+                campo for campo in serializer_class.Meta.fields
+                if campo not in serializer_class.RELACIONES
+            ]
+            cache[serializer_class] = (
+                campos_pedidos(self.request, disponibles),
+                expansiones_pedidas(
+                    self.request,
+                    serializer_class.expandibles(),
+                    serializer_class.EXPANSIONES_POR_DEFECTO,
+                ),
+            )
+        return cache[serializer_class]
+
+    def campos_pedidos(self, serializer_class=None):
+        """Campos de ?fields= para `serializer_class` (None = todos)."""
+        return self._seleccion(serializer_class)[0]
+
+    def expansiones_pedidas(self, serializer_class=None):
+        """Relaciones a expandir para `serializer_class`."""
+        return self._seleccion(serializer_class)[1]
+
+    def incluye_campo(self, nombre, serializer_class=None):
+        campos = self.campos_pedidos(serializer_class)
+        return campos is None or nombre in campos
+
+    def get_serializer(self, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, CamposSelectivosMixin):
+            kwargs.setdefault('campos', self.campos_pedidos(serializer_class))
+            kwargs.setdefault('expandir', self.expansiones_pedidas(serializer_class))
+        return super().get_serializer(*args, **kwargs)
+
+
+def comentarios_recientes(ticket_ids, limite=None, modelo=Comment):
+    """
+    Últimos `limite` comentarios de cada ticket en una sola consulta
+    (ROW_NUMBER por ticket), en orden cronológico. `modelo` permite leerlos
+    de ArchivedComment.
+
+    Returns:
+        dict: {ticket_id: [filas de .values() con id, ticket, autor,
+               contenido, fecha_creacion]}
+    """
+    if limite is None:
+        limite = getattr(settings, 'TICKETS_DETAIL_COMMENTS', 20)
+    resultado = {pk: [] for pk in ticket_ids}
+    if not resultado:
+        return resultado
+
+    filas = (
+        modelo.objects
+        .filter(ticket_id__in=resultado)
+        .annotate(posicion=Window(
+            RowNumber(),
+            partition_by=F('ticket_id'),
+            order_by=[F('fecha_creacion').desc(), F('id').desc()],
+        ))
+        .filter(posicion__lte=limite)
+        .order_by('ticket_id', 'fecha_creacion', 'id')
+        .values('id', 'ticket', 'autor', 'contenido', 'fecha_creacion')
+    )
+    for fila in filas:
+        resultado[fila['ticket']].append(fila)
+    return resultado
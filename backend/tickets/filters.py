@@ -0,0 +1,73 @@
+"""
+Orden estable de los listados.
+
+OrderingFilter de DRF ordena solo por los campos pedidos: con empates o
+valores NULL el orden entre páginas no está definido y una fila puede
+repetirse o perderse al paginar, y cada motor ubica los NULL en un
+extremo distinto. StableOrderingFilter agrega siempre el desempate por id
+de la paginación por cursor (keyset_ordering) y ordena los NULL como el
+valor más bajo: últimos en orden descendente, primeros en ascendente.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, QuerySet
+from rest_framework.filters import OrderingFilter
+
+
+DESEMPATE = '-id'
+
+
+def admite_nulos(modelo, campo):
+    """True si el campo del modelo admite NULL."""
+    try:
+        return modelo._meta.get_field(campo.lstrip('-')).null
+    except FieldDoesNotExist:
+        return False
+
+
+def expresion_orden(modelo, campo):
+    """'-campo' o 'campo' como expresión de orden con los NULL como el valor más bajo."""
+    if not admite_nulos(modelo, campo):
+        return campo
+    if campo.startswith('-'):
+        return F(campo[1:]).desc(nulls_last=True)
+    return F(campo).asc(nulls_first=True)
+
+
+def ordenar(queryset, campos):
+    """queryset.order_by(*campos) con los NULL como el valor más bajo."""
+    if not isinstance(queryset, QuerySet):
+        # archive.ConsultaCombinada ordena cada tabla por su cuenta
+        return queryset.order_by(*campos)
+    return queryset.order_by(*(expresion_orden(queryset.model, campo) for campo in campos))
+
+
+def con_desempate(campos, desempate=DESEMPATE):
+    """Los campos más el desempate por id, si no lo incluyen ya."""
+    campos = list(campos)
+    if not any(campo.lstrip('-') in ('id', 'pk') for campo in campos):
+        campos.append(desempate)
+    return campos
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter con desempate por id y NULL como el valor más bajo.
+    Sin ?ordering= se aplica el orden del modelo con el mismo desempate,
+    salvo que la consulta ya tenga un orden propio (p. ej. por relevancia).
+    """
+
+    def desempate(self, view):
+        """El de la paginación por cursor de la vista, para que ambos modos coincidan."""
+        paginacion = getattr(view, 'pagination_class', None)
+        return getattr(paginacion, 'keyset_ordering', (DESEMPATE,))[-1]
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            consulta = queryset.query
+            if consulta.order_by or not consulta.default_ordering:
+                return queryset
+            ordering = queryset.model._meta.ordering
+            if not ordering:
+                return queryset
+        return ordenar(queryset, con_desempate(ordering, self.desempate(view)))
@@ -0,0 +1,162 @@
+"""
+Claves de idempotencia para las escrituras de la API (cabecera Idempotency-Key).
+
+Un cliente que reintenta la creación de un ticket, un comentario o una
+transición con la misma clave recibe la respuesta original, marcada con
+Idempotent-Replayed: true, sin que la vista vuelva a ejecutarse. No se
+crea otro ticket ni otro comentario de sistema, y la repetición no
+consulta la base.
+
+Las respuestas viven en el alias TICKETS_IDEMPOTENCY_ALIAS de CACHES, que
+acota la cantidad de entradas (MAX_ENTRIES). Cada una expira a los
+TICKETS_IDEMPOTENCY_TTL segundos. La petición original reclama la clave
+con cache.add() antes de ejecutar la vista. Un duplicado que llega
+mientras la original sigue en curso espera su respuesta hasta
+TICKETS_IDEMPOTENCY_WAIT segundos y, si no llega, recibe 409. Con varios
+procesos el alias debe ser compartido (Redis, Memcached), como la caché
+de respuestas.
+
+La clave vale para un método, una ruta y un cuerpo: reutilizarla con otro
+cuerpo responde 422. Las respuestas 5xx no se guardan, para que el
+reintento vuelva a ejecutarse.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.http.request import RawPostDataException
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from . import instrumentation
+
+
+CABECERA = 'Idempotency-Key'
+CABECERA_REPETIDA = 'Idempotent-Replayed'
+MAX_LONGITUD = 255
+
+PREFIJO = 'tickets:idem'
+EN_CURSO = 'en_curso'
+COMPLETA = 'completa'
+
+
+def _cache():
+    return caches[getattr(settings, 'TICKETS_IDEMPOTENCY_ALIAS', 'default')]
+
+
+def habilitada():
+    return getattr(settings, 'TICKETS_IDEMPOTENCY_ENABLED', True)
+
+
+def _entrada(request, clave):
+    """Clave en la caché: la de idempotencia vale para un método, una ruta y un usuario."""
+    usuario = request.user.pk if request.user.is_authenticated else ''
+    digesto = hashlib.sha256(clave.encode()).hexdigest()
+    return f'{PREFIJO}:{request.method}:{request.path}:{usuario}:{digesto}'
+
+
+def _huella(request):
+    """Hash del cuerpo, para detectar la misma clave con otra petición."""
+    try:
+        cuerpo = request.body
+    except RawPostDataException:
+        # Multipart ya leído al parsear el formulario: se usan los datos parseados
+        cuerpo = repr(sorted(request.data.lists())).encode()
+    return hashlib.sha256(cuerpo).hexdigest()
+
+
+def _reclamar(cache, entrada, huella):
+    """
+    Reclama la clave para esta petición o espera a la que la tiene.
+
+    Returns:
+        tuple: Registro guardado (completo, de otra petición o aún en curso
+        al agotar la espera), o None si la clave quedó reclamada
+    """
+    limite = time.monotonic() + getattr(settings, 'TICKETS_IDEMPOTENCY_WAIT', 10)
+    retencion = getattr(settings, 'TICKETS_IDEMPOTENCY_LOCK_TIMEOUT', 60)
+    pausa = 0.01
+    while True:
+        if cache.add(entrada, (EN_CURSO, huella), timeout=retencion):
+            return None
+        registro = cache.get(entrada)
+        if registro is None:
+            # Expiró entre add() y get(): se vuelve a intentar reclamarla
+            continue
+        if registro[0] == COMPLETA or registro[1] != huella or time.monotonic() >= limite:
+            return registro
+        time.sleep(pausa)
+        pausa = min(pausa * 2, 0.25)
+
+
+def _responder_registro(registro, huella):
+    if registro[1] != huella:
+        return Response(
+            {'error': f'La clave {CABECERA} ya se usó con otra petición.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    if registro[0] == EN_CURSO:
+        respuesta = Response(
+            {'error': f'Una petición con la misma {CABECERA} sigue en curso. Reintenta más tarde.'},
+            status=status.HTTP_409_CONFLICT
+        )
+        respuesta['Retry-After'] = '1'
+        return respuesta
+
+    _, _, codigo, contenido, tipo = registro
+    respuesta = HttpResponse(contenido, status=codigo, content_type=tipo)
+    respuesta[CABECERA_REPETIDA] = 'true'
+    return respuesta
+
+
+def idempotente():
+    """
+    Decorador para acciones de escritura de un ViewSet.
+    Sin cabecera Idempotency-Key, o en GET, la acción se ejecuta como siempre.
+    """
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltura(self, request, *args, **kwargs):
+            clave = request.headers.get(CABECERA)
+            if clave is None or request.method in SAFE_METHODS or not habilitada():
+                return metodo(self, request, *args, **kwargs)
+            if not clave.strip() or len(clave) > MAX_LONGITUD:
+                return Response(
+                    {'error': f'{CABECERA} debe tener entre 1 y {MAX_LONGITUD} caracteres.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            cache = _cache()
+            entrada = _entrada(request, clave)
+            huella = _huella(request)
+            registro = _reclamar(cache, entrada, huella)
+            if registro is not None:
+                return _responder_registro(registro, huella)
+
+            try:
+                respuesta = metodo(self, request, *args, **kwargs)
+            except BaseException:
+                cache.delete(entrada)
+                raise
+            if respuesta.status_code >= 500:
+                cache.delete(entrada)
+                return respuesta
+
+            # Renderizar aquí para guardar los bytes finales
+            respuesta.accepted_renderer = request.accepted_renderer
+            respuesta.accepted_media_type = request.accepted_media_type
+            respuesta.renderer_context = self.get_renderer_context()
+            with instrumentation.medir_serializacion():
+                respuesta.render()
+            cache.set(
+                entrada,
+                (COMPLETA, huella, respuesta.status_code, respuesta.content, respuesta['Content-Type']),
+                getattr(settings, 'TICKETS_IDEMPOTENCY_TTL', 24 * 60 * 60)
+            )
+            return respuesta
+        return envoltura
+    return decorador
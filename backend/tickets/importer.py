@@ -0,0 +1,202 @@
+"""
+Importación masiva de tickets históricos desde CSV o NDJSON.
+
+Acepta los mismos formatos que genera tickets.export:
+    - NDJSON: un ticket por línea, con "comentarios" anidados opcionales.
+    - CSV: una fila por ticket, o una fila por comentario con el ticket
+      repetido y agrupado por la columna ticket_id.
+
+Cada registro (ticket con sus comentarios) se valida con las reglas de
+tickets.validators, sin serializers de DRF. Los válidos se insertan con
+bulk_create en lotes, cada uno en su propia transacción junto con los
+contadores, el índice de búsqueda y el avance (ImportCheckpoint). No se
+publican eventos del feed en tiempo real: los tableros abiertos reciben
+un 'reinicio' al reconectar.
+"""
+import csv
+import json
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from . import activity, cache, duplicates, search, stats, validators
+from .models import Ticket, Comment, ImportCheckpoint, TicketEvent
+
+
+FORMATOS = ('csv', 'ndjson')
+
+
+def _fecha(valor):
+    """Fecha ISO 8601 o la hora actual si no viene."""
+    if not valor:
+        return timezone.now()
+    fecha = datetime.fromisoformat(valor)
+    if timezone.is_naive(fecha):
+        fecha = timezone.make_aware(fecha)
+    return fecha
+
+
+def abrir(ruta):
+    """Abre el archivo de entrada; '-' es la entrada estándar."""
+    if ruta == '-':
+        return sys.stdin
+    return open(ruta, encoding='utf-8', newline='')
+
+
+def registros_ndjson(archivo):
+    """
+    Yields:
+        dict | ValueError: Datos crudos del ticket o el error de lectura
+    """
+    for linea in archivo:
+        if not linea.strip():
+            continue
+        try:
+            datos = json.loads(linea)
+            if not isinstance(datos, dict):
+                raise ValueError('Se esperaba un objeto JSON.')
+            yield datos
+        except ValueError as e:
+            yield ValueError(f'JSON inválido: {e}')
+
+
+def registros_csv(archivo):
+    """Agrupa filas consecutivas con el mismo ticket_id en un registro."""
+    actual = None
+    clave_actual = None
+
+    for fila in csv.DictReader(archivo):
+        clave = fila.get('ticket_id') or None
+        if actual is None or clave is None or clave != clave_actual:
+            if actual is not None:
+                yield actual
+            actual = {campo: valor for campo, valor in fila.items()
+                      if not campo.startswith('comentario_')}
+            actual['comentarios'] = []
+            clave_actual = clave
+
+        if fila.get('comentario_contenido') or fila.get('comentario_autor'):
+            actual['comentarios'].append({
+                'autor': fila.get('comentario_autor'),
+                'contenido': fila.get('comentario_contenido'),
+                'fecha_creacion': fila.get('comentario_fecha_creacion'),
+            })
+
+    if actual is not None:
+        yield actual
+
+
+def validar_registro(datos):
+    """
+    Valida un ticket y sus comentarios.
+
+    Returns:
+        tuple: (Ticket sin guardar, [Comment sin ticket asignado])
+
+    Raises:
+        ValidationError: Con los errores por campo; los de comentarios
+                         bajo claves 'comentarios[i].campo'
+    """
+    errores = {}
+    limpios = {}
+    try:
+        limpios = validators.validar_datos_ticket(datos)
+    except ValidationError as e:
+        errores.update(e.message_dict)
+
+    try:
+        fecha_creacion = _fecha(datos.get('fecha_creacion'))
+    except (TypeError, ValueError):
+        errores['fecha_creacion'] = ['Fecha inválida.']
+
+    comentarios = []
+    crudos = datos.get('comentarios') or []
+    if not isinstance(crudos, list):
+        errores['comentarios'] = ['Se esperaba una lista.']
+        crudos = []
+    for indice, crudo in enumerate(crudos):
+        prefijo = f'comentarios[{indice}]'
+        if not isinstance(crudo, dict):
+            errores[prefijo] = ['Se esperaba un objeto.']
+            continue
+        try:
+            comentario = validators.validar_datos_comentario(crudo)
+            comentario['fecha_creacion'] = _fecha(crudo.get('fecha_creacion'))
+            comentarios.append(Comment(**comentario))
+        except ValidationError as e:
+            for campo, mensajes in e.message_dict.items():
+                errores[f'{prefijo}.{campo}'] = mensajes
+        except (TypeError, ValueError):
+            errores[f'{prefijo}.fecha_creacion'] = ['Fecha inválida.']
+
+    if errores:
+        raise ValidationError(errores)
+
+    return Ticket(fecha_creacion=fecha_creacion, **limpios), comentarios
+
+
+@contextmanager
+def fechas_originales():
+    """
+    Desactiva auto_now_add de fecha_creacion para conservar la fecha del
+    sistema de origen. Solo para procesos de importación, no para vistas.
+    """
+    campos = [
+        Ticket._meta.get_field('fecha_creacion'),
+        Comment._meta.get_field('fecha_creacion'),
+    ]
+    for campo in campos:
+        campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo in campos:
+            campo.auto_now_add = True
+
+
+def insertar_lote(validos, avance, leidos, rechazados):
+    """
+    Inserta un lote y registra el avance en una sola transacción.
+
+    Args:
+        validos (list): Tuplas (Ticket, [Comment])
+        avance (ImportCheckpoint): Avance de la importación
+        leidos (int): Registros leídos en este lote (válidos y rechazados)
+        rechazados (int): Registros rechazados en este lote
+
+    Returns:
+        tuple: (tickets insertados, comentarios insertados)
+    """
+    for ticket, suyos in validos:
+        activity.asignar(ticket, suyos)
+
+    with transaction.atomic():
+        tickets = Ticket.objects.bulk_create([ticket for ticket, _ in validos])
+        comentarios = []
+        for ticket, suyos in validos:
+            for comentario in suyos:
+                comentario.ticket = ticket
+                comentarios.append(comentario)
+        Comment.objects.bulk_create(comentarios)
+
+        # Mismo mantenimiento que las señales de crear_lote
+        stats.aplicar_deltas(Counter((t.estado, t.prioridad) for t in tickets))
+        TicketEvent.objects.bulk_create([
+            evento for ticket in tickets for evento in TicketEvent.historial_inicial(ticket)
+        ])
+        search.indexar_tickets(tickets)
+        search.indexar_comentarios(comentarios)
+        duplicates.indexar_tickets(tickets, nuevos=True)
+        cache.invalidar()
+
+        avance.registros += leidos
+        avance.aceptados += len(tickets)
+        avance.rechazados += rechazados
+        avance.save(update_fields=['registros', 'aceptados', 'rechazados', 'fecha_actualizacion'])
+
+    return len(tickets), len(comentarios)
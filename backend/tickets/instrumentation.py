@@ -0,0 +1,322 @@
+"""
+Instrumentación por petición: consultas SQL, tiempo en la base, tiempo de
+serialización, tamaño de la respuesta y detección de N+1.
+
+Cada petición abre una Medicion en una ContextVar. Un execute_wrapper
+instalado en cada conexión (señal connection_created) la alimenta, por lo
+que también cuenta las consultas de vistas asíncronas que corren en hilos
+de sync_to_async. La serialización suma to_representation de los
+serializers que usan SerializacionMedida (sin las consultas que disparen)
+y el renderizado de la respuesta a bytes.
+
+Los resultados se publican en tres lugares:
+    - cabecera Server-Timing (TICKETS_SERVER_TIMING)
+    - una línea JSON por petición en el logger 'tickets.instrumentacion'
+      (INFO; las peticiones con N+1 se registran como WARNING)
+    - /metrics en formato de texto de Prometheus, acumulado por proceso
+
+Una consulta se considera N+1 cuando la misma plantilla SQL (sin valores
+literales) se repite TICKETS_N1_THRESHOLD veces o más en una petición.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('tickets.instrumentacion')
+
+BUCKETS_DURACION = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_medicion = ContextVar('tickets_medicion', default=None)
+_profundidad_serializacion = ContextVar('tickets_profundidad_serializacion', default=0)
+
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTAS = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+
+
+def normalizar_sql(sql):
+    """
+    Plantilla de una consulta: literales y listas IN colapsados, para
+    agrupar las ejecuciones de la misma consulta con distintos valores.
+    """
+    plantilla = _LITERALES.sub('%s', sql)
+    return _LISTAS.sub('(%s, ...)', plantilla)
+
+
+class Medicion:
+    """Acumula lo ocurrido durante una petición (o un bloque de código)."""
+
+    def __init__(self, padre=None):
+        self.padre = padre
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.tiempo_db = 0.0
+        self.tiempo_serializacion = 0.0  # Incluye tiempo_render
+        self.tiempo_render = 0.0
+        self.plantillas = Counter()
+
+    def registrar_consulta(self, sql, duracion):
+        self.consultas += 1
+        self.tiempo_db += duracion
+        self.plantillas[normalizar_sql(sql)] += 1
+        if self.padre is not None:
+            self.padre.registrar_consulta(sql, duracion)
+
+    def n_mas_uno(self, umbral=None):
+        """
+        Returns:
+            list: Tuplas (plantilla, repeticiones) que alcanzan el umbral
+        """
+        if umbral is None:
+            umbral = getattr(settings, 'TICKETS_N1_THRESHOLD', 5)
+        return [
+            (plantilla, veces) for plantilla, veces in self.plantillas.most_common()
+            if veces >= umbral
+        ]
+
+
+def medicion_actual():
+    return _medicion.get()
+
+
+@contextmanager
+def medir():
+    """
+    Abre una Medicion para el bloque. Las consultas de una medición anidada
+    (la del middleware dentro de presupuesto_consultas) cuentan también en
+    la exterior.
+    """
+    medicion = Medicion(padre=_medicion.get())
+    token = _medicion.set(medicion)
+    try:
+        yield medicion
+    finally:
+        _medicion.reset(token)
+
+
+def registrar_consulta(execute, sql, params, many, context):
+    """execute_wrapper que alimenta la Medicion activa, si la hay."""
+    medicion = _medicion.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.registrar_consulta(sql, time.perf_counter() - inicio)
+
+
+def instalar_en_conexion(sender, connection, **kwargs):
+    """Receptor de connection_created."""
+    if registrar_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(registrar_consulta)
+
+
+def instalar_en_conexiones_abiertas():
+    """Para conexiones abiertas antes de registrar la señal."""
+    for alias in connections:
+        conexion = connections[alias]
+        if conexion.connection is not None:
+            instalar_en_conexion(None, conexion)
+
+
+@contextmanager
+def medir_serializacion():
+    """
+    Suma al tiempo de serialización el bloque, sin las consultas que
+    ejecute. Los bloques anidados (serializers dentro de serializers) solo
+    se cuentan una vez.
+    """
+    medicion = _medicion.get()
+    profundidad = _profundidad_serializacion.get()
+    if medicion is None or profundidad:
+        yield
+        return
+
+    token = _profundidad_serializacion.set(profundidad + 1)
+    db_previo = medicion.tiempo_db
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _profundidad_serializacion.reset(token)
+        transcurrido = time.perf_counter() - inicio
+        medicion.tiempo_serializacion += transcurrido - (medicion.tiempo_db - db_previo)
+
+
+class SerializacionMedida:
+    """Mixin de serializers de DRF que mide to_representation."""
+
+    def to_representation(self, instance):
+        with medir_serializacion():
+            return super().to_representation(instance)
+
+
+# Métricas acumuladas en este proceso
+
+_lock_metricas = threading.Lock()
+_peticiones = Counter()  # (metodo, vista, estado) -> total
+_duracion = defaultdict(lambda: [0] * (len(BUCKETS_DURACION) + 1))  # vista -> buckets
+_sumas = defaultdict(Counter)  # vista -> {duracion, consultas, db, serializacion, bytes, n1}
+
+
+def registrar_peticion(metodo, vista, estado, medicion, duracion, tamano, n1):
+    with _lock_metricas:
+        _peticiones[(metodo, vista, estado)] += 1
+        _duracion[vista][bisect_left(BUCKETS_DURACION, duracion)] += 1
+        sumas = _sumas[vista]
+        sumas['peticiones'] += 1
+        sumas['duracion'] += duracion
+        sumas['consultas'] += medicion.consultas
+        sumas['db'] += medicion.tiempo_db
+        sumas['serializacion'] += medicion.tiempo_serializacion
+        sumas['bytes'] += tamano or 0
+        sumas['n1'] += 1 if n1 else 0
+
+
+def reiniciar_metricas():
+    with _lock_metricas:
+        _peticiones.clear()
+        _duracion.clear()
+        _sumas.clear()
+
+
+def _etiquetas(**valores):
+    pares = ','.join(
+        '{}="{}"'.format(clave, str(valor).replace('\\', '\\\\').replace('"', '\\"'))
+        for clave, valor in valores.items()
+    )
+    return '{' + pares + '}'
+
+
+def exportar_prometheus():
+    """
+    Returns:
+        str: Métricas en formato de exposición de texto de Prometheus
+    """
+    from . import cache
+
+    with _lock_metricas:
+        peticiones = dict(_peticiones)
+        duracion = {vista: list(buckets) for vista, buckets in _duracion.items()}
+        sumas = {vista: Counter(valores) for vista, valores in _sumas.items()}
+
+    lineas = [
+        '# HELP tickets_http_requests_total Peticiones HTTP atendidas.',
+        '# TYPE tickets_http_requests_total counter',
+    ]
+    for (metodo, vista, estado), total in sorted(peticiones.items()):
+        lineas.append(
+            f'tickets_http_requests_total{_etiquetas(metodo=metodo, vista=vista, estado=estado)} {total}'
+        )
+
+    lineas += [
+        '# HELP tickets_http_request_duration_seconds Duración de las peticiones.',
+        '# TYPE tickets_http_request_duration_seconds histogram',
+    ]
+    for vista, buckets in sorted(duracion.items()):
+        acumulado = 0
+        for limite, cantidad in zip(BUCKETS_DURACION + ('+Inf',), buckets):
+            acumulado += cantidad
+            lineas.append(
+                'tickets_http_request_duration_seconds_bucket'
+                f'{_etiquetas(vista=vista, le=limite)} {acumulado}'
+            )
+        lineas.append(
+            f'tickets_http_request_duration_seconds_sum{_etiquetas(vista=vista)} '
+            f'{sumas[vista]["duracion"]:.6f}'
+        )
+        lineas.append(
+            f'tickets_http_request_duration_seconds_count{_etiquetas(vista=vista)} {acumulado}'
+        )
+
+    contadores = [
+        ('tickets_db_queries_total', 'consultas', 'Consultas SQL ejecutadas.', '{}'),
+        ('tickets_db_seconds_total', 'db', 'Segundos en la base de datos.', '{:.6f}'),
+        ('tickets_serialization_seconds_total', 'serializacion',
+         'Segundos serializando respuestas.', '{:.6f}'),
+        ('tickets_response_bytes_total', 'bytes', 'Bytes de respuesta (sin streaming).', '{}'),
+        ('tickets_n_plus_one_requests_total', 'n1', 'Peticiones con consultas N+1.', '{}'),
+    ]
+    for nombre, clave, ayuda, formato in contadores:
+        lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} counter']
+        for vista, valores in sorted(sumas.items()):
+            lineas.append(f'{nombre}{_etiquetas(vista=vista)} {formato.format(valores[clave])}')
+
+    lineas += [
+        '# HELP tickets_cache_lookups_total Lecturas de la caché de respuestas.',
+        '# TYPE tickets_cache_lookups_total counter',
+    ]
+    for accion, valores in sorted(cache.estadisticas().items()):
+        for resultado in ('aciertos', 'fallos', 'no_modificados'):
+            lineas.append(
+                f'tickets_cache_lookups_total{_etiquetas(accion=accion, resultado=resultado)} '
+                f'{valores[resultado]}'
+            )
+
+    return '\n'.join(lineas) + '\n'
+
+
+def server_timing(medicion, total):
+    """Valor de la cabecera Server-Timing (milisegundos)."""
+    app = max(total - medicion.tiempo_db - medicion.tiempo_serializacion, 0)
+    return ', '.join([
+        f'db;dur={medicion.tiempo_db * 1000:.1f};desc="{medicion.consultas} SQL"',
+        f'serializacion;dur={medicion.tiempo_serializacion * 1000:.1f}',
+        f'render;dur={medicion.tiempo_render * 1000:.1f}',
+        f'app;dur={app * 1000:.1f}',
+        f'total;dur={total * 1000:.1f}',
+    ])
+
+
+def registrar_log(datos, n1):
+    if n1:
+        logger.warning(json.dumps(datos, ensure_ascii=False))
+    elif logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(datos, ensure_ascii=False))
+
+
+class PresupuestoExcedido(AssertionError):
+    """Un bloque ejecutó más consultas que las permitidas."""
+
+
+@contextmanager
+def presupuesto_consultas(maximo, nombre='bloque', permitir_n1=False):
+    """
+    Fija el máximo de consultas de un bloque, para pruebas y verificaciones
+    de CI (ver el comando check_query_budget).
+
+    Ejemplo:
+        with presupuesto_consultas(2, 'ticket-list'):
+            client.get('/api/tickets/')
+
+    Args:
+        maximo (int): Consultas permitidas
+        nombre (str): Nombre del bloque para el mensaje de error
+        permitir_n1 (bool): No fallar si hay plantillas repetidas
+
+    Raises:
+        PresupuestoExcedido: Si se supera el máximo o se detecta un N+1
+    """
+    instalar_en_conexiones_abiertas()
+    with medir() as medicion:
+        yield medicion
+
+    problemas = []
+    if medicion.consultas > maximo:
+        problemas.append(f'{medicion.consultas} consultas (máximo {maximo})')
+    n1 = [] if permitir_n1 else medicion.n_mas_uno()
+    for plantilla, veces in n1:
+        problemas.append(f'N+1: {veces}x {plantilla[:200]}')
+    if problemas:
+        detalle = '\n  '.join(problemas)
+        raise PresupuestoExcedido(f'{nombre}:\n  {detalle}')
@@ -0,0 +1,72 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tickets import archive
+
+
+class Command(BaseCommand):
+    """
+    Mueve los tickets cerrados sin actividad reciente, con sus comentarios,
+    a las tablas de archivo.
+
+    Cada lote se confirma por separado: si se interrumpe, al volver a
+    ejecutarlo continúa con los tickets que quedaron en la tabla activa.
+    La API sigue sirviendo los archivados (detalle y ?include_archived=1).
+
+    Ejemplos:
+        python manage.py archive_closed --older-than=90d
+        python manage.py archive_closed --older-than=12h --lote 200
+        python manage.py archive_closed --maximo 10000     # acotar la ejecución
+        python manage.py archive_closed --dry-run
+    """
+
+    help = 'Archiva los tickets cerrados sin actividad desde hace más de --older-than'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', default=settings.TICKETS_ARCHIVE_AFTER,
+            help='Antigüedad mínima desde la última actualización: 90d, 12h, 2w '
+                 '(por defecto TICKETS_ARCHIVE_AFTER)'
+        )
+        parser.add_argument(
+            '--lote', type=int, default=settings.TICKETS_ARCHIVE_BATCH,
+            help='Tickets por transacción (por defecto TICKETS_ARCHIVE_BATCH)'
+        )
+        parser.add_argument(
+            '--maximo', type=int,
+            help='Tickets a mover como máximo en esta ejecución'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Solo informa cuántos tickets se archivarían'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            antiguedad = archive.parsear_antiguedad(options['older_than'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que cero.')
+
+        if options['dry_run']:
+            pendientes = archive.archivables(timezone.now() - antiguedad).count()
+            self.stdout.write(f'{pendientes} tickets cerrados por archivar')
+            return
+
+        inicio = time.perf_counter()
+        tickets = comentarios = 0
+        for movidos, comentarios_movidos in archive.archivar_cerrados(
+            antiguedad, lote=options['lote'], maximo=options['maximo']
+        ):
+            tickets += movidos
+            comentarios += comentarios_movidos
+            self.stdout.write(f'  {tickets} tickets y {comentarios} comentarios archivados')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{tickets} tickets y {comentarios} comentarios archivados '
+            f'en {time.perf_counter() - inicio:.1f} s'
+        ))
@@ -0,0 +1,165 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from tickets import benchmarks
+from tickets.models import Ticket, Comment
+from tickets.serializers import (
+    TicketListSerializer, TicketDetailSerializer, CommentSerializer
+)
+from tickets.sync import codificar_marca
+from tickets.synthetic import VOCABULARIO
+from tickets.views import TicketViewSet
+
+
+class Command(BaseCommand):
+    """
+    Micro-benchmarks de cada acción de TicketViewSet y de los serializers.
+
+    Las vistas se invocan directamente (sin middleware ni enrutamiento) y
+    sin caché de respuestas, para medir solo consulta y serialización. Las
+    escrituras se revierten tras cada repetición.
+
+    Ejemplo:
+        python manage.py benchmark_api --repeticiones 100 --salida bench/api.json
+    """
+
+    help = 'Mide latencia y consultas por acción de la API y por serializer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=30)
+        parser.add_argument('--calentamiento', type=int, default=3)
+        parser.add_argument(
+            '--solo', help='Escenarios separados por coma (por defecto todos)'
+        )
+        parser.add_argument('--salida', help='Guarda los resultados en este JSON')
+        parser.add_argument('--comparar', help='JSON de una ejecución anterior')
+
+    def handle(self, *args, **options):
+        ticket = (
+            Ticket.objects.filter(estado='nuevo').order_by('-fecha_creacion').first()
+            or Ticket.objects.order_by('-fecha_creacion').first()
+        )
+        if ticket is None:
+            raise CommandError('No hay tickets: ejecute generate_synthetic primero.')
+
+        escenarios = self._escenarios(ticket)
+        if options['solo']:
+            pedidos = set(options['solo'].split(','))
+            escenarios = [e for e in escenarios if e[0] in pedidos]
+
+        resultado = {'metadatos': benchmarks.metadatos(), 'escenarios': {}}
+        self.stdout.write(
+            f"{'escenario':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'consultas':>11}"
+        )
+
+        with override_settings(TICKETS_CACHE_ENABLED=False):
+            for nombre, ejecutar, escritura in escenarios:
+                datos = self._medir(ejecutar, escritura, options)
+                resultado['escenarios'][nombre] = datos
+                self.stdout.write(
+                    f"{nombre:<24}{datos['p50_ms']:>10.2f}{datos['p95_ms']:>10.2f}"
+                    f"{datos['p99_ms']:>10.2f}{datos['consultas']:>11}"
+                )
+
+        if options['salida']:
+            benchmarks.guardar(resultado, options['salida'])
+            self.stdout.write(f"Resultados guardados en {options['salida']}")
+        if options['comparar']:
+            self._imprimir_comparacion(resultado, options['comparar'])
+
+    def _escenarios(self, ticket):
+        """
+        Returns:
+            list: Tuplas (nombre, función sin argumentos, es_escritura)
+        """
+        # Host admitido por ALLOWED_HOSTS para los enlaces de paginación
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+        lista = TicketViewSet.as_view({'get': 'list', 'post': 'create'})
+        detalle = TicketViewSet.as_view({'get': 'retrieve'})
+        comentarios = TicketViewSet.as_view({'get': 'comments', 'post': 'comments'})
+        transicion = TicketViewSet.as_view({'patch': 'transition'})
+        estadisticas = TicketViewSet.as_view({'get': 'stats'})
+        lote = TicketViewSet.as_view({'get': 'batch'})
+        cambios = TicketViewSet.as_view({'get': 'changes'})
+
+        base = '/api/tickets/'
+        ids = ','.join(str(pk) for pk in Ticket.objects.values_list('id', flat=True)[:20])
+        marca = codificar_marca(
+            (ticket.fecha_actualizacion, 0),
+            (timezone.now(), 0)
+        )
+        pagina = list(Ticket.objects.all()[:20])
+        pagina_grande = list(Ticket.objects.all()[:100])
+        comentarios_pagina = list(Comment.objects.order_by('id')[:100])
+
+        def get(vista, url, **kwargs):
+            return lambda: vista(factory.get(url), **kwargs).render()
+
+        nuevo = {
+            'titulo': 'Benchmark de creación',
+            'descripcion': 'Ticket temporal creado por benchmark_api',
+            'prioridad': 'media',
+            'solicitante': 'Benchmark',
+        }
+
+        return [
+            ('list', get(lista, base), False),
+            ('list_estado', get(lista, f'{base}?estado=nuevo'), False),
+            ('list_cursor', get(lista, f'{base}?paginacion=cursor'), False),
+            ('list_search', get(lista, f'{base}?search={VOCABULARIO[200]}'), False),
+            ('retrieve', get(detalle, f'{base}{ticket.pk}/', pk=ticket.pk), False),
+            ('comments', get(comentarios, f'{base}{ticket.pk}/comments/', pk=ticket.pk), False),
+            ('stats', get(estadisticas, f'{base}stats/'), False),
+            ('stats_estado', get(estadisticas, f'{base}stats/?estado=nuevo'), False),
+            ('batch', get(lote, f'{base}batch/?ids={ids}'), False),
+            ('changes', get(cambios, f'{base}changes/?since={marca}'), False),
+            ('create', lambda: lista(factory.post(base, nuevo, format='json')).render(), True),
+            ('transition', lambda: transicion(
+                factory.patch(f'{base}{ticket.pk}/transition/',
+                              {'nuevo_estado': 'en_proceso', 'comentario': 'Benchmark'},
+                              format='json'),
+                pk=ticket.pk
+            ).render(), True),
+            ('comment_create', lambda: comentarios(
+                factory.post(f'{base}{ticket.pk}/comments/',
+                             {'autor': 'Benchmark', 'contenido': 'Comentario de benchmark'},
+                             format='json'),
+                pk=ticket.pk
+            ).render(), True),
+            ('ser_list_20', lambda: TicketListSerializer(pagina, many=True).data, False),
+            ('ser_list_100', lambda: TicketListSerializer(pagina_grande, many=True).data, False),
+            ('ser_detail', lambda: TicketDetailSerializer(
+                Ticket.objects.get(pk=ticket.pk)
+            ).data, False),
+            ('ser_comment_100', lambda: CommentSerializer(comentarios_pagina, many=True).data, False),
+        ]
+
+    def _medir(self, ejecutar, escritura, options):
+        tiempos = []
+        consultas = 0
+        for i in range(options['calentamiento'] + options['repeticiones']):
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as capturadas:
+                    inicio = time.perf_counter()
+                    ejecutar()
+                    duracion = (time.perf_counter() - inicio) * 1000
+                if escritura:
+                    transaction.set_rollback(True)
+            if i >= options['calentamiento']:
+                tiempos.append(duracion)
+                consultas = len(capturadas.captured_queries)
+
+        datos = benchmarks.resumir_tiempos(tiempos)
+        datos['consultas'] = consultas
+        return datos
+
+    def _imprimir_comparacion(self, resultado, ruta):
+        self.stdout.write(f"\n{'escenario':<24}{'antes':>10}{'ahora':>10}{'var %':>9}")
+        for nombre, antes, ahora, variacion in benchmarks.comparar(resultado, ruta):
+            estilo = self.style.ERROR if variacion > 10 else self.style.SUCCESS
+            self.stdout.write(estilo(f'{nombre:<24}{antes:>10.2f}{ahora:>10.2f}{variacion:>+9.1f}'))
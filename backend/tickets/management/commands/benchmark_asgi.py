@@ -0,0 +1,410 @@
+import asyncio
+import importlib.util
+import io
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from tickets import async_views, benchmarks, urls
+from tickets.models import Comment
+from tickets.management.commands.load_test import Command as LoadTest
+
+
+class Command(BaseCommand):
+    """
+    Compara el despliegue WSGI (vistas síncronas) con el ASGI de vistas
+    async nativas (TICKETS_ASYNC_READS, tickets.async_views) bajo
+    --concurrencia conexiones simultáneas.
+
+    Primero verifica que ambas vistas respondan los mismos bytes y
+    cabeceras. Luego, por defecto, mide dentro del proceso:
+        - WSGI: hilos que invocan el WSGIHandler de Django
+        - ASGI: corrutinas en un event loop que invocan el ASGIHandler
+    Con --servidores levanta runserver (WSGI con hilos) y uvicorn (ASGI) en
+    puertos libres y los mide con load_test sobre HTTP real.
+
+    Ejemplos:
+        python manage.py benchmark_asgi --concurrencia 64 --duracion 20
+        python manage.py benchmark_asgi --servidores --salida bench/asgi.json
+    """
+
+    help = 'Compara peticiones por segundo de lectura entre WSGI y ASGI con conexiones concurrentes'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._urlconfs = {}
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrencia', type=int, default=32)
+        parser.add_argument('--duracion', type=float, default=10, help='Segundos por despliegue')
+        parser.add_argument(
+            '--escenarios',
+            help='Escenarios de load_test separados por coma (por defecto: %s)'
+            % ','.join(LoadTest.ESCENARIOS)
+        )
+        parser.add_argument(
+            '--servidores', action='store_true',
+            help='Medir runserver y uvicorn sobre HTTP en vez de los handlers en proceso'
+        )
+        parser.add_argument(
+            '--sin-cache', action='store_true',
+            help='Desactiva la caché de respuestas para medir las consultas'
+        )
+        parser.add_argument('--salida', help='Guarda los resultados en este JSON')
+
+    def handle(self, *args, **options):
+        if options['concurrencia'] < 1:
+            raise CommandError('--concurrencia debe ser mayor que cero.')
+        escenarios = options['escenarios'].split(',') if options['escenarios'] else LoadTest.ESCENARIOS
+        desconocidos = set(escenarios) - set(LoadTest.ESCENARIOS)
+        if desconocidos:
+            raise CommandError(f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}")
+        rutas = LoadTest()._rutas(escenarios)
+
+        diferencias = self._verificar()
+        if diferencias:
+            for diferencia in diferencias:
+                self.stderr.write(diferencia)
+            raise CommandError('Las vistas async no responden igual que las síncronas.')
+        self.stdout.write(self.style.SUCCESS('Vistas async equivalentes a las síncronas'))
+
+        if options['servidores']:
+            resultados = self._medir_servidores(escenarios, options)
+        else:
+            with override_settings(TICKETS_CACHE_ENABLED=not options['sin_cache']):
+                resultados = {
+                    'wsgi': self._medir_wsgi(rutas, options['concurrencia'], options['duracion']),
+                    'asgi': self._medir_asgi(rutas, options['concurrencia'], options['duracion']),
+                }
+
+        self.stdout.write(
+            f"\n{'escenario':<16}{'WSGI req/s':>12}{'ASGI req/s':>12}"
+            f"{'WSGI p95':>10}{'ASGI p95':>10}{'var %':>8}"
+        )
+        for nombre in [*escenarios, 'total']:
+            wsgi, asgi = resultados['wsgi'][nombre], resultados['asgi'][nombre]
+            variacion = (asgi['req_s'] / wsgi['req_s'] - 1) * 100 if wsgi['req_s'] else 0.0
+            estilo = self.style.SUCCESS if variacion >= 0 else self.style.WARNING
+            self.stdout.write(estilo(
+                f"{nombre:<16}{wsgi['req_s']:>12.1f}{asgi['req_s']:>12.1f}"
+                f"{wsgi['p95_ms']:>10.1f}{asgi['p95_ms']:>10.1f}{variacion:>+8.1f}"
+            ))
+        errores = {modo: datos['total']['errores'] for modo, datos in resultados.items()}
+        if any(errores.values()):
+            self.stdout.write(self.style.WARNING(f'Errores: {errores}'))
+
+        if options['salida']:
+            benchmarks.guardar({
+                'metadatos': dict(
+                    benchmarks.metadatos(),
+                    concurrencia=options['concurrencia'], duracion_s=options['duracion'],
+                    servidores=options['servidores'], cache=not options['sin_cache'],
+                ),
+                'despliegues': resultados,
+            }, options['salida'])
+            self.stdout.write(f"Resultados guardados en {options['salida']}")
+
+    def _urlconf(self, asincrono):
+        """
+        URLconf de la API con o sin las lecturas async, sin depender de
+        TICKETS_ASYNC_READS. Se crea una vez: Django cachea el resolver por URLconf.
+        """
+        if asincrono not in self._urlconfs:
+            modulo = types.ModuleType('tickets_urls_asgi' if asincrono else 'tickets_urls_wsgi')
+            modulo.urlpatterns = [
+                *(async_views.rutas(urls.router) if asincrono else []),
+                path('api/', include(urls.router.urls)),
+            ]
+            self._urlconfs[asincrono] = modulo
+        return self._urlconfs[asincrono]
+
+    def _verificar(self):
+        """
+        Compara estado, cuerpo y cabeceras entre WSGI y ASGI, con la caché
+        desactivada, en todos los escenarios y en variantes con paginación,
+        cursores (siguiendo el enlace next) y casos que se delegan.
+        """
+        rutas = dict(LoadTest()._rutas(LoadTest.ESCENARIOS))
+        rutas.update({
+            'list_pagina': '/api/tickets/?page=3&page_size=7',
+            'list_cursor': '/api/tickets/?paginacion=cursor&page_size=5',
+            'list_pagina_invalida': '/api/tickets/?page=999999999',
+            'list_fields': '/api/tickets/?fields=id,titulo',
+            'retrieve_inexistente': '/api/tickets/999999999/',
+            'comments_cursor': f"{rutas['comments']}?paginacion=cursor&page_size=2",
+            'stats_estado': '/api/tickets/stats/?estado=nuevo',
+        })
+        comentado = (
+            Comment.objects.values('ticket').annotate(total=Count('id'))
+            .filter(total__gt=getattr(settings, 'TICKETS_DETAIL_COMMENTS', 20))
+            .order_by('ticket').values_list('ticket', flat=True).first()
+        )
+        if comentado is not None:
+            # Detalle con comentarios_cursor
+            rutas['retrieve_comentado'] = f'/api/tickets/{comentado}/'
+
+        diferencias = []
+        wsgi = WSGIHandler()
+        asgi = ASGIHandler()
+        pendientes = list(rutas.items())
+        # Sin el aviso de cada 404 esperado
+        registro = logging.getLogger('django.request')
+        nivel = registro.level
+        registro.setLevel(logging.ERROR)
+        with override_settings(TICKETS_CACHE_ENABLED=False):
+            while pendientes:
+                nombre, ruta = pendientes.pop(0)
+                with override_settings(ROOT_URLCONF=self._urlconf(False)):
+                    esperado = self._pedir_wsgi(wsgi, ruta)
+                with override_settings(ROOT_URLCONF=self._urlconf(True)):
+                    obtenido = asyncio.run(self._pedir_asgi(asgi, ruta))
+                for campo in ('estado', 'cuerpo', 'Content-Type', 'Allow', 'Vary'):
+                    if esperado[campo] != obtenido[campo]:
+                        diferencias.append(
+                            f'{nombre} {ruta}: {campo} difiere '
+                            f'(WSGI {esperado[campo]!r:.80}, ASGI {obtenido[campo]!r:.80})'
+                        )
+                if nombre.endswith('_cursor') and esperado['estado'] == 200:
+                    siguiente = json.loads(esperado['cuerpo'])['next']
+                    if siguiente:
+                        partes = urlsplit(siguiente)
+                        pendientes.append((f'{nombre}_siguiente', f'{partes.path}?{partes.query}'))
+        registro.setLevel(nivel)
+        connections.close_all()
+        return diferencias
+
+    def _pedir_wsgi(self, aplicacion, ruta):
+        camino, _, consulta = ruta.partition('?')
+        entorno = {
+            'PATH_INFO': camino, 'QUERY_STRING': consulta, 'REQUEST_METHOD': 'GET',
+            'HTTP_HOST': 'localhost', 'HTTP_ACCEPT': 'application/json',
+        }
+        setup_testing_defaults(entorno)
+        capturado = {}
+
+        def start_response(estado, cabeceras, exc_info=None):
+            capturado['estado'] = int(estado.split()[0])
+            capturado['cabeceras'] = dict(cabeceras)
+
+        respuesta = aplicacion(entorno, start_response)
+        try:
+            cuerpo = b''.join(respuesta)
+        finally:
+            respuesta.close()
+        return self._resumen(capturado['estado'], capturado['cabeceras'], cuerpo)
+
+    async def _pedir_asgi(self, aplicacion, ruta):
+        camino, _, consulta = ruta.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': camino, 'raw_path': camino.encode(),
+            'query_string': consulta.encode(), 'root_path': '',
+            'headers': [(b'host', b'localhost'), (b'accept', b'application/json')],
+            'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+        }
+        mensajes = []
+        cuerpo_enviado = False
+
+        async def receive():
+            nonlocal cuerpo_enviado
+            if not cuerpo_enviado:
+                cuerpo_enviado = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # El cliente sigue conectado hasta que llega la respuesta
+            await asyncio.Future()
+
+        async def send(mensaje):
+            mensajes.append(mensaje)
+
+        await aplicacion(scope, receive, send)
+        inicio = mensajes[0]
+        cabeceras = {clave.decode(): valor.decode() for clave, valor in inicio['headers']}
+        cuerpo = b''.join(mensaje.get('body', b'') for mensaje in mensajes[1:])
+        return self._resumen(inicio['status'], cabeceras, cuerpo)
+
+    @staticmethod
+    def _resumen(estado, cabeceras, cuerpo):
+        # Vary: Cookie solo indica que DRF leyó la sesión al autenticar (ver async_views)
+        vary = [
+            valor.strip() for valor in cabeceras.get('Vary', '').split(',')
+            if valor.strip() and valor.strip().lower() != 'cookie'
+        ]
+        return {
+            'estado': estado, 'cuerpo': cuerpo, 'Vary': ', '.join(vary),
+            **{nombre: cabeceras.get(nombre) for nombre in ('Content-Type', 'Allow')},
+        }
+
+    def _resumir(self, medidas, errores, transcurrido):
+        """Req/s y percentiles por escenario y en total."""
+        resultado = {}
+        for nombre, tiempos in [*medidas.items(), ('total', [t for v in medidas.values() for t in v])]:
+            datos = benchmarks.resumir_tiempos(tiempos)
+            datos['req_s'] = round(len(tiempos) / transcurrido, 1)
+            datos['errores'] = errores[nombre] if nombre != 'total' else sum(errores.values())
+            resultado[nombre] = datos
+        return resultado
+
+    def _medir_wsgi(self, rutas, concurrencia, duracion):
+        aplicacion = WSGIHandler()
+        medidas = defaultdict(list)
+        errores = defaultdict(int)
+        for nombre, _ in rutas:
+            medidas[nombre]
+        candado = threading.Lock()
+
+        with override_settings(ROOT_URLCONF=self._urlconf(False)):
+            fin = time.monotonic() + duracion
+
+            def trabajador(desfase):
+                propias = defaultdict(list)
+                fallidas = defaultdict(int)
+                i = desfase
+                try:
+                    while time.monotonic() < fin:
+                        nombre, ruta = rutas[i % len(rutas)]
+                        i += 1
+                        inicio = time.perf_counter()
+                        if self._pedir_wsgi(aplicacion, ruta)['estado'] >= 500:
+                            fallidas[nombre] += 1
+                            continue
+                        propias[nombre].append((time.perf_counter() - inicio) * 1000)
+                finally:
+                    connections.close_all()
+                with candado:
+                    for nombre, valores in propias.items():
+                        medidas[nombre].extend(valores)
+                    for nombre, cantidad in fallidas.items():
+                        errores[nombre] += cantidad
+
+            hilos = [threading.Thread(target=trabajador, args=(n,)) for n in range(concurrencia)]
+            inicio = time.monotonic()
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+        return self._resumir(medidas, errores, time.monotonic() - inicio)
+
+    def _medir_asgi(self, rutas, concurrencia, duracion):
+        aplicacion = ASGIHandler()
+        medidas = defaultdict(list)
+        errores = defaultdict(int)
+        for nombre, _ in rutas:
+            medidas[nombre]
+
+        async def conexion(desfase, fin):
+            i = desfase
+            while time.monotonic() < fin:
+                nombre, ruta = rutas[i % len(rutas)]
+                i += 1
+                inicio = time.perf_counter()
+                if (await self._pedir_asgi(aplicacion, ruta))['estado'] >= 500:
+                    errores[nombre] += 1
+                    continue
+                medidas[nombre].append((time.perf_counter() - inicio) * 1000)
+
+        async def cargar():
+            fin = time.monotonic() + duracion
+            await asyncio.gather(*(conexion(n, fin) for n in range(concurrencia)))
+
+        with override_settings(ROOT_URLCONF=self._urlconf(True)):
+            inicio = time.monotonic()
+            asyncio.run(cargar())
+            transcurrido = time.monotonic() - inicio
+        connections.close_all()
+        return self._resumir(medidas, errores, transcurrido)
+
+    def _medir_servidores(self, escenarios, options):
+        if importlib.util.find_spec('uvicorn') is None:
+            raise CommandError('--servidores requiere uvicorn (pip install uvicorn).')
+
+        entorno = dict(os.environ, TICKETS_QUERY_COUNT_HEADER='1')
+        if options['sin_cache']:
+            entorno['TICKETS_CACHE_ENABLED'] = '0'
+        despliegues = {
+            'wsgi': (
+                [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'runserver', '--noreload'],
+                dict(entorno, TICKETS_ASYNC_READS='0'),
+            ),
+            'asgi': (
+                [sys.executable, '-m', 'uvicorn', 'tickets_system.asgi:application',
+                 '--no-access-log'],
+                dict(entorno, TICKETS_ASYNC_READS='1'),
+            ),
+        }
+
+        resultados = {}
+        for modo, (comando, variables) in despliegues.items():
+            servidor, url = self._iniciar_servidor(modo, comando, variables)
+            descriptor, salida = tempfile.mkstemp(suffix='.json')
+            os.close(descriptor)
+            try:
+                call_command(
+                    'load_test', url=url, concurrencia=options['concurrencia'],
+                    duracion=options['duracion'], escenarios=','.join(escenarios),
+                    salida=salida, stdout=io.StringIO(),
+                )
+                with open(salida, encoding='utf-8') as archivo:
+                    datos = json.load(archivo)
+            finally:
+                servidor.terminate()
+                servidor.wait(timeout=10)
+                os.unlink(salida)
+
+            resultados[modo] = datos['escenarios']
+            resultados[modo]['total'] = {
+                'req_s': datos['total_req_s'],
+                'p95_ms': max(v['p95_ms'] for v in datos['escenarios'].values()),
+                'errores': sum(v['errores'] for v in datos['escenarios'].values()),
+            }
+        return resultados
+
+    def _iniciar_servidor(self, modo, comando, entorno):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            puerto = s.getsockname()[1]
+
+        if modo == 'asgi':
+            comando = [*comando, '--host', '127.0.0.1', '--port', str(puerto)]
+        else:
+            comando = [*comando, f'127.0.0.1:{puerto}']
+        servidor = subprocess.Popen(
+            comando, env=entorno, cwd=settings.BASE_DIR,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        url = f'http://127.0.0.1:{puerto}'
+
+        limite = time.monotonic() + 30
+        while time.monotonic() < limite:
+            if servidor.poll() is not None:
+                raise CommandError(f'El servidor {modo} terminó al iniciar.')
+            try:
+                urllib.request.urlopen(f'{url}/api/tickets/stats/', timeout=2).read()
+                self.stdout.write(f'Servidor {modo} iniciado en {url}')
+                return servidor, url
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.2)
+
+        servidor.terminate()
+        raise CommandError(f'El servidor {modo} no respondió en 30 segundos.')
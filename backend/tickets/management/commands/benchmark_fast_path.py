@@ -0,0 +1,140 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from tickets import benchmarks, fastpath
+from tickets.models import Ticket
+from tickets.renderers import ORJSONRenderer
+from tickets.serializers import TicketListSerializer
+from tickets.synthetic import VOCABULARIO
+
+
+class Command(BaseCommand):
+    """
+    Compara el listado con TicketListSerializer + JSONRenderer contra la
+    lectura rápida (.values() + tablas precalculadas + orjson).
+
+    Primero verifica que los endpoints de listado respondan los mismos
+    bytes con y sin TICKETS_FAST_LIST; después mide cada etapa (consulta,
+    serialización, renderizado) sobre páginas de --filas tickets.
+
+    Ejemplo:
+        python manage.py benchmark_fast_path --filas 10000 --salida bench/fast.json
+    """
+
+    help = 'Verifica y mide la lectura rápida del listado de tickets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=10000, help='Tickets por página medida')
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--salida', help='Guarda los resultados en este JSON')
+        parser.add_argument('--comparar', help='JSON de una ejecución anterior')
+
+    def handle(self, *args, **options):
+        if not Ticket.objects.exists():
+            raise CommandError('No hay tickets: ejecute generate_synthetic primero.')
+
+        self._verificar_endpoints()
+
+        queryset = (
+            Ticket.objects
+            .order_by('-fecha_creacion', '-id')[:options['filas']]
+        )
+        serializer_tiempos, rapido_tiempos = [], []
+        for _ in range(options['repeticiones']):
+            serializer_tiempos.append(self._medir_serializer(queryset))
+            rapido_tiempos.append(self._medir_rapido(queryset))
+
+        if serializer_tiempos[-1]['bytes'] != rapido_tiempos[-1]['bytes']:
+            raise CommandError('Las respuestas de ambos caminos no son idénticas.')
+
+        resultado = {'metadatos': benchmarks.metadatos(), 'filas': options['filas'], 'escenarios': {}}
+        self.stdout.write(f"\n{options['filas']} filas, {options['repeticiones']} repeticiones (p50 ms)")
+        self.stdout.write(f"{'etapa':<14}{'serializer':>12}{'rápido':>10}{'x':>8}")
+        for etapa in ('consulta', 'serializacion', 'render', 'total'):
+            antes = benchmarks.resumir_tiempos([t[etapa] for t in serializer_tiempos])
+            ahora = benchmarks.resumir_tiempos([t[etapa] for t in rapido_tiempos])
+            resultado['escenarios'][f'serializer_{etapa}'] = antes
+            resultado['escenarios'][f'rapido_{etapa}'] = ahora
+            factor = antes['p50_ms'] / ahora['p50_ms'] if ahora['p50_ms'] else 0
+            self.stdout.write(
+                f"{etapa:<14}{antes['p50_ms']:>12.1f}{ahora['p50_ms']:>10.1f}{factor:>7.1f}x"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Respuestas idénticas ({len(rapido_tiempos[-1]['bytes']):,} bytes)"
+        ))
+
+        if options['salida']:
+            benchmarks.guardar(resultado, options['salida'])
+            self.stdout.write(f"Resultados guardados en {options['salida']}")
+        if options['comparar']:
+            self.stdout.write(f"\n{'escenario':<24}{'antes':>10}{'ahora':>10}{'var %':>9}")
+            for nombre, antes, ahora, variacion in benchmarks.comparar(resultado, options['comparar']):
+                estilo = self.style.ERROR if variacion > 10 else self.style.SUCCESS
+                self.stdout.write(estilo(f'{nombre:<24}{antes:>10.2f}{ahora:>10.2f}{variacion:>+9.1f}'))
+
+    def _verificar_endpoints(self):
+        """Mismos bytes por HTTP con y sin la lectura rápida."""
+        ticket = Ticket.objects.order_by('-fecha_creacion').first()
+        ids = ','.join(str(pk) for pk in (ticket.pk, ticket.pk - 1, 0))
+        urls = [
+            '/api/tickets/',
+            '/api/tickets/?estado=nuevo&page=3',
+            '/api/tickets/?page_size=100',
+            '/api/tickets/?paginacion=cursor',
+            '/api/tickets/?paginacion=cursor&total=aprox&estado=cerrado',
+            f'/api/tickets/?search={VOCABULARIO[200]}',
+            '/api/tickets/?ordering=titulo',
+            f'/api/tickets/batch/?ids={ids}',
+            '/api/tickets/?fields=id,titulo,estado,prioridad',
+            '/api/tickets/?fields=titulo,estado_display,total_comentarios&paginacion=cursor',
+            '/api/tickets/?expand=comentarios&page_size=50',
+            f'/api/tickets/batch/?ids={ids}&fields=estado,status_color&expand=comentarios',
+            '/api/tickets/board/',
+            '/api/tickets/board/?page_size=5&fields=id,titulo&expand=comentarios',
+        ]
+        client = Client(SERVER_NAME='localhost')
+        for url in urls:
+            respuestas = []
+            for rapido in (False, True):
+                with override_settings(TICKETS_CACHE_ENABLED=False, TICKETS_FAST_LIST=rapido):
+                    respuesta = client.get(url)
+                if respuesta.status_code != 200:
+                    raise CommandError(f'{url} respondió {respuesta.status_code}')
+                respuestas.append(respuesta.content)
+            if respuestas[0] != respuestas[1]:
+                raise CommandError(f'{url}: la lectura rápida no produce los mismos bytes')
+            self.stdout.write(f'idéntico  {url}')
+
+    def _medir_serializer(self, queryset):
+        inicio = time.perf_counter()
+        tickets = list(queryset.all())
+        consulta = time.perf_counter()
+        datos = TicketListSerializer(tickets, many=True).data
+        serializacion = time.perf_counter()
+        contenido = JSONRenderer().render(datos)
+        fin = time.perf_counter()
+        return self._etapas(inicio, consulta, serializacion, fin, contenido)
+
+    def _medir_rapido(self, queryset):
+        inicio = time.perf_counter()
+        filas = list(queryset.values(*fastpath.CAMPOS_LISTA))
+        consulta = time.perf_counter()
+        datos = fastpath.filas_lista(filas)
+        serializacion = time.perf_counter()
+        contenido = ORJSONRenderer().render(datos)
+        fin = time.perf_counter()
+        return self._etapas(inicio, consulta, serializacion, fin, contenido)
+
+    @staticmethod
+    def _etapas(inicio, consulta, serializacion, fin, contenido):
+        return {
+            'consulta': (consulta - inicio) * 1000,
+            'serializacion': (serializacion - consulta) * 1000,
+            'render': (fin - serializacion) * 1000,
+            'total': (fin - inicio) * 1000,
+            'bytes': contenido,
+        }
@@ -0,0 +1,80 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets import search, stats
+from tickets.models import Ticket
+from tickets.synthetic import VOCABULARIO, generar_tickets
+
+
+class Command(BaseCommand):
+    """
+    Compara la búsqueda de texto completo contra el filtro icontains original.
+
+    Ejemplo con un millón de tickets sintéticos:
+        python manage.py benchmark_search --poblar 1000000
+    """
+
+    help = 'Mide la latencia de búsqueda FTS contra icontains'
+
+    # Términos de distinta frecuencia según su rango en el vocabulario Zipf
+    CONSULTAS = [
+        VOCABULARIO[0],
+        f'{VOCABULARIO[1]} {VOCABULARIO[5]}',
+        VOCABULARIO[200],
+        VOCABULARIO[3000],
+        VOCABULARIO[3000][:4],
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poblar', type=int, default=0,
+            help='Genera N tickets sintéticos antes de medir'
+        )
+        parser.add_argument(
+            '--repeticiones', type=int, default=5,
+            help='Ejecuciones por consulta'
+        )
+        parser.add_argument(
+            '--pagina', type=int, default=20,
+            help='Tickets leídos por consulta (tamaño de página)'
+        )
+
+    def handle(self, *args, **options):
+        if options['poblar']:
+            self.stdout.write(f"Generando {options['poblar']} tickets sintéticos...")
+            generar_tickets(options['poblar'])
+            stats.reconstruir_contadores()
+            search.crear_backend().reconstruir()
+
+        if search.get_backend() is None:
+            raise CommandError(
+                'No hay índice de texto completo. Ejecuta migrate o rebuild_search_index.'
+            )
+
+        total = Ticket.objects.count()
+        self.stdout.write(f'Tickets en la base: {total}')
+        self.stdout.write(f"{'consulta':<24}{'icontains (ms)':>16}{'fts (ms)':>12}{'x':>8}")
+
+        for consulta in self.CONSULTAS:
+            legado = self._medir(
+                lambda: search.filtro_legado(Ticket.objects.all(), consulta),
+                options
+            )
+            fts = self._medir(
+                lambda: search.filtrar(Ticket.objects.all(), consulta),
+                options
+            )
+            self.stdout.write(
+                f'{consulta:<24}{legado:>16.2f}{fts:>12.2f}{legado / max(fts, 1e-6):>8.1f}'
+            )
+
+    def _medir(self, construir_queryset, options):
+        """Mediana en milisegundos de leer una página del queryset."""
+        tiempos = []
+        for _ in range(options['repeticiones']):
+            inicio = time.perf_counter()
+            list(construir_queryset()[:options['pagina']])
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return statistics.median(tiempos)
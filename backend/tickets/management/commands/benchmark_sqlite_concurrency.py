@@ -0,0 +1,239 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.test import Client
+from django.test.utils import override_settings
+
+from tickets import benchmarks, routers, sqlite
+from tickets.models import Ticket
+
+
+class Command(BaseCommand):
+    """
+    Escrituras concurrentes contra SQLite con la configuración por defecto
+    y con el modo producción (tickets.sqlite).
+
+    Cada modo trabaja sobre su propia copia temporal de la base primaria,
+    que se elimina al terminar. --clientes hilos repiten durante --duracion
+    segundos el flujo de la API: crear un ticket, comentarlo y
+    transicionarlo. Otros --lectores hilos leen el listado y el detalle a
+    la vez, para mostrar que las lecturas siguen siendo concurrentes. Se
+    informan escrituras por segundo, latencias, errores "database is
+    locked" y, en modo producción, escrituras confirmadas por commit.
+
+    Ejemplos:
+        python manage.py benchmark_sqlite_concurrency --clientes 16 --duracion 20
+        python manage.py benchmark_sqlite_concurrency --modo produccion --salida bench/sqlite.json
+    """
+
+    help = 'Mide escrituras por segundo y errores de bloqueo de SQLite con clientes en paralelo'
+
+    MODOS = ('base', 'produccion')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=8, help='Hilos que escriben')
+        parser.add_argument('--lectores', type=int, default=2, help='Hilos que leen')
+        parser.add_argument('--duracion', type=float, default=10, help='Segundos por modo')
+        parser.add_argument(
+            '--modo', choices=self.MODOS,
+            help='Solo este modo (por defecto ambos, para comparar)'
+        )
+        parser.add_argument('--salida', help='Guarda los resultados en este JSON')
+
+    def handle(self, *args, **options):
+        if connections[routers.PRIMARIO].vendor != 'sqlite':
+            raise CommandError('La base primaria no es SQLite.')
+        if options['clientes'] < 1:
+            raise CommandError('--clientes debe ser mayor que cero.')
+
+        modos = [options['modo']] if options['modo'] else list(self.MODOS)
+        resultado = {
+            'metadatos': dict(
+                benchmarks.metadatos(),
+                clientes=options['clientes'], lectores=options['lectores'],
+                duracion_s=options['duracion'],
+            ),
+            'modos': {},
+        }
+
+        self.stdout.write(
+            f"{'modo':<12}{'escrituras':>11}{'esc/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'bloqueos':>10}{'otros':>7}{'lect/s':>9}{'lect p95':>10}{'por commit':>12}"
+        )
+        for modo in modos:
+            datos = self._ejecutar(modo, options)
+            resultado['modos'][modo] = datos
+            escrituras = datos['escrituras']
+            self.stdout.write(
+                f"{modo:<12}{escrituras['n']:>11}{datos['escrituras_s']:>9.1f}"
+                f"{escrituras['p50_ms']:>9.1f}{escrituras['p95_ms']:>9.1f}"
+                f"{datos['errores_bloqueo']:>10}{datos['otros_errores']:>7}"
+                f"{datos['lecturas_s']:>9.1f}{datos['lecturas']['p95_ms']:>10.1f}"
+                f"{'-' if datos['por_commit'] is None else datos['por_commit']:>12}"
+            )
+
+        if options['salida']:
+            benchmarks.guardar(resultado, options['salida'])
+            self.stdout.write(f"Resultados guardados en {options['salida']}")
+
+    def _ejecutar(self, modo, options):
+        """Corre un modo sobre una copia de la base y restaura la configuración."""
+        conexion = connections[routers.PRIMARIO]
+        original = conexion.settings_dict['NAME']
+        ruta = self._copia(routers.ruta_sqlite(routers.PRIMARIO), modo)
+        produccion = modo == 'produccion'
+
+        # Todos los hilos comparten settings_dict: las conexiones nuevas abren la copia
+        conexion.close()
+        conexion.settings_dict['NAME'] = ruta
+        try:
+            with override_settings(
+                TICKETS_CACHE_ENABLED=False, TICKETS_DB_REPLICAS=[],
+                TICKETS_SQLITE_PRODUCTION=produccion,
+            ):
+                confirmaciones = sqlite.escritor.confirmaciones
+                operaciones = sqlite.escritor.operaciones
+                datos = self._cargar(options)
+                sqlite.escritor.detener()
+                if produccion:
+                    commits = sqlite.escritor.confirmaciones - confirmaciones
+                    datos['por_commit'] = round(
+                        (sqlite.escritor.operaciones - operaciones) / commits, 1
+                    ) if commits else None
+                    datos['pragmas'] = sqlite.pragmas_actuales()
+                else:
+                    datos['por_commit'] = None
+        finally:
+            conexion.close()
+            conexion.settings_dict['NAME'] = original
+            for sufijo in ('', '-wal', '-shm', '-journal'):
+                if os.path.exists(ruta + sufijo):
+                    os.unlink(ruta + sufijo)
+        return datos
+
+    def _copia(self, origen, modo):
+        """Copia la base con la API de respaldo, en journal de rollback."""
+        descriptor, ruta = tempfile.mkstemp(suffix=f'-{modo}.sqlite3')
+        os.close(descriptor)
+        primario = sqlite3.connect(origen)
+        copia = sqlite3.connect(ruta)
+        try:
+            primario.backup(copia)
+            # El modo WAL persiste en el archivo: cada modo parte del valor por defecto
+            copia.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            copia.close()
+            primario.close()
+        return ruta
+
+    def _cargar(self, options):
+        """
+        Returns:
+            dict: Latencias de escritura y lectura, tasas y errores del modo
+        """
+        ticket = Ticket.objects.order_by('-fecha_creacion').values_list('pk', flat=True).first()
+        if ticket is None:
+            raise CommandError('No hay tickets: ejecute generate_synthetic primero.')
+        lecturas_rutas = ['/api/tickets/', f'/api/tickets/{ticket}/']
+
+        escrituras, lecturas = [], []
+        errores = Counter()
+        candado = threading.Lock()
+        fin = time.monotonic() + options['duracion']
+
+        def medir(propias, fallidas, llamada):
+            inicio = time.perf_counter()
+            try:
+                respuesta = llamada()
+            except OperationalError as e:
+                fallidas['bloqueo' if 'locked' in str(e) else 'otro'] += 1
+                return None
+            except Exception:
+                fallidas['otro'] += 1
+                return None
+            if respuesta.status_code >= 400:
+                fallidas['otro'] += 1
+                return None
+            propias.append((time.perf_counter() - inicio) * 1000)
+            return respuesta
+
+        def escritor(numero):
+            cliente = Client(SERVER_NAME='localhost', REMOTE_ADDR=f'10.0.1.{numero % 250}')
+            propias, fallidas = [], Counter()
+            try:
+                while time.monotonic() < fin:
+                    creado = medir(propias, fallidas, lambda: cliente.post(
+                        '/api/tickets/', data=json.dumps({
+                            'titulo': f'Concurrencia {numero}',
+                            'descripcion': 'Ticket generado por benchmark_sqlite_concurrency',
+                            'prioridad': 'media',
+                            'solicitante': 'Benchmark',
+                        }), content_type='application/json'
+                    ))
+                    if creado is None:
+                        continue
+                    url = f"/api/tickets/{creado.json()['id']}/"
+                    medir(propias, fallidas, lambda: cliente.post(
+                        f'{url}comments/', data=json.dumps({
+                            'autor': 'Benchmark', 'contenido': 'Comentario concurrente',
+                        }), content_type='application/json'
+                    ))
+                    medir(propias, fallidas, lambda: cliente.patch(
+                        f'{url}transition/', data=json.dumps({'nuevo_estado': 'en_proceso'}),
+                        content_type='application/json'
+                    ))
+            finally:
+                connections.close_all()
+            with candado:
+                escrituras.extend(propias)
+                errores.update(fallidas)
+
+        def lector(numero):
+            cliente = Client(SERVER_NAME='localhost', REMOTE_ADDR=f'10.0.2.{numero % 250}')
+            propias, fallidas = [], Counter()
+            i = 0
+            try:
+                while time.monotonic() < fin:
+                    ruta = lecturas_rutas[i % len(lecturas_rutas)]
+                    i += 1
+                    medir(propias, fallidas, lambda: cliente.get(ruta))
+            finally:
+                connections.close_all()
+            with candado:
+                lecturas.extend(propias)
+                errores.update(fallidas)
+
+        # Los errores de bloqueo se cuentan; sin el traceback de cada 500
+        registro = logging.getLogger('django.request')
+        nivel = registro.level
+        registro.setLevel(logging.CRITICAL)
+
+        hilos = [
+            threading.Thread(target=escritor, args=(n,)) for n in range(options['clientes'])
+        ] + [
+            threading.Thread(target=lector, args=(n,)) for n in range(options['lectores'])
+        ]
+        inicio = time.monotonic()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        transcurrido = time.monotonic() - inicio
+        registro.setLevel(nivel)
+
+        return {
+            'escrituras': benchmarks.resumir_tiempos(escrituras),
+            'escrituras_s': round(len(escrituras) / transcurrido, 1),
+            'lecturas': benchmarks.resumir_tiempos(lecturas),
+            'lecturas_s': round(len(lecturas) / transcurrido, 1),
+            'errores_bloqueo': errores['bloqueo'],
+            'otros_errores': errores['otro'],
+        }
@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tickets import services
+from tickets.models import Ticket, Comment
+
+
+class Command(BaseCommand):
+    """
+    Compara escrituras por segundo del flujo en autocommit contra el
+    flujo transaccional de tickets.services.
+
+    Cada iteración crea un ticket y lo transiciona a 'en_proceso' con un
+    comentario, igual que un uso típico de la API. Los tickets creados se
+    eliminan al terminar.
+    """
+
+    help = 'Mide escrituras por segundo de creación y transición de tickets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--operaciones', type=int, default=300,
+            help='Tickets a crear y transicionar por modo'
+        )
+
+    def handle(self, *args, **options):
+        operaciones = options['operaciones']
+        self.stdout.write(f"{'modo':<16}{'ops/s':>10}{'ms/op':>10}")
+
+        for nombre, flujo in (
+            ('autocommit', self._flujo_autocommit),
+            ('transaccional', self._flujo_transaccional),
+        ):
+            creados = []
+            inicio = time.perf_counter()
+            for i in range(operaciones):
+                creados.append(flujo(i))
+            duracion = time.perf_counter() - inicio
+
+            self.stdout.write(
+                f'{nombre:<16}{operaciones / duracion:>10.1f}'
+                f'{duracion * 1000 / operaciones:>10.2f}'
+            )
+            Ticket.objects.filter(pk__in=creados).delete()
+
+    def _datos(self, i):
+        return {
+            'titulo': f'Benchmark de escritura {i}',
+            'descripcion': 'Ticket generado por benchmark_writes',
+            'prioridad': 'media',
+            'solicitante': 'Benchmark',
+        }
+
+    def _flujo_autocommit(self, i):
+        """Secuencia previa: cada sentencia confirmada por separado."""
+        ticket = Ticket.objects.create(**self._datos(i))
+        Comment.objects.create(
+            ticket=ticket, autor='Sistema',
+            contenido=f'Ticket creado por {ticket.solicitante}'
+        )
+        ticket.estado = 'en_proceso'
+        ticket.save(update_fields=['estado', 'fecha_actualizacion'])
+        Comment.objects.create(
+            ticket=ticket, autor='Sistema',
+            contenido="Estado cambiado a 'En Proceso'"
+        )
+        Comment.objects.create(ticket=ticket, autor='Sistema', contenido='Comentario')
+        return ticket.pk
+
+    def _flujo_transaccional(self, i):
+        ticket = services.crear_ticket(self._datos(i))
+        services.transicionar_ticket(ticket, 'en_proceso', 'Comentario')
+        return ticket.pk
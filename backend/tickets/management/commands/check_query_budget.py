@@ -0,0 +1,215 @@
+import json
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+
+from tickets.instrumentation import PresupuestoExcedido, presupuesto_consultas
+from tickets import archive
+from tickets.models import ArchivedComment, ArchivedTicket, Ticket, Comment
+from tickets.sync import codificar_marca
+
+
+class Command(BaseCommand):
+    """
+    Verifica el presupuesto de consultas de cada endpoint.
+
+    Ejecuta los escenarios con el cliente de pruebas (middleware incluido)
+    y falla si alguno supera su máximo de consultas o repite una misma
+    plantilla SQL TICKETS_N1_THRESHOLD veces (N+1). Las escrituras se
+    revierten al terminar, por lo que puede correr en CI como
+    check_query_plans.
+    """
+
+    help = 'Falla si algún endpoint supera su presupuesto de consultas o tiene un N+1'
+
+    # Consultas máximas por escenario, sin caché de respuestas
+    PRESUPUESTOS = {
+        'list': 2,
+        'list estado': 2,
+        'list cursor': 2,
+        'list search': 4,
+        'list fields': 2,
+        'list expand': 3,
+        'list actividad': 2,
+        'retrieve fields': 1,
+        'retrieve': 2,
+        'retrieve archived': 3,
+        'comments archived': 3,
+        'list archived': 4,
+        'list archived cursor': 2,
+        'comments': 2,
+        'batch': 1,
+        'board': 2,
+        'changes': 2,
+        'stats': 1,
+        'analytics mttr': 1,
+        'analytics backlog': 2,
+        'analytics throughput': 1,
+        'create': 16,
+        'comment create': 7,
+        'transition': 16,
+        'merge': 25,
+        'create idempotente': 16,
+        # La repetición responde desde el almacén de idempotencia
+        'create repetido': 0,
+        'comment list': 2,
+        'comment list expand': 2,
+        'comment retrieve': 1,
+        'admin tickets': 5,
+        'admin comments': 6,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mostrar', action='store_true',
+            help='Muestra las consultas de cada escenario'
+        )
+
+    def handle(self, *args, **options):
+        fallas = []
+
+        with override_settings(TICKETS_CACHE_ENABLED=False), transaction.atomic():
+            ticket, comentario = self._datos_minimos()
+            archivado = self._archivado(ticket)
+            client = Client(SERVER_NAME='localhost')
+            # El admin requiere sesión; la API se consulta de forma anónima
+            client_admin = Client(SERVER_NAME='localhost')
+            client_admin.force_login(
+                User.objects.create_superuser('verificacion_presupuesto', password=None)
+            )
+
+            for nombre, metodo, url, datos, *cabeceras in self._escenarios(ticket, comentario, archivado):
+                maximo = self.PRESUPUESTOS[nombre]
+                try:
+                    with presupuesto_consultas(maximo, nombre) as medicion:
+                        respuesta = self._pedir(
+                            client_admin if url.startswith('/admin/') else client,
+                            metodo, url, datos, *cabeceras
+                        )
+                except PresupuestoExcedido as e:
+                    fallas.append(str(e))
+                    continue
+                if respuesta.status_code >= 400:
+                    raise CommandError(f'[{nombre}] {url} respondió {respuesta.status_code}')
+                self.stdout.write(f'{nombre:<20}{medicion.consultas:>3} / {maximo}')
+                if options['mostrar']:
+                    for plantilla, veces in medicion.plantillas.items():
+                        self.stdout.write(f'    {veces}x {plantilla[:160]}')
+
+            transaction.set_rollback(True)
+
+        if fallas:
+            for falla in fallas:
+                self.stderr.write(falla)
+            raise CommandError(f'{len(fallas)} escenario(s) fuera de presupuesto')
+
+        self.stdout.write(self.style.SUCCESS('Todos los endpoints dentro de su presupuesto'))
+
+    def _datos_minimos(self):
+        """Garantiza al menos un ticket con comentario para ejercitar las rutas."""
+        ticket = Ticket.objects.filter(estado='nuevo').first()
+        if ticket is None:
+            ticket = Ticket.objects.create(
+                titulo='Ticket de verificación',
+                descripcion='Ticket temporal para revisar el presupuesto de consultas',
+                solicitante='Sistema'
+            )
+        comentario = ticket.comentarios.first()
+        if comentario is None:
+            comentario = Comment.objects.create(
+                ticket=ticket, autor='Sistema', contenido='Comentario de verificación'
+            )
+        return ticket, comentario
+
+    def _archivado(self, ticket):
+        """Un ticket archivado con comentario (copia del de prueba si no hay ninguno)."""
+        archivado = ArchivedTicket.objects.first()
+        if archivado is None:
+            archivado = ArchivedTicket.objects.create(**{
+                campo: getattr(ticket, campo) for campo in archive.CAMPOS_TICKET
+            } | {'id': -ticket.pk, 'estado': 'cerrado'})
+            ArchivedComment.objects.create(
+                id=-ticket.pk, ticket=archivado, autor='Sistema',
+                contenido='Comentario archivado de verificación',
+                fecha_creacion=archivado.fecha_creacion,
+            )
+        return archivado
+
+    def _duplicado(self, ticket):
+        """Copia del ticket de prueba, con un comentario, para fusionarla."""
+        duplicado = Ticket.objects.create(
+            titulo=ticket.titulo, descripcion=ticket.descripcion, solicitante='Sistema'
+        )
+        Comment.objects.create(ticket=duplicado, autor='Sistema', contenido='Comentario duplicado')
+        return duplicado
+
+    def _escenarios(self, ticket, comentario, archivado):
+        base = '/api/tickets/'
+        # Única por ejecución: la segunda petición repite la primera
+        clave = f'check_query_budget-{uuid.uuid4()}'
+        posicion = (ticket.fecha_actualizacion, 0)
+        marca = codificar_marca(posicion, posicion)
+        return [
+            ('list', 'get', base, None),
+            ('list estado', 'get', f'{base}?estado=nuevo', None),
+            ('list cursor', 'get', f'{base}?paginacion=cursor&total=aprox', None),
+            ('list search', 'get', f'{base}?search=error', None),
+            ('retrieve', 'get', f'{base}{ticket.pk}/', None),
+            ('list fields', 'get', f'{base}?fields=id,titulo,estado', None),
+            ('list expand', 'get', f'{base}?expand=comentarios', None),
+            ('list actividad', 'get', f'{base}?ordering=-fecha_ultimo_comentario&actividad_desde=2024-01-01', None),
+            ('retrieve fields', 'get', f'{base}{ticket.pk}/?fields=id,estado', None),
+            ('comments', 'get', f'{base}{ticket.pk}/comments/', None),
+            ('retrieve archived', 'get', f'{base}{archivado.pk}/', None),
+            ('comments archived', 'get', f'{base}{archivado.pk}/comments/', None),
+            ('list archived', 'get', f'{base}?include_archived=1', None),
+            ('list archived cursor', 'get', f'{base}?include_archived=1&paginacion=cursor', None),
+            ('board', 'get', f'{base}board/', None),
+            ('batch', 'get', f'{base}batch/?ids={ticket.pk},{ticket.pk + 1}', None),
+            ('changes', 'get', f'{base}changes/?since={marca}', None),
+            ('stats', 'get', f'{base}stats/', None),
+            ('analytics mttr', 'get', f'{base}analytics/mttr/', None),
+            ('analytics backlog', 'get', f'{base}analytics/backlog/?granularidad=hora', None),
+            ('analytics throughput', 'get', f'{base}analytics/throughput/', None),
+            ('create', 'post', base, {
+                'titulo': 'Verificación de presupuesto',
+                'descripcion': 'Ticket temporal de verificación',
+                'prioridad': 'media',
+                'solicitante': 'Sistema',
+            }),
+            *[
+                (nombre, 'post', base, {
+                    'titulo': 'Verificación de idempotencia',
+                    'descripcion': 'Ticket temporal de verificación',
+                    'prioridad': 'media',
+                    'solicitante': 'Sistema',
+                }, {'Idempotency-Key': clave})
+                for nombre in ('create idempotente', 'create repetido')
+            ],
+            ('comment create', 'post', f'{base}{ticket.pk}/comments/', {
+                'autor': 'Sistema', 'contenido': 'Comentario temporal',
+            }),
+            ('transition', 'patch', f'{base}{ticket.pk}/transition/', {
+                'nuevo_estado': 'en_proceso',
+            }),
+            ('merge', 'post', f'{base}{ticket.pk}/merge/', {
+                'duplicados': [self._duplicado(ticket).pk],
+            }),
+            ('comment list', 'get', '/api/comments/', None),
+            ('comment list expand', 'get', '/api/comments/?expand=ticket', None),
+            ('comment retrieve', 'get', f'/api/comments/{comentario.pk}/', None),
+            ('admin tickets', 'get', '/admin/tickets/ticket/', None),
+            ('admin comments', 'get', '/admin/tickets/comment/', None),
+        ]
+
+    def _pedir(self, client, metodo, url, datos, cabeceras=None):
+        peticion = getattr(client, metodo)
+        if datos is None:
+            return peticion(url, headers=cabeceras)
+        return peticion(
+            url, data=json.dumps(datos), content_type='application/json', headers=cabeceras
+        )
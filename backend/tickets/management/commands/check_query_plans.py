@@ -0,0 +1,197 @@
+import json
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from tickets import archive
+from tickets.models import ArchivedComment, ArchivedTicket, Ticket, Comment
+from tickets.pagination import TicketPagination
+from tickets.sync import codificar_marca
+
+
+class Command(BaseCommand):
+    """
+    Verifica que las consultas de la API usen índices.
+
+    Ejecuta cada acción de TicketViewSet y CommentViewSet con el cliente de
+    pruebas, captura el SQL emitido y obtiene su EXPLAIN. Falla si alguna
+    consulta recorre completa una tabla de tickets o comentarios. Las
+    escrituras se revierten al terminar, por lo que puede correr contra
+    cualquier base migrada (por ejemplo en CI).
+    """
+
+    help = 'Falla si alguna consulta de la API hace un recorrido completo de tabla'
+
+    # Tablas pequeñas por diseño: recorrerlas completas es lo esperado
+    TABLAS_PERMITIDAS = {'tickets_ticketcounter'}
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Muestra el plan de cada consulta'
+        )
+
+    def handle(self, *args, **options):
+        self.verbose_plans = options['verbose_plans']
+        fallas = []
+
+        # Sin caché de respuestas: cada escenario debe llegar a la base
+        with override_settings(TICKETS_CACHE_ENABLED=False), transaction.atomic():
+            ticket, comentario = self._datos_minimos()
+            archivado = self._archivado(ticket)
+            for nombre, metodo, url, datos in self._escenarios(ticket, comentario, archivado):
+                fallas.extend(self._verificar(nombre, metodo, url, datos))
+            transaction.set_rollback(True)
+
+        if fallas:
+            for nombre, sql, plan in fallas:
+                self.stderr.write(f'\n[{nombre}] recorrido completo:\n  {sql}\n  {plan}')
+            raise CommandError(f'{len(fallas)} consulta(s) sin índice')
+
+        self.stdout.write(self.style.SUCCESS('Todas las consultas usan índices'))
+
+    def _datos_minimos(self):
+        """Garantiza al menos un ticket con comentario para ejercitar las rutas."""
+        ticket = Ticket.objects.filter(estado='nuevo').first()
+        if ticket is None:
+            ticket = Ticket.objects.create(
+                titulo='Ticket de verificación',
+                descripcion='Ticket temporal para revisar planes de consulta',
+                solicitante='Sistema'
+            )
+        comentario = ticket.comentarios.first()
+        if comentario is None:
+            comentario = Comment.objects.create(
+                ticket=ticket, autor='Sistema', contenido='Comentario de verificación'
+            )
+        return ticket, comentario
+
+    def _archivado(self, ticket):
+        """Un ticket archivado con comentario (copia del de prueba si no hay ninguno)."""
+        archivado = ArchivedTicket.objects.first()
+        if archivado is None:
+            archivado = ArchivedTicket.objects.create(**{
+                campo: getattr(ticket, campo) for campo in archive.CAMPOS_TICKET
+            } | {'id': -ticket.pk, 'estado': 'cerrado'})
+            ArchivedComment.objects.create(
+                id=-ticket.pk, ticket=archivado, autor='Sistema',
+                contenido='Comentario archivado de verificación',
+                fecha_creacion=archivado.fecha_creacion,
+            )
+        return archivado
+
+    def _duplicado(self, ticket):
+        """Copia del ticket de prueba, con un comentario, para fusionarla."""
+        duplicado = Ticket.objects.create(
+            titulo=ticket.titulo, descripcion=ticket.descripcion, solicitante='Sistema'
+        )
+        Comment.objects.create(ticket=duplicado, autor='Sistema', contenido='Comentario duplicado')
+        return duplicado
+
+    def _escenarios(self, ticket, comentario, archivado):
+        base = '/api/tickets/'
+        posicion = (ticket.fecha_actualizacion, 0)
+        marca = codificar_marca(posicion, posicion)
+        cursor = TicketPagination().codificar_cursor(ticket, hacia_atras=False)
+        actividad = ('-fecha_ultimo_comentario', '-id')
+        cursor_actividad = TicketPagination().codificar_cursor(
+            ticket, hacia_atras=False, ordering=actividad
+        )
+        return [
+            ('list', 'get', base, None),
+            ('list estado', 'get', f'{base}?estado=nuevo', None),
+            ('list cursor', 'get', f'{base}?paginacion=cursor&total=aprox', None),
+            ('list cursor estado', 'get', f'{base}?paginacion=cursor&estado=nuevo', None),
+            ('list search', 'get', f'{base}?search=error', None),
+            ('list fields', 'get', f'{base}?fields=id,titulo,estado', None),
+            ('list expand', 'get', f'{base}?expand=comentarios', None),
+            ('list actividad', 'get', f'{base}?ordering=-fecha_ultimo_comentario', None),
+            ('list actividad desde', 'get', f'{base}?actividad_desde=2024-01-01&ordering=-fecha_ultimo_comentario', None),
+            ('list actividad cursor', 'get', f'{base}?paginacion=cursor&ordering=-fecha_ultimo_comentario&cursor={cursor_actividad}', None),
+            ('list archived actividad', 'get', f'{base}?include_archived=1&paginacion=cursor&ordering=-fecha_ultimo_comentario&cursor={cursor_actividad}', None),
+            ('retrieve', 'get', f'{base}{ticket.pk}/', None),
+            ('comments', 'get', f'{base}{ticket.pk}/comments/', None),
+            ('comments cursor', 'get', f'{base}{ticket.pk}/comments/?paginacion=cursor', None),
+            ('retrieve archived', 'get', f'{base}{archivado.pk}/', None),
+            ('comments archived', 'get', f'{base}{archivado.pk}/comments/?paginacion=cursor', None),
+            ('list archived', 'get', f'{base}?include_archived=1&estado=cerrado', None),
+            ('list archived cursor', 'get', f'{base}?include_archived=1&paginacion=cursor&cursor={cursor}', None),
+            ('board', 'get', f'{base}board/', None),
+            ('board cursor', 'get', f'{base}board/?columnas=nuevo&cursor_nuevo={cursor}', None),
+            ('batch', 'get', f'{base}batch/?ids={ticket.pk},{ticket.pk + 1}', None),
+            ('changes', 'get', f'{base}changes/?since={marca}', None),
+            ('stats', 'get', f'{base}stats/', None),
+            ('stats estado', 'get', f'{base}stats/?estado=nuevo', None),
+            ('analytics mttr', 'get', f'{base}analytics/mttr/?prioridad=alta', None),
+            ('analytics backlog', 'get', f'{base}analytics/backlog/?granularidad=hora', None),
+            ('analytics throughput', 'get', f'{base}analytics/throughput/', None),
+            ('create', 'post', base, {
+                'titulo': 'Verificación de planes',
+                'descripcion': 'Ticket temporal de verificación',
+                'prioridad': 'media',
+                'solicitante': 'Sistema',
+            }),
+            ('comment create', 'post', f'{base}{ticket.pk}/comments/', {
+                'autor': 'Sistema', 'contenido': 'Comentario temporal',
+            }),
+            ('transition', 'patch', f'{base}{ticket.pk}/transition/', {
+                'nuevo_estado': 'en_proceso',
+            }),
+            ('merge', 'post', f'{base}{ticket.pk}/merge/', {
+                'duplicados': [self._duplicado(ticket).pk],
+            }),
+            ('comment list', 'get', '/api/comments/', None),
+            ('comment list ticket', 'get', f'/api/comments/?ticket={ticket.pk}', None),
+            ('comment list cursor', 'get', '/api/comments/?paginacion=cursor', None),
+            ('comment list expand', 'get', '/api/comments/?expand=ticket', None),
+            ('comment retrieve', 'get', f'/api/comments/{comentario.pk}/', None),
+        ]
+
+    def _verificar(self, nombre, metodo, url, datos):
+        client = Client(SERVER_NAME='localhost')
+        peticion = getattr(client, metodo)
+
+        with CaptureQueriesContext(connection) as consultas:
+            if datos is None:
+                respuesta = peticion(url)
+            else:
+                respuesta = peticion(url, data=json.dumps(datos), content_type='application/json')
+
+        if respuesta.status_code >= 400:
+            raise CommandError(f'[{nombre}] {url} respondió {respuesta.status_code}')
+
+        fallas = []
+        for consulta in consultas.captured_queries:
+            sql = consulta['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            plan = self._plan(sql)
+            if self.verbose_plans:
+                self.stdout.write(f'[{nombre}] {sql}\n    {plan}')
+            if self._recorrido_completo(plan):
+                fallas.append((nombre, sql, plan))
+        return fallas
+
+    def _plan(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                return ' | '.join(fila[-1] for fila in cursor.fetchall())
+            cursor.execute(f'EXPLAIN {sql}')
+            return ' | '.join(fila[0] for fila in cursor.fetchall())
+
+    def _recorrido_completo(self, plan):
+        """Detecta recorridos completos de tabla en planes de SQLite o PostgreSQL."""
+        if connection.vendor == 'sqlite':
+            # "SCAN tabla" sin índice; "SCAN tabla USING INDEX ..." sí usa índice
+            patron = re.compile(r'SCAN (tickets_\w+)(?! USING| VIRTUAL TABLE)(?:\s|$|\|)')
+        else:
+            patron = re.compile(r'Seq Scan on (tickets_\w+)')
+
+        return any(
+            tabla not in self.TABLAS_PERMITIDAS
+            for tabla in patron.findall(plan + ' ')
+        )
@@ -0,0 +1,163 @@
+import json
+import os
+import sqlite3
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from tickets import routers
+from tickets.models import Ticket
+from tickets.sync import codificar_marca
+
+
+class Command(BaseCommand):
+    """
+    Verifica el enrutamiento de lecturas y escrituras entre el primario y
+    las réplicas (tickets.routers).
+
+    Si no hay réplicas configuradas usa una copia temporal del archivo
+    SQLite primario. Comprueba que las lecturas de la API vayan a la
+    réplica, que las escrituras, el admin y la sincronización usen el
+    primario, que el cliente que escribió lea sus propios cambios y que una
+    réplica caída se reemplace por el primario. Las escrituras se revierten
+    al terminar.
+    """
+
+    help = 'Falla si las lecturas y escrituras no se enrutan como se espera'
+
+    ALIAS_TEMPORAL = 'replica_verificacion'
+
+    def handle(self, *args, **options):
+        if connections[routers.PRIMARIO].vendor != 'sqlite' and not routers.replicas():
+            raise CommandError('Sin réplicas configuradas solo se puede verificar con SQLite.')
+
+        temporal = None
+        replicas = routers.replicas()
+        if not replicas:
+            temporal = self._replica_temporal()
+            replicas = [self.ALIAS_TEMPORAL]
+
+        fallas = []
+        try:
+            with override_settings(TICKETS_CACHE_ENABLED=False, TICKETS_DB_REPLICAS=replicas):
+                routers.olvidar_salud()
+                fallas = self._verificar(replicas)
+        finally:
+            routers.olvidar_salud()
+            if temporal is not None:
+                connections[self.ALIAS_TEMPORAL].close()
+                os.unlink(temporal)
+
+        if fallas:
+            for falla in fallas:
+                self.stderr.write(falla)
+            raise CommandError(f'{len(fallas)} verificación(es) fallida(s)')
+        self.stdout.write(self.style.SUCCESS('Lecturas y escrituras enrutadas correctamente'))
+
+    def _replica_temporal(self):
+        """Copia el primario a un archivo temporal y lo registra como réplica."""
+        descriptor, ruta = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descriptor)
+        primario = sqlite3.connect(routers.ruta_sqlite(routers.PRIMARIO))
+        replica = sqlite3.connect(ruta)
+        primario.backup(replica)
+        replica.close()
+        primario.close()
+        connections.settings[self.ALIAS_TEMPORAL] = {
+            **connections[routers.PRIMARIO].settings_dict,
+            'NAME': f'file:{ruta}?mode=ro',
+        }
+        return ruta
+
+    def _verificar(self, replicas):
+        fallas = []
+        escritor = Client(SERVER_NAME='localhost', REMOTE_ADDR='10.0.0.1')
+        lector = Client(SERVER_NAME='localhost', REMOTE_ADDR='10.0.0.2')
+        base = '/api/tickets/'
+
+        with transaction.atomic():
+            ticket = Ticket.objects.first()
+            posicion = (ticket.fecha_actualizacion, 0)
+            marca = codificar_marca(posicion, posicion)
+            escenarios = [
+                ('lectura en réplica', lector, 'get', base, 'replica', 200),
+                ('detalle en réplica', lector, 'get', f'{base}{ticket.pk}/', 'replica', 200),
+                ('comentarios en réplica', lector, 'get', '/api/comments/', 'replica', 200),
+                ('sincronización en primario', lector, 'get', f'{base}changes/?since={marca}', 'primario', 200),
+                ('escritura en primario', escritor, 'post', base, 'primario', 201),
+            ]
+            for nombre, cliente, metodo, url, destino, esperado in escenarios:
+                fallas.extend(self._escenario(nombre, cliente, metodo, url, destino, esperado, replicas))
+
+            # El ticket recién creado solo existe en el primario
+            nuevo = Ticket.objects.order_by('-id').first()
+            fallas.extend(self._escenario(
+                'read-your-writes', escritor, 'get', f'{base}{nuevo.pk}/', 'primario', 200, replicas
+            ))
+            fallas.extend(self._escenario(
+                'otro cliente lee la réplica', lector, 'get', f'{base}{nuevo.pk}/', 'replica', 404, replicas
+            ))
+
+            # Réplica caída: sus lecturas pasan al primario
+            originales = {}
+            for alias in replicas:
+                originales[alias] = connections[alias].settings_dict['NAME']
+                connections[alias].close()
+                connections[alias].settings_dict['NAME'] = 'file:/nonexistent/replica.sqlite3?mode=ro'
+            routers.olvidar_salud()
+            try:
+                # Sin medir las réplicas: abrir su conexión fallaría
+                fallas.extend(self._escenario(
+                    'réplica caída', lector, 'get', base, 'primario', 200, []
+                ))
+            finally:
+                for alias, nombre in originales.items():
+                    connections[alias].settings_dict['NAME'] = nombre
+                    connections[alias].close()
+                routers.olvidar_salud()
+
+            transaction.set_rollback(True)
+        return fallas
+
+    def _escenario(self, nombre, cliente, metodo, url, destino, esperado, replicas):
+        capturas = {
+            alias: CaptureQueriesContext(connections[alias])
+            for alias in [routers.PRIMARIO, *replicas]
+        }
+        for captura in capturas.values():
+            captura.__enter__()
+        try:
+            if metodo == 'post':
+                respuesta = cliente.post(url, data=json.dumps({
+                    'titulo': 'Verificación de réplicas',
+                    'descripcion': 'Ticket temporal de verificación de réplicas',
+                    'prioridad': 'media',
+                    'solicitante': 'Sistema',
+                }), content_type='application/json')
+            else:
+                respuesta = getattr(cliente, metodo)(url)
+        finally:
+            for captura in capturas.values():
+                captura.__exit__(None, None, None)
+
+        en_primario = len(capturas[routers.PRIMARIO].captured_queries)
+        en_replicas = sum(len(capturas[alias].captured_queries) for alias in replicas)
+        self.stdout.write(
+            f'{nombre:<30} {respuesta.status_code}  primario {en_primario:>3}  réplicas {en_replicas:>3}'
+        )
+
+        fallas = []
+        if respuesta.status_code != esperado:
+            fallas.append(f'[{nombre}] {url} respondió {respuesta.status_code}, se esperaba {esperado}')
+        consultas_replica = [
+            consulta['sql'] for consulta in capturas[routers.PRIMARIO].captured_queries
+            if 'tickets_' in consulta['sql']
+        ]
+        if destino == 'replica' and (consultas_replica or not en_replicas):
+            fallas.append(f'[{nombre}] se esperaban las lecturas en la réplica: {consultas_replica[:3]}')
+        if destino == 'primario' and en_replicas:
+            fallas.append(f'[{nombre}] se esperaba el primario y hubo {en_replicas} consultas en réplicas')
+        return fallas
@@ -0,0 +1,67 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets import export
+from tickets.models import Ticket
+
+
+class Command(BaseCommand):
+    """
+    Exporta tickets con sus comentarios en CSV o NDJSON, en streaming.
+
+    Ejemplo:
+        python manage.py export_tickets --formato ndjson --estado cerrado \\
+            --desde 2024-01-01 --salida cerrados.ndjson
+    """
+
+    help = 'Exporta tickets y comentarios a CSV o NDJSON con memoria constante'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formato', choices=export.FORMATOS, default='csv')
+        parser.add_argument('--estado')
+        parser.add_argument('--prioridad')
+        parser.add_argument('--desde', help='Fecha de creación mínima (YYYY-MM-DD)')
+        parser.add_argument('--hasta', help='Fecha de creación máxima (YYYY-MM-DD)')
+        parser.add_argument(
+            '--salida', help='Archivo de destino; por defecto la salida estándar'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='Filas por bloque de lectura (TICKETS_EXPORT_CHUNK_SIZE)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            tickets = export.filtrar(
+                Ticket.objects.all(),
+                estado=options['estado'],
+                prioridad=options['prioridad'],
+                desde=options['desde'],
+                hasta=options['hasta'],
+            )
+        except export.FiltroInvalido as e:
+            raise CommandError(str(e))
+
+        lineas = export.lineas(options['formato'], tickets, options['chunk_size'])
+        destino = (
+            open(options['salida'], 'w', encoding='utf-8', newline='')
+            if options['salida'] else sys.stdout
+        )
+
+        inicio = time.perf_counter()
+        escritos = 0
+        try:
+            for bloque in export.bloques(lineas):
+                destino.write(bloque)
+                escritos += len(bloque)
+        finally:
+            if destino is not sys.stdout:
+                destino.close()
+
+        if options['salida']:
+            self.stderr.write(
+                f"{options['salida']}: {escritos / 1e6:.1f} MB "
+                f"en {time.perf_counter() - inicio:.1f} s"
+            )
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tickets import cache, search, stats
+from tickets.synthetic import generar_tickets
+
+
+class Command(BaseCommand):
+    """
+    Genera un conjunto de datos sintético y determinístico para pruebas de
+    rendimiento: con la misma semilla produce siempre los mismos tickets,
+    comentarios y fechas.
+
+    Ejemplos:
+        python manage.py generate_synthetic --tickets 10000
+        python manage.py generate_synthetic --tickets 10000000 --lote 20000
+    """
+
+    help = 'Genera tickets y comentarios sintéticos (10k a 10M filas)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tickets', type=int, default=10000)
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument(
+            '--comentarios', type=float, default=2,
+            help='Promedio de comentarios por ticket (distribución geométrica)'
+        )
+        parser.add_argument('--lote', type=int, default=5000, help='Tickets por bulk_create')
+        parser.add_argument(
+            '--sin-indice', action='store_true',
+            help='No reconstruir el índice de búsqueda al terminar'
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        total = generar_tickets(
+            options['tickets'],
+            semilla=options['semilla'],
+            lote=options['lote'],
+            comentarios_por_ticket=options['comentarios'],
+        )
+        self.stdout.write(f'{total} tickets en {time.perf_counter() - inicio:.1f} s')
+
+        stats.reconstruir_contadores()
+        backend = search.crear_backend()
+        if backend is not None and not options['sin_indice']:
+            inicio = time.perf_counter()
+            backend.reconstruir()
+            self.stdout.write(f'Índice de búsqueda reconstruido en {time.perf_counter() - inicio:.1f} s')
+        cache.invalidar()
+
+        self.stdout.write(self.style.SUCCESS('Datos sintéticos generados'))
@@ -0,0 +1,137 @@
+import json
+import os
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets import importer
+from tickets.models import ImportCheckpoint
+
+
+class Command(BaseCommand):
+    """
+    Importa tickets y comentarios históricos en lotes con bulk_create.
+
+    El avance se guarda junto con cada lote: si el proceso se interrumpe,
+    volver a ejecutar el mismo comando continúa desde el último lote
+    confirmado. Los registros inválidos se escriben en el archivo de
+    rechazos con su número y sus errores.
+
+    Ejemplo:
+        python manage.py import_tickets legado.ndjson --lote 2000
+    """
+
+    help = 'Importa tickets históricos desde CSV o NDJSON, reanudable'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help="Ruta del archivo, o '-' para la entrada estándar")
+        parser.add_argument(
+            '--formato', choices=importer.FORMATOS,
+            help='Por defecto se deduce de la extensión del archivo'
+        )
+        parser.add_argument(
+            '--lote', type=int, default=1000,
+            help='Tickets por bulk_create y por transacción'
+        )
+        parser.add_argument(
+            '--nombre',
+            help='Identificador del avance; por defecto el nombre del archivo'
+        )
+        parser.add_argument(
+            '--rechazos',
+            help='Archivo NDJSON de rechazos; por defecto <archivo>.rechazos.ndjson'
+        )
+        parser.add_argument(
+            '--reiniciar', action='store_true',
+            help='Descarta el avance guardado y empieza desde el primer registro'
+        )
+
+    def handle(self, *args, **options):
+        archivo = options['archivo']
+        formato = options['formato'] or os.path.splitext(archivo)[1].lstrip('.').lower()
+        if formato not in importer.FORMATOS:
+            raise CommandError('Indique --formato csv o --formato ndjson.')
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que cero.')
+
+        nombre = options['nombre'] or os.path.basename(archivo)
+        if archivo == '-' and not options['nombre']:
+            raise CommandError('Con la entrada estándar se requiere --nombre.')
+        if options['reiniciar']:
+            ImportCheckpoint.objects.filter(nombre=nombre).delete()
+        avance, _ = ImportCheckpoint.objects.get_or_create(nombre=nombre)
+        if avance.completado:
+            self.stdout.write(f'La importación "{nombre}" ya está completa (use --reiniciar).')
+            return
+
+        ruta_rechazos = options['rechazos'] or (
+            f'{archivo}.rechazos.ndjson' if archivo != '-' else f'{nombre}.rechazos.ndjson'
+        )
+
+        try:
+            entrada = importer.abrir(archivo)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        lector = importer.registros_csv if formato == 'csv' else importer.registros_ndjson
+        saltar = avance.registros
+        if saltar:
+            self.stdout.write(f'Reanudando "{nombre}" después de {saltar} registros')
+
+        with entrada, open(ruta_rechazos, 'a', encoding='utf-8') as rechazos, \
+                importer.fechas_originales():
+            self._importar(lector(entrada), saltar, avance, rechazos, options['lote'])
+
+        avance.completado = True
+        avance.save(update_fields=['completado', 'fecha_actualizacion'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{avance.aceptados} tickets importados, {avance.rechazados} rechazados '
+            f'({ruta_rechazos})'
+        ))
+
+    def _importar(self, registros, saltar, avance, rechazos, tamano_lote):
+        inicio = time.perf_counter()
+        filas = 0
+        validos = []
+        errores = []
+
+        for numero, datos in enumerate(registros, start=1):
+            if numero <= saltar:
+                continue
+
+            if isinstance(datos, ValueError):
+                # Línea ilegible: se rechaza sin datos
+                errores.append({'registro': numero, 'errores': {'registro': [str(datos)]}})
+            else:
+                try:
+                    validos.append(importer.validar_registro(datos))
+                except ValidationError as e:
+                    errores.append({'registro': numero, 'errores': e.message_dict, 'datos': datos})
+
+            if len(validos) + len(errores) >= tamano_lote:
+                filas += self._confirmar(validos, errores, avance, rechazos, inicio, filas)
+                validos, errores = [], []
+
+        if validos or errores:
+            filas += self._confirmar(validos, errores, avance, rechazos, inicio, filas)
+
+    def _confirmar(self, validos, errores, avance, rechazos, inicio, filas_previas):
+        """Inserta el lote, registra sus rechazos e informa el ritmo."""
+        tickets, comentarios = importer.insertar_lote(
+            validos, avance, len(validos) + len(errores), len(errores)
+        )
+        # Los rechazos se escriben después del commit para no registrarlos
+        # dos veces si el lote se revierte
+        for error in errores:
+            rechazos.write(json.dumps(error, ensure_ascii=False, default=str) + '\n')
+        rechazos.flush()
+
+        filas = tickets + comentarios
+        transcurrido = time.perf_counter() - inicio
+        self.stdout.write(
+            f'{avance.registros} registros | {avance.aceptados} aceptados | '
+            f'{avance.rechazados} rechazados | '
+            f'{(filas_previas + filas) / transcurrido:,.0f} filas/s'
+        )
+        return filas
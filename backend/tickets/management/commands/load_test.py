@@ -0,0 +1,212 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets import benchmarks
+from tickets.models import Ticket
+from tickets.synthetic import VOCABULARIO
+
+
+class Command(BaseCommand):
+    """
+    Prueba de carga HTTP concurrente contra un servidor en ejecución.
+
+    Cada hilo recorre los escenarios en rueda durante --duracion segundos.
+    Con --iniciar se levanta un runserver local en un puerto libre con la
+    cabecera X-Query-Count activa, para informar consultas por petición.
+
+    Ejemplos:
+        python manage.py load_test --iniciar --concurrencia 8 --duracion 30
+        python manage.py load_test --url http://localhost:8000 --salida bench/carga.json
+    """
+
+    help = 'Genera carga HTTP concurrente e informa p50/p95/p99 y peticiones por segundo'
+
+    ESCENARIOS = ('list', 'list_estado', 'list_search', 'retrieve', 'comments', 'stats')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='URL base del servidor (p. ej. http://localhost:8000)')
+        parser.add_argument(
+            '--iniciar', action='store_true',
+            help='Inicia un runserver local en un puerto libre y lo detiene al terminar'
+        )
+        parser.add_argument(
+            '--sin-cache', action='store_true',
+            help='Con --iniciar, desactiva la caché de respuestas para medir la base'
+        )
+        parser.add_argument('--concurrencia', type=int, default=4)
+        parser.add_argument('--duracion', type=float, default=10, help='Segundos de carga')
+        parser.add_argument(
+            '--escenarios',
+            help='Escenarios separados por coma (por defecto: %s)' % ','.join(self.ESCENARIOS)
+        )
+        parser.add_argument('--salida', help='Guarda los resultados en este JSON')
+        parser.add_argument('--comparar', help='JSON de una ejecución anterior')
+
+    def handle(self, *args, **options):
+        if bool(options['url']) == options['iniciar']:
+            raise CommandError('Indique --url o --iniciar (solo uno).')
+        if options['concurrencia'] < 1:
+            raise CommandError('--concurrencia debe ser mayor que cero.')
+
+        escenarios = options['escenarios'].split(',') if options['escenarios'] else self.ESCENARIOS
+        desconocidos = set(escenarios) - set(self.ESCENARIOS)
+        if desconocidos:
+            raise CommandError(f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}")
+        rutas = self._rutas(escenarios)
+
+        servidor = None
+        url = (options['url'] or '').rstrip('/')
+        if options['iniciar']:
+            servidor, url = self._iniciar_servidor(options['sin_cache'])
+
+        try:
+            medidas, errores, transcurrido = self._cargar(
+                url, rutas, options['concurrencia'], options['duracion']
+            )
+        finally:
+            if servidor is not None:
+                servidor.terminate()
+                servidor.wait(timeout=10)
+
+        resultado = {
+            'metadatos': dict(
+                benchmarks.metadatos(),
+                url=url, concurrencia=options['concurrencia'], duracion_s=options['duracion'],
+                cache=not options['sin_cache'],
+            ),
+            'escenarios': {},
+        }
+        self.stdout.write(
+            f"{'escenario':<16}{'peticiones':>11}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'p99 ms':>9}{'req/s':>9}{'consultas':>11}{'errores':>9}"
+        )
+        for nombre in escenarios:
+            tiempos = [tiempo for tiempo, _ in medidas[nombre]]
+            consultas = [c for _, c in medidas[nombre] if c is not None]
+            datos = benchmarks.resumir_tiempos(tiempos)
+            datos['req_s'] = round(len(tiempos) / transcurrido, 1)
+            datos['consultas'] = round(sum(consultas) / len(consultas), 1) if consultas else None
+            datos['errores'] = errores[nombre]
+            resultado['escenarios'][nombre] = datos
+            self.stdout.write(
+                f"{nombre:<16}{datos['n']:>11}{datos['p50_ms']:>9.1f}{datos['p95_ms']:>9.1f}"
+                f"{datos['p99_ms']:>9.1f}{datos['req_s']:>9.1f}"
+                f"{'-' if datos['consultas'] is None else datos['consultas']:>11}"
+                f"{datos['errores']:>9}"
+            )
+
+        total = sum(len(m) for m in medidas.values())
+        resultado['total_req_s'] = round(total / transcurrido, 1)
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} peticiones en {transcurrido:.1f} s: {resultado["total_req_s"]} req/s'
+        ))
+
+        if options['salida']:
+            benchmarks.guardar(resultado, options['salida'])
+            self.stdout.write(f"Resultados guardados en {options['salida']}")
+        if options['comparar']:
+            self.stdout.write(f"\n{'escenario':<16}{'antes':>10}{'ahora':>10}{'var %':>9}")
+            for nombre, antes, ahora, variacion in benchmarks.comparar(resultado, options['comparar']):
+                estilo = self.style.ERROR if variacion > 10 else self.style.SUCCESS
+                self.stdout.write(estilo(f'{nombre:<16}{antes:>10.1f}{ahora:>10.1f}{variacion:>+9.1f}'))
+
+    def _rutas(self, escenarios):
+        """Rutas de cada escenario sobre tickets reales de la base."""
+        ticket = (
+            Ticket.objects.filter(estado='nuevo').order_by('-fecha_creacion').first()
+            or Ticket.objects.order_by('-fecha_creacion').first()
+        )
+        if ticket is None:
+            raise CommandError('No hay tickets: ejecute generate_synthetic primero.')
+
+        todas = {
+            'list': '/api/tickets/',
+            'list_estado': '/api/tickets/?estado=nuevo',
+            'list_search': f'/api/tickets/?search={VOCABULARIO[200]}',
+            'retrieve': f'/api/tickets/{ticket.pk}/',
+            'comments': f'/api/tickets/{ticket.pk}/comments/',
+            'stats': '/api/tickets/stats/',
+        }
+        return [(nombre, todas[nombre]) for nombre in escenarios]
+
+    def _iniciar_servidor(self, sin_cache=False):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            puerto = s.getsockname()[1]
+
+        entorno = dict(os.environ, TICKETS_QUERY_COUNT_HEADER='1')
+        if sin_cache:
+            entorno['TICKETS_CACHE_ENABLED'] = '0'
+        servidor = subprocess.Popen(
+            [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'runserver',
+             f'127.0.0.1:{puerto}', '--noreload'],
+            env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        url = f'http://127.0.0.1:{puerto}'
+
+        limite = time.monotonic() + 30
+        while time.monotonic() < limite:
+            if servidor.poll() is not None:
+                raise CommandError('El servidor terminó al iniciar.')
+            try:
+                urllib.request.urlopen(f'{url}/api/tickets/stats/', timeout=2).read()
+                self.stdout.write(f'Servidor iniciado en {url}')
+                return servidor, url
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.2)
+
+        servidor.terminate()
+        raise CommandError('El servidor no respondió en 30 segundos.')
+
+    def _cargar(self, url, rutas, concurrencia, duracion):
+        """
+        Returns:
+            tuple: ({escenario: [(ms, consultas)]}, {escenario: errores}, segundos)
+        """
+        medidas = defaultdict(list)
+        errores = defaultdict(int)
+        candado = threading.Lock()
+        fin = time.monotonic() + duracion
+
+        def trabajador(desfase):
+            propias = defaultdict(list)
+            fallidas = defaultdict(int)
+            i = desfase
+            while time.monotonic() < fin:
+                nombre, ruta = rutas[i % len(rutas)]
+                i += 1
+                inicio = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(url + ruta, timeout=30) as respuesta:
+                        respuesta.read()
+                        consultas = respuesta.headers.get('X-Query-Count')
+                except (urllib.error.URLError, ConnectionError, TimeoutError):
+                    fallidas[nombre] += 1
+                    continue
+                propias[nombre].append((
+                    (time.perf_counter() - inicio) * 1000,
+                    int(consultas) if consultas is not None else None,
+                ))
+            with candado:
+                for nombre, valores in propias.items():
+                    medidas[nombre].extend(valores)
+                for nombre, cantidad in fallidas.items():
+                    errores[nombre] += cantidad
+
+        hilos = [threading.Thread(target=trabajador, args=(n,)) for n in range(concurrencia)]
+        inicio = time.monotonic()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        return medidas, errores, time.monotonic() - inicio
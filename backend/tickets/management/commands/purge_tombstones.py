@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tickets.models import TicketTombstone
+
+
+class Command(BaseCommand):
+    """
+    Elimina las marcas de tickets eliminados más antiguas que la retención.
+
+    Los clientes con una marca de sincronización anterior a ese límite
+    reciben 410 y deben sincronizar desde cero.
+    """
+
+    help = 'Depura los registros de tickets eliminados usados por /api/tickets/changes/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=settings.TICKETS_SYNC_TOMBSTONE_DAYS,
+            help='Días de retención (por defecto TICKETS_SYNC_TOMBSTONE_DAYS)'
+        )
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options['dias'])
+        eliminados, _ = TicketTombstone.objects.filter(fecha_eliminacion__lt=limite).delete()
+        self.stdout.write(self.style.SUCCESS(f'{eliminados} registros depurados'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from tickets import duplicates
+
+
+class Command(BaseCommand):
+    """
+    Reconstruye las firmas MinHash/LSH de los tickets abiertos.
+    Útil tras cargas con SQL directo o al cambiar BANDAS/FILAS en
+    tickets.duplicates.
+    """
+
+    help = 'Reconstruye el índice de posibles duplicados de los tickets abiertos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Alias de la base de datos a indexar'
+        )
+        parser.add_argument('--lote', type=int, default=2000, help='Tickets por transacción')
+
+    def handle(self, *args, **options):
+        total = 0
+        for leidos in duplicates.reconstruir(options['lote'], options['database']):
+            total += leidos
+            self.stdout.write(f'{total} tickets firmados', ending='\r')
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'Índice de duplicados reconstruido: {total} tickets abiertos'
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from tickets import search
+
+
+class Command(BaseCommand):
+    """
+    Reconstruye el índice de texto completo de tickets y comentarios.
+    Crea las estructuras si no existen (por ejemplo tras restaurar un backup).
+    """
+
+    help = 'Reconstruye el índice de búsqueda de texto completo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Alias de la base de datos a indexar'
+        )
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        backend = search.crear_backend(alias)
+
+        if backend is None:
+            raise CommandError(
+                'El motor de base de datos no soporta búsqueda de texto completo.'
+            )
+
+        backend.crear_estructura()
+        search.olvidar_disponibilidad(alias)
+
+        with transaction.atomic(using=alias):
+            backend.reconstruir()
+
+        self.stdout.write(self.style.SUCCESS('Índice de búsqueda reconstruido'))
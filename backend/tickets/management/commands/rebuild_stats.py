@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from tickets import cache
+from tickets.stats import reconstruir_contadores
+
+
+class Command(BaseCommand):
+    """
+    Recalcula los contadores de estadísticas desde la tabla de tickets.
+    Útil si los contadores se desincronizan (cargas masivas, ediciones SQL).
+    """
+
+    help = 'Reconstruye los contadores de tickets por estado y prioridad'
+
+    def handle(self, *args, **options):
+        combinaciones = reconstruir_contadores()
+        cache.invalidar()
+        self.stdout.write(self.style.SUCCESS(
+            f'Contadores reconstruidos: {combinaciones} combinaciones estado/prioridad'
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from tickets import activity, cache
+
+
+class Command(BaseCommand):
+    """
+    Recalcula el resumen de actividad (total de comentarios y último
+    comentario) de los tickets activos y archivados desde sus comentarios.
+    Útil tras cargas con SQL directo o para reparar desvíos.
+    """
+
+    help = 'Recalcula por lotes el resumen de actividad de los tickets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Alias de la base de datos a recalcular'
+        )
+        parser.add_argument('--lote', type=int, default=2000, help='Tickets por transacción')
+
+    def handle(self, *args, **options):
+        total = 0
+        for recalculados in activity.reconstruir(options['lote'], options['database']):
+            total += recalculados
+            self.stdout.write(f'{total} tickets recalculados', ending='\r')
+        self.stdout.write('')
+        cache.invalidar()
+        self.stdout.write(self.style.SUCCESS(
+            f'Resumen de actividad recalculado: {total} tickets'
+        ))
@@ -0,0 +1,64 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from tickets import routers
+
+
+class Command(BaseCommand):
+    """
+    Copia la base primaria SQLite sobre cada réplica SQLite configurada
+    (TICKETS_DB_REPLICAS), con la API de respaldo en línea de SQLite: es
+    seguro mientras el servidor escribe en el primario.
+
+    Sirve para probar en local el enrutamiento a réplicas; con --intervalo
+    simula una replicación asíncrona con ese retraso. Las réplicas
+    PostgreSQL se mantienen con la replicación del propio motor y se omiten.
+
+    Ejemplos:
+        TICKETS_DB_REPLICAS=/tmp/r1.sqlite3,/tmp/r2.sqlite3 python manage.py refresh_replicas
+        python manage.py refresh_replicas --intervalo 2
+    """
+
+    help = 'Actualiza las réplicas SQLite locales copiando la base primaria'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intervalo', type=float,
+            help='Repite cada N segundos hasta interrumpir con Ctrl+C'
+        )
+
+    def handle(self, *args, **options):
+        if connections[routers.PRIMARIO].vendor != 'sqlite':
+            raise CommandError('La base primaria no es SQLite.')
+        replicas = [
+            alias for alias in routers.replicas() if connections[alias].vendor == 'sqlite'
+        ]
+        if not replicas:
+            raise CommandError('No hay réplicas SQLite en TICKETS_DB_REPLICAS.')
+
+        origen = routers.ruta_sqlite(routers.PRIMARIO)
+        while True:
+            for alias in replicas:
+                inicio = time.perf_counter()
+                self._copiar(origen, routers.ruta_sqlite(alias))
+                self.stdout.write(self.style.SUCCESS(
+                    f'{alias} actualizada en {time.perf_counter() - inicio:.1f} s'
+                ))
+            if not options['intervalo']:
+                return
+            try:
+                time.sleep(options['intervalo'])
+            except KeyboardInterrupt:
+                return
+
+    def _copiar(self, origen, destino):
+        primario = sqlite3.connect(origen)
+        replica = sqlite3.connect(destino)
+        try:
+            primario.backup(replica)
+        finally:
+            replica.close()
+            primario.close()
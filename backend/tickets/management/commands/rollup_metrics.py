@@ -0,0 +1,63 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tickets import analytics
+
+
+class Command(BaseCommand):
+    """
+    Incorpora los eventos de tickets nuevos a los acumulados por hora y día.
+
+    Es incremental y reanudable: cada lote se confirma junto con el último
+    evento procesado. Pensado para ejecutarse periódicamente (cron) o en
+    bucle con --intervalo.
+
+    Ejemplos:
+        python manage.py rollup_metrics
+        python manage.py rollup_metrics --historial       # tickets sin eventos
+        python manage.py rollup_metrics --reconstruir     # desde el primer evento
+        python manage.py rollup_metrics --intervalo 60
+    """
+
+    help = 'Actualiza los acumulados de métricas (MTTR, backlog, throughput)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote', type=int, default=settings.TICKETS_ROLLUP_BATCH,
+            help='Eventos por transacción (por defecto TICKETS_ROLLUP_BATCH)'
+        )
+        parser.add_argument(
+            '--historial', action='store_true',
+            help='Crea primero el historial aproximado de los tickets sin eventos'
+        )
+        parser.add_argument(
+            '--reconstruir', action='store_true',
+            help='Borra los acumulados y los recalcula desde el primer evento'
+        )
+        parser.add_argument(
+            '--intervalo', type=float,
+            help='Repite cada N segundos hasta interrumpir con Ctrl+C'
+        )
+
+    def handle(self, *args, **options):
+        if options['historial']:
+            creados = analytics.completar_historial()
+            self.stdout.write(f'{creados} eventos de historial creados')
+        if options['reconstruir']:
+            analytics.reiniciar()
+            self.stdout.write('Acumulados borrados')
+
+        while True:
+            inicio = time.perf_counter()
+            procesados = analytics.acumular(lote=options['lote'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{procesados} eventos acumulados en {time.perf_counter() - inicio:.1f} s'
+            ))
+            if not options['intervalo']:
+                return
+            try:
+                time.sleep(options['intervalo'])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,152 @@
+"""
+Middleware de diagnóstico de la API de tickets.
+"""
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import instrumentation, routers
+
+
+class InstrumentationMiddleware:
+    """
+    Mide cada petición con tickets.instrumentation: consultas, tiempo en la
+    base, serialización y tamaño. Agrega Server-Timing (y X-Query-Count si
+    TICKETS_QUERY_COUNT_HEADER está activo), escribe el log estructurado y
+    acumula las métricas de /metrics.
+
+    Funciona con WSGI y ASGI. En respuestas en streaming solo se mide hasta
+    que la vista devuelve la respuesta.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        if not getattr(settings, 'TICKETS_INSTRUMENTATION_ENABLED', True):
+            return self.get_response(request)
+
+        with instrumentation.medir() as medicion:
+            response = self.get_response(request)
+        self._publicar(request, response, medicion)
+        return response
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'TICKETS_INSTRUMENTATION_ENABLED', True):
+            return await self.get_response(request)
+
+        with instrumentation.medir() as medicion:
+            response = await self.get_response(request)
+        self._publicar(request, response, medicion)
+        return response
+
+    def process_template_response(self, request, response):
+        """Mide el renderizado de las respuestas de DRF a bytes."""
+        medicion = instrumentation.medicion_actual()
+        if medicion is not None:
+            inicio = time.perf_counter()
+
+            def fin_render(respuesta):
+                medicion.tiempo_render = time.perf_counter() - inicio
+                medicion.tiempo_serializacion += medicion.tiempo_render
+
+            response.add_post_render_callback(fin_render)
+        return response
+
+    def _publicar(self, request, response, medicion):
+        total = time.perf_counter() - medicion.inicio
+        streaming = response.streaming
+        tamano = None if streaming else len(response.content)
+        n1 = medicion.n_mas_uno()
+        vista = request.resolver_match.view_name if request.resolver_match else 'sin_ruta'
+
+        if getattr(settings, 'TICKETS_SERVER_TIMING', True):
+            response['Server-Timing'] = instrumentation.server_timing(medicion, total)
+        if getattr(settings, 'TICKETS_QUERY_COUNT_HEADER', False):
+            response['X-Query-Count'] = str(medicion.consultas)
+
+        instrumentation.registrar_peticion(
+            request.method, vista, response.status_code, medicion, total, tamano, n1
+        )
+        instrumentation.registrar_log({
+            'metodo': request.method,
+            'ruta': request.path,
+            'vista': vista,
+            'estado': response.status_code,
+            'duracion_ms': round(total * 1000, 2),
+            'consultas': medicion.consultas,
+            'db_ms': round(medicion.tiempo_db * 1000, 2),
+            'serializacion_ms': round(medicion.tiempo_serializacion * 1000, 2),
+            'bytes': tamano,
+            'streaming': streaming,
+            'n1': [{'veces': veces, 'sql': plantilla} for plantilla, veces in n1],
+        }, n1)
+
+
+class ReplicaMiddleware:
+    """
+    Envía a una réplica las lecturas de las acciones marcadas en la vista
+    (`acciones_replica`), salvo que el mismo cliente haya escrito hace poco,
+    y registra las escrituras para esa ventana de read-your-writes.
+    Ver tickets.routers. Sin réplicas configuradas no hace nada.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    METODOS_LECTURA = ('GET', 'HEAD')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        if not routers.replicas():
+            return self.get_response(request)
+
+        token = routers.iniciar_peticion()
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.terminar_peticion(token)
+        self._registrar_escritura(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if not routers.replicas():
+            return await self.get_response(request)
+
+        token = routers.iniciar_peticion()
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.terminar_peticion(token)
+        self._registrar_escritura(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in self.METODOS_LECTURA or not routers.replicas():
+            return None
+        # Los ViewSets de DRF exponen la clase y el mapa método -> acción
+        acciones = getattr(getattr(view_func, 'cls', None), 'acciones_replica', ())
+        accion = getattr(view_func, 'actions', {}).get('get')
+        if accion in acciones and not routers.escribio_hace_poco(request):
+            routers.leer_de(routers.elegir_replica())
+        return None
+
+    def _registrar_escritura(self, request, response):
+        if request.method not in self.METODOS_LECTURA + ('OPTIONS',) and response.status_code < 400:
+            routers.marcar_escritura(request)
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:04
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def poblar_contadores(apps, schema_editor):
+    """Inicializa los contadores con los tickets existentes."""
+    Ticket = apps.get_model('tickets', 'Ticket')
+    TicketCounter = apps.get_model('tickets', 'TicketCounter')
+
+    filas = (
+        Ticket.objects.order_by()
+        .values_list('estado', 'prioridad')
+        .annotate(total=Count('id'))
+    )
+    TicketCounter.objects.bulk_create([
+        TicketCounter(estado=estado, prioridad=prioridad, total=total)
+        for estado, prioridad, total in filas
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('nuevo', 'Nuevo'), ('en_proceso', 'En Proceso'), ('resuelto', 'Resuelto'), ('cerrado', 'Cerrado')], max_length=15)),
+                ('prioridad', models.CharField(choices=[('baja', 'Baja'), ('media', 'Media'), ('alta', 'Alta')], max_length=10)),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Contador de tickets',
+                'verbose_name_plural': 'Contadores de tickets',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ticketcounter',
+            constraint=models.UniqueConstraint(fields=('estado', 'prioridad'), name='ticket_counter_estado_prioridad_unico'),
+        ),
+        migrations.RunPython(poblar_contadores, migrations.RunPython.noop),
+    ]
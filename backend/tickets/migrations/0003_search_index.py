@@ -0,0 +1,110 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:30
+
+from django.db import migrations
+from django.db.utils import DatabaseError
+
+
+# Copia del esquema de tickets.search al momento de esta migración; el
+# módulo puede cambiar después sin alterar lo que hace la migración.
+SQLITE_CREAR = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tickets_ticket_fts USING fts5("
+    "titulo, descripcion, solicitante, "
+    "tokenize = 'unicode61 remove_diacritics 2')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tickets_comment_fts USING fts5("
+    "contenido, "
+    "tokenize = 'unicode61 remove_diacritics 2')",
+]
+
+SQLITE_LLENAR = [
+    "INSERT INTO tickets_ticket_fts(rowid, titulo, descripcion, solicitante) "
+    "SELECT id, titulo, descripcion, solicitante FROM tickets_ticket",
+    "INSERT INTO tickets_comment_fts(rowid, contenido) "
+    "SELECT id, contenido FROM tickets_comment",
+    "INSERT INTO tickets_ticket_fts(tickets_ticket_fts) VALUES ('optimize')",
+    "INSERT INTO tickets_comment_fts(tickets_comment_fts) VALUES ('optimize')",
+]
+
+SQLITE_ELIMINAR = [
+    "DROP TABLE IF EXISTS tickets_ticket_fts",
+    "DROP TABLE IF EXISTS tickets_comment_fts",
+]
+
+POSTGRES_CREAR = [
+    "CREATE TABLE IF NOT EXISTS tickets_ticket_search ("
+    "ticket_id bigint PRIMARY KEY REFERENCES tickets_ticket(id) "
+    "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "documento tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS tickets_ticket_search_gin "
+    "ON tickets_ticket_search USING GIN (documento)",
+    "CREATE TABLE IF NOT EXISTS tickets_comment_search ("
+    "comment_id bigint PRIMARY KEY REFERENCES tickets_comment(id) "
+    "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "ticket_id bigint NOT NULL, "
+    "documento tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS tickets_comment_search_gin "
+    "ON tickets_comment_search USING GIN (documento)",
+]
+
+POSTGRES_LLENAR = [
+    "INSERT INTO tickets_ticket_search (ticket_id, documento) "
+    "SELECT id, "
+    "setweight(to_tsvector('spanish', coalesce(titulo, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(descripcion, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(solicitante, '')), 'C') "
+    "FROM tickets_ticket",
+    "INSERT INTO tickets_comment_search (comment_id, ticket_id, documento) "
+    "SELECT id, ticket_id, to_tsvector('spanish', coalesce(contenido, '')) "
+    "FROM tickets_comment",
+]
+
+POSTGRES_ELIMINAR = [
+    "DROP TABLE IF EXISTS tickets_comment_search",
+    "DROP TABLE IF EXISTS tickets_ticket_search",
+]
+
+SENTENCIAS = {
+    'sqlite': (SQLITE_CREAR, SQLITE_LLENAR, SQLITE_ELIMINAR),
+    'postgresql': (POSTGRES_CREAR, POSTGRES_LLENAR, POSTGRES_ELIMINAR),
+}
+
+
+def ejecutar(schema_editor, sentencias):
+    with schema_editor.connection.cursor() as cursor:
+        for sql in sentencias:
+            cursor.execute(sql)
+
+
+def crear_indice(apps, schema_editor):
+    """
+    Crea y llena las estructuras de texto completo del motor activo.
+    Si el motor no soporta FTS5/tsvector la búsqueda usa icontains.
+    """
+    sentencias = SENTENCIAS.get(schema_editor.connection.vendor)
+    if sentencias is None:
+        return
+
+    crear, llenar, _ = sentencias
+    try:
+        ejecutar(schema_editor, crear)
+    except DatabaseError:
+        # SQLite compilado sin FTS5
+        return
+
+    ejecutar(schema_editor, llenar)
+
+
+def eliminar_indice(apps, schema_editor):
+    sentencias = SENTENCIAS.get(schema_editor.connection.vendor)
+    if sentencias is not None:
+        ejecutar(schema_editor, sentencias[2])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0002_ticket_counter'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
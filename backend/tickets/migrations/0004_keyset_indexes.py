@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='comment_fecha_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['ticket', 'fecha_creacion', 'id'], name='comment_ticket_fecha_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='ticket_fecha_id_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['estado', 'fecha_creacion', 'id'], name='ticket_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['prioridad', 'estado'], name='ticket_prioridad_estado_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0005_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Se incrementa en cada transición de estado'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0006_ticket_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=30)),
+                ('ticket_id', models.PositiveIntegerField()),
+                ('datos', models.JSONField(default=dict)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Evento de cambio',
+                'verbose_name_plural': 'Eventos de cambio',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0007_change_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticket_id', models.PositiveIntegerField()),
+                ('fecha_eliminacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Ticket eliminado',
+                'verbose_name_plural': 'Tickets eliminados',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['fecha_actualizacion', 'id'], name='ticket_actualizacion_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tickettombstone',
+            index=models.Index(fields=['fecha_eliminacion', 'id'], name='tombstone_fecha_id_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0008_delta_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=255, unique=True)),
+                ('registros', models.PositiveIntegerField(default=0, help_text='Registros leídos y confirmados')),
+                ('aceptados', models.PositiveIntegerField(default=0)),
+                ('rechazados', models.PositiveIntegerField(default=0)),
+                ('completado', models.BooleanField(default=False)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Avance de importación',
+                'verbose_name_plural': 'Avances de importación',
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:48
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0009_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('ultimo_evento', models.PositiveBigIntegerField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Avance de acumulados',
+                'verbose_name_plural': 'Avances de acumulados',
+            },
+        ),
+        migrations.CreateModel(
+            name='TicketEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticket_id', models.PositiveIntegerField()),
+                ('tipo', models.CharField(choices=[('creado', 'Creado'), ('transicion', 'Transición'), ('eliminado', 'Eliminado')], max_length=15)),
+                ('estado_anterior', models.CharField(blank=True, choices=[('nuevo', 'Nuevo'), ('en_proceso', 'En Proceso'), ('resuelto', 'Resuelto'), ('cerrado', 'Cerrado')], max_length=15)),
+                ('estado', models.CharField(blank=True, choices=[('nuevo', 'Nuevo'), ('en_proceso', 'En Proceso'), ('resuelto', 'Resuelto'), ('cerrado', 'Cerrado')], max_length=15)),
+                ('prioridad', models.CharField(choices=[('baja', 'Baja'), ('media', 'Media'), ('alta', 'Alta')], max_length=10)),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now, help_text='Momento del cambio')),
+                ('segundos_en_estado', models.FloatField(blank=True, help_text='Tiempo en el estado anterior (vacío si se desconoce)', null=True)),
+                ('segundos_desde_creacion', models.FloatField(blank=True, null=True)),
+                ('fecha_registro', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Evento de ticket',
+                'verbose_name_plural': 'Eventos de ticket',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TicketMetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularidad', models.CharField(choices=[('hora', 'Hora'), ('dia', 'Día')], max_length=4)),
+                ('periodo', models.DateTimeField(help_text='Inicio del período')),
+                ('estado', models.CharField(choices=[('nuevo', 'Nuevo'), ('en_proceso', 'En Proceso'), ('resuelto', 'Resuelto'), ('cerrado', 'Cerrado')], max_length=15)),
+                ('prioridad', models.CharField(choices=[('baja', 'Baja'), ('media', 'Media'), ('alta', 'Alta')], max_length=10)),
+                ('creados', models.PositiveIntegerField(default=0, help_text='Altas en este estado')),
+                ('entradas', models.PositiveIntegerField(default=0, help_text='Tickets que llegaron al estado')),
+                ('salidas', models.PositiveIntegerField(default=0, help_text='Tickets que dejaron el estado')),
+                ('segundos_en_estado', models.FloatField(default=0, help_text='Suma del tiempo de las salidas medidas')),
+                ('salidas_medidas', models.PositiveIntegerField(default=0)),
+                ('segundos_desde_creacion', models.FloatField(default=0, help_text='Suma de la antigüedad de las entradas')),
+            ],
+            options={
+                'verbose_name': 'Acumulado de métricas',
+                'verbose_name_plural': 'Acumulados de métricas',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ticketmetricrollup',
+            constraint=models.UniqueConstraint(fields=('granularidad', 'periodo', 'estado', 'prioridad'), name='rollup_periodo_estado_prioridad_unico'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketevent',
+            index=models.Index(fields=['ticket_id', 'id'], name='ticketevent_ticket_id_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0010_ticket_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTicket',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('titulo', models.CharField(max_length=200)),
+                ('descripcion', models.TextField()),
+                ('prioridad', models.CharField(choices=[('baja', 'Baja'), ('media', 'Media'), ('alta', 'Alta')], max_length=10)),
+                ('solicitante', models.CharField(max_length=100)),
+                ('email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('estado', models.CharField(choices=[('nuevo', 'Nuevo'), ('en_proceso', 'En Proceso'), ('resuelto', 'Resuelto'), ('cerrado', 'Cerrado')], max_length=15)),
+                ('fecha_creacion', models.DateTimeField()),
+                ('fecha_actualizacion', models.DateTimeField()),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('fecha_archivado', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Ticket archivado',
+                'verbose_name_plural': 'Tickets archivados',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['fecha_creacion', 'id'], name='archivedticket_fecha_id_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('autor', models.CharField(max_length=100)),
+                ('contenido', models.TextField()),
+                ('fecha_creacion', models.DateTimeField()),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comentarios', to='tickets.archivedticket')),
+            ],
+            options={
+                'verbose_name': 'Comentario archivado',
+                'verbose_name_plural': 'Comentarios archivados',
+                'ordering': ['fecha_creacion'],
+                'indexes': [models.Index(fields=['ticket', 'fecha_creacion', 'id'], name='archivedcomment_ticket_idx')],
+            },
+        ),
+    ]
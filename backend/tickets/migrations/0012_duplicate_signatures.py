@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0011_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketSignature',
+            fields=[
+                ('ticket', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='firma_duplicados', serialize=False, to='tickets.ticket')),
+                ('minhash', models.BinaryField(help_text='Mínimos de cada permutación, enteros de 64 bits')),
+            ],
+            options={
+                'verbose_name': 'Firma de ticket',
+                'verbose_name_plural': 'Firmas de tickets',
+            },
+        ),
+        migrations.CreateModel(
+            name='TicketSignatureBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('banda', models.PositiveSmallIntegerField()),
+                ('valor', models.BigIntegerField(help_text='Hash de las filas de la firma en esta banda')),
+                ('ticket', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tickets.ticket')),
+            ],
+            options={
+                'verbose_name': 'Banda de firma',
+                'verbose_name_plural': 'Bandas de firmas',
+                'indexes': [models.Index(fields=['banda', 'valor', 'ticket'], name='signatureband_valor_idx'), models.Index(fields=['ticket'], name='signatureband_ticket_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Substr
+
+
+# Largo del extracto al momento de esta migración (Ticket.LARGO_EXTRACTO)
+LARGO_EXTRACTO = 140
+
+
+def calcular_actividad(apps, schema_editor):
+    """
+    Resumen de actividad de los tickets existentes, activos y archivados,
+    con el UPDATE de subconsultas correlacionadas de rebuild_ticket_activity
+    en bloques de 5000 tickets.
+    """
+    alias = schema_editor.connection.alias
+    modelos = [
+        (apps.get_model('tickets', 'Ticket'), apps.get_model('tickets', 'Comment')),
+        (apps.get_model('tickets', 'ArchivedTicket'), apps.get_model('tickets', 'ArchivedComment')),
+    ]
+    for modelo_ticket, modelo_comentario in modelos:
+        suyos = modelo_comentario.objects.using(alias).filter(ticket=OuterRef('pk')).order_by()
+        recientes = suyos.order_by('-fecha_creacion', '-id')
+        valores = {
+            'total_comentarios': Coalesce(
+                Subquery(suyos.values('ticket').annotate(total=Count('id')).values('total')), 0
+            ),
+            'fecha_ultimo_comentario': Subquery(recientes.values('fecha_creacion')[:1]),
+            'autor_ultimo_comentario': Coalesce(
+                Subquery(recientes.values('autor')[:1]), Value('')
+            ),
+            'extracto_ultimo_comentario': Coalesce(
+                Subquery(
+                    recientes.annotate(extracto=Substr('contenido', 1, LARGO_EXTRACTO))
+                    .values('extracto')[:1]
+                ),
+                Value('')
+            ),
+        }
+        tickets = modelo_ticket.objects.using(alias)
+        ids = tickets.order_by('id').values_list('id', flat=True)
+        ultimo = 0
+        while True:
+            bloque = list(ids.filter(id__gt=ultimo)[:5000])
+            if not bloque:
+                break
+            tickets.filter(id__gte=bloque[0], id__lte=bloque[-1]).update(**valores)
+            ultimo = bloque[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0012_duplicate_signatures'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedticket',
+            name='autor_ultimo_comentario',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='archivedticket',
+            name='extracto_ultimo_comentario',
+            field=models.CharField(blank=True, max_length=140),
+        ),
+        migrations.AddField(
+            model_name='archivedticket',
+            name='fecha_ultimo_comentario',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedticket',
+            name='total_comentarios',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='autor_ultimo_comentario',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='extracto_ultimo_comentario',
+            field=models.CharField(blank=True, editable=False, help_text='Comienzo del último comentario', max_length=140),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='fecha_ultimo_comentario',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='total_comentarios',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(calcular_actividad, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['fecha_ultimo_comentario', 'id'], name='ticket_actividad_id_idx'),
+        ),
+    ]
@@ -1,5 +1,36 @@
-from django.db import models
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.models import F
+from django.dispatch import Signal
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+
+# Señales para escrituras en lote, que no disparan post_save por objeto.
+# Argumentos: tickets=[Ticket] o comentarios=[Comment], ya con pk asignado.
+tickets_creados = Signal()
+comentarios_creados = Signal()
+
+
+class TransicionConcurrenteError(ValidationError):
+    """El ticket cambió de estado mientras se validaba la transición."""
+
+
+class TicketQuerySet(models.QuerySet):
+    
+    def crear_lote(self, tickets):
+        """
+        Inserta tickets con un único bulk_create.
+        Emite `tickets_creados` para que índices y contadores se
+        actualicen como con save().
+        
+        Returns:
+            list: Tickets creados, con pk
+        """
+        creados = self.bulk_create(tickets)
+        if creados:
+            tickets_creados.send(sender=self.model, tickets=creados)
+        return creados
 
 
 class Ticket(models.Model):
@@ -31,6 +62,30 @@ class Ticket(models.Model):
         'cerrado': [],  # Estado final
     }
     
+    # Tablas precalculadas de nombres y colores (una sola vez por clase)
+    PRIORIDAD_DISPLAY = dict(PRIORITY_CHOICES)
+    ESTADO_DISPLAY = dict(STATUS_CHOICES)
+    PRIORITY_COLORS = {
+        'baja': 'green',
+        'media': 'yellow',
+        'alta': 'red',
+    }
+    STATUS_COLORS = {
+        'nuevo': 'blue',
+        'en_proceso': 'yellow',
+        'resuelto': 'green',
+        'cerrado': 'gray',
+    }
+    
+    # Resumen de actividad desnormalizado (tickets.activity)
+    CAMPOS_ACTIVIDAD = (
+        'total_comentarios', 'fecha_ultimo_comentario',
+        'autor_ultimo_comentario', 'extracto_ultimo_comentario',
+    )
+    LARGO_EXTRACTO = 140
+    
+    objects = TicketQuerySet.as_manager()
+    
     # Campos del modelo
     titulo = models.CharField(max_length=200, help_text="Título descriptivo del problema")
     descripcion = models.TextField(help_text="Descripción detallada del problema")
@@ -53,14 +108,74 @@ class Ticket(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
     
+    # Control de concurrencia optimista de las transiciones
+    version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Se incrementa en cada transición de estado"
+    )
+    
+    # Actividad: la mantiene tickets.activity con cada comentario
+    total_comentarios = models.PositiveIntegerField(default=0, editable=False)
+    fecha_ultimo_comentario = models.DateTimeField(null=True, blank=True, editable=False)
+    autor_ultimo_comentario = models.CharField(max_length=100, blank=True, editable=False)
+    extracto_ultimo_comentario = models.CharField(
+        max_length=LARGO_EXTRACTO, blank=True, editable=False,
+        help_text="Comienzo del último comentario"
+    )
+    
     class Meta:
         ordering = ['-fecha_creacion']  # Más recientes primero
         verbose_name = 'Ticket'
         verbose_name_plural = 'Tickets'
+        indexes = [
+            # Keyset de la paginación por cursor
+            models.Index(fields=['fecha_creacion', 'id'], name='ticket_fecha_id_idx'),
+            # Filtro por estado con el orden por fecha del listado
+            models.Index(fields=['estado', 'fecha_creacion', 'id'], name='ticket_estado_fecha_idx'),
+            # Conteos agrupados por prioridad y estado
+            models.Index(fields=['prioridad', 'estado'], name='ticket_prioridad_estado_idx'),
+            # Sincronización incremental por fecha de actualización
+            models.Index(fields=['fecha_actualizacion', 'id'], name='ticket_actualizacion_id_idx'),
+            # Orden y filtro por última actividad (?ordering=, ?actividad_desde=)
+            models.Index(fields=['fecha_ultimo_comentario', 'id'], name='ticket_actividad_id_idx'),
+        ]
     
     def __str__(self):
         return f"#{self.id} - {self.titulo} ({self.get_estado_display()})"
     
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        """
+        Un save() completo de un ticket existente no escribe las columnas de
+        actividad: sus valores en memoria pueden ser anteriores a un
+        comentario concurrente. Solo las actualiza tickets.activity.
+        """
+        if update_fields is None and not force_insert and not self._state.adding:
+            diferidos = self.get_deferred_fields()
+            update_fields = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key
+                and campo.attname not in diferidos
+                and campo.name not in self.CAMPOS_ACTIVIDAD
+            ]
+        super().save(
+            force_insert=force_insert, force_update=force_update,
+            using=using, update_fields=update_fields
+        )
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Recuerda el estado y la prioridad cargados desde la base de datos.
+        Los contadores de estadísticas los usan para calcular el cambio.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._valores_contados = (
+            instance.__dict__.get('estado'),
+            instance.__dict__.get('prioridad'),
+        )
+        return instance
+    
     def puede_transicionar_a(self, nuevo_estado):
         """
         Verifica si el ticket puede transicionar al nuevo estado.
@@ -78,21 +193,64 @@ class Ticket(models.Model):
         """
         Cambia el estado del ticket validando el flujo.
         
+        La validación y la escritura ocurren en una transacción protegida
+        según TICKETS_TRANSITION_LOCKING:
+        - 'row': bloquea la fila (SELECT ... FOR UPDATE) y valida sobre
+          el estado recién leído.
+        - 'optimistic': solo escribe si `version`, `estado` y `prioridad`
+          no cambiaron desde la lectura; `estado` y `prioridad` cubren las
+          ediciones que no pasan por aquí (p. ej. el admin) y no suben
+          `version`, y son los valores de los que dependen los contadores.
+        Los motores sin FOR UPDATE (SQLite) usan siempre el modo optimista.
+        
         Args:
             nuevo_estado (str): Estado destino
             
         Raises:
             ValidationError: Si la transición no es válida
+            TransicionConcurrenteError: Si otra transición ganó la carrera
         """
-        if not self.puede_transicionar_a(nuevo_estado):
-            raise ValidationError(
-                f"No se puede cambiar de '{self.get_estado_display()}' "
-                f"a '{dict(self.STATUS_CHOICES)[nuevo_estado]}'. "
-                f"Transiciones válidas: {self.get_transiciones_validas()}"
-            )
+        modo = getattr(settings, 'TICKETS_TRANSITION_LOCKING', 'optimistic')
+        using = self._state.db or 'default'
+        bloquear_fila = (
+            modo == 'row' and connections[using].features.has_select_for_update
+        )
         
-        self.estado = nuevo_estado
-        self.save(update_fields=['estado', 'fecha_actualizacion'])
+        with transaction.atomic(using=using):
+            if bloquear_fila:
+                actual = (
+                    Ticket.objects.using(using)
+                    .select_for_update()
+                    .values('estado', 'version')
+                    .get(pk=self.pk)
+                )
+                self.estado, self.version = actual['estado'], actual['version']
+                self._valores_contados = (self.estado, self.prioridad)
+            
+            if not self.puede_transicionar_a(nuevo_estado):
+                raise ValidationError(
+                    f"No se puede cambiar de '{self.get_estado_display()}' "
+                    f"a '{dict(self.STATUS_CHOICES)[nuevo_estado]}'. "
+                    f"Transiciones válidas: {self.get_transiciones_validas()}"
+                )
+            
+            if not bloquear_fila:
+                # Compare-and-set sobre la versión y los valores contados leídos
+                reclamado = Ticket.objects.using(using).filter(
+                    pk=self.pk, version=self.version,
+                    estado=self.estado, prioridad=self.prioridad,
+                ).update(version=F('version') + 1)
+                if not reclamado:
+                    raise TransicionConcurrenteError(
+                        f"El ticket #{self.pk} fue modificado por otra operación. "
+                        f"Recarga el ticket e intenta nuevamente."
+                    )
+            
+            self.version += 1
+            estado_anterior = self.estado
+            self.estado = nuevo_estado
+            self.save(update_fields=['estado', 'fecha_actualizacion', 'version'])
+            TicketEvent.registrar_transicion(self, estado_anterior, using)
     
     def get_transiciones_validas(self):
         """
@@ -103,28 +261,42 @@ class Ticket(models.Model):
         """
         estados_validos = self.VALID_TRANSITIONS.get(self.estado, [])
         return [
-            (estado, dict(self.STATUS_CHOICES)[estado]) 
+            (estado, self.ESTADO_DISPLAY[estado]) 
             for estado in estados_validos
         ]
     
+    def get_estado_display(self):
+        """Nombre del estado desde la tabla precalculada."""
+        return self.ESTADO_DISPLAY.get(self.estado, self.estado)
+    
+    def get_prioridad_display(self):
+        """Nombre de la prioridad desde la tabla precalculada."""
+        return self.PRIORIDAD_DISPLAY.get(self.prioridad, self.prioridad)
+    
     def get_priority_color(self):
         """Retorna color CSS para la prioridad."""
-        colors = {
-            'baja': 'green',
-            'media': 'yellow', 
-            'alta': 'red'
-        }
-        return colors.get(self.prioridad, 'gray')
+        return self.PRIORITY_COLORS.get(self.prioridad, 'gray')
     
     def get_status_color(self):
         """Retorna color CSS para el estado."""
-        colors = {
-            'nuevo': 'blue',
-            'en_proceso': 'yellow',
-            'resuelto': 'green', 
-            'cerrado': 'gray'
-        }
-        return colors.get(self.estado, 'gray')
+        return self.STATUS_COLORS.get(self.estado, 'gray')
+
+
+class CommentQuerySet(models.QuerySet):
+    
+    def crear_lote(self, comentarios):
+        """
+        Inserta comentarios con un único bulk_create.
+        Emite `comentarios_creados` para que índices y contadores se
+        actualicen como con save().
+        
+        Returns:
+            list: Comentarios creados, con pk
+        """
+        creados = self.bulk_create(comentarios)
+        if creados:
+            comentarios_creados.send(sender=self.model, comentarios=creados)
+        return creados
 
 
 class Comment(models.Model):
@@ -133,6 +305,8 @@ class Comment(models.Model):
     Mantiene historial cronológico de seguimiento.
     """
     
+    objects = CommentQuerySet.as_manager()
+    
     ticket = models.ForeignKey(
         Ticket, 
         on_delete=models.CASCADE, 
@@ -147,6 +321,382 @@ class Comment(models.Model):
         ordering = ['fecha_creacion']  # Cronológico ascendente
         verbose_name = 'Comentario'
         verbose_name_plural = 'Comentarios'
+        indexes = [
+            # Keyset de la paginación por cursor, global y por ticket
+            models.Index(fields=['fecha_creacion', 'id'], name='comment_fecha_id_idx'),
+            models.Index(fields=['ticket', 'fecha_creacion', 'id'], name='comment_ticket_fecha_id_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Comentario de {self.autor} en ticket #{self.ticket_id}"
+
+
+class TicketCounter(models.Model):
+    """
+    Contador de tickets por combinación de estado y prioridad.
+    Se mantiene de forma incremental en cada alta, cambio y baja de tickets,
+    de modo que las estadísticas no necesitan recorrer la tabla completa.
+    """
+    
+    estado = models.CharField(max_length=15, choices=Ticket.STATUS_CHOICES)
+    prioridad = models.CharField(max_length=10, choices=Ticket.PRIORITY_CHOICES)
+    total = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Contador de tickets'
+        verbose_name_plural = 'Contadores de tickets'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['estado', 'prioridad'],
+                name='ticket_counter_estado_prioridad_unico'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.estado}/{self.prioridad}: {self.total}"
+
+
+class TicketTombstone(models.Model):
+    """
+    Marca de un ticket eliminado.
+    La sincronización incremental la usa para avisar a los clientes que
+    deben quitarlo; se depura con purge_tombstones.
+    """
+    
+    ticket_id = models.PositiveIntegerField()
+    fecha_eliminacion = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Ticket eliminado'
+        verbose_name_plural = 'Tickets eliminados'
+        indexes = [
+            models.Index(fields=['fecha_eliminacion', 'id'], name='tombstone_fecha_id_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Ticket {self.ticket_id} eliminado"
+
+
+class ChangeEvent(models.Model):
+    """
+    Evento del feed de cambios guardado en la base de datos.
+    Lo usa tickets.events.BrokerBaseDatos para compartir el feed entre
+    varios procesos; el id es el identificador de reanudación del cliente.
+    """
+    
+    tipo = models.CharField(max_length=30)
+    # Sin clave foránea: el evento sobrevive a la eliminación del ticket
+    ticket_id = models.PositiveIntegerField()
+    datos = models.JSONField(default=dict)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Evento de cambio'
+        verbose_name_plural = 'Eventos de cambio'
+    
+    def __str__(self):
+        return f"#{self.id} {self.tipo} ticket {self.ticket_id}"
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Avance de una importación masiva (comando import_tickets).
+    Se actualiza en la misma transacción que cada lote insertado, por lo
+    que al reanudar tras una caída no se duplica ni se pierde ningún registro.
+    """
+    
+    nombre = models.CharField(max_length=255, unique=True)
+    registros = models.PositiveIntegerField(default=0, help_text="Registros leídos y confirmados")
+    aceptados = models.PositiveIntegerField(default=0)
+    rechazados = models.PositiveIntegerField(default=0)
+    completado = models.BooleanField(default=False)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Avance de importación'
+        verbose_name_plural = 'Avances de importación'
+    
+    def __str__(self):
+        return f"{self.nombre}: {self.registros} registros"
+
+
+class TicketEvent(models.Model):
+    """
+    Historial estructurado de un ticket: creación, cambios de estado y
+    eliminación. Cada transición guarda cuánto tiempo pasó el ticket en el
+    estado anterior y su antigüedad, de modo que las métricas (tiempo en
+    cada estado, MTTR, backlog, throughput) se acumulan sin reconstruir la
+    historia. Los endpoints de analítica leen TicketMetricRollup.
+    """
+    
+    CREADO = 'creado'
+    TRANSICION = 'transicion'
+    ELIMINADO = 'eliminado'
+    TIPO_CHOICES = [
+        (CREADO, 'Creado'),
+        (TRANSICION, 'Transición'),
+        (ELIMINADO, 'Eliminado'),
+    ]
+    
+    # Sin clave foránea: el historial sobrevive a la eliminación del ticket
+    ticket_id = models.PositiveIntegerField()
+    tipo = models.CharField(max_length=15, choices=TIPO_CHOICES)
+    estado_anterior = models.CharField(max_length=15, choices=Ticket.STATUS_CHOICES, blank=True)
+    estado = models.CharField(max_length=15, choices=Ticket.STATUS_CHOICES, blank=True)
+    prioridad = models.CharField(max_length=10, choices=Ticket.PRIORITY_CHOICES)
+    fecha = models.DateTimeField(default=timezone.now, help_text="Momento del cambio")
+    segundos_en_estado = models.FloatField(
+        null=True, blank=True,
+        help_text="Tiempo en el estado anterior (vacío si se desconoce)"
+    )
+    segundos_desde_creacion = models.FloatField(null=True, blank=True)
+    # Momento de la escritura; el acumulado deja un margen para transacciones lentas
+    fecha_registro = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Evento de ticket'
+        verbose_name_plural = 'Eventos de ticket'
+        indexes = [
+            models.Index(fields=['ticket_id', 'id'], name='ticketevent_ticket_id_idx'),
+        ]
+    
+    def __str__(self):
+        return f"#{self.ticket_id} {self.tipo}: {self.estado_anterior or '-'} -> {self.estado or '-'}"
+    
+    @classmethod
+    def de_creacion(cls, ticket):
+        """Evento de alta de un ticket (sin guardar)."""
+        return cls(
+            ticket_id=ticket.pk, tipo=cls.CREADO, estado=ticket.estado,
+            prioridad=ticket.prioridad, fecha=ticket.fecha_creacion or timezone.now(),
+            segundos_desde_creacion=0,
+        )
+    
+    @classmethod
+    def historial_inicial(cls, ticket):
+        """
+        Eventos aproximados de un ticket sin historial (importado o anterior
+        a esta tabla): el alta como 'nuevo' y, si ya avanzó, un cambio directo
+        al estado actual en su última actualización.
+        
+        Returns:
+            list: Eventos sin guardar
+        """
+        creacion = cls.de_creacion(ticket)
+        creacion.estado = 'nuevo'
+        if ticket.estado == 'nuevo':
+            return [creacion]
+        fecha = max(ticket.fecha_actualizacion or creacion.fecha, creacion.fecha)
+        return [creacion, cls(
+            ticket_id=ticket.pk, tipo=cls.TRANSICION, estado_anterior='nuevo',
+            estado=ticket.estado, prioridad=ticket.prioridad, fecha=fecha,
+            segundos_desde_creacion=(fecha - creacion.fecha).total_seconds(),
+        )]
+    
+    @classmethod
+    def registrar_transicion(cls, ticket, estado_anterior, using=None):
+        """
+        Guarda el cambio de estado recién aplicado a `ticket`, con el tiempo
+        transcurrido desde el evento anterior del mismo ticket.
+        """
+        ahora = timezone.now()
+        desde = (
+            cls.objects.using(using).filter(ticket_id=ticket.pk)
+            .order_by('-id').values_list('fecha', flat=True).first()
+        )
+        if desde is None and estado_anterior == 'nuevo':
+            desde = ticket.fecha_creacion
+        return cls.objects.using(using).create(
+            ticket_id=ticket.pk, tipo=cls.TRANSICION, estado_anterior=estado_anterior,
+            estado=ticket.estado, prioridad=ticket.prioridad, fecha=ahora,
+            segundos_en_estado=(ahora - desde).total_seconds() if desde else None,
+            segundos_desde_creacion=(
+                (ahora - ticket.fecha_creacion).total_seconds() if ticket.fecha_creacion else None
+            ),
+        )
+
+
+class TicketMetricRollup(models.Model):
+    """
+    Acumulado de TicketEvent por período (hora o día, en la zona horaria del
+    proyecto), estado y prioridad. Lo mantiene de forma incremental el
+    comando rollup_metrics; los endpoints de analítica solo leen esta tabla.
+    """
+    
+    HORA = 'hora'
+    DIA = 'dia'
+    GRANULARIDAD_CHOICES = [(HORA, 'Hora'), (DIA, 'Día')]
+    
+    granularidad = models.CharField(max_length=4, choices=GRANULARIDAD_CHOICES)
+    periodo = models.DateTimeField(help_text="Inicio del período")
+    estado = models.CharField(max_length=15, choices=Ticket.STATUS_CHOICES)
+    prioridad = models.CharField(max_length=10, choices=Ticket.PRIORITY_CHOICES)
+    creados = models.PositiveIntegerField(default=0, help_text="Altas en este estado")
+    entradas = models.PositiveIntegerField(default=0, help_text="Tickets que llegaron al estado")
+    salidas = models.PositiveIntegerField(default=0, help_text="Tickets que dejaron el estado")
+    segundos_en_estado = models.FloatField(default=0, help_text="Suma del tiempo de las salidas medidas")
+    salidas_medidas = models.PositiveIntegerField(default=0)
+    segundos_desde_creacion = models.FloatField(default=0, help_text="Suma de la antigüedad de las entradas")
+    
+    class Meta:
+        verbose_name = 'Acumulado de métricas'
+        verbose_name_plural = 'Acumulados de métricas'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularidad', 'periodo', 'estado', 'prioridad'],
+                name='rollup_periodo_estado_prioridad_unico'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.granularidad} {self.periodo:%Y-%m-%d %H:%M} {self.estado}/{self.prioridad}"
+
+
+class RollupCheckpoint(models.Model):
+    """Último TicketEvent incorporado a los acumulados (comando rollup_metrics)."""
+    
+    nombre = models.CharField(max_length=50, unique=True)
+    ultimo_evento = models.PositiveBigIntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Avance de acumulados'
+        verbose_name_plural = 'Avances de acumulados'
+    
+    def __str__(self):
+        return f"{self.nombre}: evento {self.ultimo_evento}"
+
+
+class ArchivedTicket(models.Model):
+    """
+    Ticket cerrado que el comando archive_closed sacó de la tabla activa.
+    Conserva id, campos y fechas del original; la API lo sirve en modo de
+    solo lectura (detalle, comentarios y listados con ?include_archived=1).
+    """
+    
+    # Misma presentación que Ticket
+    PRIORIDAD_DISPLAY = Ticket.PRIORIDAD_DISPLAY
+    ESTADO_DISPLAY = Ticket.ESTADO_DISPLAY
+    PRIORITY_COLORS = Ticket.PRIORITY_COLORS
+    STATUS_COLORS = Ticket.STATUS_COLORS
+    
+    # Mismo id que tenía en la tabla activa
+    id = models.BigIntegerField(primary_key=True)
+    titulo = models.CharField(max_length=200)
+    descripcion = models.TextField()
+    prioridad = models.CharField(max_length=10, choices=Ticket.PRIORITY_CHOICES)
+    solicitante = models.CharField(max_length=100)
+    email = models.EmailField(blank=True, null=True)
+    estado = models.CharField(max_length=15, choices=Ticket.STATUS_CHOICES)
+    fecha_creacion = models.DateTimeField()
+    fecha_actualizacion = models.DateTimeField()
+    version = models.PositiveIntegerField(default=0)
+    # Resumen de actividad tal como estaba al archivar
+    total_comentarios = models.PositiveIntegerField(default=0)
+    fecha_ultimo_comentario = models.DateTimeField(null=True, blank=True)
+    autor_ultimo_comentario = models.CharField(max_length=100, blank=True)
+    extracto_ultimo_comentario = models.CharField(max_length=Ticket.LARGO_EXTRACTO, blank=True)
+    fecha_archivado = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-fecha_creacion']
+        verbose_name = 'Ticket archivado'
+        verbose_name_plural = 'Tickets archivados'
+        indexes = [
+            # Keyset del listado con ?include_archived=1
+            models.Index(fields=['fecha_creacion', 'id'], name='archivedticket_fecha_id_idx'),
+        ]
+    
+    def __str__(self):
+        return f"#{self.id} - {self.titulo} (archivado)"
+    
+    get_estado_display = Ticket.get_estado_display
+    get_prioridad_display = Ticket.get_prioridad_display
+    get_priority_color = Ticket.get_priority_color
+    get_status_color = Ticket.get_status_color
+    
+    def get_transiciones_validas(self):
+        """Los tickets archivados son de solo lectura."""
+        return []
+
+
+class ArchivedComment(models.Model):
+    """Comentario de un ticket archivado, con el id que tenía en la tabla activa."""
+    
+    id = models.BigIntegerField(primary_key=True)
+    ticket = models.ForeignKey(
+        ArchivedTicket,
+        on_delete=models.CASCADE,
+        related_name='comentarios'
+    )
+    autor = models.CharField(max_length=100)
+    contenido = models.TextField()
+    fecha_creacion = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['fecha_creacion']
+        verbose_name = 'Comentario archivado'
+        verbose_name_plural = 'Comentarios archivados'
+        indexes = [
+            models.Index(
+                fields=['ticket', 'fecha_creacion', 'id'], name='archivedcomment_ticket_idx'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Comentario de {self.autor} en ticket archivado #{self.ticket_id}"
+
+
+class TicketSignature(models.Model):
+    """
+    Firma MinHash del título y la descripción de un ticket abierto
+    (tickets.duplicates). Solo existe mientras el ticket está en 'nuevo' o
+    'en_proceso'; se usa para estimar la similitud con los candidatos que
+    encuentra TicketSignatureBand.
+    """
+    
+    ticket = models.OneToOneField(
+        Ticket,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='firma_duplicados'
+    )
+    minhash = models.BinaryField(help_text="Mínimos de cada permutación, enteros de 64 bits")
+    
+    class Meta:
+        verbose_name = 'Firma de ticket'
+        verbose_name_plural = 'Firmas de tickets'
+    
+    def __str__(self):
+        return f"Firma del ticket #{self.ticket_id}"
+
+
+class TicketSignatureBand(models.Model):
+    """
+    Una banda LSH de la firma de un ticket abierto: los tickets que
+    comparten (banda, valor) son candidatos a duplicado.
+    """
+    
+    ticket = models.ForeignKey(
+        Ticket,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False
+    )
+    banda = models.PositiveSmallIntegerField()
+    valor = models.BigIntegerField(help_text="Hash de las filas de la firma en esta banda")
+    
+    class Meta:
+        verbose_name = 'Banda de firma'
+        verbose_name_plural = 'Bandas de firmas'
+        indexes = [
+            # Búsqueda de candidatos; incluye el ticket para no leer la tabla
+            models.Index(fields=['banda', 'valor', 'ticket'], name='signatureband_valor_idx'),
+            # Borrado de las bandas de un ticket
+            models.Index(fields=['ticket'], name='signatureband_ticket_idx'),
+        ]
     
     def __str__(self):
-        return f"Comentario de {self.autor} en ticket #{self.ticket.id}"
\ No newline at end of file
+        return f"Banda {self.banda} del ticket #{self.ticket_id}"
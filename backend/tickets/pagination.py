@@ -0,0 +1,332 @@
+import base64
+import json
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .filters import admite_nulos, ordenar
+
+
+class KeysetPaginationMixin:
+    """
+    Paginación por cursor (keyset) sobre (fecha_creacion, id).
+
+    Cada página es un rango del índice compuesto: no usa OFFSET ni cuenta
+    la tabla completa. Se activa con ``?paginacion=cursor`` o al recibir un
+    ``?cursor=``; sin ellos se mantiene la paginación por número de página.
+    Con ``?total=aprox`` la respuesta incluye un total aproximado.
+
+    ``?ordering=`` elige otro campo de keyset_ordering_fields, ascendente o
+    descendente, con el mismo desempate por id; cualquier otro orden se
+    rechaza con 400 en lugar de ignorarse.
+    """
+
+    # Orden del keyset: campo de fecha y desempate por id
+    keyset_ordering = ('-fecha_creacion', '-id')
+    # Campos admitidos en ?ordering= (None = solo el de keyset_ordering)
+    keyset_ordering_fields = None
+    cursor_query_param = 'cursor'
+    mode_query_param = 'paginacion'
+    total_query_param = 'total'
+    # Tope del conteo acotado cuando el motor no ofrece estimaciones
+    approximate_count_cap = 10000
+
+    def usa_cursor(self, request):
+        return (
+            self.cursor_query_param in request.query_params or
+            request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+
+    def orden_keyset(self, request):
+        """
+        Orden del keyset según ?ordering=: un campo de
+        keyset_ordering_fields más el desempate de keyset_ordering.
+
+        Raises:
+            ValidationError: Si el orden pedido no puede recorrerse por keyset
+        """
+        parametro = api_settings.ORDERING_PARAM
+        pedido = [
+            campo.strip() for campo in request.query_params.get(parametro, '').split(',')
+            if campo.strip()
+        ]
+        desempate = self.keyset_ordering[-1]
+        if len(pedido) > 1 and pedido[-1].lstrip('-') in ('id', 'pk'):
+            pedido = pedido[:-1]
+        if not pedido:
+            return self.keyset_ordering
+
+        campos = self.keyset_ordering_fields or (self.keyset_ordering[0].lstrip('-'),)
+        if len(pedido) == 1 and pedido[0].lstrip('-') in campos:
+            return (pedido[0], desempate)
+        raise ValidationError({parametro: [
+            'Con paginación por cursor o ?include_archived=1 solo se admite '
+            f'ordenar por {", ".join(campos)}.'
+        ]})
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.usa_cursor(request)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        pagina, filtrado = self._consulta_keyset(queryset, request)
+        resultados = self._recortar_keyset(list(pagina))
+
+        self.total_aproximado = None
+        if request.query_params.get(self.total_query_param) == 'aprox':
+            self.total_aproximado = self.contar_aproximado(filtrado, view)
+
+        return resultados
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() para vistas async: la página (y en la
+        paginación por número, el conteo) se leen con el ORM async.
+        """
+        self.keyset = self.usa_cursor(request)
+        if not self.keyset:
+            return await self._apaginar_por_numero(queryset, request)
+
+        pagina, filtrado = self._consulta_keyset(queryset, request)
+        resultados = self._recortar_keyset([fila async for fila in pagina])
+
+        self.total_aproximado = None
+        if request.query_params.get(self.total_query_param) == 'aprox':
+            self.total_aproximado = await sync_to_async(self.contar_aproximado)(filtrado, view)
+
+        return resultados
+
+    async def _apaginar_por_numero(self, queryset, request):
+        """PageNumberPagination.paginate_queryset() con el conteo y la página leídos en async."""
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count es una cached_property: se precarga con el conteo async
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        self.page.object_list = [fila async for fila in self.page.object_list]
+        return self.page.object_list
+
+    def _consulta_keyset(self, queryset, request):
+        """
+        Prepara la página por cursor sin ejecutarla.
+
+        Returns:
+            tuple: (consulta de la página con una fila extra, queryset sin la
+                    condición de posición para el total aproximado)
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size_keyset = self.get_page_size(request)
+
+        posicion, hacia_atras = self.decodificar_cursor(
+            request.query_params.get(self.cursor_query_param)
+        )
+        self.tiene_cursor = posicion is not None
+        self.hacia_atras = hacia_atras
+
+        self.orden = ordering = self.orden_keyset(request)
+        if hacia_atras:
+            ordering = tuple(self._invertir(campo) for campo in ordering)
+
+        filtrado = queryset
+        if posicion is not None:
+            queryset = self.despues_de(queryset, ordering, posicion)
+
+        return ordenar(queryset, ordering)[:self.page_size_keyset + 1], filtrado
+
+    def despues_de(self, queryset, ordering, posicion):
+        """
+        Filas posteriores a la posición. Si la fecha admite NULL y la página
+        puede pasar del tramo de la posición al siguiente (de las fechas a
+        los NULL en orden descendente, de los NULL a las fechas en
+        ascendente), cada tramo lee sus primeras filas por su propio rango
+        del índice: un OR en la misma condición obligaría a recorrerlo
+        desde el principio.
+        """
+        if not isinstance(queryset, QuerySet):
+            # archive.ConsultaCombinada: cada tabla por separado
+            return queryset.aplicar(lambda tabla: self.despues_de(tabla, ordering, posicion))
+
+        campo_fecha = ordering[0].lstrip('-')
+        condicion = queryset.filter(self.filtro_posicion(ordering, posicion))
+        descendente = ordering[0].startswith('-')
+        if not admite_nulos(queryset.model, campo_fecha) or descendente != (posicion[0] is not None):
+            return condicion
+
+        siguiente = queryset.filter(**{f'{campo_fecha}__isnull': descendente})
+        limite = self.page_size_keyset + 1
+        return queryset.filter(
+            Q(pk__in=ordenar(condicion, ordering).values('pk')[:limite]) |
+            Q(pk__in=ordenar(siguiente, ordering).values('pk')[:limite])
+        )
+
+    def _recortar_keyset(self, resultados):
+        """Descarta la fila extra (que indica si hay más) y restablece el orden."""
+        self.hay_mas = len(resultados) > self.page_size_keyset
+        resultados = resultados[:self.page_size_keyset]
+
+        if self.hacia_atras:
+            resultados.reverse()
+
+        self.pagina = resultados
+        return resultados
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        respuesta = {}
+        if self.total_aproximado is not None:
+            respuesta['count'] = self.total_aproximado
+            respuesta['count_aproximado'] = True
+        respuesta.update({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+        return Response(respuesta)
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+
+        # Hay siguiente si sobraron filas, o si se vino retrocediendo
+        if not self.pagina or not (self.hay_mas or self.hacia_atras):
+            return None
+        cursor = self.codificar_cursor(self.pagina[-1], hacia_atras=False, ordering=self.orden)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+
+        if not self.pagina:
+            return None
+        hay_anterior = self.hay_mas if self.hacia_atras else self.tiene_cursor
+        if not hay_anterior:
+            return None
+        cursor = self.codificar_cursor(self.pagina[0], hacia_atras=True, ordering=self.orden)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def filtro_posicion(self, ordering, posicion):
+        """
+        Condición "después de la posición" para el orden dado.
+
+        Equivale a (fecha, id) < (f, i) en orden descendente, escrita como
+        un rango sobre la fecha más un desempate para que use el índice.
+        Cada campo tiene su propia dirección. Con una fecha NULL cubre solo
+        los demás NULL; el tramo siguiente lo agrega despues_de().
+        """
+        campo_fecha, campo_id = (campo.lstrip('-') for campo in ordering)
+        fecha, pk = posicion
+        operador = 'lt' if ordering[0].startswith('-') else 'gt'
+        operador_id = 'lt' if ordering[1].startswith('-') else 'gt'
+        desempate = Q(**{f'{campo_id}__{operador_id}': pk})
+
+        if fecha is None:
+            return Q(**{f'{campo_fecha}__isnull': True}) & desempate
+        return (
+            Q(**{f'{campo_fecha}__{operador}e': fecha}) &
+            (Q(**{f'{campo_fecha}__{operador}': fecha}) | desempate)
+        )
+
+    def codificar_cursor(self, item, hacia_atras, ordering=None):
+        """Genera un cursor opaco a partir de la fila límite de la página."""
+        campo_fecha, campo_id = (campo.lstrip('-') for campo in ordering or self.keyset_ordering)
+        fecha = self._valor(item, campo_fecha)
+        datos = {
+            'f': fecha.isoformat() if fecha is not None else None,
+            'i': self._valor(item, campo_id),
+        }
+        if hacia_atras:
+            datos['a'] = 1
+        crudo = json.dumps(datos, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(crudo).decode().rstrip('=')
+
+    def decodificar_cursor(self, cursor):
+        """
+        Returns:
+            tuple: ((fecha, id) o None, hacia_atras)
+        """
+        if not cursor:
+            return None, False
+        try:
+            relleno = '=' * (-len(cursor) % 4)
+            datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+            fecha = datos['f']
+            posicion = (
+                datetime.fromisoformat(fecha) if fecha is not None else None, int(datos['i'])
+            )
+            return posicion, bool(datos.get('a'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound('Cursor inválido.')
+
+    def contar_aproximado(self, queryset, view):
+        """
+        Total aproximado sin contar la tabla completa.
+        Primero consulta a la vista; si no sabe, usa un conteo acotado.
+        """
+        estimador = getattr(view, 'get_total_aproximado', None)
+        if estimador is not None:
+            total = estimador(queryset)
+            if total is not None:
+                return total
+
+        if connections[queryset.db].vendor == 'postgresql':
+            # Estimación del planificador: no recorre la tabla
+            plan = json.loads(queryset.order_by().explain(format='json'))
+            return int(plan[0]['Plan']['Plan Rows'])
+
+        return queryset.order_by()[:self.approximate_count_cap].count()
+
+    @staticmethod
+    def _invertir(campo):
+        return campo[1:] if campo.startswith('-') else f'-{campo}'
+
+    @staticmethod
+    def _valor(item, campo):
+        if isinstance(item, dict):
+            return item[campo]
+        return getattr(item, campo)
+
+
+class TicketPagination(KeysetPaginationMixin, PageNumberPagination):
+    """
+    Tickets: más recientes primero, igual que Ticket.Meta.ordering. Por
+    cursor admite también ?ordering=-fecha_ultimo_comentario (índice
+    ticket_actividad_id_idx).
+    """
+
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    keyset_ordering = ('-fecha_creacion', '-id')
+    keyset_ordering_fields = ('fecha_creacion', 'fecha_ultimo_comentario')
+
+
+class CommentPagination(KeysetPaginationMixin, PageNumberPagination):
+    """Comentarios: orden cronológico ascendente, igual que Comment.Meta.ordering."""
+
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    keyset_ordering = ('fecha_creacion', 'id')
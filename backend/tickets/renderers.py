@@ -0,0 +1,50 @@
+"""
+Renderizador JSON basado en orjson.
+
+Produce los mismos bytes que rest_framework.renderers.JSONRenderer con la
+configuración por defecto (JSON compacto, UNICODE_JSON, U+2028/U+2029
+escapados y fechas ISO 8601 con 'Z' para UTC), pero serializa en C. Los
+tipos que orjson no conoce se convierten con el encoder de DRF, y ante
+cualquier dato que orjson no puede representar igual (enteros de más de
+64 bits, claves no textuales) se usa el renderizador estándar.
+
+Diferencias conocidas: orjson escribe los exponentes de floats sin signo
+'+' (1e16 en vez de 1e+16) y convierte NaN/Infinity en null en lugar de
+fallar. La API no produce esos valores.
+
+Si orjson no está instalado se comporta como JSONRenderer.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer compatible byte a byte, acelerado con orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Con indentación o con otra configuración de DRF el formato difiere
+        if (
+            orjson is None or not self.compact or self.ensure_ascii or
+            self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            contenido = orjson.dumps(
+                data, default=self.encoder_class().default, option=orjson.OPT_UTC_Z
+            )
+        except (orjson.JSONEncodeError, TypeError):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Igual que DRF: separadores de línea escapados para uso en <script>
+        if b'\xe2\x80' in contenido:
+            contenido = contenido.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+                b'\xe2\x80\xa9', b'\\u2029'
+            )
+        return contenido
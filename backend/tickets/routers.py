@@ -0,0 +1,175 @@
+"""
+Lecturas de la API en réplicas y escrituras en el primario ('default').
+
+Solo van a una réplica las consultas de los modelos de tickets hechas
+durante una acción de lectura que la vista declara en `acciones_replica`
+(TicketViewSet y CommentViewSet). Todo lo demás usa el primario:
+escrituras, admin, comandos de mantenimiento y la sincronización
+incremental, que necesita ver todo lo confirmado. ReplicaMiddleware elige
+la réplica al empezar cada petición, así todas sus consultas leen la misma
+copia.
+
+Read-your-writes: tras una escritura, las lecturas del mismo cliente (por
+dirección IP, en la caché TICKETS_CACHE_ALIAS) van al primario durante
+TICKETS_DB_STICKY_SECONDS, que debe superar el retraso de replicación.
+
+Cada réplica se verifica con SELECT 1 como máximo cada
+TICKETS_DB_HEALTH_INTERVAL segundos; mientras falle, sus lecturas van al
+primario.
+
+Las réplicas se declaran con la variable de entorno TICKETS_DB_REPLICAS
+(ver settings). En local bastan copias del archivo SQLite que el comando
+refresh_replicas actualiza; check_replica_routing verifica el enrutamiento.
+"""
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+
+
+PRIMARIO = 'default'
+
+logger = logging.getLogger('tickets.replicas')
+
+# Réplica elegida para la petición en curso (None = primario)
+_lectura = ContextVar('tickets_lectura', default=None)
+# alias -> (disponible, momento de la verificación)
+_salud = {}
+_turno = itertools.count()
+
+
+class _Lectura:
+    """Decisión de la petición; el middleware la completa en process_view."""
+
+    __slots__ = ('alias',)
+
+    def __init__(self):
+        self.alias = None
+
+
+def replicas():
+    """Alias de las réplicas configuradas."""
+    return list(getattr(settings, 'TICKETS_DB_REPLICAS', ()))
+
+
+def ruta_sqlite(alias):
+    """Ruta del archivo de una base SQLite (también con NAME en formato URI)."""
+    nombre = str(connections[alias].settings_dict['NAME'])
+    if nombre.startswith('file:'):
+        return urlsplit(nombre).path
+    return nombre
+
+
+def replica_disponible(alias):
+    """Verificación de salud de la réplica, cacheada por TICKETS_DB_HEALTH_INTERVAL."""
+    ahora = time.monotonic()
+    intervalo = getattr(settings, 'TICKETS_DB_HEALTH_INTERVAL', 10)
+    previo = _salud.get(alias)
+    if previo is not None and ahora - previo[1] < intervalo:
+        return previo[0]
+
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+        disponible = True
+    except DatabaseError as e:
+        connections[alias].close()
+        disponible = False
+        if previo is None or previo[0]:
+            logger.warning('Réplica %s no disponible, se lee del primario: %s', alias, e)
+    else:
+        if previo is not None and not previo[0]:
+            logger.info('Réplica %s disponible nuevamente', alias)
+
+    _salud[alias] = (disponible, ahora)
+    return disponible
+
+
+def olvidar_salud():
+    """Fuerza una nueva verificación de todas las réplicas."""
+    _salud.clear()
+
+
+def elegir_replica():
+    """
+    Returns:
+        str | None: Una réplica disponible (rotando entre ellas), o None
+    """
+    disponibles = [alias for alias in replicas() if replica_disponible(alias)]
+    if not disponibles:
+        return None
+    return disponibles[next(_turno) % len(disponibles)]
+
+
+def iniciar_peticion():
+    return _lectura.set(_Lectura())
+
+
+def terminar_peticion(token):
+    _lectura.reset(token)
+
+
+def leer_de(alias):
+    """Envía a `alias` las lecturas restantes de la petición en curso."""
+    lectura = _lectura.get()
+    if lectura is not None:
+        lectura.alias = alias
+
+
+def alias_lectura():
+    lectura = _lectura.get()
+    if lectura is None or lectura.alias is None:
+        return PRIMARIO
+    return lectura.alias
+
+
+def en_replica():
+    """True si la petición en curso lee de una réplica."""
+    return alias_lectura() != PRIMARIO
+
+
+def _cache():
+    return caches[getattr(settings, 'TICKETS_CACHE_ALIAS', 'default')]
+
+
+def _clave_cliente(request):
+    return f"tickets:primario:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def marcar_escritura(request):
+    """El cliente lee del primario durante TICKETS_DB_STICKY_SECONDS."""
+    _cache().set(
+        _clave_cliente(request), 1, getattr(settings, 'TICKETS_DB_STICKY_SECONDS', 5)
+    )
+
+
+def escribio_hace_poco(request):
+    return _cache().get(_clave_cliente(request)) is not None
+
+
+class ReplicaRouter:
+    """
+    Router de DATABASE_ROUTERS. Sin réplicas configuradas, o fuera de una
+    acción de lectura elegida por el middleware, todo va al primario.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == 'tickets':
+            return alias_lectura()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return PRIMARIO
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplicas contienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas se copian del primario ya migrado
+        return db == PRIMARIO
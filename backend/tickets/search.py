@@ -0,0 +1,459 @@
+"""
+Índice de búsqueda de texto completo para tickets y comentarios.
+
+En SQLite se usan tablas virtuales FTS5 y en PostgreSQL tablas auxiliares
+con columnas tsvector e índices GIN. Si el motor no soporta ninguno de los
+dos, la búsqueda vuelve al filtro ``icontains`` original.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Ticket
+
+
+TICKET_FTS_TABLE = 'tickets_ticket_fts'
+COMMENT_FTS_TABLE = 'tickets_comment_fts'
+
+# Campos de Ticket que alimentan el índice
+CAMPOS_INDEXADOS = ('titulo', 'descripcion', 'solicitante')
+
+# Límite de términos por consulta para acotar el costo del MATCH
+MAX_TERMINOS = 8
+
+_PALABRA = re.compile(r'\w+', re.UNICODE)
+
+
+def extraer_terminos(texto):
+    """Normaliza la búsqueda del usuario a una lista de palabras."""
+    return _PALABRA.findall(texto.lower())[:MAX_TERMINOS]
+
+
+class SQLiteFTSBackend:
+    """Índice basado en tablas virtuales FTS5 de SQLite."""
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def connection(self):
+        return connections[self.alias]
+
+    def crear_estructura(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TICKET_FTS_TABLE} USING fts5("
+                "titulo, descripcion, solicitante, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {COMMENT_FTS_TABLE} USING fts5("
+                "contenido, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+
+    def eliminar_estructura(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TICKET_FTS_TABLE}")
+            cursor.execute(f"DROP TABLE IF EXISTS {COMMENT_FTS_TABLE}")
+
+    def existe(self):
+        tablas = self.connection.introspection.table_names()
+        return TICKET_FTS_TABLE in tablas and COMMENT_FTS_TABLE in tablas
+
+    def indexar_tickets(self, tickets):
+        filas = [
+            (t.pk, t.titulo, t.descripcion, t.solicitante)
+            for t in tickets
+        ]
+        if not filas:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {TICKET_FTS_TABLE} WHERE rowid = %s",
+                [(fila[0],) for fila in filas]
+            )
+            cursor.executemany(
+                f"INSERT INTO {TICKET_FTS_TABLE}(rowid, titulo, descripcion, solicitante) "
+                "VALUES (%s, %s, %s, %s)",
+                filas
+            )
+
+    def eliminar_tickets(self, ids):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {TICKET_FTS_TABLE} WHERE rowid = %s",
+                [(pk,) for pk in ids]
+            )
+
+    def indexar_comentarios(self, comentarios):
+        filas = [(c.pk, c.contenido) for c in comentarios]
+        if not filas:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {COMMENT_FTS_TABLE} WHERE rowid = %s",
+                [(fila[0],) for fila in filas]
+            )
+            cursor.executemany(
+                f"INSERT INTO {COMMENT_FTS_TABLE}(rowid, contenido) VALUES (%s, %s)",
+                filas
+            )
+
+    def eliminar_comentarios(self, ids):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {COMMENT_FTS_TABLE} WHERE rowid = %s",
+                [(pk,) for pk in ids]
+            )
+
+    def reconstruir(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TICKET_FTS_TABLE}")
+            cursor.execute(f"DELETE FROM {COMMENT_FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {TICKET_FTS_TABLE}(rowid, titulo, descripcion, solicitante) "
+                "SELECT id, titulo, descripcion, solicitante FROM tickets_ticket"
+            )
+            cursor.execute(
+                f"INSERT INTO {COMMENT_FTS_TABLE}(rowid, contenido) "
+                "SELECT id, contenido FROM tickets_comment"
+            )
+            cursor.execute(f"INSERT INTO {TICKET_FTS_TABLE}({TICKET_FTS_TABLE}) VALUES ('optimize')")
+            cursor.execute(f"INSERT INTO {COMMENT_FTS_TABLE}({COMMENT_FTS_TABLE}) VALUES ('optimize')")
+
+    def _consulta(self, terminos):
+        # Cada término se busca como prefijo: "login"* encuentra "logins"
+        return ' '.join(f'"{termino}"*' for termino in terminos)
+
+    def subconsulta(self, terminos):
+        consulta = self._consulta(terminos)
+        sql = (
+            f"SELECT rowid FROM {TICKET_FTS_TABLE} WHERE {TICKET_FTS_TABLE} MATCH %s"
+            " UNION SELECT ticket_id FROM tickets_comment WHERE id IN ("
+            f"SELECT rowid FROM {COMMENT_FTS_TABLE} WHERE {COMMENT_FTS_TABLE} MATCH %s)"
+        )
+        return sql, [consulta, consulta]
+
+    def contar(self, terminos, tope):
+        consulta = self._consulta(terminos)
+        sql = (
+            "SELECT"
+            f" (SELECT count(*) FROM (SELECT 1 FROM {TICKET_FTS_TABLE}"
+            f" WHERE {TICKET_FTS_TABLE} MATCH %s LIMIT %s)) +"
+            f" (SELECT count(*) FROM (SELECT 1 FROM {COMMENT_FTS_TABLE}"
+            f" WHERE {COMMENT_FTS_TABLE} MATCH %s LIMIT %s))"
+        )
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, [consulta, tope, consulta, tope])
+            return cursor.fetchone()[0]
+
+    def buscar(self, terminos, limite):
+        consulta = self._consulta(terminos)
+        # bm25 devuelve valores negativos: menor es más relevante.
+        # Los campos del ticket pesan más que los comentarios. Cada lado
+        # se acota a los `limite` mejores antes de combinar.
+        sql = (
+            "SELECT ticket_id FROM ("
+            " SELECT * FROM ("
+            f"  SELECT rowid AS ticket_id, bm25({TICKET_FTS_TABLE}, 10.0, 5.0, 2.0) AS rango"
+            f"  FROM {TICKET_FTS_TABLE} WHERE {TICKET_FTS_TABLE} MATCH %s"
+            "  ORDER BY rango LIMIT %s)"
+            " UNION ALL"
+            " SELECT c.ticket_id, f.rango FROM ("
+            f"  SELECT rowid AS comment_id, bm25({COMMENT_FTS_TABLE}) * 0.5 AS rango"
+            f"  FROM {COMMENT_FTS_TABLE} WHERE {COMMENT_FTS_TABLE} MATCH %s"
+            "  ORDER BY rango LIMIT %s"
+            " ) f JOIN tickets_comment c ON c.id = f.comment_id"
+            ") GROUP BY ticket_id ORDER BY MIN(rango) LIMIT %s"
+        )
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, [consulta, limite, consulta, limite, limite])
+            return [int(fila[0]) for fila in cursor.fetchall()]
+
+
+class PostgresFTSBackend:
+    """Índice basado en columnas tsvector con índices GIN en PostgreSQL."""
+
+    TICKET_TABLE = 'tickets_ticket_search'
+    COMMENT_TABLE = 'tickets_comment_search'
+
+    DOCUMENTO_TICKET = (
+        "setweight(to_tsvector('spanish', coalesce(titulo, '')), 'A') || "
+        "setweight(to_tsvector('spanish', coalesce(descripcion, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(solicitante, '')), 'C')"
+    )
+    DOCUMENTO_COMENTARIO = "to_tsvector('spanish', coalesce(contenido, ''))"
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def connection(self):
+        return connections[self.alias]
+
+    def crear_estructura(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.TICKET_TABLE} ("
+                "ticket_id bigint PRIMARY KEY REFERENCES tickets_ticket(id) "
+                "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+                "documento tsvector NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.TICKET_TABLE}_gin "
+                f"ON {self.TICKET_TABLE} USING GIN (documento)"
+            )
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.COMMENT_TABLE} ("
+                "comment_id bigint PRIMARY KEY REFERENCES tickets_comment(id) "
+                "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+                "ticket_id bigint NOT NULL, "
+                "documento tsvector NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.COMMENT_TABLE}_gin "
+                f"ON {self.COMMENT_TABLE} USING GIN (documento)"
+            )
+
+    def eliminar_estructura(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.COMMENT_TABLE}")
+            cursor.execute(f"DROP TABLE IF EXISTS {self.TICKET_TABLE}")
+
+    def existe(self):
+        tablas = self.connection.introspection.table_names()
+        return self.TICKET_TABLE in tablas and self.COMMENT_TABLE in tablas
+
+    def indexar_tickets(self, tickets):
+        ids = [t.pk for t in tickets]
+        if not ids:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.TICKET_TABLE} (ticket_id, documento) "
+                f"SELECT id, {self.DOCUMENTO_TICKET} FROM tickets_ticket WHERE id = ANY(%s) "
+                "ON CONFLICT (ticket_id) DO UPDATE SET documento = EXCLUDED.documento",
+                [ids]
+            )
+
+    def eliminar_tickets(self, ids):
+        # La clave foránea con ON DELETE CASCADE limpia las filas
+        pass
+
+    def indexar_comentarios(self, comentarios):
+        ids = [c.pk for c in comentarios]
+        if not ids:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.COMMENT_TABLE} (comment_id, ticket_id, documento) "
+                f"SELECT id, ticket_id, {self.DOCUMENTO_COMENTARIO} "
+                "FROM tickets_comment WHERE id = ANY(%s) "
+                "ON CONFLICT (comment_id) DO UPDATE "
+                "SET ticket_id = EXCLUDED.ticket_id, documento = EXCLUDED.documento",
+                [ids]
+            )
+
+    def eliminar_comentarios(self, ids):
+        pass
+
+    def reconstruir(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {self.TICKET_TABLE}, {self.COMMENT_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {self.TICKET_TABLE} (ticket_id, documento) "
+                f"SELECT id, {self.DOCUMENTO_TICKET} FROM tickets_ticket"
+            )
+            cursor.execute(
+                f"INSERT INTO {self.COMMENT_TABLE} (comment_id, ticket_id, documento) "
+                f"SELECT id, ticket_id, {self.DOCUMENTO_COMENTARIO} FROM tickets_comment"
+            )
+
+    def _consulta(self, terminos):
+        return ' & '.join(f'{termino}:*' for termino in terminos)
+
+    def subconsulta(self, terminos):
+        consulta = self._consulta(terminos)
+        sql = (
+            f"SELECT ticket_id FROM {self.TICKET_TABLE}"
+            " WHERE documento @@ to_tsquery('spanish', %s)"
+            f" UNION SELECT ticket_id FROM {self.COMMENT_TABLE}"
+            " WHERE documento @@ to_tsquery('spanish', %s)"
+        )
+        return sql, [consulta, consulta]
+
+    def contar(self, terminos, tope):
+        consulta = self._consulta(terminos)
+        sql = (
+            "SELECT"
+            f" (SELECT count(*) FROM (SELECT 1 FROM {self.TICKET_TABLE}"
+            " WHERE documento @@ to_tsquery('spanish', %s) LIMIT %s) t) +"
+            f" (SELECT count(*) FROM (SELECT 1 FROM {self.COMMENT_TABLE}"
+            " WHERE documento @@ to_tsquery('spanish', %s) LIMIT %s) c)"
+        )
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, [consulta, tope, consulta, tope])
+            return cursor.fetchone()[0]
+
+    def buscar(self, terminos, limite):
+        consulta = self._consulta(terminos)
+        sql = (
+            "SELECT ticket_id FROM ("
+            " (SELECT ticket_id, ts_rank(documento, q) AS rango"
+            f" FROM {self.TICKET_TABLE}, to_tsquery('spanish', %s) q WHERE documento @@ q"
+            " ORDER BY rango DESC LIMIT %s)"
+            " UNION ALL"
+            " (SELECT ticket_id, ts_rank(documento, q) * 0.5 AS rango"
+            f" FROM {self.COMMENT_TABLE}, to_tsquery('spanish', %s) q WHERE documento @@ q"
+            " ORDER BY rango DESC LIMIT %s)"
+            ") r GROUP BY ticket_id ORDER BY MAX(rango) DESC LIMIT %s"
+        )
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, [consulta, limite, consulta, limite, limite])
+            return [int(fila[0]) for fila in cursor.fetchall()]
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresFTSBackend,
+}
+
+_disponibles = {}
+
+
+def crear_backend(alias='default'):
+    """
+    Instancia el backend del motor sin verificar que el índice exista.
+
+    Returns:
+        Backend o None si el motor no soporta texto completo
+    """
+    backend_class = BACKENDS.get(connections[alias].vendor)
+    return backend_class(alias) if backend_class else None
+
+
+def olvidar_disponibilidad(alias='default'):
+    """Descarta la verificación cacheada tras crear o borrar el índice."""
+    _disponibles.pop(alias, None)
+
+
+def get_backend(alias='default'):
+    """
+    Retorna el backend de búsqueda para la conexión indicada.
+
+    Returns:
+        Backend o None si el motor no tiene índice de texto completo
+    """
+    backend = crear_backend(alias)
+    if backend is None:
+        return None
+
+    if alias not in _disponibles:
+        _disponibles[alias] = backend.existe()
+
+    return backend if _disponibles[alias] else None
+
+
+def _backend_escritura():
+    return get_backend(router.db_for_write(Ticket))
+
+
+def indexar_tickets(tickets):
+    backend = _backend_escritura()
+    if backend:
+        backend.indexar_tickets(tickets)
+
+
+def eliminar_tickets(ids):
+    backend = _backend_escritura()
+    if backend:
+        backend.eliminar_tickets(ids)
+
+
+def indexar_comentarios(comentarios):
+    backend = _backend_escritura()
+    if backend:
+        backend.indexar_comentarios(comentarios)
+
+
+def eliminar_comentarios(ids):
+    backend = _backend_escritura()
+    if backend:
+        backend.eliminar_comentarios(ids)
+
+
+def filtro_legado(queryset, texto):
+    """Filtro original por subcadena en título, descripción y solicitante."""
+    return queryset.filter(
+        Q(titulo__icontains=texto) |
+        Q(descripcion__icontains=texto) |
+        Q(solicitante__icontains=texto)
+    )
+
+
+def coincidencias(queryset, texto):
+    """
+    Filtra por todas las coincidencias, sin ranking ni límite.
+    Pensado para conteos agregados como las estadísticas.
+    """
+    terminos = extraer_terminos(texto)
+    backend = get_backend(queryset.db)
+
+    if backend is None or not terminos:
+        return filtro_legado(queryset, texto)
+
+    sql, params = backend.subconsulta(terminos)
+    return queryset.filter(id__in=RawSQL(sql, params))
+
+
+def filtrar(queryset, texto):
+    """
+    Filtra un queryset de tickets por relevancia de texto completo.
+    Incluye coincidencias en comentarios y búsqueda por prefijo.
+
+    Args:
+        queryset (QuerySet): Tickets a filtrar
+        texto (str): Búsqueda ingresada por el usuario
+
+    Returns:
+        QuerySet: Todos los tickets coincidentes: los
+        TICKETS_SEARCH_MAX_RESULTS más relevantes primero y el resto por
+        fecha, o todos por fecha si la búsqueda es tan amplia que el
+        ranking no aporta
+    """
+    terminos = extraer_terminos(texto)
+    backend = get_backend(queryset.db)
+
+    if backend is None or not terminos:
+        return filtro_legado(queryset, texto)
+
+    # Con términos muy frecuentes el ranking cuesta más de lo que aporta:
+    # se filtran todas las coincidencias y se conserva el orden por fecha.
+    umbral = getattr(settings, 'TICKETS_SEARCH_RANK_THRESHOLD', 5000)
+    if backend.contar(terminos, umbral + 1) > umbral:
+        sql, params = backend.subconsulta(terminos)
+        return queryset.filter(id__in=RawSQL(sql, params))
+
+    limite = getattr(settings, 'TICKETS_SEARCH_MAX_RESULTS', 500)
+    ids = backend.buscar(terminos, limite)
+    if not ids:
+        return queryset.none()
+
+    # Solo se rankean los `limite` mejores, pero se devuelven todas las
+    # coincidencias: las demás siguen por fecha, así ninguna se pierde y el
+    # total del listado es el real. Un único CASE en SQL crudo: construirlo
+    # con When() por cada id cuesta más en compilación del ORM que la
+    # propia consulta.
+    tabla = queryset.model._meta.db_table
+    relevancia = RawSQL(
+        f'CASE "{tabla}"."id" ' + 'WHEN %s THEN %s ' * len(ids) + 'ELSE %s END',
+        [valor for posicion, pk in enumerate(ids) for valor in (pk, posicion)] + [len(ids)]
+    )
+    sql, params = backend.subconsulta(terminos)
+    return queryset.filter(id__in=RawSQL(sql, params)).order_by(
+        relevancia, '-fecha_creacion', '-id'
+    )
@@ -1,14 +1,22 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
-from .models import Ticket, Comment
+from . import services, validators
+from .fieldsets import CamposSelectivosMixin
+from .instrumentation import SerializacionMedida
+from .models import Ticket, Comment, TransicionConcurrenteError
+from .pagination import CommentPagination
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(CamposSelectivosMixin, SerializacionMedida, serializers.ModelSerializer):
     """
     Serializer para comentarios de tickets.
     Incluye validación y campos de solo lectura.
     """
     
+    # ?expand=ticket usa CommentTicketSerializer
+    EXPANDIBLES = ('ticket',)
+    
     class Meta:
         model = Comment
         fields = ['id', 'ticket', 'autor', 'contenido', 'fecha_creacion']
@@ -16,13 +24,21 @@ class CommentSerializer(serializers.ModelSerializer):
     
     def validate_contenido(self, value):
         """Valida que el comentario tenga contenido significativo."""
-        if not value.strip():
-            raise serializers.ValidationError("El comentario no puede estar vacío.")
-        
-        if len(value.strip()) < 3:
-            raise serializers.ValidationError("El comentario debe tener al menos 3 caracteres.")
-            
-        return value.strip()
+        return validators.validar_contenido(value)
+
+
+class TicketResumenSerializer(serializers.ModelSerializer):
+    """Resumen del ticket para ?expand=ticket en los comentarios."""
+    
+    class Meta:
+        model = Ticket
+        fields = ['id', 'titulo', 'estado', 'prioridad']
+
+
+class CommentTicketSerializer(CommentSerializer):
+    """Comentario con su ticket expandido en lugar del id."""
+    
+    ticket = TicketResumenSerializer(read_only=True)
 
 
 class CommentCreateSerializer(serializers.ModelSerializer):
@@ -34,26 +50,29 @@ class CommentCreateSerializer(serializers.ModelSerializer):
     
     def validate_contenido(self, value):
         """Valida que el comentario tenga contenido significativo."""
-        if not value.strip():
-            raise serializers.ValidationError("El comentario no puede estar vacío.")
-        
-        if len(value.strip()) < 3:
-            raise serializers.ValidationError("El comentario debe tener al menos 3 caracteres.")
-            
-        return value.strip()
+        return validators.validar_contenido(value)
 
 
-class TicketListSerializer(serializers.ModelSerializer):
+class TicketListSerializer(CamposSelectivosMixin, SerializacionMedida, serializers.ModelSerializer):
     """
     Serializer optimizado para listado de tickets.
-    Incluye campos calculados y cuenta de comentarios.
+    Incluye campos calculados y el resumen de actividad (tickets.activity).
     """
     
     estado_display = serializers.CharField(source='get_estado_display', read_only=True)
     prioridad_display = serializers.CharField(source='get_prioridad_display', read_only=True)
-    total_comentarios = serializers.SerializerMethodField()
     priority_color = serializers.CharField(source='get_priority_color', read_only=True)
     status_color = serializers.CharField(source='get_status_color', read_only=True)
+    # Solo con ?expand=comentarios
+    comentarios = serializers.SerializerMethodField()
+    
+    RELACIONES = {'comentarios': 'comentarios'}
+    FUENTES = {
+        'prioridad_display': ('prioridad',),
+        'estado_display': ('estado',),
+        'priority_color': ('prioridad',),
+        'status_color': ('estado',),
+    }
     
     class Meta:
         model = Ticket
@@ -61,36 +80,85 @@ class TicketListSerializer(serializers.ModelSerializer):
             'id', 'titulo', 'descripcion', 'prioridad', 'prioridad_display',
             'solicitante', 'email', 'estado', 'estado_display', 
             'fecha_creacion', 'fecha_actualizacion', 'total_comentarios',
-            'priority_color', 'status_color'
+            'fecha_ultimo_comentario', 'autor_ultimo_comentario', 'extracto_ultimo_comentario',
+            'priority_color', 'status_color', 'comentarios'
         ]
     
-    def get_total_comentarios(self, obj):
-        """Cuenta total de comentarios del ticket."""
-        return obj.comentarios.count()
+    def get_comentarios(self, obj):
+        """Últimos comentarios, precargados por la vista (comentarios_recientes)."""
+        recientes = list(reversed(getattr(obj, 'comentarios_recientes', [])))
+        return CommentSerializer(recientes, many=True).data
 
 
-class TicketDetailSerializer(serializers.ModelSerializer):
+class TicketDetailSerializer(CamposSelectivosMixin, SerializacionMedida, serializers.ModelSerializer):
     """
     Serializer detallado para un ticket específico.
-    Incluye comentarios y transiciones válidas.
+    Incluye los comentarios más recientes y transiciones válidas.
+    
+    Solo se embeben los últimos TICKETS_DETAIL_COMMENTS comentarios;
+    `comentarios_cursor` permite pedir los anteriores a
+    /api/tickets/{id}/comments/?cursor=...
     """
     
     estado_display = serializers.CharField(source='get_estado_display', read_only=True)
     prioridad_display = serializers.CharField(source='get_prioridad_display', read_only=True)
-    comentarios = CommentSerializer(many=True, read_only=True)
+    comentarios = serializers.SerializerMethodField()
+    comentarios_cursor = serializers.SerializerMethodField()
     transiciones_validas = serializers.SerializerMethodField()
     priority_color = serializers.CharField(source='get_priority_color', read_only=True)
     status_color = serializers.CharField(source='get_status_color', read_only=True)
     
+    # Los comentarios se embeben por defecto; ?fields= o ?expand= lo controlan
+    RELACIONES = {'comentarios': 'comentarios', 'comentarios_cursor': 'comentarios'}
+    EXPANSIONES_POR_DEFECTO = ('comentarios',)
+    FUENTES = {
+        'prioridad_display': ('prioridad',),
+        'estado_display': ('estado',),
+        'priority_color': ('prioridad',),
+        'status_color': ('estado',),
+        'transiciones_validas': ('estado',),
+    }
+    
     class Meta:
         model = Ticket
         fields = [
             'id', 'titulo', 'descripcion', 'prioridad', 'prioridad_display',
             'solicitante', 'email', 'estado', 'estado_display',
-            'fecha_creacion', 'fecha_actualizacion', 'comentarios',
+            'fecha_creacion', 'fecha_actualizacion', 'version', 'comentarios',
+            'comentarios_cursor', 'total_comentarios',
+            'fecha_ultimo_comentario', 'autor_ultimo_comentario', 'extracto_ultimo_comentario',
             'transiciones_validas', 'priority_color', 'status_color'
         ]
-        read_only_fields = ['id', 'fecha_creacion', 'fecha_actualizacion']
+        read_only_fields = ['id', 'fecha_creacion', 'fecha_actualizacion', 'version']
+    
+    def _ultimos_comentarios(self, obj):
+        """
+        Últimos N comentarios en orden cronológico y si existen anteriores.
+        Se calcula una sola vez por ticket.
+        """
+        cache = getattr(obj, '_ultimos_comentarios', None)
+        if cache is None:
+            limite = getattr(settings, 'TICKETS_DETAIL_COMMENTS', 20)
+            recientes = list(
+                obj.comentarios.order_by('-fecha_creacion', '-id')[:limite + 1]
+            )
+            hay_anteriores = len(recientes) > limite
+            recientes = recientes[:limite]
+            recientes.reverse()
+            cache = obj._ultimos_comentarios = (recientes, hay_anteriores)
+        return cache
+    
+    def get_comentarios(self, obj):
+        """Comentarios más recientes del ticket, en orden cronológico."""
+        recientes, _ = self._ultimos_comentarios(obj)
+        return CommentSerializer(recientes, many=True).data
+    
+    def get_comentarios_cursor(self, obj):
+        """Cursor para paginar hacia los comentarios anteriores, si los hay."""
+        recientes, hay_anteriores = self._ultimos_comentarios(obj)
+        if not hay_anteriores:
+            return None
+        return CommentPagination().codificar_cursor(recientes[0], hacia_atras=True)
     
     def get_transiciones_validas(self, obj):
         """Obtiene las transiciones válidas desde el estado actual."""
@@ -115,33 +183,15 @@ class TicketCreateSerializer(serializers.ModelSerializer):
     
     def validate_titulo(self, value):
         """Valida que el título sea descriptivo."""
-        if not value.strip():
-            raise serializers.ValidationError("El título no puede estar vacío.")
-        
-        if len(value.strip()) < 5:
-            raise serializers.ValidationError("El título debe tener al menos 5 caracteres.")
-            
-        return value.strip()
+        return validators.validar_titulo(value)
     
     def validate_descripcion(self, value):
         """Valida que la descripción sea suficientemente detallada."""
-        if not value.strip():
-            raise serializers.ValidationError("La descripción no puede estar vacía.")
-        
-        if len(value.strip()) < 10:
-            raise serializers.ValidationError("La descripción debe tener al menos 10 caracteres.")
-            
-        return value.strip()
+        return validators.validar_descripcion(value)
     
     def validate_solicitante(self, value):
         """Valida el nombre del solicitante."""
-        if not value.strip():
-            raise serializers.ValidationError("El nombre del solicitante no puede estar vacío.")
-        
-        if len(value.strip()) < 2:
-            raise serializers.ValidationError("El nombre debe tener al menos 2 caracteres.")
-            
-        return value.strip()
+        return validators.validar_solicitante(value)
 
 
 class TicketTransitionSerializer(serializers.Serializer):
@@ -156,6 +206,10 @@ class TicketTransitionSerializer(serializers.Serializer):
         allow_blank=True,
         help_text="Comentario opcional sobre la transición"
     )
+    version = serializers.IntegerField(
+        required=False,
+        help_text="Versión del ticket que vio el cliente (control optimista)"
+    )
     
     def validate_nuevo_estado(self, value):
         """Valida que la transición sea válida para el ticket actual."""
@@ -178,27 +232,64 @@ class TicketTransitionSerializer(serializers.Serializer):
         ticket = self.context['ticket']
         nuevo_estado = self.validated_data['nuevo_estado']
         comentario = self.validated_data.get('comentario', '').strip()
+        version = self.validated_data.get('version')
         
-        try:
-            # Realizar la transición
-            ticket.transicionar_a(nuevo_estado)
-            
-            # Crear comentario automático de la transición
-            Comment.objects.create(
-                ticket=ticket,
-                autor='Sistema',
-                contenido=f"Estado cambiado a '{ticket.get_estado_display()}'"
+        if version is not None and version != ticket.version:
+            raise TransicionConcurrenteError(
+                f"El ticket #{ticket.pk} cambió desde la versión {version}. "
+                f"Recarga el ticket e intenta nuevamente."
             )
+        
+        try:
+            # Transición y comentarios de sistema en una sola transacción
+            return services.transicionar_ticket(ticket, nuevo_estado, comentario)
             
-            # Crear comentario adicional si se proporcionó
-            if comentario:
-                Comment.objects.create(
-                    ticket=ticket,
-                    autor='Sistema',
-                    contenido=comentario
-                )
-                
-            return ticket
-            
+        except TransicionConcurrenteError:
+            raise
         except DjangoValidationError as e:
-            raise serializers.ValidationError(str(e))
\ No newline at end of file
+            raise serializers.ValidationError(str(e))
+
+
+class TicketBulkTransitionSerializer(serializers.Serializer):
+    """
+    Serializer para un elemento de una transición en lote.
+    El estado y el flujo se validan al aplicar, para reportar errores por
+    ítem: un estado desconocido no rechaza todo el lote.
+    """
+
+    id = serializers.IntegerField()
+    nuevo_estado = serializers.CharField()
+    comentario = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text="Comentario opcional sobre la transición"
+    )
+    
+    def validate_comentario(self, value):
+        """Normaliza el comentario opcional."""
+        return value.strip()
+
+
+class TicketMergeSerializer(serializers.Serializer):
+    """
+    Serializer para fusionar duplicados en un ticket.
+    El ticket destino llega en el contexto.
+    """
+    
+    duplicados = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        help_text="Ids de los tickets que se fusionan en este"
+    )
+    
+    def validate_duplicados(self, value):
+        """Elimina repetidos, excluye el destino y acota el tamaño del lote."""
+        ticket = self.context.get('ticket')
+        if ticket is not None and ticket.pk in value:
+            raise serializers.ValidationError("Un ticket no puede fusionarse consigo mismo.")
+        
+        maximo = getattr(settings, 'TICKETS_BULK_MAX_BATCH', 100)
+        ids = list(dict.fromkeys(value))
+        if len(ids) > maximo:
+            raise serializers.ValidationError(f"Se permiten como máximo {maximo} duplicados.")
+        return ids
@@ -0,0 +1,217 @@
+"""
+Operaciones de escritura sobre tickets.
+
+Cada operación corre en una única transacción: el ticket y sus comentarios
+de sistema se confirman juntos (un solo commit/fsync) y los comentarios se
+insertan con un único bulk_create.
+
+En el modo producción de SQLite las operaciones se ejecutan en el hilo
+escritor de tickets.sqlite, que confirma juntas las que llegan a la vez.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import activity, search
+from .models import Ticket, Comment, TransicionConcurrenteError
+from .sqlite import serializada
+
+
+AUTOR_SISTEMA = 'Sistema'
+
+
+def crear_comentarios_sistema(ticket, contenidos):
+    """Inserta en lote los comentarios automáticos de un ticket."""
+    return Comment.objects.crear_lote([
+        Comment(ticket=ticket, autor=AUTOR_SISTEMA, contenido=contenido)
+        for contenido in contenidos
+    ])
+
+
+@serializada
+def crear_ticket(datos):
+    """
+    Crea un ticket junto con su comentario inicial.
+
+    Args:
+        datos (dict): Campos validados del ticket
+
+    Returns:
+        Ticket: Ticket creado
+    """
+    with transaction.atomic():
+        ticket = Ticket.objects.create(**datos)
+        crear_comentarios_sistema(ticket, [f'Ticket creado por {ticket.solicitante}'])
+    return ticket
+
+
+@serializada
+def transicionar_ticket(ticket, nuevo_estado, comentario=''):
+    """
+    Cambia el estado de un ticket y registra los comentarios de sistema.
+
+    Args:
+        ticket (Ticket): Ticket a transicionar
+        nuevo_estado (str): Estado destino
+        comentario (str): Comentario opcional sobre la transición
+
+    Raises:
+        ValidationError: Si la transición no es válida
+        TransicionConcurrenteError: Si el ticket cambió durante la operación
+    """
+    with transaction.atomic():
+        ticket.transicionar_a(nuevo_estado)
+
+        contenidos = [f"Estado cambiado a '{ticket.get_estado_display()}'"]
+        if comentario:
+            contenidos.append(comentario)
+        crear_comentarios_sistema(ticket, contenidos)
+    return ticket
+
+
+@serializada
+def agregar_comentario(ticket, datos):
+    """
+    Agrega un comentario de usuario al ticket.
+
+    Args:
+        ticket (Ticket): Ticket comentado
+        datos (dict): Campos validados del comentario
+    """
+    with transaction.atomic():
+        return Comment.objects.create(ticket=ticket, **datos)
+
+
+@serializada
+def crear_tickets_en_lote(lista_datos):
+    """
+    Crea varios tickets y sus comentarios iniciales con dos bulk_create.
+
+    Args:
+        lista_datos (list): Campos validados de cada ticket
+
+    Returns:
+        list: Tickets creados, en el mismo orden recibido
+    """
+    with transaction.atomic():
+        tickets = Ticket.objects.crear_lote([Ticket(**datos) for datos in lista_datos])
+        Comment.objects.crear_lote([
+            Comment(
+                ticket=ticket, autor=AUTOR_SISTEMA,
+                contenido=f'Ticket creado por {ticket.solicitante}'
+            )
+            for ticket in tickets
+        ])
+    return tickets
+
+
+@serializada
+def transicionar_en_lote(transiciones):
+    """
+    Aplica varias transiciones en una transacción.
+
+    Cada transición se valida (estado conocido y Ticket.VALID_TRANSITIONS)
+    y se aplica en su propio savepoint, de modo que un error no revierte
+    las demás. Los comentarios de sistema de todas las transiciones
+    exitosas se insertan con un único bulk_create.
+
+    Args:
+        transiciones (list): Diccionarios {id, nuevo_estado, comentario?}
+
+    Returns:
+        tuple: (tickets transicionados, errores [{id, error}])
+    """
+    ids = {item['id'] for item in transiciones}
+    transicionados = []
+    errores = []
+    comentarios = []
+
+    with transaction.atomic():
+        tickets = Ticket.objects.in_bulk(ids)
+
+        for item in transiciones:
+            ticket = tickets.get(item['id'])
+            if ticket is None:
+                errores.append({'id': item['id'], 'error': 'Ticket no encontrado.'})
+                continue
+            if item['nuevo_estado'] not in Ticket.ESTADO_DISPLAY:
+                errores.append({
+                    'id': item['id'],
+                    'error': f'"{item["nuevo_estado"]}" no es una elección válida.',
+                })
+                continue
+
+            try:
+                ticket.transicionar_a(item['nuevo_estado'])
+            except TransicionConcurrenteError as e:
+                errores.append({'id': item['id'], 'error': e.messages[0], 'conflicto': True})
+                continue
+            except ValidationError as e:
+                errores.append({'id': item['id'], 'error': e.messages[0]})
+                continue
+
+            transicionados.append(ticket)
+            comentarios.append(Comment(
+                ticket=ticket, autor=AUTOR_SISTEMA,
+                contenido=f"Estado cambiado a '{ticket.get_estado_display()}'"
+            ))
+            if item.get('comentario'):
+                comentarios.append(Comment(
+                    ticket=ticket, autor=AUTOR_SISTEMA, contenido=item['comentario']
+                ))
+
+        Comment.objects.crear_lote(comentarios)
+
+    return transicionados, errores
+
+
+@serializada
+def fusionar_tickets(destino, ids):
+    """
+    Fusiona tickets duplicados en `destino`: sus comentarios pasan a
+    destino (que recalcula su resumen de actividad) y recibe un comentario
+    de sistema por cada duplicado, y los duplicados se eliminan
+    (tombstone, contadores, eventos y feed como cualquier eliminación).
+
+    Los duplicados se bloquean (SELECT ... FOR UPDATE donde existe) para
+    que ningún comentario concurrente se pierda con ellos.
+
+    Args:
+        destino (Ticket): Ticket que se conserva
+        ids (list): Ids de los duplicados
+
+    Returns:
+        Ticket: destino, con los datos actualizados
+
+    Raises:
+        ValidationError: Si algún duplicado no existe o es el propio destino
+    """
+    if destino.pk in ids:
+        raise ValidationError(f"El ticket #{destino.pk} no puede fusionarse consigo mismo.")
+
+    with transaction.atomic():
+        duplicados = list(
+            Ticket.objects.select_for_update().filter(pk__in=ids).order_by('pk')
+            .only('id', 'titulo', 'solicitante', 'estado', 'prioridad')
+        )
+        faltantes = sorted(set(ids) - {ticket.pk for ticket in duplicados})
+        if faltantes:
+            raise ValidationError(
+                f"Tickets no encontrados: {', '.join(f'#{pk}' for pk in faltantes)}."
+            )
+
+        movidos = Comment.objects.filter(ticket_id__in=ids).order_by()
+        ids_movidos = list(movidos.values_list('id', flat=True))
+        movidos.update(ticket=destino)
+        # El índice de PostgreSQL guarda el ticket de cada comentario
+        search.indexar_comentarios(Comment.objects.filter(id__in=ids_movidos))
+        activity.recalcular_tickets([destino.pk])
+
+        crear_comentarios_sistema(destino, [
+            f"Ticket #{ticket.pk} '{ticket.titulo}' de {ticket.solicitante} "
+            f"fusionado en este ticket"
+            for ticket in duplicados
+        ])
+        Ticket.objects.filter(pk__in=ids).delete()
+
+    destino.refresh_from_db()
+    return destino
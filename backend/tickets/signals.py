@@ -0,0 +1,245 @@
+from collections import Counter
+
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from . import activity, cache, duplicates, events, instrumentation, search, sqlite, stats
+from .models import (
+    Ticket, Comment, TicketEvent, TicketTombstone, comentarios_creados, tickets_creados
+)
+
+
+@receiver(pre_save, sender=Ticket)
+def recordar_valores_contados(sender, instance, **kwargs):
+    """
+    Obtiene estado y prioridad previos si la instancia no los trae cargados.
+    Necesario para tickets construidos a mano o con campos diferidos.
+    """
+    if instance.pk is None:
+        return
+
+    anteriores = getattr(instance, '_valores_contados', (None, None))
+    if None not in anteriores:
+        return
+
+    fila = Ticket.objects.filter(pk=instance.pk).values_list('estado', 'prioridad').first()
+    instance._valores_contados = fila or (None, None)
+
+
+@receiver(post_save, sender=Ticket)
+def publicar_cambio_ticket(sender, instance, created, using, **kwargs):
+    """
+    Publica la creación o el cambio de estado en el feed de eventos.
+    Se registra antes de actualizar_contadores_al_guardar, que reemplaza
+    los valores previos con los actuales.
+    """
+    anteriores = getattr(instance, '_valores_contados', (None, None))
+    if created:
+        tipo = events.TICKET_CREADO
+    elif anteriores[0] is not None and anteriores[0] != instance.estado:
+        tipo = events.TICKET_TRANSICIONADO
+    else:
+        return
+    events.publicar([events.evento(tipo, instance.pk, events.datos_ticket(instance))], using)
+
+
+@receiver(post_save, sender=Ticket)
+def actualizar_contadores_al_guardar(sender, instance, created, **kwargs):
+    """Mantiene los contadores por (estado, prioridad) tras crear o modificar."""
+    actuales = (instance.estado, instance.prioridad)
+    anteriores = getattr(instance, '_valores_contados', (None, None))
+
+    if created or None in anteriores:
+        stats.aplicar_deltas({actuales: 1})
+    elif anteriores != actuales:
+        stats.aplicar_deltas({anteriores: -1, actuales: 1})
+
+    instance._valores_contados = actuales
+
+
+@receiver(post_delete, sender=Ticket)
+def actualizar_contadores_al_eliminar(sender, instance, **kwargs):
+    """Descuenta el ticket eliminado de su combinación actual."""
+    anteriores = getattr(instance, '_valores_contados', (None, None))
+    if None in anteriores:
+        anteriores = (instance.estado, instance.prioridad)
+
+    stats.aplicar_deltas({anteriores: -1})
+
+
+@receiver(post_delete, sender=Ticket)
+def publicar_eliminacion_ticket(sender, instance, using, **kwargs):
+    """Avisa a los tableros que el ticket ya no existe."""
+    events.publicar([events.evento(events.TICKET_ELIMINADO, instance.pk, {})], using)
+
+
+@receiver(post_delete, sender=Ticket)
+def registrar_tombstone(sender, instance, using, **kwargs):
+    """Deja constancia de la eliminación para la sincronización incremental."""
+    TicketTombstone.objects.using(using).create(ticket_id=instance.pk)
+
+
+@receiver(post_save, sender=Ticket)
+def registrar_evento_creacion(sender, instance, created, using, **kwargs):
+    """Primer evento del historial; las transiciones las registra transicionar_a."""
+    if created:
+        TicketEvent.de_creacion(instance).save(using=using)
+
+
+@receiver(tickets_creados, sender=Ticket)
+def registrar_eventos_en_lote(sender, tickets, **kwargs):
+    """Eventos de alta de los tickets insertados con bulk_create."""
+    TicketEvent.objects.bulk_create([TicketEvent.de_creacion(ticket) for ticket in tickets])
+
+
+@receiver(post_delete, sender=Ticket)
+def registrar_evento_eliminacion(sender, instance, using, **kwargs):
+    """El ticket eliminado sale de su estado en las métricas de backlog."""
+    TicketEvent.objects.using(using).create(
+        ticket_id=instance.pk, tipo=TicketEvent.ELIMINADO,
+        estado_anterior=instance.estado, prioridad=instance.prioridad,
+    )
+
+
+@receiver(tickets_creados, sender=Ticket)
+def publicar_tickets_en_lote(sender, tickets, **kwargs):
+    """Publica un evento por cada ticket insertado con bulk_create."""
+    events.publicar([
+        events.evento(events.TICKET_CREADO, ticket.pk, events.datos_ticket(ticket))
+        for ticket in tickets
+    ])
+
+
+@receiver(tickets_creados, sender=Ticket)
+def actualizar_contadores_en_lote(sender, tickets, **kwargs):
+    """Suma a los contadores los tickets insertados con bulk_create."""
+    stats.aplicar_deltas(Counter((t.estado, t.prioridad) for t in tickets))
+    for ticket in tickets:
+        ticket._valores_contados = (ticket.estado, ticket.prioridad)
+
+
+@receiver(post_save, sender=Ticket)
+def indexar_ticket(sender, instance, update_fields=None, **kwargs):
+    """Sincroniza el índice de texto completo si cambió algún campo indexado."""
+    if update_fields is not None and not set(update_fields) & set(search.CAMPOS_INDEXADOS):
+        return
+    search.indexar_tickets([instance])
+
+
+@receiver(post_delete, sender=Ticket)
+def desindexar_ticket(sender, instance, **kwargs):
+    """Quita el ticket eliminado del índice de texto completo."""
+    search.eliminar_tickets([instance.pk])
+
+
+@receiver(tickets_creados, sender=Ticket)
+def indexar_tickets_en_lote(sender, tickets, **kwargs):
+    """Indexa los tickets insertados con bulk_create."""
+    search.indexar_tickets(tickets)
+
+
+@receiver(post_save, sender=Ticket)
+def firmar_ticket(sender, instance, created, using, update_fields=None, **kwargs):
+    """Mantiene la firma de duplicados (tickets.duplicates) del ticket guardado."""
+    duplicates.actualizar_ticket(instance, update_fields, using, creado=created)
+
+
+@receiver(tickets_creados, sender=Ticket)
+def firmar_tickets_en_lote(sender, tickets, **kwargs):
+    """Firma los tickets insertados con bulk_create."""
+    duplicates.indexar_tickets(tickets, nuevos=True)
+
+
+@receiver(post_save, sender=Comment)
+def indexar_comentario(sender, instance, **kwargs):
+    """Indexa el contenido del comentario para buscarlo desde su ticket."""
+    search.indexar_comentarios([instance])
+
+
+@receiver(post_delete, sender=Comment)
+def desindexar_comentario(sender, instance, **kwargs):
+    """Quita el comentario eliminado del índice de texto completo."""
+    search.eliminar_comentarios([instance.pk])
+
+
+@receiver(comentarios_creados, sender=Comment)
+def indexar_comentarios_en_lote(sender, comentarios, **kwargs):
+    """Indexa los comentarios insertados con bulk_create."""
+    search.indexar_comentarios(comentarios)
+
+
+@receiver(post_save, sender=Comment)
+def publicar_comentario(sender, instance, created, using, **kwargs):
+    """Publica los comentarios nuevos en el feed de eventos."""
+    if created:
+        events.publicar([events.evento(
+            events.COMENTARIO_CREADO, instance.ticket_id, events.datos_comentario(instance)
+        )], using)
+
+
+@receiver(comentarios_creados, sender=Comment)
+def publicar_comentarios_en_lote(sender, comentarios, **kwargs):
+    """Publica los comentarios insertados con bulk_create."""
+    events.publicar([
+        events.evento(events.COMENTARIO_CREADO, c.ticket_id, events.datos_comentario(c))
+        for c in comentarios
+    ])
+
+
+@receiver(post_save, sender=Comment)
+def actualizar_actividad_ticket(sender, instance, created, using, **kwargs):
+    """
+    Suma el comentario al resumen de actividad del ticket (tickets.activity)
+    y mueve su fecha de actualización, para que la sincronización
+    incremental detecte la actividad.
+    """
+    if created:
+        activity.registrar_comentarios([instance], using)
+
+
+@receiver(comentarios_creados, sender=Comment)
+def actualizar_actividad_en_lote(sender, comentarios, **kwargs):
+    """Igual que actualizar_actividad_ticket, con un único UPDATE por lote."""
+    activity.registrar_comentarios(comentarios)
+
+
+@receiver(post_delete, sender=Comment)
+def recalcular_actividad_al_eliminar(sender, instance, using, origin=None, **kwargs):
+    """Recalcula la actividad del ticket, salvo que se esté eliminando el ticket."""
+    if not activity.elimina_ticket(origin):
+        activity.recalcular_tickets([instance.ticket_id], using)
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def invalidar_cache_ticket(sender, instance, using, **kwargs):
+    """Invalida listados, estadísticas y el detalle del ticket."""
+    cache.invalidar([instance.pk], using)
+
+
+@receiver(tickets_creados, sender=Ticket)
+def invalidar_cache_tickets_en_lote(sender, tickets, **kwargs):
+    """Los tickets nuevos solo afectan listados y estadísticas."""
+    cache.invalidar()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidar_cache_comentario(sender, instance, using, **kwargs):
+    """El detalle embebe comentarios y el listado muestra su total."""
+    cache.invalidar([instance.ticket_id], using)
+
+
+@receiver(comentarios_creados, sender=Comment)
+def invalidar_cache_comentarios_en_lote(sender, comentarios, **kwargs):
+    cache.invalidar(c.ticket_id for c in comentarios)
+
+
+# Cada conexión nueva alimenta la medición de la petición en curso
+connection_created.connect(
+    instrumentation.instalar_en_conexion, dispatch_uid='tickets_instrumentacion'
+)
+
+# Pragmas del modo producción de SQLite (TICKETS_SQLITE_PRODUCTION)
+connection_created.connect(sqlite.aplicar_pragmas, dispatch_uid='tickets_sqlite_pragmas')
@@ -0,0 +1,237 @@
+"""
+Modo producción de SQLite (opcional, TICKETS_SQLITE_PRODUCTION).
+
+Con el journal de rollback por defecto, un lector bloquea la confirmación
+de un escritor, y dos transacciones que leen antes de escribir (crear un
+ticket y sus comentarios, transicionar con control de versión) se
+bloquean entre sí. SQLite lo resuelve devolviendo "database is locked" de
+inmediato a una de ellas, sin esperar el busy timeout. Con peticiones
+concurrentes las escrituras fallan y el rendimiento se desploma.
+
+En modo producción:
+    - Cada conexión aplica TICKETS_SQLITE_PRAGMAS al abrirse: WAL (las
+      lecturas no bloquean escrituras ni al revés), synchronous=NORMAL (en
+      WAL, sin fsync por commit y sin riesgo de corrupción), mmap, busy
+      timeout y caché de páginas.
+    - Las escrituras de tickets.services (crear, transicionar, comentar y
+      sus variantes en lote) se ejecutan en un único hilo escritor por
+      proceso. Las operaciones que llegan mientras se confirma un grupo se
+      confirman juntas en la siguiente transacción (group commit), cada una
+      en su propio savepoint: un error revierte solo su operación.
+    - Las lecturas siguen en el hilo de cada petición, en paralelo.
+
+La petición espera la confirmación de su grupo antes de responder, así que
+la respuesta nunca anuncia datos sin confirmar. Si pasa
+TICKETS_SQLITE_WRITE_TIMEOUT sin que el escritor tome la operación, se
+cancela y nunca se ejecuta; una vez tomada, la petición espera su
+resultado. Así un error por tiempo agotado significa siempre que no se
+escribió nada y reintentar (p. ej. con la misma Idempotency-Key) no
+duplica la escritura. Con varios procesos cada uno tiene su escritor y
+entre ellos se esperan por el busy timeout.
+
+El comando benchmark_sqlite_concurrency compara ambos modos.
+"""
+import contextvars
+import functools
+import logging
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+
+
+PRIMARIO = 'default'
+
+# Valores por defecto; settings.TICKETS_SQLITE_PRAGMAS los reemplaza
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+# Pragmas que modifican el archivo: no se aplican a conexiones de solo lectura
+PRAGMAS_ESCRITURA = ('journal_mode',)
+
+logger = logging.getLogger('tickets.sqlite')
+
+
+def modo_produccion():
+    return getattr(settings, 'TICKETS_SQLITE_PRODUCTION', False)
+
+
+def pragmas():
+    return getattr(settings, 'TICKETS_SQLITE_PRAGMAS', PRAGMAS)
+
+
+def solo_lectura(conexion):
+    """True para las réplicas abiertas con URI mode=ro."""
+    return 'mode=ro' in str(conexion.settings_dict['NAME'])
+
+
+def aplicar_pragmas(sender, connection, **kwargs):
+    """Receptor de connection_created: configura cada conexión SQLite nueva."""
+    if connection.vendor != 'sqlite' or not modo_produccion():
+        return
+    lectura = solo_lectura(connection)
+    for nombre, valor in pragmas().items():
+        if lectura and nombre in PRAGMAS_ESCRITURA:
+            continue
+        # Conexión DB-API directa: sin instrumentación ni transacción de Django
+        connection.connection.execute(f'PRAGMA {nombre} = {valor}')
+
+
+def pragmas_actuales(alias=PRIMARIO):
+    """Valores vigentes de los pragmas configurados en la conexión `alias`."""
+    with connections[alias].cursor() as cursor:
+        valores = {}
+        for nombre in pragmas():
+            cursor.execute(f'PRAGMA {nombre}')
+            valores[nombre] = cursor.fetchone()[0]
+    return valores
+
+
+class Escritor:
+    """
+    Hilo único que ejecuta las escrituras de un alias con group commit.
+
+    Se inicia con la primera escritura. `confirmaciones` y `operaciones`
+    cuentan transacciones y operaciones confirmadas, para medir cuántas
+    operaciones agrupa cada commit.
+    """
+
+    def __init__(self, alias=PRIMARIO):
+        self.alias = alias
+        self.confirmaciones = 0
+        self.operaciones = 0
+        self._cola = queue.SimpleQueue()
+        self._hilo = None
+        self._candado = threading.Lock()
+
+    def en_hilo_escritor(self):
+        return threading.current_thread() is self._hilo
+
+    def ejecutar(self, funcion, *args, **kwargs):
+        """
+        Ejecuta funcion(*args, **kwargs) en el hilo escritor y espera a que
+        su grupo se confirme.
+
+        Returns:
+            El valor devuelto por la función
+
+        Raises:
+            La excepción de la función (su savepoint se revierte) o la del
+            commit del grupo
+            TimeoutError: Si el escritor no tomó la operación a tiempo; en
+                ese caso se cancela y no se ejecuta
+        """
+        futuro = Future()
+        # El contexto de la petición (medición de consultas, réplica elegida)
+        # acompaña a la operación
+        contexto = contextvars.copy_context()
+        self._iniciar()
+        self._cola.put((contexto, funcion, args, kwargs, futuro))
+        try:
+            return futuro.result(timeout=getattr(settings, 'TICKETS_SQLITE_WRITE_TIMEOUT', 30))
+        except FuturesTimeoutError:
+            if futuro.cancel():
+                raise
+            # Ya en ejecución: su grupo puede confirmarse, hay que esperar el resultado
+            return futuro.result()
+
+    def detener(self):
+        """Termina el hilo tras confirmar lo pendiente (para benchmarks y pruebas)."""
+        with self._candado:
+            hilo, self._hilo = self._hilo, None
+        if hilo is not None:
+            self._cola.put(None)
+            hilo.join()
+
+    def _iniciar(self):
+        with self._candado:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(
+                    target=self._bucle, name=f'tickets-escritor-{self.alias}', daemon=True
+                )
+                self._hilo.start()
+
+    def _bucle(self):
+        maximo = getattr(settings, 'TICKETS_SQLITE_GROUP_COMMIT_MAX', 64)
+        try:
+            while True:
+                trabajo = self._cola.get()
+                if trabajo is None:
+                    return
+                grupo = [trabajo]
+                # Lo que llegó mientras se confirmaba el grupo anterior
+                while len(grupo) < maximo:
+                    try:
+                        trabajo = self._cola.get_nowait()
+                    except queue.Empty:
+                        break
+                    if trabajo is None:
+                        self._confirmar(grupo)
+                        return
+                    grupo.append(trabajo)
+                self._confirmar(grupo)
+        finally:
+            connections[self.alias].close()
+
+    def _confirmar(self, grupo):
+        # Las canceladas por tiempo agotado no se ejecutan
+        grupo = [trabajo for trabajo in grupo if trabajo[-1].set_running_or_notify_cancel()]
+        if not grupo:
+            return
+        resultados = []
+        try:
+            with transaction.atomic(using=self.alias):
+                for contexto, funcion, args, kwargs, futuro in grupo:
+                    try:
+                        with transaction.atomic(using=self.alias):
+                            valor = contexto.run(funcion, *args, **kwargs)
+                    except Exception as e:
+                        resultados.append((futuro, None, e))
+                    else:
+                        resultados.append((futuro, valor, None))
+        except Exception as e:
+            # Falló el commit: ninguna operación del grupo quedó confirmada
+            logger.error('Falló la confirmación de %s escrituras: %s', len(grupo), e)
+            if isinstance(e, DatabaseError):
+                connections[self.alias].close()
+            for *_, futuro in grupo:
+                futuro.set_exception(e)
+            return
+
+        self.confirmaciones += 1
+        self.operaciones += len(grupo)
+        for futuro, valor, error in resultados:
+            if error is not None:
+                futuro.set_exception(error)
+            else:
+                futuro.set_result(valor)
+
+
+escritor = Escritor()
+
+
+def serializada(funcion):
+    """
+    Decorador de las operaciones de escritura de tickets.services.
+
+    En modo producción la operación se ejecuta en el hilo escritor. Si ya
+    se está dentro de una transacción (un lote, un comando, una prueba que
+    revierte), corre en el hilo actual para formar parte de ella.
+    """
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        conexion = connections[escritor.alias]
+        if (
+            not modo_produccion() or conexion.vendor != 'sqlite' or
+            conexion.in_atomic_block or escritor.en_hilo_escritor()
+        ):
+            return funcion(*args, **kwargs)
+        return escritor.ejecutar(funcion, *args, **kwargs)
+    return envoltura
@@ -0,0 +1,120 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import Ticket, TicketCounter
+
+
+def aplicar_deltas(deltas):
+    """
+    Aplica variaciones a los contadores por (estado, prioridad).
+
+    Args:
+        deltas (dict): Mapa {(estado, prioridad): variación}
+    """
+    for (estado, prioridad), delta in deltas.items():
+        if not delta:
+            continue
+
+        actualizados = TicketCounter.objects.filter(
+            estado=estado, prioridad=prioridad
+        ).update(total=F('total') + delta)
+
+        if not actualizados:
+            # Primera vez que aparece la combinación
+            TicketCounter.objects.get_or_create(estado=estado, prioridad=prioridad)
+            TicketCounter.objects.filter(
+                estado=estado, prioridad=prioridad
+            ).update(total=F('total') + delta)
+
+
+def _construir_resumen(filas):
+    """
+    Arma la respuesta de estadísticas a partir de filas agrupadas.
+
+    Args:
+        filas (iterable): Tuplas (estado, prioridad, total)
+
+    Returns:
+        dict: Total, conteo por estado y conteo por prioridad
+    """
+    por_estado = Counter()
+    por_prioridad = Counter()
+
+    for estado, prioridad, total in filas:
+        por_estado[estado] += total
+        por_prioridad[prioridad] += total
+
+    return {
+        'total_tickets': sum(por_estado.values()),
+        'por_estado': {
+            estado: {'nombre': nombre, 'count': por_estado[estado]}
+            for estado, nombre in Ticket.STATUS_CHOICES
+        },
+        'por_prioridad': {
+            prioridad: {'nombre': nombre, 'count': por_prioridad[prioridad]}
+            for prioridad, nombre in Ticket.PRIORITY_CHOICES
+        },
+    }
+
+
+def resumen_contadores():
+    """Estadísticas globales leídas de la tabla de contadores."""
+    filas = TicketCounter.objects.values_list('estado', 'prioridad', 'total')
+    return _construir_resumen(filas)
+
+
+async def aresumen_contadores():
+    """resumen_contadores() con el ORM async."""
+    filas = [fila async for fila in TicketCounter.objects.values_list('estado', 'prioridad', 'total')]
+    return _construir_resumen(filas)
+
+
+def _filas_agrupadas(queryset):
+    return (
+        queryset
+        .prefetch_related(None)
+        .order_by()
+        .values_list('estado', 'prioridad')
+        .annotate(total=Count('id'))
+    )
+
+
+def resumen_queryset(queryset):
+    """
+    Estadísticas de un queryset filtrado con una única consulta agrupada.
+
+    Args:
+        queryset (QuerySet): Tickets ya filtrados
+    """
+    return _construir_resumen(_filas_agrupadas(queryset))
+
+
+async def aresumen_queryset(queryset):
+    """resumen_queryset() con el ORM async."""
+    return _construir_resumen([fila async for fila in _filas_agrupadas(queryset)])
+
+
+def reconstruir_contadores():
+    """
+    Recalcula todos los contadores desde la tabla de tickets.
+
+    Returns:
+        int: Número de combinaciones (estado, prioridad) registradas
+    """
+    filas = (
+        Ticket.objects
+        .order_by()
+        .values_list('estado', 'prioridad')
+        .annotate(total=Count('id'))
+    )
+
+    with transaction.atomic():
+        TicketCounter.objects.all().delete()
+        TicketCounter.objects.bulk_create([
+            TicketCounter(estado=estado, prioridad=prioridad, total=total)
+            for estado, prioridad, total in filas
+        ])
+
+    return len(filas)
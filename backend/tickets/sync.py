@@ -0,0 +1,140 @@
+"""
+Sincronización incremental de tickets por marca de agua.
+
+El cliente guarda la marca devuelta y la envía en ?since= en la siguiente
+sincronización; solo recibe los tickets cuya fecha_actualizacion avanzó y los
+ids de los eliminados. La marca es opaca y contiene dos posiciones keyset
+(fecha, id): una sobre tickets y otra sobre TicketTombstone.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import TicketTombstone
+
+
+class MarcaInvalida(ValueError):
+    """La marca de agua no se pudo decodificar."""
+
+
+class MarcaVencida(Exception):
+    """La marca es anterior a la retención de tickets eliminados."""
+
+
+def codificar_marca(tickets, eliminados):
+    """
+    Args:
+        tickets (tuple): Posición (fecha, id) en tickets o None
+        eliminados (tuple): Posición (fecha, id) en tickets eliminados o None
+
+    Returns:
+        str: Marca opaca para ?since=
+    """
+    datos = {
+        clave: [posicion[0].isoformat(), posicion[1]]
+        for clave, posicion in (('t', tickets), ('e', eliminados))
+        if posicion is not None
+    }
+    crudo = json.dumps(datos, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip('=')
+
+
+def decodificar_marca(marca):
+    """
+    Returns:
+        tuple: (posición en tickets, posición en eliminados); None = desde el inicio
+
+    Raises:
+        MarcaInvalida: Si la marca está mal formada
+    """
+    if not marca:
+        return None, None
+    try:
+        relleno = '=' * (-len(marca) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(marca + relleno))
+        return tuple(
+            (datetime.fromisoformat(datos[clave][0]), int(datos[clave][1]))
+            if clave in datos else None
+            for clave in ('t', 'e')
+        )
+    except (TypeError, ValueError, KeyError, IndexError):
+        raise MarcaInvalida('Marca de sincronización inválida.')
+
+
+def _despues_de(campo_fecha, posicion):
+    """(fecha, id) > posicion, escrito como rango para usar el índice compuesto."""
+    fecha, pk = posicion
+    return Q(**{f'{campo_fecha}__gte': fecha}) & (
+        Q(**{f'{campo_fecha}__gt': fecha}) | Q(id__gt=pk)
+    )
+
+
+def cambios_desde(queryset, marca, limite):
+    """
+    Tickets modificados y eliminados después de la marca.
+
+    Solo se leen filas anteriores a "ahora - TICKETS_SYNC_SAFETY_WINDOW":
+    fecha_actualizacion se asigna antes del commit, y una transacción que
+    confirma tarde podría quedar detrás de una marca ya entregada.
+
+    Args:
+        queryset (QuerySet): Tickets a sincronizar (ya anotados para serializar)
+        marca (str): Marca de la sincronización anterior o vacía
+        limite (int): Máximo de tickets y de eliminados por respuesta
+
+    Returns:
+        dict: {tickets, eliminados, marca, hay_mas}
+
+    Raises:
+        MarcaInvalida: Si la marca está mal formada
+        MarcaVencida: Si hay que hacer una sincronización completa
+    """
+    desde_tickets, desde_eliminados = decodificar_marca(marca)
+    hasta = timezone.now() - timedelta(seconds=getattr(settings, 'TICKETS_SYNC_SAFETY_WINDOW', 1))
+
+    retencion = timezone.now() - timedelta(days=getattr(settings, 'TICKETS_SYNC_TOMBSTONE_DAYS', 30))
+    if desde_eliminados is not None and desde_eliminados[0] < retencion:
+        raise MarcaVencida()
+
+    tickets = queryset.filter(fecha_actualizacion__lt=hasta)
+    if desde_tickets is not None:
+        tickets = tickets.filter(_despues_de('fecha_actualizacion', desde_tickets))
+    tickets = list(tickets.order_by('fecha_actualizacion', 'id')[:limite + 1])
+
+    eliminados = TicketTombstone.objects.filter(fecha_eliminacion__lt=hasta)
+    if desde_eliminados is not None:
+        eliminados = eliminados.filter(_despues_de('fecha_eliminacion', desde_eliminados))
+    elif desde_tickets is None:
+        # Sincronización completa: los eliminados previos no le interesan al cliente
+        eliminados = eliminados.none()
+    eliminados = list(
+        eliminados.order_by('fecha_eliminacion', 'id')
+        .values_list('fecha_eliminacion', 'id', 'ticket_id')[:limite + 1]
+    )
+
+    tickets_mas = len(tickets) > limite
+    eliminados_mas = len(eliminados) > limite
+    tickets = tickets[:limite]
+    eliminados = eliminados[:limite]
+
+    # Cada posición avanza hasta la última fila entregada, o hasta el
+    # límite leído si ya no quedan filas pendientes en esa tabla
+    posicion_tickets = (
+        (tickets[-1].fecha_actualizacion, tickets[-1].id) if tickets else desde_tickets
+    )
+    if not tickets_mas:
+        posicion_tickets = max(posicion_tickets or (hasta, 0), (hasta, 0))
+    posicion_eliminados = eliminados[-1][:2] if eliminados else desde_eliminados
+    if not eliminados_mas:
+        posicion_eliminados = max(posicion_eliminados or (hasta, 0), (hasta, 0))
+
+    return {
+        'tickets': tickets,
+        'eliminados': [fila[2] for fila in eliminados],
+        'marca': codificar_marca(posicion_tickets, posicion_eliminados),
+        'hay_mas': tickets_mas or eliminados_mas,
+    }
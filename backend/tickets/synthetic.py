@@ -0,0 +1,154 @@
+"""
+Generador determinístico de datos sintéticos para pruebas de rendimiento.
+Con la misma semilla produce siempre los mismos tickets y comentarios.
+"""
+import math
+import random
+from itertools import accumulate
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+
+from . import activity, duplicates
+from .importer import fechas_originales
+from .models import Ticket, Comment
+
+
+PALABRAS = [
+    'error', 'login', 'sistema', 'usuario', 'acceso', 'carpeta', 'compartida',
+    'impresora', 'red', 'conexion', 'servidor', 'correo', 'contraseña',
+    'actualizacion', 'software', 'contabilidad', 'equipo', 'configuracion',
+    'capacitacion', 'herramientas', 'lentitud', 'reporte', 'factura', 'vpn',
+    'licencia', 'instalacion', 'pantalla', 'teclado', 'backup', 'base',
+    'datos', 'permisos', 'aplicacion', 'movil', 'navegador', 'certificado',
+    'autenticacion', 'sincronizacion', 'nomina', 'inventario',
+]
+
+SOLICITANTES = [
+    'María García', 'Carlos Rodríguez', 'Ana López', 'Luis Hernández',
+    'Patricia Morales', 'Roberto Silva', 'Laura Gómez', 'Jorge Ramírez',
+]
+
+SILABAS = [
+    'ca', 'de', 'fi', 'go', 'lu', 'ma', 'ne', 'po', 'ra', 'si', 'ta', 'vo',
+    'bri', 'cle', 'dro', 'fla', 'gru', 'pli', 'tre', 'zon',
+]
+
+# Distribución sesgada: la mayoría del histórico está cerrado
+PESOS_ESTADO = {'nuevo': 10, 'en_proceso': 15, 'resuelto': 15, 'cerrado': 60}
+# Los tickets recientes (último 5% del periodo) siguen mayormente abiertos
+PESOS_ESTADO_RECIENTE = {'nuevo': 35, 'en_proceso': 35, 'resuelto': 20, 'cerrado': 10}
+PESOS_PRIORIDAD = {'baja': 30, 'media': 50, 'alta': 20}
+
+# Periodo fijo para que las fechas no dependan del día de ejecución
+FECHA_FIN = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+DIAS_PERIODO = 365 * 3
+
+
+def vocabulario(tamano=5000, semilla=7):
+    """
+    Vocabulario de pseudopalabras: las de soporte técnico primero y luego
+    combinaciones de sílabas. El orden define la frecuencia (ley de Zipf).
+    """
+    rng = random.Random(semilla)
+    palabras = list(PALABRAS)
+    vistas = set(palabras)
+    while len(palabras) < tamano:
+        palabra = ''.join(rng.choice(SILABAS) for _ in range(rng.randint(2, 4)))
+        if palabra not in vistas:
+            vistas.add(palabra)
+            palabras.append(palabra)
+    return palabras
+
+
+VOCABULARIO = vocabulario()
+PESOS_ZIPF = list(accumulate(1 / rango for rango in range(1, len(VOCABULARIO) + 1)))
+
+
+def _frase(rng, minimo, maximo):
+    cantidad = rng.randint(minimo, maximo)
+    return ' '.join(rng.choices(VOCABULARIO, cum_weights=PESOS_ZIPF, k=cantidad))
+
+
+def _cantidad_comentarios(rng, promedio):
+    """
+    Cantidad de comentarios con distribución geométrica: la mayoría de los
+    tickets tiene pocos y unos pocos acumulan muchos (cola larga).
+    """
+    if promedio <= 0:
+        return 0
+    p = 1 / (promedio + 1)
+    return int(math.log(1 - rng.random()) / math.log(1 - p))
+
+
+def generar_tickets(total, semilla=42, lote=5000, comentarios_por_ticket=2):
+    """
+    Inserta tickets y comentarios sintéticos en lotes.
+
+    Las fechas de creación se reparten en los tres años previos a FECHA_FIN
+    y se insertan directamente; los comentarios quedan dentro de los 30 días
+    siguientes a su ticket. El resumen de actividad se calcula antes de
+    insertar y las firmas de duplicados se indexan en la transacción de
+    cada lote; no actualiza contadores ni el índice de búsqueda: quien
+    llama debe reconstruirlos al terminar.
+
+    Args:
+        total (int): Cantidad de tickets a generar
+        semilla (int): Semilla del generador pseudoaleatorio
+        lote (int): Tamaño de cada bulk_create
+        comentarios_por_ticket (float): Promedio de comentarios por ticket
+
+    Returns:
+        int: Cantidad de tickets insertados
+    """
+    rng = random.Random(semilla)
+    estados = list(PESOS_ESTADO)
+    prioridades = list(PESOS_PRIORIDAD)
+    segundos_periodo = DIAS_PERIODO * 86400
+    inicio = FECHA_FIN - timedelta(seconds=segundos_periodo)
+    insertados = 0
+
+    with fechas_originales():
+        while insertados < total:
+            cantidad = min(lote, total - insertados)
+            tickets = []
+            for _ in range(cantidad):
+                desplazamiento = rng.randint(0, segundos_periodo)
+                pesos = (
+                    PESOS_ESTADO_RECIENTE if desplazamiento > segundos_periodo * 0.95
+                    else PESOS_ESTADO
+                )
+                tickets.append(Ticket(
+                    titulo=_frase(rng, 3, 8).capitalize(),
+                    descripcion=_frase(rng, 12, 40),
+                    prioridad=rng.choices(prioridades, weights=PESOS_PRIORIDAD.values())[0],
+                    solicitante=rng.choice(SOLICITANTES),
+                    estado=rng.choices(estados, weights=pesos.values())[0],
+                    fecha_creacion=inicio + timedelta(seconds=desplazamiento),
+                ))
+
+            comentarios = []
+            for ticket in tickets:
+                suyos = [
+                    Comment(
+                        ticket=ticket,
+                        autor=rng.choice(SOLICITANTES),
+                        contenido=_frase(rng, 5, 20),
+                        fecha_creacion=ticket.fecha_creacion + timedelta(
+                            seconds=rng.randint(60, 30 * 86400)
+                        ),
+                    )
+                    for _ in range(_cantidad_comentarios(rng, comentarios_por_ticket))
+                ]
+                activity.asignar(ticket, suyos)
+                comentarios.extend(suyos)
+
+            with transaction.atomic():
+                # bulk_create de los comentarios toma el id recién asignado a su ticket
+                Ticket.objects.bulk_create(tickets)
+                Comment.objects.bulk_create(comentarios)
+                duplicates.indexar_tickets(tickets, nuevos=True)
+
+            insertados += cantidad
+
+    return insertados
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TicketViewSet, CommentViewSet
+from . import async_views
+from .views import TicketViewSet, CommentViewSet, feed_eventos, metricas
 
 # Crear router para las APIs REST
 router = DefaultRouter()
@@ -9,5 +11,15 @@ router.register(r'comments', CommentViewSet, basename='comment')
 
 # URLs de la aplicación
 urlpatterns = [
+    # Antes del router para que 'events' no se interprete como un id de ticket
+    path('api/tickets/events/', feed_eventos, name='ticket-events'),
+]
+
+# Lecturas async nativas (despliegues ASGI); el router atiende lo que delegan
+if getattr(settings, 'TICKETS_ASYNC_READS', False):
+    urlpatterns += async_views.rutas(router)
+
+urlpatterns += [
     path('api/', include(router.urls)),
-]
\ No newline at end of file
+    path('metrics', metricas, name='metrics'),
+]
@@ -0,0 +1,159 @@
+"""
+Reglas de validación de tickets y comentarios.
+
+Las usan los serializers de la API y la importación masiva, que valida
+millones de filas sin instanciar serializers de DRF por cada una. Cada
+función devuelve el valor normalizado o lanza ValidationError de Django,
+que DRF convierte en el error del campo.
+"""
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+
+def _texto(valor):
+    """
+    Texto sin espacios en los extremos ('' si no viene). Como CharField de
+    DRF, acepta números y rechaza el resto de los tipos: un JSON con
+    "titulo": [] debe rechazar la fila, no abortar la importación.
+    """
+    if valor is None:
+        return ''
+    if isinstance(valor, bool) or not isinstance(valor, (str, int, float)):
+        raise ValidationError("No es un texto válido.")
+    return str(valor).strip()
+
+
+def _texto_minimo(valor, minimo, vacio, corto):
+    valor = _texto(valor)
+    if not valor:
+        raise ValidationError(vacio)
+    if len(valor) < minimo:
+        raise ValidationError(corto)
+    return valor
+
+
+def validar_titulo(valor):
+    """Valida que el título sea descriptivo."""
+    return _texto_minimo(
+        valor, 5,
+        "El título no puede estar vacío.",
+        "El título debe tener al menos 5 caracteres."
+    )
+
+
+def validar_descripcion(valor):
+    """Valida que la descripción sea suficientemente detallada."""
+    return _texto_minimo(
+        valor, 10,
+        "La descripción no puede estar vacía.",
+        "La descripción debe tener al menos 10 caracteres."
+    )
+
+
+def validar_solicitante(valor):
+    """Valida el nombre del solicitante."""
+    return _texto_minimo(
+        valor, 2,
+        "El nombre del solicitante no puede estar vacío.",
+        "El nombre debe tener al menos 2 caracteres."
+    )
+
+
+def validar_contenido(valor):
+    """Valida que el comentario tenga contenido significativo."""
+    return _texto_minimo(
+        valor, 3,
+        "El comentario no puede estar vacío.",
+        "El comentario debe tener al menos 3 caracteres."
+    )
+
+
+def _longitud_maxima(modelo, campo, valor):
+    maximo = modelo._meta.get_field(campo).max_length
+    if maximo and len(valor) > maximo:
+        raise ValidationError(f"Asegúrese de que este campo no tenga más de {maximo} caracteres.")
+    return valor
+
+
+def _opcion(modelo, campo, valor, por_defecto):
+    if valor is None or valor == '':
+        return por_defecto
+    opciones = dict(modelo._meta.get_field(campo).choices)
+    if not isinstance(valor, str) or valor not in opciones:
+        raise ValidationError(f'"{valor}" no es una elección válida.')
+    return valor
+
+
+def validar_datos_ticket(datos):
+    """
+    Valida un ticket completo con las reglas de TicketCreateSerializer y
+    las restricciones del modelo (longitudes, opciones, email).
+
+    Args:
+        datos (dict): Valores crudos del ticket
+
+    Returns:
+        dict: Valores normalizados (titulo, descripcion, prioridad, estado,
+              solicitante, email)
+
+    Raises:
+        ValidationError: Con un diccionario de errores por campo
+    """
+    from .models import Ticket
+
+    reglas = {
+        'titulo': lambda v: _longitud_maxima(Ticket, 'titulo', validar_titulo(v)),
+        'descripcion': validar_descripcion,
+        'solicitante': lambda v: _longitud_maxima(Ticket, 'solicitante', validar_solicitante(v)),
+        'prioridad': lambda v: _opcion(Ticket, 'prioridad', v, 'media'),
+        'estado': lambda v: _opcion(Ticket, 'estado', v, 'nuevo'),
+        'email': _validar_email,
+    }
+    return _aplicar(reglas, datos)
+
+
+def validar_datos_comentario(datos):
+    """
+    Valida un comentario con las reglas de CommentSerializer.
+
+    Returns:
+        dict: Valores normalizados (autor, contenido)
+
+    Raises:
+        ValidationError: Con un diccionario de errores por campo
+    """
+    from .models import Comment
+
+    reglas = {
+        'autor': lambda v: _longitud_maxima(Comment, 'autor', _requerido(v)),
+        'contenido': validar_contenido,
+    }
+    return _aplicar(reglas, datos)
+
+
+def _requerido(valor):
+    valor = _texto(valor)
+    if not valor:
+        raise ValidationError("Este campo es requerido.")
+    return valor
+
+
+def _validar_email(valor):
+    valor = _texto(valor)
+    if not valor:
+        return None
+    validate_email(valor)
+    return valor
+
+
+def _aplicar(reglas, datos):
+    limpios = {}
+    errores = {}
+    for campo, regla in reglas.items():
+        try:
+            limpios[campo] = regla(datos.get(campo))
+        except ValidationError as e:
+            errores[campo] = e.messages
+    if errores:
+        raise ValidationError(errores)
+    return limpios
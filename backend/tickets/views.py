@@ -1,32 +1,68 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
-from django.db.models import Q
-from django.shortcuts import get_object_or_404
+from rest_framework.utils.urls import replace_query_param
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db.models import Prefetch
 
-from .models import Ticket, Comment
+from . import (
+    activity, analytics, archive, board, cache, duplicates, events, export,
+    fastpath, idempotency, instrumentation, search, services, stats, sync
+)
+from .fieldsets import CamposSelectivosViewMixin
+from .models import ArchivedTicket, Ticket, Comment, TransicionConcurrenteError
+from .pagination import TicketPagination, CommentPagination
 from .serializers import (
     TicketListSerializer, TicketDetailSerializer, TicketCreateSerializer,
-    TicketTransitionSerializer, CommentSerializer, CommentCreateSerializer
+    TicketTransitionSerializer, TicketBulkTransitionSerializer,
+    CommentSerializer, CommentCreateSerializer, CommentTicketSerializer,
+    TicketResumenSerializer, TicketMergeSerializer
 )
 
 
-class TicketViewSet(viewsets.ModelViewSet):
+class TicketViewSet(CamposSelectivosViewMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar tickets de soporte.
     Incluye operaciones CRUD, filtros y transiciones de estado.
+    
+    Las lecturas aceptan ?fields=a,b,c (solo esas columnas) y
+    ?expand=comentarios (embebe los últimos comentarios; el detalle los
+    embebe por defecto salvo que se use ?fields= o ?expand=).
+    
+    Los tickets archivados (archive_closed) se leen del archivo en el
+    detalle y sus comentarios, y en el listado con ?include_archived=1.
+    
+    El listado se ordena por actividad con ?ordering=-fecha_ultimo_comentario
+    (también por cursor y con archivados) y se filtra con ?actividad_desde=
+    y ?actividad_hasta= (tickets.activity).
     """
     
-    queryset = Ticket.objects.all().prefetch_related('comentarios')
+    queryset = Ticket.objects.all()
+    pagination_class = TicketPagination
+    
+    # Lecturas que pueden servirse desde una réplica (tickets.routers).
+    # changes no: la sincronización incremental necesita ver todo lo confirmado
+    acciones_replica = (
+        'list', 'retrieve', 'comments', 'batch', 'board', 'stats',
+        'analytics_mttr', 'analytics_backlog', 'analytics_throughput',
+    )
     
     def get_serializer_class(self):
         """Selecciona el serializer apropiado según la acción."""
-        if self.action == 'list':
+        if self.action in ('list', 'batch', 'changes', 'board'):
             return TicketListSerializer
-        elif self.action == 'create':
+        elif self.action in ('create', 'bulk_create'):
             return TicketCreateSerializer
         elif self.action == 'transition':
             return TicketTransitionSerializer
+        elif self.action == 'bulk_transition':
+            return TicketBulkTransitionSerializer
+        elif self.action == 'merge':
+            return TicketMergeSerializer
         else:
             return TicketDetailSerializer
     
@@ -37,43 +73,148 @@ class TicketViewSet(viewsets.ModelViewSet):
         """
         queryset = super().get_queryset()
         
+        if self.action in ('list', 'retrieve', 'batch', 'board'):
+            queryset = self.seleccionar_columnas(queryset)
+        
         # Filtro por estado
         estado = self.request.query_params.get('estado', None)
         if estado:
             queryset = queryset.filter(estado=estado)
         
-        # Búsqueda por texto en título y descripción
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(titulo__icontains=search) | 
-                Q(descripcion__icontains=search) |
-                Q(solicitante__icontains=search)
+        # Filtro por fecha del último comentario (tickets.activity)
+        queryset = activity.filtrar(queryset, self.request.query_params)
+        
+        # Búsqueda de texto completo en ticket y comentarios
+        texto = self.request.query_params.get('search', None)
+        if texto:
+            if self.action in ('stats', 'board'):
+                # Los conteos necesitan todas las coincidencias, no sólo las más relevantes
+                queryset = search.coincidencias(queryset, texto)
+            else:
+                queryset = search.filtrar(queryset, texto)
+        
+        return queryset
+    
+    def seleccionar_columnas(self, queryset):
+        """
+        Lee solo las columnas de ?fields= y precarga los últimos comentarios
+        solo con ?expand=comentarios.
+        """
+        serializer_class = self.get_serializer_class()
+        campos = self.campos_pedidos()
+        
+        if campos is not None:
+            columnas = serializer_class.columnas(campos)
+            # La paginación por cursor ordena por fecha_creacion o
+            # fecha_ultimo_comentario e id; el tablero agrupa por estado
+            queryset = queryset.only(
+                *columnas, 'fecha_creacion', 'fecha_ultimo_comentario', 'estado'
             )
         
+        if serializer_class is TicketListSerializer and 'comentarios' in self.expansiones_pedidas():
+            limite = getattr(settings, 'TICKETS_DETAIL_COMMENTS', 20)
+            queryset = queryset.prefetch_related(Prefetch(
+                'comentarios',
+                queryset=Comment.objects.order_by('-fecha_creacion', '-id')[:limite],
+                to_attr='comentarios_recientes',
+            ))
         return queryset
     
+    def get_total_aproximado(self, queryset):
+        """
+        Total para la paginación por cursor sin contar la tabla.
+        Sin búsqueda de texto se responde desde los contadores de estadísticas.
+        """
+        archivados = 0
+        if self.action == 'list' and archive.incluye_archivados(self.request):
+            if self.request.query_params.get('search'):
+                return queryset.count()
+            archivados = archive.contar(self.request.query_params.get('estado'))
+        elif self.request.query_params.get('search'):
+            return None
+        
+        resumen = stats.resumen_contadores()
+        estado = self.request.query_params.get('estado')
+        if estado:
+            return resumen['por_estado'].get(estado, {}).get('count', 0) + archivados
+        return resumen['total_tickets'] + archivados
+    
+    def get_object_o_archivado(self):
+        """get_object() que recurre al archivo si el ticket ya no está activo."""
+        try:
+            return self.get_object()
+        except Http404:
+            lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+            return get_object_or_404(ArchivedTicket.objects.all(), pk=lookup)
+    
+    @cache.respuesta_cacheada()
+    def list(self, request, *args, **kwargs):
+        """
+        Listado filtrado; cacheado por parámetros y versión global.
+        En JSON se lee con .values() sin pasar por el serializer (ver fastpath).
+        """
+        archivados = archive.incluye_archivados(request)
+        if not (fastpath.habilitado(request) or archivados):
+            return super().list(request, *args, **kwargs)
+        
+        campos = self.campos_pedidos()
+        comentarios = 'comentarios' in self.expansiones_pedidas()
+        filas = (
+            self.filter_queryset(self.get_queryset())
+            .prefetch_related(None)
+            .values(*fastpath.columnas(campos))
+        )
+        if archivados:
+            # La mezcla solo sigue órdenes de keyset: el resto se rechaza con 400
+            filas = archive.ConsultaCombinada(
+                filas, self.consultar_archivados(campos), self.paginator.orden_keyset(request)
+            )
+        pagina = self.paginate_queryset(filas)
+        if pagina is not None:
+            return self.get_paginated_response(
+                fastpath.filas_lista(pagina, campos, comentarios, archivados)
+            )
+        return Response(fastpath.filas_lista(filas, campos, comentarios, archivados))
+    
+    def consultar_archivados(self, campos):
+        """
+        Filas de ArchivedTicket con las mismas columnas y filtros que el
+        listado. La búsqueda usa el filtro por subcadena: el índice de texto
+        completo cubre solo la tabla activa.
+        """
+        queryset = activity.filtrar(archive.filtrar_estado(
+            ArchivedTicket.objects.all(), self.request.query_params.get('estado')
+        ), self.request.query_params)
+        texto = self.request.query_params.get('search')
+        if texto:
+            queryset = search.filtro_legado(queryset, texto)
+        return queryset.values(*fastpath.columnas(campos))
+    
+    @cache.respuesta_cacheada(por_ticket=True)
+    def retrieve(self, request, *args, **kwargs):
+        """Detalle; cacheado por la versión del ticket. Lee del archivo si hace falta."""
+        serializer = self.get_serializer(self.get_object_o_archivado())
+        return Response(serializer.data)
+    
+    @idempotency.idempotente()
     def create(self, request, *args, **kwargs):
         """
         Crea un nuevo ticket con validaciones.
-        Retorna el ticket creado con datos completos.
+        Retorna el ticket creado con datos completos y, en
+        `posibles_duplicados`, los tickets abiertos parecidos
+        (tickets.duplicates), que pueden fusionarse con merge.
         """
         serializer = self.get_serializer(data=request.data)
         
         if serializer.is_valid():
-            ticket = serializer.save()
-            
-            # Crear comentario inicial automático
-            Comment.objects.create(
-                ticket=ticket,
-                autor='Sistema',
-                contenido=f'Ticket creado por {ticket.solicitante}'
-            )
+            # Ticket y comentario inicial automático en una sola transacción
+            ticket = services.crear_ticket(serializer.validated_data)
             
             # Retornar respuesta con datos completos
-            response_serializer = TicketDetailSerializer(ticket)
+            datos = TicketDetailSerializer(ticket).data
+            datos['posibles_duplicados'] = duplicates.candidatos(ticket)
             return Response(
-                response_serializer.data, 
+                datos, 
                 status=status.HTTP_201_CREATED
             )
         
@@ -83,6 +224,7 @@ class TicketViewSet(viewsets.ModelViewSet):
         )
     
     @action(detail=True, methods=['patch'], url_path='transition')
+    @idempotency.idempotente()
     def transition(self, request, pk=None):
         """
         Maneja la transición de estado de un ticket.
@@ -105,6 +247,11 @@ class TicketViewSet(viewsets.ModelViewSet):
                     },
                     status=status.HTTP_200_OK
                 )
+            except TransicionConcurrenteError as e:
+                return Response(
+                    {'error': e.messages[0]},
+                    status=status.HTTP_409_CONFLICT
+                )
             except Exception as e:
                 return Response(
                     {'error': str(e)},
@@ -116,19 +263,338 @@ class TicketViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    @action(detail=True, methods=['post'], url_path='merge')
+    def merge(self, request, pk=None):
+        """
+        Fusiona tickets duplicados en este.
+        Body: {"duplicados": [ids]}
+        
+        Los comentarios de los duplicados pasan a este ticket, que registra
+        un comentario de sistema por cada uno, y los duplicados se eliminan.
+        """
+        ticket = self.get_object()
+        serializer = self.get_serializer(data=request.data, context={'ticket': ticket})
+        
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        ids = serializer.validated_data['duplicados']
+        try:
+            ticket = services.fusionar_tickets(ticket, ids)
+        except DjangoValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': f'{len(ids)} ticket(s) fusionado(s) en #{ticket.pk}',
+            'fusionados': ids,
+            'ticket': TicketDetailSerializer(ticket).data,
+        })
+    
+    def _lote(self, request):
+        """
+        Extrae la lista de elementos de una petición en lote.
+        Acepta una lista JSON directa y valida el tamaño máximo.
+        
+        Returns:
+            tuple: (lista, Response de error o None)
+        """
+        elementos = request.data
+        if not isinstance(elementos, list):
+            return None, Response(
+                {'error': 'Se esperaba una lista de elementos.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        maximo = getattr(settings, 'TICKETS_BULK_MAX_BATCH', 100)
+        if not elementos or len(elementos) > maximo:
+            return None, Response(
+                {'error': f'El lote debe tener entre 1 y {maximo} elementos.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return elementos, None
+    
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        """
+        Crea varios tickets en una sola petición.
+        Los válidos se insertan con bulk_create junto a sus comentarios
+        iniciales; los inválidos se reportan por índice.
+        """
+        elementos, error = self._lote(request)
+        if error:
+            return error
+        
+        validos = []
+        errores = []
+        for indice, datos in enumerate(elementos):
+            serializer = self.get_serializer(data=datos)
+            if serializer.is_valid():
+                validos.append(serializer.validated_data)
+            else:
+                errores.append({'indice': indice, 'errores': serializer.errors})
+        
+        tickets = services.crear_tickets_en_lote(validos) if validos else []
+        
+        if not tickets:
+            codigo = status.HTTP_400_BAD_REQUEST
+        elif errores:
+            codigo = status.HTTP_207_MULTI_STATUS
+        else:
+            codigo = status.HTTP_201_CREATED
+        
+        return Response(
+            {
+                'creados': TicketListSerializer(tickets, many=True).data,
+                'errores': errores,
+            },
+            status=codigo
+        )
+    
+    @action(detail=False, methods=['post'], url_path='bulk-transition')
+    def bulk_transition(self, request):
+        """
+        Aplica una lista de transiciones {id, nuevo_estado, comentario?}.
+        Cada una se valida (estado y flujo) y los errores se reportan por ítem.
+        """
+        elementos, error = self._lote(request)
+        if error:
+            return error
+        
+        serializer = self.get_serializer(data=elementos, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        ids = [item['id'] for item in serializer.validated_data]
+        if len(ids) != len(set(ids)):
+            return Response(
+                {'error': 'Cada ticket puede aparecer una sola vez por lote.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        transicionados, errores = services.transicionar_en_lote(serializer.validated_data)
+        
+        return Response(
+            {
+                'transicionados': [
+                    {'id': t.id, 'estado': t.estado, 'version': t.version}
+                    for t in transicionados
+                ],
+                'errores': errores,
+            },
+            status=status.HTTP_207_MULTI_STATUS if errores else status.HTTP_200_OK
+        )
+    
+    @action(detail=False, methods=['get'], url_path='batch')
+    def batch(self, request):
+        """
+        Obtiene varios tickets por id en una sola consulta: ?ids=1,2,3
+        Respeta el orden pedido e informa los ids inexistentes.
+        """
+        try:
+            ids = [
+                int(valor) for valor in request.query_params.get('ids', '').split(',')
+                if valor.strip()
+            ]
+        except ValueError:
+            return Response(
+                {'error': 'El parámetro ids debe ser una lista de enteros separados por coma.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        maximo = getattr(settings, 'TICKETS_BULK_MAX_BATCH', 100)
+        if not ids or len(ids) > maximo:
+            return Response(
+                {'error': f'Se deben pedir entre 1 y {maximo} ids.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        queryset = self.get_queryset().filter(id__in=ids)
+        # Se indexa por la fila leída: ?fields= puede omitir el id
+        if fastpath.habilitado(request):
+            campos = self.campos_pedidos()
+            filas = list(queryset.prefetch_related(None).values(*fastpath.columnas(campos)))
+            datos = fastpath.filas_lista(filas, campos, 'comentarios' in self.expansiones_pedidas())
+            encontrados = {fila['id']: dato for fila, dato in zip(filas, datos)}
+        else:
+            tickets = list(queryset)
+            datos = self.get_serializer(tickets, many=True).data
+            encontrados = {ticket.id: dato for ticket, dato in zip(tickets, datos)}
+        
+        return Response({
+            'results': [encontrados[pk] for pk in dict.fromkeys(ids) if pk in encontrados],
+            'no_encontrados': [pk for pk in dict.fromkeys(ids) if pk not in encontrados],
+        })
+    
+    @action(detail=False, methods=['get'], url_path='board')
+    @cache.respuesta_cacheada()
+    def board(self, request):
+        """
+        Tablero Kanban en una consulta: los primeros ?page_size= tickets de
+        cada estado, el total de cada columna y un enlace `next` por columna.
+        ?columnas=nuevo,en_proceso limita las columnas y ?cursor_<estado>=
+        continúa una de ellas. Acepta ?search=, ?fields= y ?expand=.
+        """
+        paginador = self.paginator
+        limite = paginador.get_page_size(request)
+        estados = board.estados_pedidos(request)
+        posiciones = {
+            estado: paginador.decodificar_cursor(
+                request.query_params.get(f'{board.PREFIJO_CURSOR}{estado}')
+            )[0]
+            for estado in estados
+        }
+        
+        filtrados = self.get_queryset()
+        tickets = board.primeros_por_estado(
+            filtrados, estados, limite, posiciones,
+            base=self.seleccionar_columnas(Ticket.objects.all())
+        )
+        rapido = fastpath.habilitado(request)
+        if rapido:
+            columnas = (*fastpath.columnas(self.campos_pedidos()), 'estado', 'posicion')
+            tickets = tickets.prefetch_related(None).values(*dict.fromkeys(columnas))
+        
+        # La fila limite + 1 de cada estado solo indica que hay más
+        visibles, por_estado, ultimo, hay_mas = [], {e: [] for e in estados}, {}, set()
+        for ticket in tickets:
+            estado = paginador._valor(ticket, 'estado')
+            if paginador._valor(ticket, 'posicion') > limite:
+                hay_mas.add(estado)
+                continue
+            visibles.append(ticket)
+            ultimo[estado] = ticket
+        
+        if rapido:
+            datos = fastpath.filas_lista(
+                visibles, self.campos_pedidos(), 'comentarios' in self.expansiones_pedidas()
+            )
+        else:
+            datos = self.get_serializer(visibles, many=True).data
+        for ticket, dato in zip(visibles, datos):
+            por_estado[paginador._valor(ticket, 'estado')].append(dato)
+        
+        total = board.totales(
+            filtrados,
+            bool(request.query_params.get('search')) or activity.filtra(request.query_params)
+        )
+        nombres = dict(Ticket.STATUS_CHOICES)
+        url = request.build_absolute_uri()
+        
+        resultado = []
+        for estado in estados:
+            siguiente = None
+            if estado in hay_mas:
+                cursor = paginador.codificar_cursor(ultimo[estado], hacia_atras=False)
+                siguiente = replace_query_param(
+                    replace_query_param(url, board.PARAMETRO_COLUMNAS, estado),
+                    f'{board.PREFIJO_CURSOR}{estado}', cursor
+                )
+            resultado.append({
+                'estado': estado,
+                'nombre': nombres[estado],
+                'total': total.get(estado, 0),
+                'next': siguiente,
+                'results': por_estado[estado],
+            })
+        return Response({'columnas': resultado})
+    
+    @action(detail=False, methods=['get'], url_path='changes')
+    def changes(self, request):
+        """
+        Sincronización incremental: ?since=<marca>
+        Devuelve los tickets modificados y los ids eliminados después de la
+        marca, y la marca para la próxima llamada. Sin ?since= entrega todos
+        los tickets. Con hay_mas=true se debe volver a llamar con la nueva marca.
+        """
+        limite = getattr(settings, 'TICKETS_SYNC_PAGE_SIZE', 500)
+        try:
+            # Sin filtros: un ticket que sale de un filtro también es un cambio
+            cambios = sync.cambios_desde(
+                Ticket.objects.all(),
+                request.query_params.get('since'),
+                limite
+            )
+        except sync.MarcaInvalida as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except sync.MarcaVencida:
+            return Response(
+                {'error': 'La marca es demasiado antigua; sincronice sin ?since=.', 'reinicio': True},
+                status=status.HTTP_410_GONE
+            )
+        
+        return Response({
+            'tickets': self.get_serializer(cambios['tickets'], many=True).data,
+            'eliminados': cambios['eliminados'],
+            'marca': cambios['marca'],
+            'hay_mas': cambios['hay_mas'],
+        })
+    
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Exportación completa en streaming: ?formato=csv|ndjson
+        Filtros: estado, prioridad, desde, hasta (fecha de creación, ISO 8601).
+        La memoria usada es constante: se lee y se escribe por bloques.
+        """
+        formato = request.query_params.get('formato', 'csv')
+        try:
+            tickets = export.filtrar(
+                Ticket.objects.all(),
+                estado=request.query_params.get('estado'),
+                prioridad=request.query_params.get('prioridad'),
+                desde=request.query_params.get('desde'),
+                hasta=request.query_params.get('hasta'),
+            )
+            lineas = export.lineas(formato, tickets)
+        except export.FiltroInvalido as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        contenido = export.bloques(lineas)
+        if isinstance(request._request, ASGIRequest):
+            contenido = export.bloques_async(contenido)
+        
+        tipos = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson'}
+        respuesta = StreamingHttpResponse(contenido, content_type=tipos[formato])
+        respuesta['Content-Disposition'] = f'attachment; filename="tickets.{formato}"'
+        return respuesta
+    
     @action(detail=True, methods=['get', 'post'], url_path='comments')
+    @idempotency.idempotente()
     def comments(self, request, pk=None):
         """
         Gestiona los comentarios de un ticket específico.
         GET: Lista comentarios ordenados cronológicamente.
         POST: Agrega nuevo comentario al ticket.
+        
+        Los tickets archivados solo admiten GET.
         """
-        ticket = self.get_object()
+        if request.method == 'GET':
+            ticket = self.get_object_o_archivado()
+        else:
+            ticket = self.get_object()
         
         if request.method == 'GET':
-            # Listar comentarios del ticket
+            # Listar comentarios del ticket (?fields= limita las columnas)
+            campos = self.campos_pedidos(CommentSerializer)
+            serializer_class = CommentSerializer
             comentarios = ticket.comentarios.all()
-            serializer = CommentSerializer(comentarios, many=True)
+            if campos is not None:
+                comentarios = comentarios.only(
+                    *CommentSerializer.columnas(campos), 'ticket', 'fecha_creacion'
+                )
+            if 'ticket' in self.expansiones_pedidas(CommentSerializer):
+                # El manager asigna el ticket ya leído: no hace falta JOIN
+                serializer_class = CommentTicketSerializer
+            
+            # Paginación por cursor opcional (?paginacion=cursor o ?cursor=)
+            paginator = CommentPagination()
+            if paginator.usa_cursor(request):
+                pagina = paginator.paginate_queryset(comentarios, request)
+                serializer = serializer_class(pagina, many=True, campos=campos)
+                return paginator.get_paginated_response(serializer.data)
+            
+            serializer = serializer_class(comentarios, many=True, campos=campos)
             return Response(serializer.data)
         
         elif request.method == 'POST':
@@ -136,7 +602,7 @@ class TicketViewSet(viewsets.ModelViewSet):
             serializer = CommentCreateSerializer(data=request.data)
             
             if serializer.is_valid():
-                comment = serializer.save(ticket=ticket)
+                comment = services.agregar_comentario(ticket, serializer.validated_data)
                 response_serializer = CommentSerializer(comment)
                 return Response(
                     response_serializer.data,
@@ -149,53 +615,159 @@ class TicketViewSet(viewsets.ModelViewSet):
             )
     
     @action(detail=False, methods=['get'], url_path='stats')
+    @cache.respuesta_cacheada()
     def stats(self, request):
         """
         Proporciona estadísticas básicas de los tickets.
         Útil para dashboards y reportes.
+        
+        Sin filtros se responde desde la tabla de contadores; con filtros
+        de estado, búsqueda o actividad se usa una única consulta agrupada.
         """
-        queryset = self.get_queryset()
-        
-        # Contar tickets por estado
-        stats_por_estado = {}
-        for estado, nombre in Ticket.STATUS_CHOICES:
-            count = queryset.filter(estado=estado).count()
-            stats_por_estado[estado] = {
-                'nombre': nombre,
-                'count': count
-            }
-        
-        # Contar tickets por prioridad
-        stats_por_prioridad = {}
-        for prioridad, nombre in Ticket.PRIORITY_CHOICES:
-            count = queryset.filter(prioridad=prioridad).count()
-            stats_por_prioridad[prioridad] = {
-                'nombre': nombre,
-                'count': count
-            }
+        filtrado = activity.filtra(request.query_params) or any(
+            request.query_params.get(param)
+            for param in ('estado', 'search')
+        )
         
-        return Response({
-            'total_tickets': queryset.count(),
-            'por_estado': stats_por_estado,
-            'por_prioridad': stats_por_prioridad,
-        })
+        if filtrado:
+            return Response(stats.resumen_queryset(self.get_queryset()))
+        
+        return Response(stats.resumen_contadores())
+    
+    def _analitica(self, reporte):
+        """Responde un reporte de tickets.analytics con los parámetros del rango."""
+        try:
+            granularidad, periodos, prioridad = analytics.rango(self.request.query_params)
+        except analytics.RangoInvalido as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(reporte(granularidad, periodos, prioridad))
+    
+    @action(detail=False, methods=['get'], url_path='analytics/mttr')
+    @cache.respuesta_cacheada()
+    def analytics_mttr(self, request):
+        """
+        Tiempo medio de resolución por período y tiempo medio en cada estado.
+        Parámetros: granularidad=hora|dia, desde, hasta, prioridad.
+        Se lee de los acumulados que mantiene rollup_metrics.
+        """
+        return self._analitica(analytics.mttr)
+    
+    @action(detail=False, methods=['get'], url_path='analytics/backlog')
+    @cache.respuesta_cacheada()
+    def analytics_backlog(self, request):
+        """Tickets en cada estado al cierre de cada período (mismos parámetros)."""
+        return self._analitica(analytics.backlog)
+    
+    @action(detail=False, methods=['get'], url_path='analytics/throughput')
+    @cache.respuesta_cacheada()
+    def analytics_throughput(self, request):
+        """Tickets creados, resueltos y cerrados por período (mismos parámetros)."""
+        return self._analitica(analytics.throughput)
+    
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        """
+        Aciertos y fallos de la caché de respuestas por acción, en este
+        proceso. ?reiniciar=1 pone los contadores en cero.
+        """
+        resumen = cache.estadisticas()
+        if request.query_params.get('reiniciar') == '1':
+            cache.reiniciar_estadisticas()
+        return Response(resumen)
 
 
-class CommentViewSet(viewsets.ReadOnlyModelViewSet):
+class CommentViewSet(CamposSelectivosViewMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet de solo lectura para comentarios.
     Permite consultar comentarios individuales si es necesario.
+    
+    Acepta ?fields= y ?expand=ticket (resumen del ticket en lugar del id,
+    con un JOIN solo en ese caso).
     """
     
-    queryset = Comment.objects.all().select_related('ticket')
+    queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    pagination_class = CommentPagination
+    acciones_replica = ('list', 'retrieve')
+    
+    def get_serializer_class(self):
+        if 'ticket' in self.expansiones_pedidas(CommentSerializer):
+            return CommentTicketSerializer
+        return CommentSerializer
     
     def get_queryset(self):
         """Filtra comentarios por ticket si se especifica."""
         queryset = super().get_queryset()
         
+        campos = self.campos_pedidos(CommentSerializer)
+        expandir_ticket = 'ticket' in self.expansiones_pedidas(CommentSerializer)
+        if expandir_ticket:
+            queryset = queryset.select_related('ticket')
+        if campos is not None or expandir_ticket:
+            columnas = CommentSerializer.columnas(campos) + ['fecha_creacion']
+            if expandir_ticket:
+                columnas += ['ticket'] + [
+                    f'ticket__{campo}' for campo in TicketResumenSerializer.Meta.fields
+                ]
+            queryset = queryset.only(*columnas)
+        
         ticket_id = self.request.query_params.get('ticket', None)
         if ticket_id:
             queryset = queryset.filter(ticket_id=ticket_id)
         
-        return queryset
\ No newline at end of file
+        return queryset
+
+
+async def feed_eventos(request):
+    """
+    Feed de cambios de tickets por Server-Sent Events.
+    
+    Envía ticket_creado, ticket_transicionado, ticket_eliminado y
+    comentario_creado a medida que se confirman. Para reanudar sin recargar
+    el tablero se envía el último id recibido en la cabecera Last-Event-ID
+    (EventSource lo hace solo al reconectar) o en ?last_event_id=. Si ese id
+    ya no está retenido se envía un evento 'reinicio'.
+    
+    Requiere servir la aplicación con ASGI (tickets_system.asgi).
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'El feed de eventos requiere un servidor ASGI.'},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+    
+    ultimo_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        ultimo_id = int(ultimo_id) if ultimo_id else None
+    except ValueError:
+        return JsonResponse(
+            {'error': 'last_event_id debe ser un entero.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    espera = getattr(settings, 'TICKETS_EVENTS_HEARTBEAT', 15)
+    
+    async def flujo():
+        yield 'retry: 3000\n\n'
+        async for evento in events.get_broker().escuchar(ultimo_id, espera):
+            # Latido: mantiene viva la conexión a través de proxies
+            yield ': ping\n\n' if evento is None else events.formatear_sse(evento)
+    
+    respuesta = StreamingHttpResponse(flujo(), content_type='text/event-stream')
+    respuesta['Cache-Control'] = 'no-cache'
+    respuesta['X-Accel-Buffering'] = 'no'
+    return respuesta
+
+
+def metricas(request):
+    """
+    Métricas de la API en formato de texto de Prometheus: peticiones,
+    duración, consultas, tiempo en la base y de serialización por vista,
+    y aciertos de la caché de respuestas. Acumuladas por proceso.
+    """
+    if not getattr(settings, 'TICKETS_METRICS_ENABLED', True):
+        return HttpResponse(status=404)
+    return HttpResponse(
+        instrumentation.exportar_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -11,10 +11,12 @@ import ErrorMessage from './components/ErrorMessage';
 const AppContent = () => {
   const { 
     tickets, 
+    columns,
     selectedTicket, 
     loading, 
     error, 
     loadTickets, 
+    loadMoreColumn,
     loadTicket, 
     clearSelectedTicket, 
     clearError,
@@ -24,6 +26,10 @@ const AppContent = () => {
   const [showCreateForm, setShowCreateForm] = useState(false);
   const [showDetailModal, setShowDetailModal] = useState(false);
 
+  // Totales del tablero: los tickets cargados son solo la primera página de cada columna
+  const totalOf = (estado) => columns[estado]?.total ?? 0;
+  const boardTotal = Object.values(columns).reduce((sum, column) => sum + column.total, 0);
+
   // Cargar tickets al montar el componente y cuando cambien los filtros
   useEffect(() => {
     loadTickets(filters);
@@ -98,24 +104,24 @@ const AppContent = () => {
             <div className="flex items-center justify-between">
               <div className="flex items-center space-x-6">
                 <div className="text-center">
-                  <div className="text-2xl font-bold text-gray-900">{tickets.length}</div>
+                  <div className="text-2xl font-bold text-gray-900">{boardTotal}</div>
                   <div className="text-sm text-gray-500">Total Tickets</div>
                 </div>
                 <div className="text-center">
                   <div className="text-2xl font-bold text-blue-600">
-                    {tickets.filter(t => t.estado === 'nuevo').length}
+                    {totalOf('nuevo')}
                   </div>
                   <div className="text-sm text-gray-500">Nuevos</div>
                 </div>
                 <div className="text-center">
                   <div className="text-2xl font-bold text-yellow-600">
-                    {tickets.filter(t => t.estado === 'en_proceso').length}
+                    {totalOf('en_proceso')}
                   </div>
                   <div className="text-sm text-gray-500">En Proceso</div>
                 </div>
                 <div className="text-center">
                   <div className="text-2xl font-bold text-green-600">
-                    {tickets.filter(t => t.estado === 'resuelto').length}
+                    {totalOf('resuelto')}
                   </div>
                   <div className="text-sm text-gray-500">Resueltos</div>
                 </div>
@@ -131,7 +137,9 @@ const AppContent = () => {
         {/* Tablero Kanban */}
         <KanbanBoard
           tickets={tickets}
+          columns={columns}
           onTicketClick={handleTicketClick}
+          onLoadMore={loadMoreColumn}
           loading={loading}
         />
 
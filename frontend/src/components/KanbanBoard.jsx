@@ -2,7 +2,18 @@ import React from 'react';
 import TicketCard from './TicketCard';
 import { TICKET_STATES } from '../services/api';
 
-const KanbanColumn = ({ title, tickets, color, onTicketClick }) => {
+const KanbanColumn = ({ title, tickets, total, next, color, onTicketClick, onLoadMore }) => {
+  const [loadingMore, setLoadingMore] = React.useState(false);
+
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    try {
+      await onLoadMore(next);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const getColumnColors = (color) => {
     const colorMap = {
       blue: 'border-blue-200 bg-blue-50',
@@ -30,7 +41,7 @@ const KanbanColumn = ({ title, tickets, color, onTicketClick }) => {
         <div className="flex items-center justify-between">
           <h3 className="font-semibold text-lg">{title}</h3>
           <span className="bg-white bg-opacity-70 text-sm font-medium px-2 py-1 rounded-full">
-            {tickets.length}
+            {total}
           </span>
         </div>
       </div>
@@ -54,12 +65,21 @@ const KanbanColumn = ({ title, tickets, color, onTicketClick }) => {
             />
           ))
         )}
+        {next && (
+          <button
+            onClick={handleLoadMore}
+            disabled={loadingMore}
+            className="w-full py-2 text-sm font-medium text-gray-600 bg-white bg-opacity-70 rounded-md hover:bg-opacity-100 disabled:opacity-50"
+          >
+            {loadingMore ? 'Cargando...' : `Cargar más (${total - tickets.length} restantes)`}
+          </button>
+        )}
       </div>
     </div>
   );
 };
 
-const KanbanBoard = ({ tickets, onTicketClick, loading }) => {
+const KanbanBoard = ({ tickets, columns = {}, onTicketClick, onLoadMore, loading }) => {
   // Agrupar tickets por estado
   const ticketsByState = React.useMemo(() => {
     const grouped = {};
@@ -79,6 +99,10 @@ const KanbanBoard = ({ tickets, onTicketClick, loading }) => {
     return grouped;
   }, [tickets]);
 
+  // Total real de la columna (tablero); sin él, los tickets cargados
+  const totalOf = (state) => columns[state]?.total ?? ticketsByState[state]?.length ?? 0;
+  const boardTotal = Object.keys(TICKET_STATES).reduce((sum, state) => sum + totalOf(state), 0);
+
   if (loading) {
     return (
       <div className="flex justify-center items-center py-12">
@@ -96,7 +120,7 @@ const KanbanBoard = ({ tickets, onTicketClick, loading }) => {
           Tablero de Tickets
         </h2>
         <div className="text-sm text-gray-500">
-          Total: {tickets.length} tickets
+          Total: {boardTotal} tickets
         </div>
       </div>
 
@@ -107,8 +131,11 @@ const KanbanBoard = ({ tickets, onTicketClick, loading }) => {
             key={stateKey}
             title={stateInfo.name}
             tickets={ticketsByState[stateKey] || []}
+            total={totalOf(stateKey)}
+            next={columns[stateKey]?.next}
             color={stateInfo.color}
             onTicketClick={onTicketClick}
+            onLoadMore={(next) => onLoadMore(stateKey, next)}
           />
         ))}
       </div>
@@ -116,7 +143,7 @@ const KanbanBoard = ({ tickets, onTicketClick, loading }) => {
       {/* Estadísticas rápidas */}
       <div className="grid grid-cols-2 md:grid-cols-4 gap-4 mt-8">
         {Object.entries(TICKET_STATES).map(([stateKey, stateInfo]) => {
-          const count = ticketsByState[stateKey]?.length || 0;
+          const count = totalOf(stateKey);
           return (
             <div key={stateKey} className="bg-white p-4 rounded-lg border border-gray-200">
               <div className="flex items-center">
@@ -1,9 +1,11 @@
-import React, { createContext, useContext, useReducer, useCallback } from 'react';
+import React, { createContext, useContext, useReducer, useCallback, useEffect, useRef } from 'react';
 import { ticketsAPI, commentsAPI, handleAPIError } from '../services/api';
 
 // Estado inicial
 const initialState = {
   tickets: [],
+  // Total y enlace a la página siguiente de cada columna del tablero
+  columns: {},
   selectedTicket: null,
   comments: [],
   filters: {
@@ -19,7 +21,8 @@ const initialState = {
 const ACTIONS = {
   SET_LOADING: 'SET_LOADING',
   SET_ERROR: 'SET_ERROR',
-  SET_TICKETS: 'SET_TICKETS',
+  SET_BOARD: 'SET_BOARD',
+  APPEND_COLUMN: 'APPEND_COLUMN',
   SET_SELECTED_TICKET: 'SET_SELECTED_TICKET',
   SET_COMMENTS: 'SET_COMMENTS',
   ADD_COMMENT: 'ADD_COMMENT',
@@ -28,6 +31,81 @@ const ACTIONS = {
   SET_FILTERS: 'SET_FILTERS',
   SET_STATS: 'SET_STATS',
   CLEAR_ERROR: 'CLEAR_ERROR',
+  APPLY_EVENT: 'APPLY_EVENT',
+};
+
+// Indica si un ticket recibido por el feed cumple los filtros activos
+const matchesFilters = (ticket, filters) => {
+  if (filters.estado && ticket.estado !== filters.estado) return false;
+  // La búsqueda se resuelve en el servidor: no se agregan tickets nuevos
+  return !filters.search;
+};
+
+// Suma `delta` al total de una columna cargada del tablero
+const adjustTotal = (columns, estado, delta) => {
+  if (!columns[estado]) return columns;
+  return { ...columns, [estado]: { ...columns[estado], total: columns[estado].total + delta } };
+};
+
+// Total y enlace `next` de cada columna devuelta por /tickets/board/
+const boardColumns = (columnas) => {
+  const columns = {};
+  columnas.forEach(({ estado, total, next }) => {
+    columns[estado] = { total, next };
+  });
+  return columns;
+};
+
+// Aplica un evento del feed de cambios sobre la lista de tickets
+const applyTicketEvent = (state, { type, data }) => {
+  const existing = state.tickets.find(ticket => ticket.id === data.ticket_id);
+  const exists = Boolean(existing);
+
+  switch (type) {
+    case 'ticket_creado':
+      if (exists || !matchesFilters(data, state.filters)) return state;
+      return {
+        ...state,
+        tickets: [{ ...data, total_comentarios: 0 }, ...state.tickets],
+        columns: adjustTotal(state.columns, data.estado, 1),
+      };
+
+    case 'ticket_transicionado': {
+      if (!exists) return state;
+      let columns = state.columns;
+      if (existing.estado !== data.estado) {
+        columns = adjustTotal(adjustTotal(columns, existing.estado, -1), data.estado, 1);
+      }
+      return {
+        ...state,
+        tickets: state.tickets
+          .map(ticket => ticket.id === data.ticket_id ? { ...ticket, ...data } : ticket)
+          .filter(ticket => ticket.id !== data.ticket_id || matchesFilters(ticket, state.filters)),
+        columns,
+      };
+    }
+
+    case 'ticket_eliminado':
+      return {
+        ...state,
+        tickets: state.tickets.filter(ticket => ticket.id !== data.ticket_id),
+        columns: exists ? adjustTotal(state.columns, existing.estado, -1) : state.columns,
+      };
+
+    case 'comentario_creado':
+      if (!exists) return state;
+      return {
+        ...state,
+        tickets: state.tickets.map(ticket =>
+          ticket.id === data.ticket_id
+            ? { ...ticket, total_comentarios: (ticket.total_comentarios || 0) + 1 }
+            : ticket
+        ),
+      };
+
+    default:
+      return state;
+  }
 };
 
 // Reducer para manejar el estado
@@ -42,8 +120,25 @@ const ticketsReducer = (state, action) => {
     case ACTIONS.CLEAR_ERROR:
       return { ...state, error: null };
     
-    case ACTIONS.SET_TICKETS:
-      return { ...state, tickets: action.payload, loading: false };
+    case ACTIONS.SET_BOARD:
+      return {
+        ...state,
+        tickets: action.payload.flatMap(columna => columna.results),
+        columns: boardColumns(action.payload),
+        loading: false,
+      };
+    
+    case ACTIONS.APPEND_COLUMN: {
+      const loaded = new Set(state.tickets.map(ticket => ticket.id));
+      return {
+        ...state,
+        tickets: [
+          ...state.tickets,
+          ...action.payload.flatMap(columna => columna.results).filter(ticket => !loaded.has(ticket.id)),
+        ],
+        columns: { ...state.columns, ...boardColumns(action.payload) },
+      };
+    }
     
     case ACTIONS.SET_SELECTED_TICKET:
       return { ...state, selectedTicket: action.payload, loading: false };
@@ -87,6 +182,9 @@ const ticketsReducer = (state, action) => {
     case ACTIONS.SET_STATS:
       return { ...state, stats: action.payload };
     
+    case ACTIONS.APPLY_EVENT:
+      return applyTicketEvent(state, action.payload);
+    
     default:
       return state;
   }
@@ -98,13 +196,27 @@ const TicketsContext = createContext();
 // Provider del contexto
 export const TicketsProvider = ({ children }) => {
   const [state, dispatch] = useReducer(ticketsReducer, initialState);
+  const filtersRef = useRef(state.filters);
+  filtersRef.current = state.filters;
 
-  // Cargar tickets con filtros
+  // Cargar el tablero con filtros: primeros tickets y total de cada columna
   const loadTickets = useCallback(async (filters = {}) => {
     dispatch({ type: ACTIONS.SET_LOADING, payload: true });
     try {
-      const data = await ticketsAPI.getTickets(filters);
-      dispatch({ type: ACTIONS.SET_TICKETS, payload: data.results || data });
+      // Con filtro de estado solo se pide esa columna
+      const data = await ticketsAPI.getBoard(filters, { estado: filters.estado || undefined });
+      dispatch({ type: ACTIONS.SET_BOARD, payload: data.columnas });
+    } catch (error) {
+      dispatch({ type: ACTIONS.SET_ERROR, payload: handleAPIError(error) });
+    }
+  }, []);
+
+  // Siguiente página de una columna a partir de su enlace `next`
+  const loadMoreColumn = useCallback(async (estado, next) => {
+    try {
+      const cursor = new URL(next).searchParams.get(`cursor_${estado}`);
+      const data = await ticketsAPI.getBoard(filtersRef.current, { estado, cursor });
+      dispatch({ type: ACTIONS.APPEND_COLUMN, payload: data.columnas });
     } catch (error) {
       dispatch({ type: ACTIONS.SET_ERROR, payload: handleAPIError(error) });
     }
@@ -197,12 +309,25 @@ export const TicketsProvider = ({ children }) => {
     dispatch({ type: ACTIONS.SET_COMMENTS, payload: [] });
   }, []);
 
+  // Feed de cambios: actualiza el tablero sin recargar la lista completa
+  useEffect(() => {
+    return ticketsAPI.subscribeToEvents((event) => {
+      if (event.type === 'reinicio') {
+        // Se perdieron eventos: recargar una sola vez la lista filtrada
+        loadTickets(filtersRef.current);
+        return;
+      }
+      dispatch({ type: ACTIONS.APPLY_EVENT, payload: event });
+    });
+  }, [loadTickets]);
+
   const value = {
     // Estado
     ...state,
     
     // Acciones
     loadTickets,
+    loadMoreColumn,
     loadTicket,
     createTicket,
     transitionTicket,
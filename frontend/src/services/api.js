@@ -318,8 +318,10 @@ const getValidTransitions = (currentState) => {
 };
 
 // Configuración base de axios (solo para desarrollo local)
+const API_BASE_URL = 'http://localhost:8000/api';
+
 const api = axios.create({
-  baseURL: 'http://localhost:8000/api',
+  baseURL: API_BASE_URL,
   timeout: 10000,
   headers: {
     'Content-Type': 'application/json',
@@ -335,6 +337,31 @@ api.interceptors.response.use(
   }
 );
 
+// Clave única por operación de escritura (cabecera Idempotency-Key)
+const nuevaClaveIdempotencia = () => {
+  if (typeof crypto !== 'undefined' && crypto.randomUUID) {
+    return crypto.randomUUID();
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+};
+
+// Escritura que se puede reintentar sin duplicar: los reintentos llevan la
+// misma Idempotency-Key y el servidor repite la respuesta original.
+// Solo se reintenta si no llegó respuesta (timeout o error de red).
+const escrituraIdempotente = async (method, url, data, reintentos = 2) => {
+  const headers = { 'Idempotency-Key': nuevaClaveIdempotencia() };
+  for (let intento = 0; ; intento++) {
+    try {
+      return await api.request({ method, url, data, headers });
+    } catch (error) {
+      if (error.response || intento >= reintentos) {
+        throw error;
+      }
+      await new Promise(resolve => setTimeout(resolve, 500 * 2 ** intento));
+    }
+  }
+};
+
 // Servicio para tickets
 export const ticketsAPI = {
   getTickets: async (filters = {}) => {
@@ -351,6 +378,35 @@ export const ticketsAPI = {
     return response.data;
   },
 
+  // Tablero Kanban: primeros tickets y total de cada estado en una petición.
+  // Con { estado, cursor } carga la siguiente página de una sola columna.
+  getBoard: async (filters = {}, { estado, cursor, pageSize } = {}) => {
+    if (isDemoMode) {
+      const tickets = await mockAPI.getTickets(filters);
+      return {
+        columnas: Object.keys(TICKET_STATES).map(key => {
+          const results = tickets.filter(t => t.estado === key);
+          return {
+            estado: key,
+            nombre: getStateDisplayName(key),
+            total: results.length,
+            next: null,
+            results,
+          };
+        }),
+      };
+    }
+
+    const params = new URLSearchParams();
+    if (filters.search) params.append('search', filters.search);
+    if (pageSize) params.append('page_size', pageSize);
+    if (estado) params.append('columnas', estado);
+    if (estado && cursor) params.append(`cursor_${estado}`, cursor);
+
+    const response = await api.get(`/tickets/board/?${params.toString()}`);
+    return response.data;
+  },
+
   getTicket: async (id) => {
     if (isDemoMode) {
       return mockAPI.getTicket(id);
@@ -365,7 +421,7 @@ export const ticketsAPI = {
       return mockAPI.createTicket(ticketData);
     }
     
-    const response = await api.post('/tickets/', ticketData);
+    const response = await escrituraIdempotente('post', '/tickets/', ticketData);
     return response.data;
   },
 
@@ -374,7 +430,7 @@ export const ticketsAPI = {
       return mockAPI.transitionTicket(id, transitionData);
     }
     
-    const response = await api.patch(`/tickets/${id}/transition/`, transitionData);
+    const response = await escrituraIdempotente('patch', `/tickets/${id}/transition/`, transitionData);
     return response.data;
   },
 
@@ -410,6 +466,31 @@ export const ticketsAPI = {
     const response = await api.get('/tickets/stats/');
     return response.data;
   },
+
+  // Suscribirse al feed de cambios (Server-Sent Events).
+  // EventSource reconecta solo y envía Last-Event-ID para reanudar.
+  // Retorna una función para cerrar la conexión.
+  subscribeToEvents: (onEvent) => {
+    if (isDemoMode || typeof EventSource === 'undefined') {
+      return () => {};
+    }
+
+    const source = new EventSource(`${API_BASE_URL}/tickets/events/`);
+    const types = [
+      'ticket_creado',
+      'ticket_transicionado',
+      'ticket_eliminado',
+      'comentario_creado',
+      'reinicio',
+    ];
+    types.forEach(type => {
+      source.addEventListener(type, (event) => {
+        onEvent({ type, data: JSON.parse(event.data) });
+      });
+    });
+
+    return () => source.close();
+  },
 };
 
 // Servicio para comentarios
@@ -429,7 +510,7 @@ export const commentsAPI = {
       return mockAPI.addComment(ticketId, commentData);
     }
     
-    const response = await api.post(`/tickets/${ticketId}/comments/`, commentData);
+    const response = await escrituraIdempotente('post', `/tickets/${ticketId}/comments/`, commentData);
     return response.data;
   },
 };